@@ -18,15 +18,23 @@ load_dotenv()
 sys.path.insert(0, str(Path(__file__).parent / "src"))
 
 from src.config import get_config
-from src.db.operations import init_db, init_default_products
+from src.db.operations import get_db_manager, init_db, init_default_products
+from src.db.partitions import run_partition_maintenance
+from src.db.replica import begin_write_scope
 from src.container import get_container
 from src.handlers.start import start_handler, OnboardingHandler, register_start_handlers
 from src.handlers.menu import MenuHandler
 from src.handlers.cart import CartHandler
 from src.handlers.admin import register_admin_handlers, AdminHandler
+from src.services.browser_pool import get_browser_pool
 from src.services.invoice_service import warmup_playwright_chromium
+from src.services.order_history import run_order_history_export
+from src.utils.catalog_snapshot import attach_catalog_store, get_catalog_store
+from src.utils.invalidation_bus import get_invalidation_bus
 from src.utils.logger import ProductionLogger
-from telegram.ext import Application, CommandHandler, MessageHandler, filters, CallbackQueryHandler
+from src.utils.loop_watchdog import get_loop_watchdog
+from src.utils.task_supervisor import get_task_supervisor
+from telegram.ext import Application, CommandHandler, MessageHandler, filters, CallbackQueryHandler, TypeHandler
 from telegram import Update
 
 def setup_bot():
@@ -62,6 +70,10 @@ def setup_bot():
             
             logger.info("Production environment validated and monitoring enabled")
 
+        # Serve the menu from the last persisted catalog until the database answers
+        catalog_store = attach_catalog_store(get_invalidation_bus())
+        catalog_store.load_from_disk()
+
         # Initialize database with retry logic
         logger.info("Initializing database...")
         try:
@@ -72,23 +84,26 @@ def setup_bot():
             logger.error(f"Database initialization failed: {e}")
             logger.warning("Bot will start with limited functionality - database features may not work")
             # Continue with bot startup even if database fails
-        # Warm up Playwright Chromium in the background to avoid first-use latency
+        # Listen for cache invalidations published by other bot processes
         try:
-            import threading
-            threading.Thread(
-                target=lambda: asyncio.run(warmup_playwright_chromium()),
-                daemon=True,
-            ).start()
-            logger.info("Scheduled Playwright warm-up task")
+            get_invalidation_bus().start()
         except Exception as e:
-            logger.warning(f"Failed to schedule Playwright warm-up: {e}")
+            logger.warning(f"Failed to start cache invalidation bus: {e}")
+        # Rebuild and persist the catalog snapshot in the background
+        catalog_store.start()
     except Exception as e:
         logger.error(f"Failed to setup bot: {e}")
         raise
 
     # Create application
     logger.info("Creating Telegram application...")
-    application = Application.builder().token(config.bot_token).build()
+    application = (
+        Application.builder()
+        .token(config.bot_token)
+        .post_init(start_background_services)
+        .post_shutdown(stop_background_services)
+        .build()
+    )
 
     # Initialize container
     container = get_container()
@@ -98,6 +113,9 @@ def setup_bot():
     # Register handlers
     logger.info("Registering handlers...")
     
+    # Each update gets its own read-after-write scope before any handler runs
+    application.add_handler(TypeHandler(Update, begin_update_write_scope), group=-1)
+    
     # Register onboarding conversation handler (includes /start command)
     register_start_handlers(application)
     
@@ -157,6 +175,43 @@ def setup_bot():
     
     return application
 
+_warmup_task = None
+_partition_task = None
+_history_task = None
+
+async def start_background_services(application=None):
+    """Start services that live on the application's event loop"""
+    # Warm Chromium for invoice PDFs in the background (installs it on first run if missing)
+    global _warmup_task, _partition_task, _history_task
+    _warmup_task = asyncio.get_running_loop().create_task(warmup_playwright_chromium())
+    # Create upcoming order partitions and move old finished orders to cold storage
+    _partition_task = asyncio.get_running_loop().create_task(run_partition_maintenance())
+    # Write newly closed months to the memory-mapped order history used by analytics
+    _history_task = asyncio.get_running_loop().create_task(run_order_history_export())
+    # Measure event-loop lag and sample whatever blocks it
+    get_loop_watchdog().start()
+
+async def stop_background_services(application=None):
+    """Stop services started by start_background_services"""
+    if _warmup_task is not None and not _warmup_task.done():
+        _warmup_task.cancel()
+    for task in (_partition_task, _history_task):
+        if task is not None and not task.done():
+            task.cancel()
+    try:
+        await get_loop_watchdog().stop()
+    except Exception as e:
+        logging.getLogger(__name__).warning(f"Failed to stop event-loop watchdog: {e}")
+    # Let queued invoices/exports finish before their browser goes away
+    try:
+        await get_task_supervisor().shutdown()
+    except Exception as e:
+        logging.getLogger(__name__).warning(f"Failed to drain background tasks: {e}")
+    try:
+        await get_browser_pool().stop()
+    except Exception as e:
+        logging.getLogger(__name__).warning(f"Failed to stop browser pool: {e}")
+
 async def cleanup_webhook(bot):
     """Clean up any existing webhook to prevent conflicts"""
     try:
@@ -167,6 +222,10 @@ async def cleanup_webhook(bot):
         logger = logging.getLogger(__name__)
         logger.warning(f"Failed to cleanup webhook: {e}")
 
+async def begin_update_write_scope(update, context):
+    """Pin only this update's reads to the primary after its writes"""
+    begin_write_scope()
+
 async def ping_handler(update, context):
     """Simple ping handler"""
     await update.message.reply_text('pong')
@@ -214,6 +273,7 @@ def run_webhook():
             # Initialize the application to handle updates
             await application.initialize()
             await application.start()
+            await start_background_services(application)
 
             # Clean up any existing webhook first
             await cleanup_webhook(application.bot)
@@ -250,7 +310,10 @@ def run_webhook():
         if application:
             try:
                 await application.stop()
+                await stop_background_services(application)
                 await application.shutdown()
+                get_invalidation_bus().stop()
+                get_catalog_store().stop()
                 logger.info("Bot shutdown completed")
             except Exception as e:
                 logger.error(f"Error during shutdown: {e}")
@@ -280,7 +343,13 @@ def run_webhook():
                 "bot_initialized": application and application.bot is not None,
                 "uptime_seconds": metrics.get_summary()['uptime_seconds'],
                 "total_requests": metrics.counters.get('http_requests_total', 0),
-                "error_count": metrics.counters.get('http_errors_total', 0)
+                "error_count": metrics.counters.get('http_errors_total', 0),
+                "event_loop": {
+                    "max_lag_ms": round(get_loop_watchdog().max_lag * 1000, 1),
+                    "top_blocking_sites": get_loop_watchdog().top_blocking_sites(5),
+                },
+                "db_pool": get_db_manager().get_pool_status(),
+                "db_replica": get_db_manager().get_replica_status(),
             }
             
             # Combine results
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Benchmark the columnar analytics engine against the per-order implementation
+
+Generates synthetic orders over a year and times:
+
+- the per-order reports (``AnalyticsService._calculate_*``) over order objects,
+- building ``OrderFacts`` from plain rows (what the bot loads from the DB),
+- the columnar reports over those facts.
+
+Usage: python scripts/benchmark_analytics.py [--lines 1000000] [--days 365]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+# The services read the bot configuration on import; none of it is used here
+os.environ.setdefault("BOT_TOKEN", "benchmark")
+os.environ.setdefault("ADMIN_CHAT_ID", "1")
+os.environ.setdefault("DATABASE_URL", "sqlite:///:memory:")
+
+from src.services.admin_service import AnalyticsService  # noqa: E402
+from src.services.analytics_engine import HAS_NUMPY, OrderFacts  # noqa: E402
+
+STATUSES = ["pending", "confirmed", "preparing", "ready", "delivered", "delivered", "delivered", "cancelled"]
+PRODUCTS = [f"Product {i}" for i in range(40)]
+
+
+def make_orders(lines: int, days: int, seed: int = 7):
+    rng = random.Random(seed)
+    end = date.today()
+    start = end - timedelta(days=days - 1)
+    customers = [SimpleNamespace(id=i, full_name=f"Customer {i}") for i in range(1, max(2, lines // 40))]
+    orders = []
+    order_rows, line_rows = [], []
+    produced = 0
+    order_id = 0
+    while produced < lines:
+        order_id += 1
+        created = datetime.combine(start, datetime.min.time()) + timedelta(seconds=rng.randrange(days * 86400))
+        status = rng.choice(STATUSES)
+        items = []
+        for _ in range(min(rng.randint(1, 7), lines - produced)):
+            qty = rng.randint(1, 4)
+            price = rng.choice((18.0, 25.0, 32.0, 45.0))
+            items.append(SimpleNamespace(product_name=rng.choice(PRODUCTS), quantity=qty, total_price=qty * price))
+        produced += len(items)
+        customer = rng.choice(customers)
+        order = SimpleNamespace(
+            id=order_id,
+            created_at=created,
+            updated_at=created + timedelta(hours=rng.uniform(0.5, 6)),
+            status=status,
+            total=sum(i.total_price for i in items),
+            delivery_method=rng.choice(("delivery", "pickup")),
+            customer=customer,
+            order_items=items,
+        )
+        orders.append(order)
+        order_rows.append((order.id, created, status, order.total, order.delivery_method, customer.id, order.updated_at))
+        line_rows.extend((order.id, i.product_name, i.quantity, i.total_price) for i in items)
+    names = {c.id: c.full_name for c in customers}
+    return start, end, orders, order_rows, line_rows, names
+
+
+def timed(label: str, func):
+    started = time.perf_counter()
+    result = func()
+    print(f"  {label:<38} {time.perf_counter() - started:8.3f} s")
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--lines", type=int, default=1_000_000, help="order lines to generate")
+    parser.add_argument("--days", type=int, default=365, help="period length in days")
+    args = parser.parse_args()
+
+    print(f"Generating {args.lines:,} order lines over {args.days} days...")
+    start, end, orders, order_rows, line_rows, names = make_orders(args.lines, args.days)
+    print(f"  {len(orders):,} orders, NumPy {'enabled' if HAS_NUMPY else 'not installed (pure-Python fallback)'}")
+    service = AnalyticsService()
+
+    def per_order():
+        service._calculate_revenue_analytics(orders, start, end)
+        service._calculate_order_analytics(orders, start, end)
+        service._calculate_product_analytics(orders)
+        service._calculate_customer_analytics(orders)
+        service._calculate_trends(orders, start, end)
+
+    def columnar(facts):
+        service._revenue_from_facts(facts)
+        service._orders_from_facts(facts)
+        service._products_from_facts(facts)
+        service._customers_from_facts(facts)
+        service._trends_from_facts(facts)
+
+    print("Per-order implementation")
+    timed("reports", per_order)
+    print("Columnar engine")
+    facts = timed("load facts from rows", lambda: OrderFacts.from_rows(start, end, order_rows, line_rows, names))
+    timed("reports", lambda: columnar(facts))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Benchmark the storage backends on the bot's hot cart path
+
+Runs the operations layer against an embedded SQLite file (WAL mode) and,
+with --postgres-url, against a PostgreSQL server, and reports per-call
+latency for what a customer interaction does:
+
+- customer lookup by Telegram id,
+- ``add_to_cart`` (a write transaction),
+- ``get_cart_items`` (a read-only transaction),
+- ``clear_cart``.
+
+The schema is created if missing. Point --postgres-url at a scratch
+database: the benchmark's customers, carts and product use ids far above
+real ones and are deleted afterwards, but the schema bootstrap still runs.
+
+Usage: python scripts/benchmark_storage.py [--iterations 500] [--postgres-url URL]
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+# The operations module reads the bot configuration on import; none of it is used here
+os.environ.setdefault("BOT_TOKEN", "benchmark")
+os.environ.setdefault("ADMIN_CHAT_ID", "1")
+os.environ.setdefault("DATABASE_URL", "sqlite:///:memory:")
+
+from src.db import operations  # noqa: E402
+from src.db.models import Cart, CartItem, Customer, Product  # noqa: E402
+
+TELEGRAM_BASE = 900_000_000
+CUSTOMERS = 20
+
+
+def make_manager(database_url: str) -> operations.DatabaseManager:
+    config = SimpleNamespace(
+        supabase_connection_string="",
+        database_url=database_url,
+        database_replica_url="",
+        environment="benchmark",
+        db_pool_mode="auto",
+        db_pool_size=0,
+        db_max_overflow=-1,
+        db_pool_adaptive=False,
+    )
+    manager = operations.DatabaseManager(config)
+    manager.create_tables()
+    return manager
+
+
+def cleanup(manager: operations.DatabaseManager, product_id: int) -> None:
+    with manager.get_session_context() as session:
+        customers = session.query(Customer.id).filter(Customer.telegram_id >= TELEGRAM_BASE).scalar_subquery()
+        carts = session.query(Cart.id).filter(Cart.customer_id.in_(customers)).scalar_subquery()
+        session.query(CartItem).filter(CartItem.cart_id.in_(carts)).delete(synchronize_session=False)
+        session.query(Cart).filter(Cart.customer_id.in_(customers)).delete(synchronize_session=False)
+        session.query(Customer).filter(Customer.telegram_id >= TELEGRAM_BASE).delete(synchronize_session=False)
+        session.query(Product).filter(Product.id == product_id).delete(synchronize_session=False)
+
+
+def run(label: str, database_url: str, iterations: int) -> None:
+    manager = make_manager(database_url)
+    operations._db_manager = manager
+    with manager.get_session_context() as session:
+        product = Product(name=f"benchmark_product_{os.getpid()}", price=25.0)
+        session.add(product)
+        session.flush()
+        product_id = product.id
+
+    steps = {
+        "customer lookup": lambda tid: operations.get_customer_by_telegram_id(tid),
+        "add_to_cart": lambda tid: operations.add_to_cart(tid, product_id, 1, {"size": "large"}),
+        "get_cart_items": lambda tid: operations.get_cart_items(tid),
+        "clear_cart": lambda tid: operations.clear_cart(tid),
+    }
+    timings = {name: [] for name in steps}
+    try:
+        for i in range(iterations):
+            telegram_id = TELEGRAM_BASE + i % CUSTOMERS
+            for name, step in steps.items():
+                started = time.perf_counter()
+                step(telegram_id)
+                timings[name].append((time.perf_counter() - started) * 1000)
+    finally:
+        cleanup(manager, product_id)
+        manager.get_engine().dispose()
+        operations._db_manager = None
+
+    print(f"{label} ({iterations} iterations)")
+    for name, samples in timings.items():
+        p95 = statistics.quantiles(samples, n=20)[-1] if len(samples) > 1 else samples[0]
+        print(f"  {name:<18} p50 {statistics.median(samples):7.2f} ms   p95 {p95:7.2f} ms")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--iterations", type=int, default=500, help="customer interactions per backend")
+    parser.add_argument("--sqlite-path", help="SQLite file to use (default: a temporary file)")
+    parser.add_argument("--postgres-url", help="scratch PostgreSQL database to compare against")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = args.sqlite_path or str(Path(directory) / "benchmark.db")
+        run(f"SQLite WAL ({path})", f"sqlite:///{path}", args.iterations)
+    if args.postgres_url:
+        run("PostgreSQL", args.postgres_url, args.iterations)
+
+
+if __name__ == "__main__":
+    main()
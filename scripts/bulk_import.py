@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""
+Import customers, categories, products and options from CSV or YAML files
+
+Runs the same import as sending the file to the bot with /import: records
+are validated row by row, written in batches of upserts, and rows that fail
+validation are reported and skipped. Exits with status 1 when any row or
+file was rejected.
+
+Usage: python scripts/bulk_import.py FILE [FILE ...] [--kind products] [--dry-run]
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.services.bulk_import import KINDS, ImportFileError, import_file  # noqa: E402
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("files", nargs="+", help="CSV or YAML files, imported in the given order")
+    parser.add_argument("--kind", choices=list(KINDS), help="kind of record in CSV files not named after one")
+    parser.add_argument("--dry-run", action="store_true", help="validate and roll back without saving")
+    args = parser.parse_args()
+
+    failed = False
+    for path in args.files:
+        try:
+            result = import_file(path, kind=args.kind, dry_run=args.dry_run)
+        except ImportFileError as e:
+            print(f"{path}: not imported: {e}")
+            failed = True
+            continue
+        print(f"{path}{' (dry run)' if args.dry_run else ''}:")
+        print("  " + result.summary().replace("\n", "\n  "))
+        failed = failed or bool(result.error_count)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
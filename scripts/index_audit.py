@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+Explain the app's hot query shapes and flag sequential scans
+
+Runs ``src.db.index_audit`` against the configured database (or ``--url``).
+With ``--seed`` a synthetic dataset is inserted first so the planner sees
+realistic table sizes; it is rolled back when the audit finishes.
+
+Usage: python scripts/index_audit.py [--url postgresql://...] [--seed 20000] [--verbose]
+Exits with status 1 when any query shape scans a table without an index.
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy import create_engine  # noqa: E402
+
+from src.db.index_audit import audit_indexes  # noqa: E402
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--url", help="database URL (default: the bot configuration)")
+    parser.add_argument("--seed", type=int, default=0, help="synthetic customers to insert before explaining")
+    parser.add_argument("--verbose", action="store_true", help="print the SQL and full plan of every query")
+    args = parser.parse_args()
+
+    if args.url:
+        engine = create_engine(args.url)
+    else:
+        from src.db.operations import get_db_manager
+
+        engine = get_db_manager().get_engine()
+
+    reports = audit_indexes(engine, seed_rows=args.seed)
+    for report in reports:
+        verdict = f"SEQ SCAN on {', '.join(report.seq_scans)}" if report.seq_scans else "ok"
+        timing = f"  {report.execution_ms:8.2f} ms  hit={report.shared_hit} read={report.shared_read}"
+        print(f"{report.name:<28} {verdict}{timing if engine.dialect.name == 'postgresql' else ''}")
+        if args.verbose:
+            print(f"  {report.sql}")
+            print(json.dumps(report.plan, indent=2, default=str))
+    return 1 if any(report.seq_scans for report in reports) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
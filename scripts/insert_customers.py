@@ -16,6 +16,7 @@ project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
 
 from faker import Faker
+from src.db.bulk import upsert_rows
 from src.db.models import Customer
 from src.db.operations import get_db_manager
 from src.config import get_config
@@ -88,37 +89,19 @@ def insert_customers(num_customers: int = 1000):
         
         logger.info(f"Generated data for {len(customers_data)} customers")
         
-        # Insert customers in batches for better performance
-        batch_size = 100
+        # Insert customers in batches: one INSERT ... ON CONFLICT per batch
+        batch_size = 500
         total_inserted = 0
+        customers_table = Customer.__table__
         
-        with db_manager.get_session_context() as session:
+        with db_manager.get_engine().begin() as conn:
             for i in range(0, len(customers_data), batch_size):
                 batch = customers_data[i:i + batch_size]
-                
-                # Create Customer objects
-                customers = []
-                for data in batch:
-                    customer = Customer(
-                        telegram_id=data['telegram_id'],
-                        name=data['name'],
-                        phone=data['phone'],
-                        language=data['language'],
-                        delivery_address=data['delivery_address'],
-                        is_admin=data['is_admin']
-                    )
-                    customers.append(customer)
-                
-                # Add batch to session
-                session.add_all(customers)
-                session.flush()  # Flush to get IDs without committing
-                
-                total_inserted += len(customers)
+                counts = upsert_rows(conn, customers_table, ("telegram_id",), batch)
+                total_inserted += counts.inserted
                 logger.info(f"Inserted batch {i//batch_size + 1}: {total_inserted}/{num_customers} customers")
             
-            # Commit all changes
-            session.commit()
-            logger.info(f"Successfully inserted all {total_inserted} customers!")
+        logger.info(f"Successfully inserted all {total_inserted} customers!")
             
     except Exception as e:
         logger.error(f"Error inserting customers: {e}")
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Convert orders and order_items to hot/cold monthly partitions (PostgreSQL)
+
+The conversion copies both tables into partitioned ones and drops the
+originals in one transaction, holding an exclusive lock on them meanwhile:
+run it while the bot is stopped or quiet, after a backup. It also drops the
+order_items -> orders foreign key, which PostgreSQL cannot keep on a
+partitioned orders table (see ``src.db.partitions``). Order numbers stay
+unique through the order_numbers table.
+
+The schema is bootstrapped first, so the order_numbers registry is in place.
+Without ``--yes`` only the row counts that would be converted are printed.
+
+Usage: python scripts/partition_orders.py [--url postgresql://...] [--yes]
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy import create_engine, text  # noqa: E402
+
+from src.db.partitions import ensure_hot_partitions, is_partitioned, partition_order_tables  # noqa: E402
+from src.db.schema import ensure_schema  # noqa: E402
+from src.utils.constants import PartitionSettings  # noqa: E402
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--url", help="database URL (default: the bot configuration)")
+    parser.add_argument("--yes", action="store_true", help="convert the tables instead of only reporting")
+    args = parser.parse_args()
+
+    if args.url:
+        engine = create_engine(args.url)
+    else:
+        from src.db.operations import get_db_manager
+
+        engine = get_db_manager().get_engine()
+    if engine.dialect.name != "postgresql":
+        print(f"Partitioning needs PostgreSQL, not {engine.dialect.name}")
+        return 1
+
+    ensure_schema(engine)
+    with engine.connect() as conn:
+        pending = [table for table in PartitionSettings.TABLES if not is_partitioned(conn, table)]
+        for table in PartitionSettings.TABLES:
+            rows = conn.execute(text(f"SELECT COUNT(*) FROM {table}")).scalar()
+            print(f"{table:<12} {rows:>10} rows  {'plain' if table in pending else 'partitioned'}")
+    if not pending:
+        print("Nothing to do")
+        return 0
+    if not args.yes:
+        print("Run again with --yes to convert; the bot should be stopped meanwhile")
+        return 0
+
+    with engine.begin() as conn:
+        converted = partition_order_tables(conn)
+        created = ensure_hot_partitions(conn)
+    print(f"Partitioned {', '.join(converted)}; created {', '.join(created) or 'no'} upcoming month partitions")
+    print("The bot's partition maintenance archives old orders into the cold partitions")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
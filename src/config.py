@@ -29,6 +29,57 @@ class Settings(BaseSettings):
         default="", description="Supabase PostgreSQL connection string"
     )
 
+    database_replica_url: str = Field(
+        default="", description="Read-replica connection URL for catalog, analytics and exports (empty disables)"
+    )
+    db_replica_max_lag_seconds: float = Field(
+        default=5.0, description="Replica replay lag above which reads fall back to the primary", ge=0
+    )
+
+    # Connection pool: "auto", "session" (QueuePool) or "transaction" (PgBouncer/Supavisor transaction mode)
+    db_pool_mode: str = Field(
+        default="auto", description="Connection pool profile"
+    )
+    db_pool_size: int = Field(
+        default=0, description="Persistent pool connections (0 uses the environment default)", ge=0
+    )
+    db_max_overflow: int = Field(
+        default=-1, description="Burst connections above the pool size (-1 uses the environment default)", ge=-1
+    )
+    db_pool_adaptive: bool = Field(
+        default=False, description="Resize the pool to follow measured concurrency"
+    )
+
+    order_archive_after_months: int = Field(
+        default=6, description="Move delivered/cancelled orders older than this many months to cold partitions", ge=1
+    )
+
+    # Cross-process cache invalidation: "auto" (Postgres NOTIFY when on Postgres), "postgres" or "loopback"
+    cache_invalidation_backend: str = Field(
+        default="auto", description="Backend used to broadcast cache invalidations between processes"
+    )
+
+    # Local catalog snapshot served at cold start and during database outages
+    catalog_snapshot_path: str = Field(
+        default="data/catalog_snapshot.json.gz", description="Path of the persisted catalog snapshot"
+    )
+
+    # Closed months of orders as column files read by analytics (empty disables)
+    order_history_dir: str = Field(
+        default="data/order_history", description="Directory of the memory-mapped order history"
+    )
+
+    # Invoice PDFs: warm Chromium contexts and the on-disk PDF cache
+    pdf_browser_pool_size: int = Field(
+        default=2, description="Warm browser contexts used to render invoice PDFs", ge=1
+    )
+    pdf_cache_dir: str = Field(
+        default="data/pdf_cache", description="Directory of the content-addressed invoice PDF cache"
+    )
+    receipt_font_path: str = Field(
+        default="", description="Hebrew-capable TrueType font for native receipts (bundled DejaVu Sans if empty)"
+    )
+
     # Redis configuration (for rate limiting in production)
     redis_url: str = Field(
         default="redis://localhost:6379", description="Redis connection URL for rate limiting"
@@ -0,0 +1,124 @@
+"""
+Batched upserts for bulk imports
+
+``upsert_rows`` writes a batch of rows identified by a natural key:
+
+- when the key is backed by a unique constraint (``customers.telegram_id``)
+  the whole batch is one ``INSERT ... ON CONFLICT (key) DO UPDATE``,
+- otherwise (category, product and option names are unique only by
+  convention, so an existing database may already hold duplicates and no
+  constraint can be added safely) the batch's keys are looked up with one
+  SELECT, then new rows are inserted and existing rows updated with one
+  executemany each.
+
+SQLAlchemy sends an executemany INSERT as multi-row ``VALUES`` pages
+("insertmanyvalues") on PostgreSQL and SQLite, so a batch of hundreds of
+rows costs a handful of round trips.
+"""
+
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Mapping, Sequence, Tuple
+
+from sqlalchemy import Table, bindparam, func, select, tuple_
+from sqlalchemy.engine import Connection
+from sqlalchemy.schema import UniqueConstraint
+
+Key = Tuple[Any, ...]
+
+
+@dataclass
+class UpsertCounts:
+    """Rows inserted and updated by ``upsert_rows``"""
+
+    inserted: int = 0
+    updated: int = 0
+
+
+def _dialect_insert(conn: Connection, table: Table):
+    """The dialect's INSERT construct, which has ON CONFLICT clauses"""
+    if conn.dialect.name == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        from sqlalchemy.dialects.postgresql import insert
+    return insert(table)
+
+
+def has_unique_key(table: Table, key: Sequence[str]) -> bool:
+    """Whether a unique constraint or index covers exactly ``key``"""
+    wanted = set(key)
+    constraints = [c for c in table.constraints if isinstance(c, UniqueConstraint)]
+    constraints += [i for i in table.indexes if i.unique]
+    return any({c.name for c in constraint.columns} == wanted for constraint in constraints) or (
+        len(key) == 1 and bool(table.c[key[0]].unique)
+    )
+
+
+def lookup_ids(conn: Connection, table: Table, key: Sequence[str], keys: Iterable[Key]) -> Dict[Key, int]:
+    """Ids of the rows with the given keys; with duplicates the oldest row wins"""
+    keys = list(dict.fromkeys(keys))
+    if not keys:
+        return {}
+    columns = [table.c[name] for name in key]
+    match = columns[0].in_([k[0] for k in keys]) if len(columns) == 1 else tuple_(*columns).in_(keys)
+    found: Dict[Key, int] = {}
+    for row in conn.execute(select(table.c.id, *columns).where(match).order_by(table.c.id)):
+        found.setdefault(tuple(row[1:]), row[0])
+    return found
+
+
+def _groups(rows: Iterable[Mapping[str, Any]]) -> Dict[Tuple[str, ...], List[Mapping[str, Any]]]:
+    # executemany needs the same columns in every row of one statement
+    groups: Dict[Tuple[str, ...], List[Mapping[str, Any]]] = {}
+    for row in rows:
+        groups.setdefault(tuple(sorted(row)), []).append(row)
+    return groups
+
+
+def upsert_rows(conn: Connection, table: Table, key: Sequence[str], rows: Sequence[Mapping[str, Any]]) -> UpsertCounts:
+    """Insert or update ``rows`` by their ``key`` columns in the caller's transaction
+
+    Every row must contain the key columns; other columns are written only
+    where a row has them. Keys must be unique within the batch.
+    """
+    counts = UpsertCounts()
+    if not rows:
+        return counts
+    existing = lookup_ids(conn, table, key, (tuple(row[name] for name in key) for row in rows))
+    counts.updated = sum(1 for row in rows if tuple(row[name] for name in key) in existing)
+    counts.inserted = len(rows) - counts.updated
+
+    if has_unique_key(table, key):
+        statement = _dialect_insert(conn, table)
+        for columns, group in _groups(rows).items():
+            assignments = {name: statement.excluded[name] for name in columns if name not in key}
+            if not assignments:
+                conn.execute(statement.on_conflict_do_nothing(index_elements=list(key)), group)
+                continue
+            if "updated_at" in table.c:
+                assignments["updated_at"] = func.now()
+            conn.execute(statement.on_conflict_do_update(index_elements=list(key), set_=assignments), group)
+        return counts
+
+    new_rows = [row for row in rows if tuple(row[name] for name in key) not in existing]
+    for group in _groups(new_rows).values():
+        conn.execute(table.insert(), group)
+    changed = [row for row in rows if tuple(row[name] for name in key) in existing]
+    for columns, group in _groups(changed).items():
+        columns = [name for name in columns if name not in key]
+        if not columns:
+            continue
+        # Bind names must differ from the column names of an UPDATE's SET clause
+        values = {name: bindparam(f"new_{name}") for name in columns}
+        params = [
+            {"row_id": existing[tuple(row[name] for name in key)], **{f"new_{name}": row[name] for name in columns}}
+            for row in group
+        ]
+        conn.execute(table.update().where(table.c.id == bindparam("row_id")).values(values), params)
+    return counts
+
+
+def insert_missing(conn: Connection, table: Table, rows: Sequence[Mapping[str, Any]]) -> None:
+    """Insert ``rows`` into an association table, skipping ones already there"""
+    if not rows:
+        return
+    conn.execute(_dialect_insert(conn, table).on_conflict_do_nothing(), list(rows))
@@ -0,0 +1,224 @@
+"""
+Index audit over the app's hot query shapes
+
+``QUERY_SHAPES`` mirrors the lookups the bot runs on every interaction
+(customer by Telegram id or phone, the active cart and its items, option
+lookups, order history, the active-order dashboards). ``audit_indexes``
+explains each one and reports the tables that are read with a full scan:
+
+- on PostgreSQL with ``EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON)``, reporting
+  ``Seq Scan`` nodes that read many rows, together with timing and buffer
+  counts (on partitioned tables each partition is checked on its own),
+- on SQLite with ``EXPLAIN QUERY PLAN``, reporting ``SCAN <table>`` steps
+  that do not use an index.
+
+With ``seed_rows`` a synthetic dataset is inserted first so the planner
+sees realistic table sizes; everything runs in one transaction that is
+rolled back, so the audit can be pointed at a real database.
+"""
+
+import json
+import logging
+import re
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Sequence
+
+from sqlalchemy import select, text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.sql import Select
+
+from src.db.models import Cart, CartItem, Customer, MenuCategory, Order, OrderItem, Product, ProductOption
+from src.utils.constants import OrderStatusGroups
+
+logger = logging.getLogger(__name__)
+
+# Tables small enough that a full scan is the right plan
+SMALL_TABLES = frozenset(
+    {"menu_categories", "order_statuses", "delivery_methods", "delivery_areas", "payment_methods", "business_settings"}
+)
+
+# On PostgreSQL a sequential scan is only reported when it read at least
+# this many rows; the planner rightly scans tiny tables and partitions
+MIN_SCANNED_ROWS = 1000
+
+# Synthetic rows start far above real ids so seeding never collides with data
+_SEED_ID_BASE = 900_000_000
+_SQLITE_SCAN = re.compile(r"^SCAN (?:TABLE )?(\w+)(.*)$")
+
+
+@dataclass(frozen=True)
+class QueryShape:
+    """A named query as the app issues it"""
+
+    name: str
+    build: Callable[[int], Select]  # receives the first seeded id
+
+
+QUERY_SHAPES: Sequence[QueryShape] = (
+    QueryShape("customer_by_telegram_id", lambda base: select(Customer).where(Customer.telegram_id == base + 7)),
+    QueryShape("customer_by_phone", lambda base: select(Customer).where(Customer.phone == f"+{base + 7}")),
+    QueryShape(
+        "active_cart",
+        lambda base: select(Cart).where(Cart.customer_id == base + 7, Cart.is_active.is_(True)),
+    ),
+    QueryShape(
+        "cart_item_lookup",
+        lambda base: select(CartItem).where(CartItem.cart_id == base + 7, CartItem.product_id == base + 1),
+    ),
+    QueryShape(
+        "product_option_lookup",
+        lambda base: select(ProductOption).where(
+            ProductOption.option_type == "audit_type_3", ProductOption.name == "audit_option_7"
+        ),
+    ),
+    QueryShape(
+        "customer_order_history",
+        lambda base: select(Order).where(Order.customer_id == base + 7).order_by(Order.created_at.desc()),
+    ),
+    QueryShape(
+        "active_orders",
+        lambda base: select(Order)
+        .where(Order.archived.is_(False), Order.status.in_(OrderStatusGroups.ACTIVE))
+        .order_by(Order.created_at.desc()),
+    ),
+    QueryShape("order_items", lambda base: select(OrderItem).where(OrderItem.order_id == base + 7)),
+    QueryShape(
+        "orders_between",
+        lambda base: select(Order).where(
+            Order.created_at >= datetime(2024, 1, 1), Order.created_at < datetime(2024, 1, 8)
+        ),
+    ),
+)
+
+
+@dataclass
+class ShapeReport:
+    """Plan summary for one query shape"""
+
+    name: str
+    sql: str
+    seq_scans: List[str] = field(default_factory=list)
+    plan: Any = None
+    execution_ms: float = 0.0
+    shared_hit: int = 0
+    shared_read: int = 0
+
+
+def seed_dataset(conn: Connection, customers: int, base: int = _SEED_ID_BASE) -> None:
+    """Insert ``customers`` customers with carts, options and a few orders each"""
+    start = datetime(2024, 1, 1)
+    statuses = ("delivered", "delivered", "delivered", "cancelled", "pending", "confirmed", "ready")
+    products = max(customers // 100, 10)
+
+    conn.execute(MenuCategory.__table__.insert(), [{"id": base, "name_en": "Audit", "name_he": "Audit"}])
+    conn.execute(
+        Product.__table__.insert(),
+        [{"id": base + i, "name": f"audit_product_{i}", "price": 10.0, "category_id": base} for i in range(products)],
+    )
+    conn.execute(
+        ProductOption.__table__.insert(),
+        [
+            {"id": base + i, "name": f"audit_option_{i}", "option_type": f"audit_type_{i % 20}"}
+            for i in range(products * 5)
+        ],
+    )
+    conn.execute(
+        Customer.__table__.insert(),
+        [{"id": base + i, "telegram_id": base + i, "name": "Audit", "phone": f"+{base + i}"} for i in range(customers)],
+    )
+    conn.execute(
+        Cart.__table__.insert(),
+        [{"id": base + i, "customer_id": base + i, "is_active": i % 3 == 0} for i in range(customers)],
+    )
+    conn.execute(
+        CartItem.__table__.insert(),
+        [
+            {"cart_id": base + i, "product_id": base + (i + j) % products, "quantity": 1, "unit_price": 10.0}
+            for i in range(customers)
+            for j in range(2)
+        ],
+    )
+    orders = []
+    for i in range(customers * 4):
+        status = statuses[i % len(statuses)] if i % 50 == 0 else "delivered"
+        orders.append(
+            {
+                "id": base + i,
+                "customer_id": base + i % customers,
+                "status": status,
+                "order_number": f"AUD{i}",
+                "created_at": start + timedelta(minutes=37 * i),
+            }
+        )
+    conn.execute(Order.__table__.insert(), orders)
+    conn.execute(
+        OrderItem.__table__.insert(),
+        [
+            {
+                "order_id": order["id"],
+                "product_id": base + j % products,
+                "product_name": "audit",
+                "quantity": 1,
+                "unit_price": 10.0,
+                "total_price": 10.0,
+            }
+            for order in orders
+            for j in range(2)
+        ],
+    )
+    conn.execute(text("ANALYZE"))
+
+
+def _walk_postgres_plan(node: Dict[str, Any], report: ShapeReport) -> None:
+    if node.get("Node Type") == "Seq Scan" and node.get("Relation Name") not in SMALL_TABLES:
+        scanned = (node.get("Actual Rows", 0) + node.get("Rows Removed by Filter", 0)) * node.get("Actual Loops", 1)
+        if scanned >= MIN_SCANNED_ROWS:
+            report.seq_scans.append(node["Relation Name"])
+    for child in node.get("Plans", ()):
+        _walk_postgres_plan(child, report)
+
+
+def explain_shape(conn: Connection, shape: QueryShape, base: int = _SEED_ID_BASE) -> ShapeReport:
+    """Run the dialect's EXPLAIN for one shape and collect its full scans"""
+    statement = shape.build(base)
+    sql = str(statement.compile(dialect=conn.dialect, compile_kwargs={"literal_binds": True}))
+    report = ShapeReport(shape.name, sql)
+    if conn.dialect.name == "postgresql":
+        raw = conn.execute(text(f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {sql}")).scalar()
+        report.plan = (json.loads(raw) if isinstance(raw, str) else raw)[0]
+        root = report.plan["Plan"]
+        report.execution_ms = float(report.plan.get("Execution Time", 0.0))
+        report.shared_hit = int(root.get("Shared Hit Blocks", 0))
+        report.shared_read = int(root.get("Shared Read Blocks", 0))
+        _walk_postgres_plan(root, report)
+    else:
+        rows = conn.execute(text(f"EXPLAIN QUERY PLAN {sql}")).fetchall()
+        report.plan = [row[-1] for row in rows]
+        for detail in report.plan:
+            match = _SQLITE_SCAN.match(detail)
+            if match and "INDEX" not in match.group(2) and match.group(1) not in SMALL_TABLES:
+                report.seq_scans.append(match.group(1))
+    return report
+
+
+def audit_indexes(
+    engine: Engine, shapes: Sequence[QueryShape] = QUERY_SHAPES, seed_rows: int = 0
+) -> List[ShapeReport]:
+    """Explain every shape, optionally over ``seed_rows`` synthetic customers
+
+    Nothing is left behind: the seed data and ANALYZE run in a transaction
+    that is rolled back.
+    """
+    with engine.connect() as conn:
+        transaction = conn.begin()
+        try:
+            if seed_rows:
+                seed_dataset(conn, seed_rows)
+            reports = [explain_shape(conn, shape) for shape in shapes]
+        finally:
+            transaction.rollback()
+    for report in reports:
+        if report.seq_scans:
+            logger.warning("Query %s scans %s without an index", report.name, ", ".join(report.seq_scans))
+    return reports
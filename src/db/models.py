@@ -5,6 +5,8 @@ SQLAlchemy database models for the Samna Salta bot
 Properly defined models with correct Base class and type annotations.
 """
 
+import hashlib
+import json
 from datetime import datetime
 from typing import Any, List, Optional, Type
 
@@ -15,10 +17,13 @@ from sqlalchemy.orm import (
     declarative_base,
     mapped_column,
     relationship,
+    validates,
 )
-from sqlalchemy.sql import func
+from sqlalchemy.sql import func, text
 from sqlalchemy.ext.mutable import MutableList  # local import to avoid circular deps
 
+from src.utils.constants import OrderStatusGroups
+
 # Create declarative base with proper type annotation
 _Base = declarative_base()
 
@@ -30,6 +35,10 @@ class Customer(Base):
     """Customer model"""
 
     __tablename__ = "customers"
+    __table_args__ = (
+        # telegram_id lookups use the index behind its unique constraint
+        Index("idx_customers_phone", "phone"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     telegram_id: Mapped[int] = mapped_column(BigInteger, unique=True, nullable=False)
@@ -132,6 +141,9 @@ class ProductOption(Base):
     """Product option/variant model (e.g., Kubaneh Classic, Samneh Smoked)"""
 
     __tablename__ = "product_options"
+    __table_args__ = (
+        Index("idx_product_options_type_name", "option_type", "name"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     name: Mapped[str] = mapped_column(String(100), nullable=False)
@@ -555,10 +567,26 @@ class Cart(Base):
         return f"<Cart(id={self.id}, customer_id={self.customer_id})>"
 
 
+def canonical_options_key(options: Optional[dict]) -> str:
+    """Canonical key of a cart line's selected options
+
+    Equal selections give the same key whatever their key order, so cart
+    lines are grouped with a plain string comparison that every database
+    supports. No options is the empty string, the column default.
+    """
+    if not options:
+        return ""
+    canonical = json.dumps(options, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
 class CartItem(Base):
     """Cart item model"""
 
     __tablename__ = "cart_items"
+    __table_args__ = (
+        Index("idx_cart_items_cart_product", "cart_id", "product_id"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     cart_id: Mapped[Optional[int]] = mapped_column(
@@ -579,11 +607,18 @@ class CartItem(Base):
     product_options: Mapped[Optional[dict[str, Any]]] = mapped_column(
         JSON, nullable=True, server_default="{}"
     )
+    # Kept in step with product_options by _sync_options_key
+    options_key: Mapped[str] = mapped_column(String(64), nullable=False, default="", server_default="")
 
     # Relationships
     cart: Mapped[Optional["Cart"]] = relationship("Cart", back_populates="cart_items")
     product: Mapped[Optional["Product"]] = relationship("Product")
 
+    @validates("product_options")
+    def _sync_options_key(self, _key: str, value: Optional[dict]) -> Optional[dict]:
+        self.options_key = canonical_options_key(value)
+        return value
+
     @property
     def total_price(self) -> float:
         """Calculate total price for this item"""
@@ -599,9 +634,16 @@ class Order(Base):
     __tablename__ = "orders"
     __table_args__ = (
         # Match provided DB schema indexes
-        Index("idx_orders_customer", "customer_id"),
+        Index("idx_orders_customer_created", "customer_id", "created_at"),
         Index("idx_orders_status", "status"),
         Index("idx_orders_created", "created_at"),
+        # Dashboards list the few orders still in progress, newest first
+        Index(
+            "idx_orders_active_created",
+            "created_at",
+            postgresql_where=text(f"status IN {OrderStatusGroups.ACTIVE!r}"),
+            sqlite_where=text(f"status IN {OrderStatusGroups.ACTIVE!r}"),
+        ),
     )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
@@ -625,6 +667,8 @@ class Order(Base):
     delivery_method: Mapped[str] = mapped_column(String(20), default="pickup", nullable=False)
     delivery_area_id: Mapped[Optional[int]] = mapped_column(Integer, ForeignKey("delivery_areas.id"), nullable=True)
     total: Mapped[float] = mapped_column(Float, nullable=False, server_default="0.0")
+    # Set by the archive job; on PostgreSQL it selects the hot or cold partition
+    archived: Mapped[bool] = mapped_column(Boolean, default=False, server_default=text("false"), nullable=False)
 
     # Relationships
     customer: Mapped[Optional["Customer"]] = relationship("Customer", back_populates="orders")
@@ -637,10 +681,34 @@ class Order(Base):
         return f"<Order(id={self.id}, customer_id={self.customer_id}, order_number='{self.order_number}')>"
 
 
+class OrderNumber(Base):
+    """Every order number ever issued, unique
+
+    A partitioned orders table can only enforce uniqueness together with its
+    partition keys, so order numbers are registered here in the transaction
+    that creates the order. Rows are kept when an order is deleted, so a
+    number is never issued twice.
+    """
+
+    __tablename__ = "order_numbers"
+
+    order_number: Mapped[str] = mapped_column(String(20), primary_key=True)
+    order_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    created_at: Mapped[Optional[datetime]] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=True
+    )
+
+    def __str__(self) -> str:
+        return f"<OrderNumber(order_number='{self.order_number}', order_id={self.order_id})>"
+
+
 class OrderItem(Base):
     """Order item model"""
 
     __tablename__ = "order_items"
+    __table_args__ = (
+        Index("idx_order_items_order", "order_id"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     order_id: Mapped[int] = mapped_column(
@@ -659,6 +727,7 @@ class OrderItem(Base):
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), server_default=func.now()
     )
+    archived: Mapped[bool] = mapped_column(Boolean, default=False, server_default=text("false"), nullable=False)
 
     # Relationships
     order: Mapped["Order"] = relationship("Order", back_populates="order_items")
@@ -6,15 +6,15 @@ Enhanced with proper type annotations, constant usage, and performance optimizat
 
 import logging
 # PostgreSQL operations only
+import threading
 import time
 from datetime import datetime
 from functools import wraps
-from typing import Any, Callable, Dict, List, Optional, Union, Generator, Tuple
+from typing import Any, Callable, Dict, List, Optional, Union, Generator, Sequence, Tuple
 from contextlib import contextmanager
 
-from sqlalchemy import Engine, create_engine, event, text, cast, bindparam, JSON
-from sqlalchemy.dialects.postgresql import JSONB
-from sqlalchemy.exc import OperationalError, SQLAlchemyError
+from sqlalchemy import Engine, create_engine, event, text, bindparam, JSON
+from sqlalchemy.exc import DisconnectionError, OperationalError, SQLAlchemyError
 from sqlalchemy.orm import Session, sessionmaker
 from sqlalchemy.orm.attributes import flag_modified
 from sqlalchemy.pool import StaticPool, QueuePool
@@ -28,6 +28,7 @@ from src.db.models import (
     Customer,
     Order,
     OrderItem,
+    OrderNumber,
     Product,
     MenuCategory,
     BusinessSettings,
@@ -38,12 +39,18 @@ from src.db.models import (
     PaymentMethod,
     DeliveryArea,
     ProductOptionRule,
+    canonical_options_key,
 )
+from src.utils.catalog_snapshot import catalog_read
+from src.utils.invalidation_bus import publish_invalidation
 from src.utils.logger import PerformanceLogger
 from src.utils.constants import (
+    CacheNamespaces,
+    DatabaseRetrySettings,
     DatabaseSettings,
     ErrorCodes,
     PerformanceSettings,
+    ReplicaSettings,
     RetrySettings,
 )
 from src.utils.error_handler import (
@@ -51,8 +58,13 @@ from src.utils.error_handler import (
     DatabaseOperationError,
     DatabaseRetryExhaustedError,
     DatabaseTimeoutError,
-    retry_on_database_error,
 )
+from src.utils.db_retry import install_engine_hooks, retry_on_database_error
+from src.db.pool import configure_pool, pool_engine_kwargs, pool_status
+from src.db.replica import ReplicaHealth
+from src.db.schema import ensure_schema
+from src.db.sqlite import configure_sqlite, is_sqlite_url
+from src.utils.metrics import get_metrics
 
 import random
 import string
@@ -60,6 +72,17 @@ from decimal import Decimal
 import json
 
 logger = logging.getLogger(__name__)
+
+
+def _invalidate_constants() -> None:
+    """Rebuild the constants registry and derived translations after an edit"""
+    publish_invalidation(CacheNamespaces.CONSTANTS)
+
+
+def _invalidate_option_config() -> None:
+    """Refresh the catalog snapshot that serves ``get_product_option_config``"""
+    publish_invalidation(CacheNamespaces.PRODUCTS)
+
 # ----------------------------- Product options: CRUD & assignment -----------------------------
 
 @retry_on_database_error()
@@ -90,6 +113,7 @@ def create_product_option(
         session.add(opt)
         session.commit()
         session.refresh(opt)
+        _invalidate_constants()
         return opt
     except SQLAlchemyError as e:
         session.rollback()
@@ -133,6 +157,7 @@ def update_product_option(
         opt.updated_at = datetime.utcnow()
         session.add(opt)
         session.commit()
+        _invalidate_constants()
         return True
     except SQLAlchemyError as e:
         session.rollback()
@@ -155,6 +180,7 @@ def delete_product_option(option_id: int) -> bool:
             return False
         session.delete(opt)
         session.commit()
+        _invalidate_constants()
         return True
     except SQLAlchemyError as e:
         session.rollback()
@@ -185,6 +211,7 @@ def assign_option_to_product(product_id: int, option_id: int) -> bool:
         if option not in product.options:
             product.options.append(option)
         session.commit()
+        _invalidate_option_config()
         return True
     except SQLAlchemyError as e:
         session.rollback()
@@ -205,6 +232,7 @@ def unassign_option_from_product(product_id: int, option_id: int) -> bool:
         if option in product.options:
             product.options.remove(option)
         session.commit()
+        _invalidate_option_config()
         return True
     except SQLAlchemyError as e:
         session.rollback()
@@ -249,6 +277,7 @@ def upsert_product_option_rule(
             rule.max_choices = max_choices
             rule.display_order = display_order
         session.commit()
+        _invalidate_option_config()
         return True
     except SQLAlchemyError as e:
         session.rollback()
@@ -258,9 +287,44 @@ def upsert_product_option_rule(
         session.close()
 
 
+def _build_option_config(options: List[ProductOption], rules: List[ProductOptionRule]) -> Dict[str, Any]:
+    grouped: Dict[str, list] = {}
+    for opt in options:
+        grouped.setdefault(opt.option_type, []).append(opt)
+    for k in grouped:
+        grouped[k].sort(key=lambda x: (x.display_order, x.id))
+    return {
+        "rules": [
+            {
+                "option_type": r.option_type,
+                "is_required": r.is_required,
+                "selection_type": r.selection_type,
+                "min_choices": r.min_choices,
+                "max_choices": r.max_choices,
+                "display_order": r.display_order,
+            }
+            for r in rules
+        ],
+        "choices": {
+            k: [
+                {
+                    "id": o.id,
+                    "name": o.name,
+                    "display_name_en": o.display_name_en,
+                    "display_name_he": o.display_name_he,
+                    "price_modifier": o.price_modifier,
+                }
+                for o in v
+            ]
+            for k, v in grouped.items()
+        },
+    }
+
+
+@catalog_read(lambda catalog, product_id: catalog.option_config(product_id))
 @retry_on_database_error()
 def get_product_option_config(product_id: int) -> Dict[str, Any]:
-    session = get_db_session()
+    session = get_read_session()
     try:
         product = session.query(Product).options(joinedload(Product.options)).filter(Product.id == product_id).first()
         if not product:
@@ -271,37 +335,7 @@ def get_product_option_config(product_id: int) -> Dict[str, Any]:
             .order_by(ProductOptionRule.display_order, ProductOptionRule.option_type)
             .all()
         )
-        grouped: Dict[str, list] = {}
-        for opt in product.options:
-            grouped.setdefault(opt.option_type, []).append(opt)
-        for k in grouped:
-            grouped[k].sort(key=lambda x: (x.display_order, x.id))
-        return {
-            "rules": [
-                {
-                    "option_type": r.option_type,
-                    "is_required": r.is_required,
-                    "selection_type": r.selection_type,
-                    "min_choices": r.min_choices,
-                    "max_choices": r.max_choices,
-                    "display_order": r.display_order,
-                }
-                for r in rules
-            ],
-            "choices": {
-                k: [
-                    {
-                        "id": o.id,
-                        "name": o.name,
-                        "display_name_en": o.display_name_en,
-                        "display_name_he": o.display_name_he,
-                        "price_modifier": o.price_modifier,
-                    }
-                    for o in v
-                ]
-                for k, v in grouped.items()
-            },
-        }
+        return _build_option_config(product.options, rules)
     finally:
         session.close()
 
@@ -486,43 +520,70 @@ def get_localized_category_description(category: MenuCategory, language: str = "
 
 
 class ACIDTransactionManager:
-    """Manages ACID-compliant transactions with configurable isolation levels"""
-    
+    """Manages ACID-compliant transactions with configurable isolation levels
+
+    Isolation level and read-only mode are applied as connection execution
+    options, which psycopg2 folds into the ``BEGIN`` it sends anyway, and the
+    lock timeout is set once per connection at connect time. A transaction
+    therefore costs no extra round trips beyond its own statements.
+
+    SQLite transactions are always serializable. There a writing transaction
+    starts with ``BEGIN IMMEDIATE`` so it takes the write lock up front and
+    waits on ``busy_timeout``, instead of failing with "database is locked"
+    when a read upgrades to a write; read-only ones use a deferred ``BEGIN``
+    (see ``src.db.sqlite``).
+    """
+
+    ISOLATION_LEVELS: Dict[str, str] = {
+        "READ_UNCOMMITTED": "READ UNCOMMITTED",
+        "READ_COMMITTED": "READ COMMITTED",
+        "REPEATABLE_READ": "REPEATABLE READ",
+        "SERIALIZABLE": "SERIALIZABLE",
+    }
+
+    @staticmethod
+    def _dialect_name(session: Session) -> Optional[str]:
+        return getattr(getattr(session.bind, "dialect", None), "name", None)
+
+    @staticmethod
+    def _is_postgresql(session: Session) -> bool:
+        return ACIDTransactionManager._dialect_name(session) == "postgresql"
+
     @staticmethod
     @contextmanager
     def atomic_transaction(
         isolation_level: str = "READ_COMMITTED",
-        timeout: int = 30
+        timeout: int = DatabaseSettings.LOCK_TIMEOUT_SECONDS,
+        read_only: bool = False,
     ) -> Generator[Session, None, None]:
         """
         Atomic transaction with configurable isolation level
         
         Args:
             isolation_level: Database isolation level (READ_COMMITTED, SERIALIZABLE, etc.)
-            timeout: Transaction timeout in seconds
+            timeout: Lock timeout in seconds; only a non-default value costs a ``SET LOCAL``
+                (PostgreSQL only; SQLite waits for its connection's ``busy_timeout``)
+            read_only: Run as a read-only transaction (lookups that never write)
             
         Yields:
             Database session for transaction operations
         """
         session = get_db_session()
         try:
-            # Check if we're using PostgreSQL (Supabase) or SQLite
-            engine = session.bind
-            if engine and hasattr(engine, 'url') and 'postgresql' in str(engine.url):
-                # PostgreSQL/Supabase: Set transaction isolation level
-                if isolation_level == "READ_COMMITTED":
-                    session.execute(text("SET TRANSACTION ISOLATION LEVEL READ COMMITTED"))
-                elif isolation_level == "SERIALIZABLE":
-                    session.execute(text("SET TRANSACTION ISOLATION LEVEL SERIALIZABLE"))
-                elif isolation_level == "REPEATABLE_READ":
-                    session.execute(text("SET TRANSACTION ISOLATION LEVEL REPEATABLE READ"))
-                elif isolation_level == "READ_UNCOMMITTED":
-                    session.execute(text("SET TRANSACTION ISOLATION LEVEL READ UNCOMMITTED"))
-                
-                session.execute(text(f"SET LOCAL lock_timeout = '{timeout}s'"))
-            else:
-                # SQLite: Use default isolation level (SERIALIZABLE)
-                logger.debug("Using SQLite with default SERIALIZABLE isolation level")
+            dialect = ACIDTransactionManager._dialect_name(session)
+            if dialect == "sqlite":
+                session.connection(execution_options={"sqlite_begin": "DEFERRED" if read_only else "IMMEDIATE"})
+            elif dialect == "postgresql":
+                options: Dict[str, Any] = {
+                    "isolation_level": ACIDTransactionManager.ISOLATION_LEVELS.get(
+                        isolation_level, "READ COMMITTED"
+                    )
+                }
+                if read_only:
+                    options["postgresql_readonly"] = True
+                session.connection(execution_options=options)
+                if timeout != DatabaseSettings.LOCK_TIMEOUT_SECONDS:
+                    session.execute(text(f"SET LOCAL lock_timeout = '{int(timeout)}s'"))
             
             yield session
             session.commit()
@@ -619,25 +680,23 @@ class DatabaseOptimizer:
         if self._db_manager is None:
             return {"pool_status": {"status": "not_initialized"}}
         engine = self._db_manager.get_engine()
-        return {
-            "pool_status": {
-                "status": "active",
-                "pool_size": engine.pool.size(),
-                "checkedin": engine.pool.checkedin(),
-                "checkedout": engine.pool.checkedout(),
-                "overflow": engine.pool.overflow() if hasattr(engine.pool, "overflow") else 0,
-            }
-        }
+        return {"pool_status": pool_status(engine)}
 
 # Update DatabaseManager to include optimization features
 class DatabaseManager:
     """Enhanced database manager with retry logic and performance monitoring"""
 
-    def __init__(self, config: Optional[Any] = None):
+    def __init__(self, config: Optional[Any] = None, replica_url: Optional[str] = None):
         """Initialize database manager with configuration"""
         self.config = config or get_config()
         self._engine: Optional[Engine] = None
         self._session_factory: Optional[sessionmaker] = None
+        if replica_url is None:
+            replica_url = getattr(self.config, "database_replica_url", "")
+        self.replica_url = replica_url if isinstance(replica_url, str) else ""
+        self._replica: Optional[ReplicaHealth] = None
+        self._replica_session_factory: Optional[sessionmaker] = None
+        self._replica_lock = threading.Lock()
         self.logger = logging.getLogger(__name__)
         self.optimizer = DatabaseOptimizer(self)
 
@@ -655,30 +714,83 @@ class DatabaseManager:
         else:
             database_url = self.config.database_url
 
-        # Base engine configuration
+        engine = self._build_engine(database_url, DatabaseRetrySettings.PRIMARY_TARGET)
+        # Let the circuit breaker see connection errors that callers swallow
+        try:
+            install_engine_hooks(engine)
+        except Exception as e:  # e.g. create_engine patched with a mock in tests
+            logger.debug("Skipped circuit breaker engine hooks: %s", e)
+
+        return engine
+
+    def _build_engine(self, database_url: str, name: str) -> Engine:
+        # Base engine configuration. No pool_pre_ping: it costs a round trip on
+        # every checkout; see _setup_liveness_check for the cheaper strategy.
         engine_kwargs: dict[str, Any] = {
-            "pool_recycle": DatabaseSettings.POOL_RECYCLE_SECONDS,
-            "pool_pre_ping": True,
             "echo": self.config.environment == "development",
         }
-
-        # PostgreSQL/Supabase: configure pool sizing
-        if self.config.environment == "production":
-            pool_size = DatabaseSettings.PRODUCTION_POOL_SIZE
-            max_overflow = DatabaseSettings.PRODUCTION_MAX_OVERFLOW
-        else:
-            pool_size = DatabaseSettings.DEVELOPMENT_POOL_SIZE
-            max_overflow = DatabaseSettings.DEVELOPMENT_MAX_OVERFLOW
-
-        engine_kwargs.update({"pool_size": pool_size, "max_overflow": max_overflow})
+        # Pool profile: monitored QueuePool, or NullPool behind a transaction-mode pooler
+        engine_kwargs.update(pool_engine_kwargs(self.config, database_url, name))
 
         engine = create_engine(database_url, **engine_kwargs)
 
+        if is_sqlite_url(database_url):
+            self._setup_sqlite(engine)
+
         # Add performance monitoring
         self._setup_engine_events(engine)
-
+        self._setup_liveness_check(engine)
+        configure_pool(engine, self.config, name)
         return engine
 
+    def _get_replica(self) -> Optional[ReplicaHealth]:
+        if not self.replica_url:
+            return None
+        if self._replica is None:
+            with self._replica_lock:
+                if self._replica is None:
+                    engine = self._build_engine(self.replica_url, ReplicaSettings.TARGET)
+                    self._replica_session_factory = sessionmaker(bind=engine, expire_on_commit=False)
+                    self._replica = ReplicaHealth(
+                        engine,
+                        max_lag=getattr(self.config, "db_replica_max_lag_seconds", ReplicaSettings.MAX_LAG_SECONDS),
+                    )
+                    logger.info("Read replica configured; read-only queries are routed to it")
+        return self._replica
+
+    def get_replica_session(self) -> Optional[Session]:
+        """Replica session for a read-only query, or None when reads must use the primary"""
+        replica = self._get_replica()
+        use_replica = replica is not None and replica.usable()
+        get_metrics().increment(
+            "db_reads_total",
+            labels={"target": ReplicaSettings.TARGET if use_replica else DatabaseRetrySettings.PRIMARY_TARGET},
+        )
+        return self._replica_session_factory() if use_replica else None
+
+    def get_read_session(self) -> Session:
+        """Session for read-only queries: the replica when healthy, else the primary"""
+        return self.get_replica_session() or self.get_session()
+
+    def get_replica_status(self) -> Dict[str, Any]:
+        """Replica health for health checks"""
+        replica = self._get_replica() if self._replica is not None else None
+        if replica is None:
+            return {"status": "configured" if self.replica_url else "not_configured"}
+        return {"status": "active", **replica.status(), "pool": pool_status(replica.engine)}
+
+    @staticmethod
+    def _setup_sqlite(engine: Engine) -> None:
+        """WAL pragmas and explicit BEGIN handling for the embedded SQLite mode"""
+        try:
+            from unittest.mock import Mock
+
+            if isinstance(engine, Mock):  # pragma: no cover
+                return
+            configure_sqlite(engine)
+        except Exception as e:  # pylint: disable=broad-except
+            logger.debug("Skipped SQLite engine setup: %s", e)
+
     def _setup_engine_events(self, engine: Engine) -> None:
         """Setup SQLAlchemy events for performance monitoring"""
 
@@ -710,6 +822,43 @@ class DatabaseManager:
             # actual performance logging is non-critical for unit tests.
             logger.debug("Skipped engine event hooks for non-SQLAlchemy engine.")
 
+    @staticmethod
+    def _setup_liveness_check(
+        engine: Engine, idle_seconds: float = DatabaseSettings.LIVENESS_IDLE_SECONDS
+    ) -> None:
+        """Ping pooled connections on checkout only after they sat idle
+
+        Replaces ``pool_pre_ping``. Busy connections are reused without a
+        round trip; TCP keepalives catch dead peers in the background and a
+        connection dropped mid-query is invalidated by the disconnect
+        handling and retried by ``retry_on_database_error``.
+        """
+        try:
+            from unittest.mock import Mock
+
+            if isinstance(engine, Mock):  # pragma: no cover
+                return
+
+            @event.listens_for(engine, "checkin")
+            def on_checkin(dbapi_connection, connection_record):  # noqa: D401
+                connection_record.info["checked_in_at"] = time.monotonic()
+
+            @event.listens_for(engine, "checkout")
+            def on_checkout(dbapi_connection, connection_record, connection_proxy):  # noqa: D401
+                checked_in_at = connection_record.info.get("checked_in_at")
+                if checked_in_at is None or time.monotonic() - checked_in_at < idle_seconds:
+                    return
+                try:
+                    cursor = dbapi_connection.cursor()
+                    cursor.execute("SELECT 1")
+                    cursor.close()
+                except Exception as e:
+                    # The pool discards this connection and checks out a fresh one
+                    raise DisconnectionError(f"Idle connection failed liveness check: {e}") from e
+
+        except Exception:  # pylint: disable=broad-except
+            logger.debug("Skipped connection liveness hooks for non-SQLAlchemy engine.")
+
     def get_session_factory(self) -> sessionmaker:
         """Get session factory"""
         if self._session_factory is None:
@@ -739,76 +888,13 @@ class DatabaseManager:
         """Get current connection pool status"""
         return self.optimizer.get_optimization_stats()["pool_status"]
 
-    def create_tables(self) -> None:
-        """Create all database tables"""
-        try:
-            # Create all tables
-            Base.metadata.create_all(self.get_engine())
-
-            # ------------------------------------------------------------------
-            # Lightweight auto-migration for SQLite and PostgreSQL: add newly introduced columns
-            # This ensures backward compatibility when new columns are added to models
-            # ------------------------------------------------------------------
-            
-            def _column_exists(table: str, column: str) -> bool:
-                """Check if a column exists in a table"""
-                try:
-                    with self.get_session_context() as session:
-                        if self.config.database_url.startswith('sqlite'):
-                            # SQLite
-                            result = session.execute(text(f"PRAGMA table_info({table})"))
-                            columns = [row[1] for row in result.fetchall()]
-                            return column in columns
-                        else:
-                            # PostgreSQL
-                            result = session.execute(text(f"""
-                                SELECT column_name 
-                                FROM information_schema.columns 
-                                WHERE table_name = '{table}' AND column_name = '{column}'
-                            """))
-                            return result.fetchone() is not None
-                except Exception:
-                    return False
-
-            # Add any missing columns that might be needed
-            # This is a safety net for schema evolution
-            try:
-                with self.get_session_context() as session:
-                    # Add missing column: business_settings.app_images (TEXT)
-                    if not _column_exists("business_settings", "app_images"):
-                        try:
-                            # PostgreSQL and SQLite both support simple ADD COLUMN
-                            session.execute(text("ALTER TABLE business_settings ADD COLUMN app_images TEXT"))
-                            session.commit()
-                            self.logger.info("Added missing column business_settings.app_images")
-                        except Exception as add_err:
-                            session.rollback()
-                            self.logger.warning(f"Failed to add column app_images: {add_err}")
-
-                    # Widen image_url columns to TEXT to support long URLs
-                    try:
-                        # menu_categories.image_url
-                        session.execute(text("ALTER TABLE menu_categories ALTER COLUMN image_url TYPE TEXT"))
-                        # menu_products.image_url
-                        session.execute(text("ALTER TABLE menu_products ALTER COLUMN image_url TYPE TEXT"))
-                        session.commit()
-                        self.logger.info("Ensured image_url columns are TEXT for long URLs")
-                    except Exception as widen_err:
-                        session.rollback()
-                        # For SQLite, ALTER TYPE is limited; try add+copy approach
-                        try:
-                            if self.config.database_url.startswith('sqlite'):
-                                # SQLite fallback: attempt table rebuilds only if necessary (no-op if already TEXT)
-                                pass
-                        except Exception:
-                            pass
-                        self.logger.warning(
-                            f"Could not alter image_url columns to TEXT (may already be TEXT): {widen_err}"
-                        )
-            except Exception as e:
-                self.logger.warning(f"Auto-migration check failed: {e}")
+    def create_tables(self) -> bool:
+        """Create tables and apply pending migrations unless the schema stamp is current
 
-            self.logger.info("Database tables created successfully")
+        Returns True when the schema was (re)built.
+        """
+        try:
+            return ensure_schema(self.get_engine())
         except Exception as e:
             self.logger.error(f"Failed to create database tables: {e}")
             raise
@@ -879,10 +965,13 @@ def get_db_session() -> Session:
     return get_db_manager().get_session()
 
 
-from src.utils.error_handler import retry_on_database_error
-
-
+def get_read_session() -> Session:
+    """Session for read-only queries that tolerate replica lag - convenience function
 
+    Writes and flows that re-read what they just wrote (cart, checkout) keep
+    using ``get_db_session``.
+    """
+    return get_db_manager().get_replica_session() or get_db_session()
 
 
 def init_db():
@@ -894,36 +983,11 @@ def init_db():
         try:
             logger.info(f"Database initialization attempt {attempt + 1}/{max_retries}")
             
-            # Test connection first
-            engine = get_db_manager().get_engine()
-            with engine.connect() as conn:
-                conn.execute(text("SELECT 1"))
-                logger.info("Database connection test successful")
-            
-            # Create tables
-            get_db_manager().create_tables()
-            logger.info("Database tables created successfully")
-
-            # Initialize default products (only if none exist)
-            init_default_products()
-
-            # Best-effort ensure new rules table exists (when Alembic not used)
-            try:
-                with get_db_manager().get_session_context() as session:
-                    session.execute(text(
-                        "CREATE TABLE IF NOT EXISTS product_option_rules ("
-                        "id SERIAL PRIMARY KEY,"
-                        "product_id INTEGER NOT NULL REFERENCES menu_products(id),"
-                        "option_type VARCHAR(50) NOT NULL,"
-                        "is_required BOOLEAN NOT NULL DEFAULT FALSE,"
-                        "selection_type VARCHAR(10) NOT NULL DEFAULT 'single',"
-                        "min_choices INTEGER NOT NULL DEFAULT 0,"
-                        "max_choices INTEGER NOT NULL DEFAULT 1,"
-                        "display_order INTEGER NOT NULL DEFAULT 0" 
-                        ")"
-                    ))
-            except Exception as e:
-                logger.debug("product_option_rules ensure failed or skipped: %s", e)
+            # A warm start reads the schema stamp with one SELECT and stops there
+            if get_db_manager().create_tables():
+                logger.info("Database tables created successfully")
+                # Initialize default products (only if none exist)
+                init_default_products()
             
             logger.info("Database initialization completed successfully")
             return
@@ -1192,12 +1256,13 @@ def get_customer_by_telegram_id(telegram_id: int) -> Customer | None:
 
 
 # Product operations
+@catalog_read(lambda catalog: catalog.active_products())
 @retry_on_database_error()
 def get_all_products() -> list[Product]:
     """Get all active products"""
-    session = get_db_session()
+    session = get_read_session()
     try:
-        return session.query(Product).filter(Product.is_active).all()
+        return session.query(Product).options(joinedload(Product.category_rel)).filter(Product.is_active).all()
     finally:
         session.close()
 
@@ -1241,10 +1306,11 @@ def get_product_by_name(name: str) -> Optional[Product]:
         session.close()
 
 
+@catalog_read(lambda catalog, product_id: catalog.product(product_id))
 @retry_on_database_error()
 def get_product_by_id(product_id: int) -> Optional[Product]:
     """Get product by ID with category relationship loaded"""
-    session = get_db_session()
+    session = get_read_session()
     try:
         return session.query(Product).options(joinedload(Product.category_rel)).filter(Product.id == product_id).first()
     finally:
@@ -1323,10 +1389,8 @@ def create_product(
                 session.refresh(existing_product)
                 # Clear cache after changing products
                 try:
-                    from src.utils.helpers import SimpleCache
-                    cache = SimpleCache()
-                    cache.clear()
-                    logger.info("Cleared cache after reactivating product '%s'", name)
+                    publish_invalidation(CacheNamespaces.PRODUCTS, CacheNamespaces.CATEGORIES, CacheNamespaces.TRANSLATIONS)
+                    logger.info("Invalidated caches after reactivating product '%s'", name)
                 except Exception as cache_error:
                     logger.warning("Failed to clear cache after reactivating product '%s': %s", name, cache_error)
                 logger.info("Reactivated and updated product: %s (ID: %d)", name, existing_product.id)
@@ -1358,10 +1422,8 @@ def create_product(
         logger.info("Created new product: %s (ID: %d)", name, product.id)
         # Clear cache after creating product
         try:
-            from src.utils.helpers import SimpleCache
-            cache = SimpleCache()
-            cache.clear()
-            logger.info("Cleared cache after creating product ID %d", product.id)
+            publish_invalidation(CacheNamespaces.PRODUCTS, CacheNamespaces.CATEGORIES, CacheNamespaces.TRANSLATIONS)
+            logger.info("Invalidated caches after creating product ID %d", product.id)
         except Exception as cache_error:
             logger.warning("Failed to clear cache after creating product ID %d: %s", product.id, cache_error)
         return product
@@ -1402,10 +1464,8 @@ def update_product(product_id: int, **kwargs) -> bool:
         
         # Clear any cached data related to this product
         try:
-            from src.utils.helpers import SimpleCache
-            cache = SimpleCache()
-            cache.clear()  # Clear all cache entries to ensure fresh data
-            logger.info("Cleared cache after updating product ID %d", product_id)
+            publish_invalidation(CacheNamespaces.PRODUCTS, CacheNamespaces.CATEGORIES, CacheNamespaces.TRANSLATIONS)
+            logger.info("Invalidated caches after updating product ID %d", product_id)
         except Exception as cache_error:
             logger.warning("Failed to clear cache after updating product ID %d: %s", product_id, cache_error)
         
@@ -1435,10 +1495,8 @@ def deactivate_product(product_id: int) -> bool:
         logger.info("Deactivated product ID %d: %s", product_id, product.name)
         # Clear cache after product status change
         try:
-            from src.utils.helpers import SimpleCache
-            cache = SimpleCache()
-            cache.clear()
-            logger.info("Cleared cache after deactivating product ID %d", product_id)
+            publish_invalidation(CacheNamespaces.PRODUCTS, CacheNamespaces.CATEGORIES, CacheNamespaces.TRANSLATIONS)
+            logger.info("Invalidated caches after deactivating product ID %d", product_id)
         except Exception as cache_error:
             logger.warning("Failed to clear cache after deactivating product ID %d: %s", product_id, cache_error)
         return True
@@ -1480,10 +1538,8 @@ def hard_delete_product(product_id: int) -> bool:
         logger.info("Hard deleted product ID %d: %s", product_id, product_name)
         # Clear cache after deleting product
         try:
-            from src.utils.helpers import SimpleCache
-            cache = SimpleCache()
-            cache.clear()
-            logger.info("Cleared cache after hard deleting product ID %d", product_id)
+            publish_invalidation(CacheNamespaces.PRODUCTS, CacheNamespaces.CATEGORIES, CacheNamespaces.TRANSLATIONS)
+            logger.info("Invalidated caches after hard deleting product ID %d", product_id)
         except Exception as cache_error:
             logger.warning("Failed to clear cache after hard deleting product ID %d: %s", product_id, cache_error)
         return True
@@ -1502,10 +1558,11 @@ def delete_product(product_id: int) -> bool:
     return deactivate_product(product_id)
 
 
+@catalog_read(lambda catalog: catalog.category_names(with_active_products=True))
 @retry_on_database_error()
 def get_product_categories() -> list[str]:
     """Get all unique product categories that have active products (returns English names)"""
-    session = get_db_session()
+    session = get_read_session()
     try:
         # Get categories that have active products
         categories = session.query(MenuCategory).join(Product).filter(
@@ -1516,10 +1573,11 @@ def get_product_categories() -> list[str]:
         session.close()
 
 
+@catalog_read(lambda catalog: catalog.category_names())
 @retry_on_database_error()
 def get_all_categories() -> list[str]:
     """Get all categories (including those without products) - for admin use (returns English names)"""
-    session = get_db_session()
+    session = get_read_session()
     try:
         # Get all categories
         categories = session.query(MenuCategory).filter(
@@ -1530,10 +1588,11 @@ def get_all_categories() -> list[str]:
         session.close()
 
 
+@catalog_read(lambda catalog, name: catalog.category(name))
 @retry_on_database_error()
 def get_category_by_name(name: str) -> Optional[MenuCategory]:
     """Get category by name (searches in both name_en and name_he fields)"""
-    session = get_db_session()
+    session = get_read_session()
     try:
         # Search in both English and Hebrew name fields
         return session.query(MenuCategory).filter(
@@ -1543,10 +1602,11 @@ def get_category_by_name(name: str) -> Optional[MenuCategory]:
         session.close()
 
 
+@catalog_read(lambda catalog, category: catalog.products_in_category(category))
 @retry_on_database_error()
 def get_products_by_category(category: str) -> list[Product]:
     """Get all active products in a specific category"""
-    session = get_db_session()
+    session = get_read_session()
     try:
         # First get the category by name (searches in both name_en and name_he)
         category_obj = session.query(MenuCategory).filter(
@@ -1564,10 +1624,11 @@ def get_products_by_category(category: str) -> list[Product]:
         session.close()
 
 
+@catalog_read(lambda catalog, category: catalog.products_in_category(category, include_inactive=True))
 @retry_on_database_error()
 def get_all_products_by_category(category: str) -> list[Product]:
     """Get all products in a specific category (including inactive ones)"""
-    session = get_db_session()
+    session = get_read_session()
     try:
         # First get the category by name (searches in both name_en and name_he)
         category_obj = session.query(MenuCategory).filter(
@@ -1720,14 +1781,13 @@ def add_to_cart(
 
             computed_unit_price = _compute_unit_price()
 
-            # Check if item already exists in cart (same options grouped)
-            # Compare options structurally using JSONB to avoid json= json operator error
+            # Check if item already exists in cart (same options grouped by canonical key)
             existing_item = (
                 session.query(CartItem)
                 .filter(
                     CartItem.cart_id == cart.id,
                     CartItem.product_id == product_id,
-                    cast(CartItem.product_options, JSONB) == cast((options or {}), JSONB),
+                    CartItem.options_key == canonical_options_key(options),
                 )
                 .with_for_update()
                 .first()
@@ -1770,7 +1830,7 @@ def get_cart_items(telegram_id: int) -> list[dict]:
         List of cart items with product information including multilingual names
     """
     try:
-        with ACIDTransactionManager.atomic_transaction("READ_COMMITTED") as session:
+        with ACIDTransactionManager.atomic_transaction("READ_COMMITTED", read_only=True) as session:
             # Get customer by telegram_id
             customer = session.query(Customer).filter(Customer.telegram_id == telegram_id).first()
             if not customer:
@@ -2002,7 +2062,7 @@ class ACIDComplianceChecker:
             Tuple of (is_consistent, list_of_issues)
         """
         try:
-            with ACIDTransactionManager.atomic_transaction("READ_COMMITTED") as session:
+            with ACIDTransactionManager.atomic_transaction("READ_COMMITTED", read_only=True) as session:
                 order = session.query(Order).filter(Order.id == order_id).first()
                 if not order:
                     return False, [f"Order {order_id} not found"]
@@ -2043,7 +2103,7 @@ class ACIDComplianceChecker:
             Tuple of (is_consistent, list_of_issues)
         """
         try:
-            with ACIDTransactionManager.atomic_transaction("READ_COMMITTED") as session:
+            with ACIDTransactionManager.atomic_transaction("READ_COMMITTED", read_only=True) as session:
                 customer = session.query(Customer).filter(Customer.telegram_id == telegram_id).first()
                 if not customer:
                     return False, [f"Customer {telegram_id} not found"]
@@ -2169,6 +2229,7 @@ def create_order(
             session.commit()
             session.refresh(order)
             logger.info("Created order #%s for customer %s", order.order_number, customer_id)
+            publish_invalidation(CacheNamespaces.ORDERS)
             return order
     except Exception as e:
         logger.error("Failed to create order: %s", e)
@@ -2207,6 +2268,8 @@ def create_order_with_items(
             )
             session.add(order)
             session.flush()  # Get the order ID
+            # Unique even when orders is partitioned; a duplicate number fails the whole order
+            session.add(OrderNumber(order_number=order_number, order_id=order.id))
             
             # Create order items
             for item in items:
@@ -2229,12 +2292,20 @@ def create_order_with_items(
             session.refresh(order)
             logger.info("Created order #%s with %d items for customer %s", 
                        order_number, len(items), customer_id)
+            publish_invalidation(CacheNamespaces.ORDERS)
             return order
     except Exception as e:
         logger.error("Failed to create order with items: %s", e)
         return None
 
 
+def _reopen_order_history(created_at: Optional[datetime]) -> None:
+    """Have analytics re-read the order's month if it was already exported"""
+    from src.services.order_history import reopen_order_history
+
+    reopen_order_history(created_at)
+
+
 @retry_on_database_error()
 def update_order_status(order_id: int, new_status: str) -> bool:
     """Update order status"""
@@ -2244,8 +2315,11 @@ def update_order_status(order_id: int, new_status: str) -> bool:
             if order:
                 order.status = new_status
                 order.updated_at = datetime.utcnow()
+                created_at = order.created_at
                 session.commit()
                 logger.info("Updated order %d status to %s", order_id, new_status)
+                _reopen_order_history(created_at)
+                publish_invalidation(CacheNamespaces.ORDERS)
                 return True
             else:
                 logger.error("Order %d not found for status update", order_id)
@@ -2271,6 +2345,7 @@ def delete_order(order_id: int) -> bool:
                 "ORDER_DELETED: order_id=%d, customer_id=%d, total=%.2f, order_number=%s, status=%s",
                 order.id, order.customer_id, order.total, order.order_number, order.status
             )
+            created_at = order.created_at
             
             # Delete order items first (foreign key constraint)
             session.query(OrderItem).filter(OrderItem.order_id == order_id).delete()
@@ -2281,6 +2356,8 @@ def delete_order(order_id: int) -> bool:
             session.commit()
             
             logger.info("Order %d and its items deleted successfully", order_id)
+            _reopen_order_history(created_at)
+            publish_invalidation(CacheNamespaces.ORDERS)
             return True
             
     except Exception as e:
@@ -2297,16 +2374,92 @@ def generate_order_number() -> str:
 
 def get_all_customers() -> list[Customer]:
     """Get all customers"""
-    session = get_db_session()
+    session = get_read_session()
     try:
         return session.query(Customer).all()
     finally:
         session.close()
 
 
+def _customer_summary_query(session: Session):
+    """Customers with their order count and total spent, aggregated in SQL"""
+    from sqlalchemy import func
+
+    totals = (
+        session.query(
+            Order.customer_id.label("customer_id"),
+            func.count(Order.id).label("total_orders"),
+            func.sum(Order.total).label("total_spent"),
+        )
+        .group_by(Order.customer_id)
+        .subquery()
+    )
+    total_orders = func.coalesce(totals.c.total_orders, 0)
+    total_spent = func.coalesce(totals.c.total_spent, 0.0)
+    query = session.query(
+        Customer.id, Customer.telegram_id, Customer.name, Customer.phone,
+        Customer.delivery_address, Customer.language, Customer.created_at,
+        total_orders, total_spent,
+    ).outerjoin(totals, totals.c.customer_id == Customer.id)
+    return query, total_spent
+
+
+def _customer_summary(row) -> dict:
+    (customer_id, telegram_id, name, phone, delivery_address, language, created_at,
+     total_orders, total_spent) = row
+    return {
+        "customer_id": customer_id,
+        "telegram_id": telegram_id,
+        "full_name": name,
+        "phone_number": phone,
+        "delivery_address": delivery_address,
+        "language": language,
+        "created_at": created_at,
+        "total_orders": int(total_orders or 0),
+        "total_spent": float(total_spent or 0),
+    }
+
+
+def count_customers() -> int:
+    """Number of customers"""
+    session = get_read_session()
+    try:
+        return session.query(Customer).count()
+    finally:
+        session.close()
+
+
+def get_customer_summaries(offset: int = 0, limit: Optional[int] = None) -> list[dict]:
+    """Customers with order count and total spent, most valuable first.
+
+    One LEFT JOIN against per-customer order aggregates; sorting and paging
+    happen in SQL.
+    """
+    session = get_read_session()
+    try:
+        query, total_spent = _customer_summary_query(session)
+        query = query.order_by(total_spent.desc(), Customer.id).offset(offset)
+        if limit is not None:
+            query = query.limit(limit)
+        return [_customer_summary(row) for row in query.all()]
+    finally:
+        session.close()
+
+
+def get_customer_summary(customer_id: int) -> Optional[dict]:
+    """One customer with order count and total spent"""
+    session = get_read_session()
+    try:
+        query, _ = _customer_summary_query(session)
+        row = query.filter(Customer.id == customer_id).first()
+        return _customer_summary(row) if row else None
+    finally:
+        session.close()
+
+
 def get_all_orders() -> list[Order]:
     """Get all orders with customer and order_items information"""
-    session = get_db_session()
+    session = get_read_session()
     try:
         from sqlalchemy.orm import joinedload
         return (
@@ -2319,6 +2472,169 @@ def get_all_orders() -> list[Order]:
         session.close()
 
 
+@retry_on_database_error()
+def get_orders_by_status(statuses: Sequence[str], telegram_id: Optional[int] = None) -> List[Order]:
+    """Orders in the given statuses, newest first, with customer and order_items information
+
+    Filtering in SQL lets active-order lists use the partial index on orders,
+    and skipping archived orders keeps them on the hot partitions.
+    """
+    session = get_db_session()
+    try:
+        query = (
+            session.query(Order)
+            .options(joinedload(Order.customer), joinedload(Order.order_items))
+            .filter(Order.archived.is_(False), Order.status.in_(list(statuses)))
+        )
+        if telegram_id is not None:
+            query = query.join(Customer, Order.customer_id == Customer.id).filter(Customer.telegram_id == telegram_id)
+        return query.order_by(Order.created_at.desc()).all()
+    finally:
+        session.close()
+
+
+@retry_on_database_error()
+def count_orders_between(start: datetime, end: datetime) -> int:
+    """Number of orders created in [start, end)"""
+    session = get_read_session()
+    try:
+        return (
+            session.query(Order)
+            .filter(Order.created_at >= start, Order.created_at < end)
+            .count()
+        )
+    finally:
+        session.close()
+
+
+def get_orders_page_between(start: datetime, end: datetime, after_id: int = 0, limit: int = 50) -> list[Order]:
+    """Orders created in [start, end) with id > ``after_id``, oldest id first.
+
+    Keyset pagination lets callers stream a day's orders in small batches
+    instead of loading every order with its items at once.
+    """
+    session = get_read_session()
+    try:
+        from sqlalchemy.orm import selectinload
+        return (
+            session.query(Order)
+            .options(joinedload(Order.customer), selectinload(Order.order_items))
+            .filter(Order.created_at >= start, Order.created_at < end, Order.id > after_id)
+            .order_by(Order.id)
+            .limit(limit)
+            .all()
+        )
+    finally:
+        session.close()
+
+
+def get_first_order_time() -> Optional[datetime]:
+    """Creation time of the oldest order, or None without orders"""
+    from sqlalchemy import func
+
+    session = get_read_session()
+    try:
+        return session.query(func.min(Order.created_at)).scalar()
+    finally:
+        session.close()
+
+
+def get_order_fact_rows(start: datetime, end: datetime) -> Tuple[list, list, Dict[int, str]]:
+    """Plain rows for analytics over orders created in [start, end).
+
+    Returns (orders, lines, customer names) where orders are
+    (id, created_at, status, total, delivery_method, customer_id, updated_at)
+    and lines are (order_id, product_name, quantity, total_price). Only the
+    needed columns are selected, so no ORM objects are built.
+    """
+    session = get_read_session()
+    try:
+        in_period = (Order.created_at >= start, Order.created_at < end)
+        orders = (
+            session.query(
+                Order.id, Order.created_at, Order.status, Order.total,
+                Order.delivery_method, Order.customer_id, Order.updated_at,
+            )
+            .filter(*in_period)
+            .all()
+        )
+        lines = (
+            session.query(OrderItem.order_id, OrderItem.product_name, OrderItem.quantity, OrderItem.total_price)
+            .join(Order, Order.id == OrderItem.order_id)
+            .filter(*in_period)
+            .order_by(OrderItem.order_id, OrderItem.id)
+            .all()
+        )
+        customer_ids = session.query(Order.customer_id).filter(*in_period, Order.customer_id.isnot(None))
+        names = dict(session.query(Customer.id, Customer.name).filter(Customer.id.in_(customer_ids)).all())
+        return [tuple(row) for row in orders], [tuple(row) for row in lines], names
+    finally:
+        session.close()
+
+
+def stream_order_export(
+    start: datetime,
+    end: datetime,
+    statuses: Optional[List[str]] = None,
+    lines: bool = False,
+    batch_size: int = 1000,
+) -> Tuple[List[str], Generator[List[tuple], None, None]]:
+    """Column names and batches of plain rows for orders created in [start, end).
+
+    With ``lines`` the rows are order lines instead of orders. Rows are read
+    through a server-side cursor ``batch_size`` at a time, so memory does not
+    grow with the number of orders; the session closes when the batches are
+    exhausted or the generator is closed.
+    """
+    from sqlalchemy import select
+
+    if lines:
+        columns = [
+            OrderItem.order_id.label("order_id"),
+            Order.order_number.label("order_number"),
+            Order.created_at.label("order_created_at"),
+            Order.status.label("order_status"),
+            OrderItem.product_id.label("product_id"),
+            OrderItem.product_name.label("product_name"),
+            OrderItem.product_options.label("product_options"),
+            OrderItem.quantity.label("quantity"),
+            OrderItem.unit_price.label("unit_price"),
+            OrderItem.total_price.label("total_price"),
+        ]
+        stmt = select(*columns).join(Order, Order.id == OrderItem.order_id).order_by(OrderItem.order_id, OrderItem.id)
+    else:
+        columns = [
+            Order.id.label("order_id"),
+            Order.order_number.label("order_number"),
+            Order.created_at.label("created_at"),
+            Order.updated_at.label("updated_at"),
+            Order.status.label("status"),
+            Order.customer_id.label("customer_id"),
+            Customer.name.label("customer_name"),
+            Customer.phone.label("customer_phone"),
+            Order.delivery_method.label("delivery_method"),
+            Order.delivery_address.label("delivery_address"),
+            Order.subtotal.label("subtotal"),
+            Order.delivery_charge.label("delivery_charge"),
+            Order.total.label("total"),
+        ]
+        stmt = select(*columns).outerjoin(Customer, Customer.id == Order.customer_id).order_by(Order.id)
+    stmt = stmt.where(Order.created_at >= start, Order.created_at < end)
+    if statuses:
+        stmt = stmt.where(Order.status.in_(statuses))
+
+    def batches() -> Generator[List[tuple], None, None]:
+        session = get_read_session()
+        try:
+            result = session.execute(stmt.execution_options(stream_results=True, yield_per=batch_size))
+            for partition in result.partitions():
+                yield [tuple(row) for row in partition]
+        finally:
+            session.close()
+
+    return [column.key for column in columns], batches()
+
+
 def check_database_connection() -> bool:
     """Check if database connection is available"""
     try:
@@ -2349,7 +2665,10 @@ def get_database_status() -> dict:
             status["database_type"] = "postgresql"
         else:
             status["connection_string"] = "local"
-            status["database_type"] = "postgresql" if "postgresql" in config.database_url else "other"
+            if "postgresql" in config.database_url:
+                status["database_type"] = "postgresql"
+            else:
+                status["database_type"] = "sqlite" if is_sqlite_url(config.database_url) else "other"
         
         # Test connection
         status["connected"] = check_database_connection()
@@ -2397,10 +2716,8 @@ def create_category(
         session.commit()
         # Clear cache so category lists refresh everywhere
         try:
-            from src.utils.helpers import SimpleCache
-            cache = SimpleCache()
-            cache.clear()
-            logger.info("Cleared cache after creating category '%s'", name_en)
+            publish_invalidation(CacheNamespaces.CATEGORIES, CacheNamespaces.PRODUCTS)
+            logger.info("Invalidated caches after creating category '%s'", name_en)
         except Exception as cache_error:
             logger.warning("Failed to clear cache after creating category '%s': %s", name_en, cache_error)
         
@@ -2440,10 +2757,8 @@ def delete_category(name_en: str, name_he: str = None) -> bool:
         session.commit()
         # Clear cache after deleting category
         try:
-            from src.utils.helpers import SimpleCache
-            cache = SimpleCache()
-            cache.clear()
-            logger.info("Cleared cache after deleting category '%s'", name_en)
+            publish_invalidation(CacheNamespaces.CATEGORIES, CacheNamespaces.PRODUCTS)
+            logger.info("Invalidated caches after deleting category '%s'", name_en)
         except Exception as cache_error:
             logger.warning("Failed to clear cache after deleting category '%s': %s", name_en, cache_error)
         
@@ -2482,6 +2797,7 @@ def get_business_settings() -> Optional[BusinessSettings]:
             session.commit()
             session.refresh(settings)
             logger.info("Created default business settings")
+            publish_invalidation(CacheNamespaces.SETTINGS)
         
         return settings
     except SQLAlchemyError as e:
@@ -2526,10 +2842,8 @@ def update_business_settings(**kwargs) -> bool:
         logger.info("Updated business settings: %s", list(kwargs.keys()))
         # Clear in-memory caches so changes reflect immediately (e.g., step images)
         try:
-            from src.utils.helpers import SimpleCache
-            cache = SimpleCache()
-            cache.clear()
-            logger.info("Cleared cache after updating business settings")
+            publish_invalidation(CacheNamespaces.SETTINGS)
+            logger.info("Invalidated caches after updating business settings")
         except Exception as _e:
             logger.debug("Failed to clear cache after settings update: %s", _e)
         return True
@@ -2541,9 +2855,15 @@ def update_business_settings(**kwargs) -> bool:
         session.close()
 
 
-@retry_on_database_error()
 def get_business_settings_dict() -> dict:
-    """Get business settings as dictionary"""
+    """Get business settings as dictionary (served from the versioned snapshot)"""
+    from src.utils.settings_snapshot import get_settings_snapshot
+    return get_settings_snapshot().as_dict()
+
+
+@retry_on_database_error()
+def load_business_settings_dict() -> dict:
+    """Read business settings from the database as a dictionary"""
     db_manager = get_db_manager()
     
     with db_manager.get_session_context() as session:
@@ -2624,7 +2944,8 @@ def set_product_option_active(option_id: int, is_active: bool) -> bool:
         option.is_active = bool(is_active)
         option.updated_at = datetime.utcnow()
         session.add(option)
-        return True
+    _invalidate_constants()
+    return True
 
 
 @retry_on_database_error()
@@ -2641,7 +2962,8 @@ def reset_product_options(seed_defaults: bool = False) -> bool:
         session.execute(text("DELETE FROM product_options"))
         if seed_defaults:
             _seed_default_product_options_in_session(session)
-        return True
+    _invalidate_constants()
+    return True
 
 
 def _seed_default_product_options_in_session(session: Session) -> None:
@@ -2936,6 +3258,98 @@ def get_localized_constant(constant_type: str, name: str, language: str = "en")
         return None
 
 
+@retry_on_database_error()
+def load_constant_tables() -> Dict[str, List[Dict[str, Any]]]:
+    """Read every constants table (including delivery areas) in one session.
+    Returns plain dicts so the result can outlive the session.
+    """
+    db_manager = get_db_manager()
+
+    def localized(item) -> Dict[str, Any]:
+        return {
+            "name": item.name,
+            "display_names": {
+                "en": item.get_localized_display_name("en"),
+                "he": item.get_localized_display_name("he"),
+                None: item.display_name or item.name,
+            },
+        }
+
+    with db_manager.get_session_context() as session:
+        options = (
+            session.query(ProductOption)
+            .filter(ProductOption.is_active == True)  # noqa: E712
+            .order_by(ProductOption.display_order, ProductOption.id)
+            .all()
+        )
+        tables: Dict[str, List[Dict[str, Any]]] = {
+            "product_option": [dict(localized(o), option_type=o.option_type) for o in options],
+        }
+        for constant_type, model in (
+            ("product_size", ProductSize),
+            ("order_status", OrderStatus),
+            ("delivery_method", DeliveryMethod),
+            ("payment_method", PaymentMethod),
+        ):
+            rows = (
+                session.query(model)
+                .filter(model.is_active == True)  # noqa: E712
+                .order_by(model.display_order, model.id)
+                .all()
+            )
+            tables[constant_type] = [localized(r) for r in rows]
+            if model is DeliveryMethod:
+                for row, entry in zip(rows, tables[constant_type]):
+                    entry["charge"] = row.charge
+        tables["delivery_area"] = [
+            {
+                "id": a.id,
+                "name_en": a.name_en,
+                "name_he": a.name_he,
+                "charge": a.charge,
+                "is_active": bool(a.is_active),
+                "display_order": a.display_order,
+            }
+            for a in session.query(DeliveryArea).order_by(DeliveryArea.display_order, DeliveryArea.name_en).all()
+        ]
+        return tables
+
+
+def _catalog_row(obj) -> Dict[str, Any]:
+    # Timestamps are not needed to serve the menu and would change the checksum
+    return {c.key: getattr(obj, c.key) for c in obj.__table__.columns if c.key not in ("created_at", "updated_at")}
+
+
+@retry_on_database_error()
+def load_catalog_tables() -> Dict[str, Any]:
+    """Read the customer-facing catalog for the catalog snapshot.
+    Categories, products and option configs come from one read session.
+    """
+    session = get_read_session()
+    try:
+        categories = session.query(MenuCategory).order_by(MenuCategory.display_order, MenuCategory.id).all()
+        products = session.query(Product).options(joinedload(Product.options)).order_by(Product.id).all()
+        rules: Dict[int, List[ProductOptionRule]] = {}
+        for rule in (
+            session.query(ProductOptionRule)
+            .order_by(ProductOptionRule.product_id, ProductOptionRule.display_order, ProductOptionRule.option_type)
+            .all()
+        ):
+            rules.setdefault(rule.product_id, []).append(rule)
+        payload: Dict[str, Any] = {
+            "categories": [_catalog_row(c) for c in categories],
+            "products": [_catalog_row(p) for p in products],
+            "option_configs": {
+                str(p.id): _build_option_config(p.options, rules.get(p.id, [])) for p in products
+            },
+        }
+    finally:
+        session.close()
+    payload["settings"] = load_business_settings_dict()
+    payload["constants"] = load_constant_tables()
+    return payload
+
+
 @retry_on_database_error()
 def get_delivery_charge(method_name: str) -> float:
     """Get delivery charge for a specific method"""
@@ -2958,13 +3372,15 @@ def get_current_delivery_charge() -> float:
     Falls back to delivery_methods('delivery') if settings not present.
     """
     try:
-        settings = get_business_settings_dict()
-        if settings and settings.get("delivery_charge") is not None:
-            return float(settings["delivery_charge"]) or 0.0
+        from src.utils.settings_snapshot import get_settings_snapshot
+        charge = get_settings_snapshot().delivery_charge
+        if charge is not None:
+            return charge or 0.0
     except Exception:
         pass
-    # Fallback to delivery_methods table
-    return get_delivery_charge("delivery")
+    # Fallback to delivery_methods table (via the constants registry)
+    from src.utils.constants_manager import get_delivery_charge_for_method
+    return get_delivery_charge_for_method("delivery")
 
 
 @retry_on_database_error()
@@ -2997,7 +3413,8 @@ def create_delivery_area(name_en: str, name_he: str, charge: Optional[float]) ->
             session.add(area)
             session.commit()
             logger.info("Created delivery area: %s / %s (charge=%s)", name_en, name_he, charge)
-            return True
+        _invalidate_constants()
+        return True
     except Exception as e:
         logger.error("Failed to create delivery area: %s", e)
         return False
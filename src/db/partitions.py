@@ -0,0 +1,314 @@
+"""
+Hot/cold monthly partitions for orders and order_items
+
+On PostgreSQL both tables are partitioned in two levels::
+
+    orders                      PARTITION BY LIST (archived)
+      orders_hot                  archived = false, PARTITION BY RANGE (created_at)
+        orders_hot_2026_10          one partition per month
+        orders_hot_default          anything no month partition covers yet
+      orders_cold                 archived = true, PARTITION BY RANGE (created_at)
+        orders_cold_2025_03 ...
+
+New orders land in the hot side. ``archive_orders`` flags delivered and
+cancelled orders older than N months (and their items) as archived, which
+moves the rows into the cold month partitions. Queries that filter on
+``archived = false`` (the active-order lists) are pruned to the hot side;
+analytics and exports without that filter span both.
+
+Partitioning is opt-in: the conversion rebuilds both tables, so it is run
+by an operator with ``scripts/partition_orders.py`` during a quiet period,
+never at startup. Until then the tables stay plain and only the archive
+flag is maintained.
+
+``maintain_partitions`` creates the month partitions ahead of time, runs the
+archive step and drops hot month partitions the archive has emptied. The
+``archived`` flag is kept on SQLite too, so the same queries work there;
+only the partition management is PostgreSQL specific.
+
+PostgreSQL requires the partition keys in every unique constraint, so the
+primary key becomes ``(id, archived, created_at)`` and the unique
+constraint on ``order_number`` can only include those columns as well.
+Order numbers stay unique through the ``order_numbers`` table, written in
+the transaction that creates the order. order_items keeps its ``order_id``
+column and ORM relationship, but the database foreign key to orders is
+dropped because it cannot reference ``id`` alone; ``delete_order`` removes
+the items itself.
+"""
+
+import asyncio
+import logging
+import re
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+from sqlalchemy import select, text, update
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.schema import AddConstraint, UniqueConstraint
+
+from src.db.models import Base
+from src.utils.constants import PartitionSettings
+
+logger = logging.getLogger(__name__)
+
+_TIERS = (("hot", "false"), ("cold", "true"))
+_MONTH_SUFFIX = re.compile(r"_(\d{4})_(\d{2})$")
+
+
+def month_start(moment: datetime) -> datetime:
+    return datetime(moment.year, moment.month, 1)
+
+
+def add_months(month: datetime, months: int) -> datetime:
+    index = month.year * 12 + month.month - 1 + months
+    return datetime(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(table: str, tier: str, month: datetime) -> str:
+    return f"{table}_{tier}_{month:%Y_%m}"
+
+
+def is_partitioned(conn: Connection, table: str) -> bool:
+    """Whether ``table`` is a partitioned table (always False off PostgreSQL)"""
+    if conn.dialect.name != "postgresql":
+        return False
+    return bool(
+        conn.execute(
+            text("SELECT EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(:table))"),
+            {"table": table},
+        ).scalar()
+    )
+
+
+def _exists(conn: Connection, relation: str) -> bool:
+    return conn.execute(text("SELECT to_regclass(:name) IS NOT NULL"), {"name": relation}).scalar()
+
+
+def ensure_month_partition(conn: Connection, table: str, tier: str, month: datetime) -> bool:
+    """Create the ``tier`` partition of ``table`` for ``month`` if it is missing
+
+    Rows for that month already sitting in the default partition are moved
+    into the new one, so a late partition never fails to attach.
+    """
+    name = partition_name(table, tier, month)
+    if _exists(conn, name):
+        return False
+    parent, default = f"{table}_{tier}", f"{table}_{tier}_default"
+    lower, upper = month, add_months(month, 1)
+    conn.execute(text(f"CREATE TABLE {name} (LIKE {table} INCLUDING DEFAULTS)"))
+    moved = conn.execute(
+        text(
+            f"WITH moved AS (DELETE FROM {default} WHERE created_at >= :lower AND created_at < :upper RETURNING *) "
+            f"INSERT INTO {name} SELECT * FROM moved"
+        ),
+        {"lower": lower, "upper": upper},
+    ).rowcount
+    conn.execute(
+        text(f"ALTER TABLE {parent} ATTACH PARTITION {name} FOR VALUES FROM ('{lower:%Y-%m-%d}') TO ('{upper:%Y-%m-%d}')")
+    )
+    logger.info("Created partition %s (%d rows moved from %s)", name, moved, default)
+    return True
+
+
+def partition_table(conn: Connection, table: str) -> None:
+    """Convert a plain ``table`` into the hot/cold monthly layout, keeping its rows
+
+    Runs inside the caller's transaction. Foreign keys from other tables to
+    ``table`` are dropped with the old table (and logged).
+    """
+    model = Base.metadata.tables[table]
+    staging = f"{table}_partitioned"
+    sequence = conn.execute(text("SELECT pg_get_serial_sequence(:table, 'id')"), {"table": table}).scalar()
+    if sequence:
+        # Keep the id sequence when the old table is dropped
+        conn.execute(text(f"ALTER SEQUENCE {sequence} OWNED BY NONE"))
+
+    conn.execute(text(f"CREATE TABLE {staging} (LIKE {table} INCLUDING DEFAULTS) PARTITION BY LIST (archived)"))
+    for tier, value in _TIERS:
+        conn.execute(
+            text(f"CREATE TABLE {table}_{tier} PARTITION OF {staging} FOR VALUES IN ({value}) PARTITION BY RANGE (created_at)")
+        )
+        conn.execute(text(f"CREATE TABLE {table}_{tier}_default PARTITION OF {table}_{tier} DEFAULT"))
+
+    conn.execute(text(f"UPDATE {table} SET created_at = now() WHERE created_at IS NULL"))
+    months = conn.execute(
+        text(f"SELECT DISTINCT date_trunc('month', created_at)::timestamp FROM {table}")
+    ).scalars().all()
+    copied = conn.execute(text(f"INSERT INTO {staging} SELECT * FROM {table}")).rowcount
+    referencing = conn.execute(
+        text(
+            "SELECT conrelid::regclass::text || '.' || conname FROM pg_constraint "
+            "WHERE contype = 'f' AND confrelid = to_regclass(:table)"
+        ),
+        {"table": table},
+    ).scalars().all()
+    for foreign_key in referencing:
+        logger.warning("Dropping foreign key %s, which references %s, to partition it", foreign_key, table)
+    conn.execute(text(f"DROP TABLE {table} CASCADE"))
+    conn.execute(text(f"ALTER TABLE {staging} RENAME TO {table}"))
+
+    keys = ("archived", "created_at")
+    conn.execute(text(f"ALTER TABLE {table} ADD PRIMARY KEY (id, {', '.join(keys)})"))
+    if sequence:
+        conn.execute(text(f"ALTER SEQUENCE {sequence} OWNED BY {table}.id"))
+    for constraint in model.constraints:
+        if isinstance(constraint, UniqueConstraint):
+            columns = [c.name for c in constraint.columns] + list(keys)
+            conn.execute(text(f"ALTER TABLE {table} ADD UNIQUE ({', '.join(columns)})"))
+    for foreign_key in model.foreign_key_constraints:
+        if foreign_key.referred_table.name not in PartitionSettings.TABLES:
+            conn.execute(AddConstraint(foreign_key))
+    for index in model.indexes:
+        index.create(conn)
+
+    for month in sorted(set(months)):
+        ensure_month_partition(conn, table, "hot", month_start(month))
+    logger.info("Partitioned %s (%d rows, %d months)", table, copied, len(set(months)))
+
+
+def partition_order_tables(conn: Connection) -> List[str]:
+    """Partition orders and order_items on PostgreSQL; returns the tables converted
+
+    Used by ``scripts/partition_orders.py``. Tables already partitioned are
+    left alone.
+    """
+    converted = []
+    if conn.dialect.name != "postgresql":
+        return converted
+    for table in PartitionSettings.TABLES:
+        if not is_partitioned(conn, table):
+            partition_table(conn, table)
+            converted.append(table)
+    return converted
+
+
+def _bound_lock_waits(conn: Connection) -> None:
+    conn.execute(text(f"SET LOCAL lock_timeout = {int(PartitionSettings.LOCK_TIMEOUT_MS)}"))
+
+
+def ensure_hot_partitions(conn: Connection, now: Optional[datetime] = None, ahead: int = PartitionSettings.MONTHS_AHEAD) -> List[str]:
+    """Create hot partitions for the current month and ``ahead`` months after it"""
+    current = month_start(now or datetime.utcnow())
+    created = []
+    for table in PartitionSettings.TABLES:
+        for offset in range(ahead + 1):
+            month = add_months(current, offset)
+            if ensure_month_partition(conn, table, "hot", month):
+                created.append(partition_name(table, "hot", month))
+    return created
+
+
+def _child_partitions(conn: Connection, parent: str) -> List[str]:
+    return conn.execute(
+        text(
+            "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+            "WHERE i.inhparent = to_regclass(:parent) ORDER BY c.relname"
+        ),
+        {"parent": parent},
+    ).scalars().all()
+
+
+def drop_empty_hot_partitions(conn: Connection, before: datetime) -> List[str]:
+    """Drop hot month partitions that end before ``before`` and hold no rows"""
+    dropped = []
+    for table in PartitionSettings.TABLES:
+        parent = f"{table}_hot"
+        for name in _child_partitions(conn, parent):
+            match = _MONTH_SUFFIX.search(name)
+            if not match:
+                continue
+            month = datetime(int(match.group(1)), int(match.group(2)), 1)
+            if add_months(month, 1) > before:
+                continue
+            if conn.execute(text(f"SELECT EXISTS (SELECT 1 FROM {name})")).scalar():
+                continue
+            conn.execute(text(f"ALTER TABLE {parent} DETACH PARTITION {name}"))
+            conn.execute(text(f"DROP TABLE {name}"))
+            dropped.append(name)
+    return dropped
+
+
+def _months(values: Iterable[Optional[datetime]]) -> List[datetime]:
+    return sorted({month_start(v) for v in values if v is not None})
+
+
+def archive_orders(
+    engine: Engine,
+    older_than_months: int = PartitionSettings.ARCHIVE_AFTER_MONTHS,
+    statuses: Sequence[str] = PartitionSettings.ARCHIVE_STATUSES,
+    batch_size: int = PartitionSettings.ARCHIVE_BATCH_SIZE,
+    now: Optional[datetime] = None,
+) -> int:
+    """Flag finished orders created before the cutoff month, and their items, as archived
+
+    Works in batches, one transaction each. On a partitioned PostgreSQL
+    database the update moves the rows into the cold partitions, which are
+    created first for every month a batch touches.
+    """
+    orders = Base.metadata.tables["orders"]
+    items = Base.metadata.tables["order_items"]
+    cutoff = add_months(month_start(now or datetime.utcnow()), -older_than_months)
+    total = 0
+    while True:
+        with engine.begin() as conn:
+            batch = conn.execute(
+                select(orders.c.id, orders.c.created_at)
+                .where(
+                    orders.c.archived.is_(False),
+                    orders.c.status.in_(list(statuses)),
+                    orders.c.created_at < cutoff,
+                )
+                .order_by(orders.c.created_at)
+                .limit(batch_size)
+            ).all()
+            if not batch:
+                break
+            ids = [row.id for row in batch]
+            if is_partitioned(conn, "orders"):
+                _bound_lock_waits(conn)
+                item_dates = conn.execute(select(items.c.created_at).where(items.c.order_id.in_(ids))).scalars()
+                for month in _months(row.created_at for row in batch):
+                    ensure_month_partition(conn, "orders", "cold", month)
+                for month in _months(item_dates):
+                    ensure_month_partition(conn, "order_items", "cold", month)
+            conn.execute(update(orders).where(orders.c.id.in_(ids), orders.c.archived.is_(False)).values(archived=True))
+            conn.execute(update(items).where(items.c.order_id.in_(ids), items.c.archived.is_(False)).values(archived=True))
+        total += len(ids)
+        logger.info("Archived %d orders (%d so far)", len(ids), total)
+        if len(batch) < batch_size:
+            break
+    return total
+
+
+def maintain_partitions(engine: Engine, older_than_months: Optional[int] = None) -> Dict[str, Any]:
+    """Create upcoming hot partitions, archive old orders and drop emptied hot partitions"""
+    if older_than_months is None:
+        from src.config import get_config
+
+        older_than_months = get_config().order_archive_after_months
+    now = datetime.utcnow()
+    result: Dict[str, Any] = {"created": [], "dropped": []}
+    with engine.begin() as conn:
+        partitioned = is_partitioned(conn, "orders")
+        if partitioned:
+            _bound_lock_waits(conn)
+            result["created"] = ensure_hot_partitions(conn, now)
+    result["archived"] = archive_orders(engine, older_than_months, now=now)
+    if partitioned:
+        with engine.begin() as conn:
+            _bound_lock_waits(conn)
+            result["dropped"] = drop_empty_hot_partitions(conn, add_months(month_start(now), -older_than_months))
+    return result
+
+
+async def run_partition_maintenance(interval: float = PartitionSettings.MAINTENANCE_INTERVAL_SECONDS) -> None:
+    """Run ``maintain_partitions`` now and then every ``interval`` seconds"""
+    from src.db.operations import get_db_manager
+
+    while True:
+        try:
+            result = await asyncio.to_thread(maintain_partitions, get_db_manager().get_engine())
+            logger.info("Partition maintenance: %s", result)
+        except Exception as e:
+            logger.error("Partition maintenance failed: %s", e)
+        await asyncio.sleep(interval)
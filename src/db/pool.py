@@ -0,0 +1,253 @@
+"""
+Connection pool profiles, monitoring and adaptive sizing
+
+``MonitoredQueuePool`` is a ``QueuePool`` that exports how long callers wait
+for a connection (``db_pool_checkout_wait_seconds``), checkout timeouts
+(``db_pool_timeouts_total``), overflow connections opened beyond the pool
+size (``db_pool_overflow_total``) and the age of pooled connections. With
+an ``AdaptivePoolSizer`` attached it also resizes itself to the peak
+concurrency measured over each window, within configured bounds.
+
+``pool_engine_kwargs`` picks the pool profile: a monitored ``QueuePool`` for
+direct Postgres connections, or ``NullPool`` without startup options for
+PgBouncer/Supavisor in transaction mode, where the server-side pooler owns
+the connections and session state does not survive a transaction. A SQLite
+file gets the monitored pool too, with connections shared across threads.
+"""
+
+import logging
+import math
+import threading
+import time
+import weakref
+from typing import Any, Dict, Optional
+from urllib.parse import urlparse
+
+from sqlalchemy import exc
+from sqlalchemy.pool import NullPool, QueuePool
+
+from src.db.sqlite import is_sqlite_url, sqlite_connect_args
+from src.utils.constants import DatabaseSettings, DatabaseRetrySettings, PoolSettings
+from src.utils.metrics import get_metrics
+
+logger = logging.getLogger(__name__)
+
+
+class AdaptivePoolSizer:
+    """Sizes a pool to the peak concurrent checkouts of the last window"""
+
+    def __init__(
+        self,
+        min_size: int = PoolSettings.ADAPTIVE_MIN_SIZE,
+        max_size: int = DatabaseSettings.PRODUCTION_POOL_SIZE,
+        window: float = PoolSettings.ADAPTIVE_WINDOW_SECONDS,
+        headroom: float = PoolSettings.ADAPTIVE_HEADROOM,
+    ):
+        self.min_size = min_size
+        self.max_size = max(min_size, max_size)
+        self.window = window
+        self.headroom = headroom
+        self._peak = 0
+        self._window_start = time.monotonic()
+
+    def target(self, peak: int) -> int:
+        return min(self.max_size, max(self.min_size, math.ceil(peak * self.headroom)))
+
+    def observe(self, pool: "MonitoredQueuePool", in_use: int) -> None:
+        """Record the current concurrency and resize once per window"""
+        self._peak = max(self._peak, in_use)
+        now = time.monotonic()
+        if now - self._window_start < self.window:
+            return
+        target = self.target(self._peak)
+        self._peak, self._window_start = in_use, now
+        if target != pool.size():
+            logger.info("Resizing %s connection pool from %d to %d", pool.name, pool.size(), target)
+            pool.resize(target)
+
+
+class MonitoredQueuePool(QueuePool):
+    """QueuePool that exports checkout waits, timeouts, overflow and connection age"""
+
+    name: str = DatabaseRetrySettings.PRIMARY_TARGET
+    sizer: Optional[AdaptivePoolSizer] = None
+
+    def __init__(self, *args: Any, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self._in_use = 0
+        self._records: "weakref.WeakSet" = weakref.WeakSet()
+        self._stats_lock = threading.Lock()
+
+    @property
+    def _labels(self) -> Dict[str, str]:
+        return {"pool": self.name}
+
+    def _do_get(self):
+        metrics = get_metrics()
+        start = time.perf_counter()
+        try:
+            record = super()._do_get()
+        except exc.TimeoutError:
+            metrics.increment("db_pool_timeouts_total", labels=self._labels)
+            logger.warning("Timed out waiting for a %s database connection: %s", self.name, self.status())
+            raise
+        finally:
+            metrics.observe_histogram(
+                "db_pool_checkout_wait_seconds", time.perf_counter() - start, PoolSettings.WAIT_BUCKETS, self._labels
+            )
+        self._track_checkout(1)
+        return record
+
+    def _do_return_conn(self, record) -> None:
+        self._track_checkout(-1)
+        if self._pool.qsize() >= self._pool.maxsize:
+            # The pool shrank while this connection was out; close it instead
+            try:
+                record.close()
+            finally:
+                self._dec_overflow()
+            return
+        super()._do_return_conn(record)
+
+    def _create_connection(self):
+        record = super()._create_connection()
+        self._records.add(record)
+        if self.overflow() > 0:
+            get_metrics().increment("db_pool_overflow_total", labels=self._labels)
+        return record
+
+    def _track_checkout(self, delta: int) -> None:
+        with self._stats_lock:
+            self._in_use += delta
+            in_use = self._in_use
+        get_metrics().set_gauge("db_pool_checked_out", in_use, self._labels)
+        if self.sizer is not None:
+            self.sizer.observe(self, in_use)
+
+    def resize(self, pool_size: int) -> None:
+        """Change the number of persistent connections, keeping max_overflow"""
+        with self._overflow_lock:
+            delta = pool_size - self._pool.maxsize
+            self._pool.maxsize = pool_size
+            # _overflow counts connections beyond the pool size
+            self._overflow -= delta
+        get_metrics().set_gauge("db_pool_size", pool_size, self._labels)
+
+    def recreate(self) -> "MonitoredQueuePool":
+        pool = super().recreate()
+        pool.name, pool.sizer = self.name, self.sizer
+        return pool
+
+    def stats(self) -> Dict[str, Any]:
+        """Pool snapshot, also published as gauges"""
+        now = time.time()
+        ages = [now - record.starttime for record in list(self._records) if record.dbapi_connection is not None]
+        stats = {
+            "pool_size": self.size(),
+            "checkedin": self.checkedin(),
+            "checkedout": self.checkedout(),
+            "overflow": self.overflow(),
+            "max_overflow": self._max_overflow,
+            "connections": len(ages),
+            "oldest_connection_age_seconds": round(max(ages), 1) if ages else 0.0,
+            "adaptive": self.sizer is not None,
+        }
+        metrics = get_metrics()
+        metrics.set_gauge("db_pool_size", stats["pool_size"], self._labels)
+        metrics.set_gauge("db_pool_connections", stats["connections"], self._labels)
+        metrics.set_gauge("db_pool_oldest_connection_age_seconds", stats["oldest_connection_age_seconds"], self._labels)
+        return stats
+
+
+def resolve_pool_mode(database_url: str, mode: str = "auto") -> str:
+    """Resolve the pool mode to session or transaction; auto detects the Supavisor transaction port"""
+    if mode not in PoolSettings.MODES:
+        raise ValueError(f"Unknown pool mode {mode!r}, expected one of {PoolSettings.MODES}")
+    if mode != "auto":
+        return mode
+    try:
+        port = urlparse(database_url).port
+    except ValueError:
+        port = None
+    return "transaction" if port == PoolSettings.TRANSACTION_POOLER_PORT else "session"
+
+
+def pool_engine_kwargs(config: Any, database_url: str, name: str = DatabaseRetrySettings.PRIMARY_TARGET) -> Dict[str, Any]:
+    """``create_engine`` pool arguments for the configured profile"""
+    is_postgres = database_url.startswith(("postgresql", "postgres://"))
+    mode = resolve_pool_mode(database_url, getattr(config, "db_pool_mode", "auto")) if is_postgres else "session"
+
+    kwargs: Dict[str, Any] = {}
+    if is_postgres:
+        connect_args: Dict[str, Any] = {
+            "keepalives": 1,
+            "keepalives_idle": DatabaseSettings.TCP_KEEPALIVE_IDLE_SECONDS,
+            "keepalives_interval": DatabaseSettings.TCP_KEEPALIVE_INTERVAL_SECONDS,
+            "keepalives_count": DatabaseSettings.TCP_KEEPALIVE_COUNT,
+        }
+        if mode == "session":
+            # Applies to every transaction without a per-transaction SET
+            connect_args["options"] = f"-c lock_timeout={DatabaseSettings.LOCK_TIMEOUT_SECONDS * 1000}"
+        elif database_url.startswith("postgresql+psycopg:"):
+            # psycopg 3 prepares repeated statements server-side; the pooler
+            # may hand the next transaction to a backend without them
+            connect_args["prepare_threshold"] = None
+        kwargs["connect_args"] = connect_args
+    elif is_sqlite_url(database_url):
+        kwargs["connect_args"] = sqlite_connect_args()
+
+    if mode == "transaction":
+        # The external pooler owns the connections: no client-side pool, and
+        # no startup options (PgBouncer rejects them). lock_timeout comes from
+        # the role/database default in this profile.
+        logger.info("Using transaction-mode pooler profile for %s database", name)
+        kwargs["poolclass"] = NullPool
+        return kwargs
+
+    if getattr(config, "environment", "development") == "production":
+        pool_size, max_overflow = DatabaseSettings.PRODUCTION_POOL_SIZE, DatabaseSettings.PRODUCTION_MAX_OVERFLOW
+    else:
+        pool_size, max_overflow = DatabaseSettings.DEVELOPMENT_POOL_SIZE, DatabaseSettings.DEVELOPMENT_MAX_OVERFLOW
+    pool_size = getattr(config, "db_pool_size", 0) or pool_size
+    configured_overflow = getattr(config, "db_max_overflow", -1)
+    max_overflow = max_overflow if configured_overflow < 0 else configured_overflow
+
+    if database_url in ("sqlite://", "sqlite:///:memory:"):
+        # In-memory SQLite keeps its per-thread pool: every new connection would be a new database
+        return kwargs
+    kwargs.update({
+        "poolclass": MonitoredQueuePool,
+        "pool_size": pool_size,
+        "max_overflow": max_overflow,
+        "pool_timeout": PoolSettings.TIMEOUT_SECONDS,
+        "pool_recycle": DatabaseSettings.POOL_RECYCLE_SECONDS,
+    })
+    return kwargs
+
+
+def configure_pool(engine: Any, config: Any, name: str = DatabaseRetrySettings.PRIMARY_TARGET) -> None:
+    """Name a monitored pool and attach adaptive sizing when enabled"""
+    pool = getattr(engine, "pool", None)
+    if not isinstance(pool, MonitoredQueuePool):
+        return
+    pool.name = name
+    if getattr(config, "db_pool_adaptive", False):
+        # Never grow past the configured size: that is the pooler budget
+        pool.sizer = AdaptivePoolSizer(max_size=pool.size())
+        logger.info("Adaptive sizing enabled for %s pool (max %d)", name, pool.size())
+
+
+def pool_status(engine: Any) -> Dict[str, Any]:
+    """Status of an engine's pool for health checks"""
+    pool = engine.pool
+    if isinstance(pool, MonitoredQueuePool):
+        return {"status": "active", **pool.stats()}
+    if isinstance(pool, NullPool):
+        return {"status": "active", "mode": "transaction_pooler"}
+    return {
+        "status": "active",
+        "pool_size": pool.size() if hasattr(pool, "size") else 0,
+        "checkedin": pool.checkedin() if hasattr(pool, "checkedin") else 0,
+        "checkedout": pool.checkedout() if hasattr(pool, "checkedout") else 0,
+        "overflow": pool.overflow() if hasattr(pool, "overflow") else 0,
+    }
@@ -0,0 +1,147 @@
+"""
+Read-replica health and read-after-write pinning
+
+Read-only work (catalog loads, analytics, customer lists, order history,
+exports) may be served by a replica so it does not compete with checkout
+for primary connections. ``ReplicaHealth`` decides per read whether the
+replica may be used:
+
+- its health check succeeds (a connection error on the replica engine
+  makes reads fall back at once; repeated failed checks open its circuit
+  breaker so it is then probed only every few seconds),
+- its replay lag, measured at most every few seconds, is under the limit,
+- and the current writer did not write recently. Every write publishes a
+  cache invalidation; the bus handler calls ``note_primary_write`` so the
+  reads that follow a write go to the primary until the replica has had
+  time to catch up.
+
+The pin belongs to a write scope, not to the process: the bot opens one per
+update with ``begin_write_scope``, so a customer's checkout keeps that
+customer's next reads on the primary while analytics and exports of other
+users stay on the replica. Threads and tasks started from the scope share it.
+"""
+
+import contextvars
+import logging
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from sqlalchemy import event, text
+
+from src.utils.constants import ReplicaSettings
+from src.utils.db_retry import CircuitBreaker, get_circuit_breaker, is_retryable_db_error
+from src.utils.metrics import get_metrics
+
+logger = logging.getLogger(__name__)
+
+# Zero when the replica has replayed everything it received, so an idle
+# primary does not look like replication lag
+_LAG_QUERY = text(
+    """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+    """
+)
+
+
+class _WriteScope:
+    """Read-after-write pin shared by everything running in one scope"""
+
+    __slots__ = ("primary_until",)
+
+    def __init__(self):
+        self.primary_until = 0.0
+
+
+_write_scope: contextvars.ContextVar[Optional[_WriteScope]] = contextvars.ContextVar("db_write_scope", default=None)
+
+
+def begin_write_scope() -> None:
+    """Start a new read-after-write scope in the current context (one per update)"""
+    _write_scope.set(_WriteScope())
+
+
+def note_primary_write(window: float = ReplicaSettings.READ_AFTER_WRITE_SECONDS) -> None:
+    """Keep the current scope's reads on the primary for ``window`` seconds after a write"""
+    scope = _write_scope.get()
+    if scope is None:
+        scope = _WriteScope()
+        _write_scope.set(scope)
+    scope.primary_until = max(scope.primary_until, time.monotonic() + window)
+
+
+def primary_pinned() -> bool:
+    scope = _write_scope.get()
+    return scope is not None and time.monotonic() < scope.primary_until
+
+
+class ReplicaHealth:
+    """Tracks whether a replica engine may serve reads"""
+
+    def __init__(
+        self,
+        engine,
+        max_lag: float = ReplicaSettings.MAX_LAG_SECONDS,
+        check_interval: float = ReplicaSettings.LAG_CHECK_INTERVAL_SECONDS,
+        breaker: Optional[CircuitBreaker] = None,
+    ):
+        self.engine = engine
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        self.breaker = breaker or get_circuit_breaker(ReplicaSettings.TARGET)
+        self.lag: Optional[float] = None  # None: unknown or unreachable
+        self._checked_at = float("-inf")
+        self._lock = threading.Lock()
+        event.listen(engine, "handle_error", self._on_error)
+
+    def _on_error(self, context) -> None:
+        if context.is_disconnect or is_retryable_db_error(context.original_exception):
+            # Reads go to the primary until the next health check succeeds
+            logger.warning("Replica error, reading from the primary: %s", context.original_exception)
+            self.lag = None
+
+    def measure_lag(self) -> float:
+        """Replay lag of the replica in seconds (0 for non-Postgres test replicas)"""
+        with self.engine.connect() as conn:
+            if self.engine.dialect.name != "postgresql":
+                conn.execute(text("SELECT 1"))
+                return 0.0
+            return float(conn.execute(_LAG_QUERY).scalar() or 0.0)
+
+    def _refresh(self) -> None:
+        try:
+            lag = self.measure_lag()
+        except Exception as e:
+            logger.warning("Replica health check failed: %s", e)
+            self.lag = None
+            self.breaker.record_failure()
+        else:
+            if self.lag is not None and lag > self.max_lag >= self.lag:
+                logger.warning("Replica lag %.1fs is over %.1fs, reading from the primary", lag, self.max_lag)
+            self.lag = lag
+            self.breaker.record_success()
+            get_metrics().set_gauge("db_replica_lag_seconds", lag)
+        self._checked_at = time.monotonic()
+
+    def usable(self) -> bool:
+        """Whether the next read may go to the replica"""
+        if primary_pinned() or not self.breaker.allow():
+            return False
+        probing = self.breaker.state == CircuitBreaker.HALF_OPEN
+        if probing or time.monotonic() - self._checked_at >= self.check_interval:
+            with self._lock:
+                if probing or time.monotonic() - self._checked_at >= self.check_interval:
+                    self._refresh()
+        return self.lag is not None and self.lag <= self.max_lag
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "lag_seconds": self.lag,
+            "max_lag_seconds": self.max_lag,
+            "pinned_to_primary": primary_pinned(),
+            "circuit": self.breaker.stats(),
+        }
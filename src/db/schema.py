@@ -0,0 +1,230 @@
+"""
+Schema bootstrap with a version stamp
+
+``ensure_schema`` stores a fingerprint of the ORM models together with the
+number of applied migrations in a one-row ``schema_version`` table. A warm
+start reads that row with a single SELECT and returns. Only when the row is
+missing or differs (new deployment with model changes, new migration, empty
+database) are tables created and pending migrations applied.
+
+Migrations are numbered steps that run once each, in order, in their own
+transaction. Every step must also be idempotent: a database created by
+``create_all`` already has the final shape, and a step may be re-run if the
+process died before its number was stored. Add new steps at the end of
+``MIGRATIONS``; never renumber or edit a released one.
+"""
+
+import hashlib
+import logging
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable, Optional, Sequence, Tuple
+
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, bindparam, inspect, select, text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.exc import SQLAlchemyError
+
+from src.db.models import Base, canonical_options_key
+from src.utils.constants import SchemaSettings
+
+logger = logging.getLogger(__name__)
+
+_metadata = MetaData()
+schema_version_table = Table(
+    SchemaSettings.VERSION_TABLE,
+    _metadata,
+    Column("id", Integer, primary_key=True),
+    Column("fingerprint", String(64), nullable=False),
+    Column("migration", Integer, nullable=False),
+    Column("updated_at", DateTime, nullable=False),
+)
+
+
+@dataclass(frozen=True)
+class Migration:
+    """One versioned, idempotent schema step"""
+
+    version: int
+    description: str
+    apply: Callable[[Connection], None]
+
+
+def _has_column(conn: Connection, table: str, column: str) -> bool:
+    return column in {c["name"] for c in inspect(conn).get_columns(table)}
+
+
+def _add_business_settings_app_images(conn: Connection) -> None:
+    if not _has_column(conn, "business_settings", "app_images"):
+        conn.execute(text("ALTER TABLE business_settings ADD COLUMN app_images TEXT"))
+
+
+def _widen_image_urls(conn: Connection) -> None:
+    # SQLite does not enforce VARCHAR lengths; only Postgres needs the change
+    if conn.dialect.name != "postgresql":
+        return
+    for table in ("menu_categories", "menu_products"):
+        data_type = conn.execute(
+            text(
+                "SELECT data_type FROM information_schema.columns "
+                "WHERE table_name = :table AND column_name = 'image_url'"
+            ),
+            {"table": table},
+        ).scalar()
+        if data_type is not None and data_type != "text":
+            conn.execute(text(f"ALTER TABLE {table} ALTER COLUMN image_url TYPE TEXT"))
+
+
+def _create_product_option_rules(conn: Connection) -> None:
+    Base.metadata.tables["product_option_rules"].create(conn, checkfirst=True)
+
+
+_HOT_PATH_INDEXES = (
+    "idx_customers_phone",
+    "idx_product_options_type_name",
+    "idx_cart_items_cart_product",
+    "idx_orders_customer_created",
+    "idx_orders_active_created",
+    "idx_order_items_order",
+)
+
+
+def _add_hot_path_indexes(conn: Connection) -> None:
+    # create_all only builds indexes together with a new table
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            if index.name in _HOT_PATH_INDEXES:
+                index.create(conn, checkfirst=True)
+    # Superseded by idx_orders_customer_created, which has customer_id as its prefix
+    conn.execute(text("DROP INDEX IF EXISTS idx_orders_customer"))
+
+
+def _add_archived_flags(conn: Connection) -> None:
+    for table in ("orders", "order_items"):
+        if not _has_column(conn, table, "archived"):
+            conn.execute(text(f"ALTER TABLE {table} ADD COLUMN archived BOOLEAN NOT NULL DEFAULT false"))
+
+
+def _register_order_numbers(conn: Connection) -> None:
+    Base.metadata.tables["order_numbers"].create(conn, checkfirst=True)
+    conn.execute(
+        text(
+            "INSERT INTO order_numbers (order_number, order_id, created_at) "
+            "SELECT order_number, MIN(id), MIN(created_at) FROM orders "
+            "WHERE order_number NOT IN (SELECT order_number FROM order_numbers) "
+            "GROUP BY order_number"
+        )
+    )
+
+
+def _add_cart_options_key(conn: Connection) -> None:
+    if not _has_column(conn, "cart_items", "options_key"):
+        conn.execute(text("ALTER TABLE cart_items ADD COLUMN options_key VARCHAR(64) NOT NULL DEFAULT ''"))
+    # The key is computed in Python so both dialects hash the same canonical JSON
+    items = Base.metadata.tables["cart_items"]
+    rows = conn.execute(select(items.c.id, items.c.product_options).where(items.c.options_key == "")).all()
+    keyed = [
+        {"item_id": row.id, "key": canonical_options_key(row.product_options)}
+        for row in rows
+        if row.product_options
+    ]
+    if keyed:
+        conn.execute(
+            items.update()
+            .where(items.c.id == bindparam("item_id"))
+            .values(options_key=bindparam("key"), updated_at=items.c.updated_at),  # a backfill, not an edit
+            keyed,
+        )
+
+
+MIGRATIONS: Tuple[Migration, ...] = (
+    Migration(1, "add business_settings.app_images", _add_business_settings_app_images),
+    Migration(2, "widen image_url columns to TEXT", _widen_image_urls),
+    Migration(3, "create product_option_rules", _create_product_option_rules),
+    Migration(4, "add hot-path and active-order indexes", _add_hot_path_indexes),
+    Migration(5, "add archived flags to orders and order_items", _add_archived_flags),
+    Migration(6, "register issued order numbers in order_numbers", _register_order_numbers),
+    Migration(7, "add cart_items.options_key for portable option grouping", _add_cart_options_key),
+)
+
+
+def schema_fingerprint(migrations: Sequence[Migration] = MIGRATIONS) -> str:
+    """Hash of every model table, column and index plus the migration list"""
+    parts = []
+    for table in Base.metadata.sorted_tables:
+        parts.append(f"T {table.name}")
+        for column in table.columns:
+            parts.append(f"C {column.name} {column.type!r} {column.nullable} {column.primary_key}")
+        for index in sorted(table.indexes, key=lambda i: i.name or ""):
+            parts.append(f"I {index.name} {index.unique} {[c.name for c in index.columns]}")
+    parts.extend(f"M {m.version} {m.description}" for m in migrations)
+    return hashlib.sha256("\n".join(parts).encode("utf-8")).hexdigest()
+
+
+def read_schema_version(engine: Engine) -> Optional[Tuple[str, int]]:
+    """(fingerprint, applied migration) from the stamp, or None if there is none"""
+    try:
+        with engine.connect() as conn:
+            row = conn.execute(
+                select(schema_version_table.c.fingerprint, schema_version_table.c.migration)
+                .where(schema_version_table.c.id == 1)
+            ).first()
+    except SQLAlchemyError:
+        # Usually the table does not exist yet
+        return None
+    return (row.fingerprint, row.migration) if row else None
+
+
+def _lock(conn: Connection) -> None:
+    if conn.dialect.name == "postgresql":
+        # Instances starting together take turns; the second one then finds the stamp current
+        conn.execute(text("SELECT pg_advisory_xact_lock(:id)"), {"id": SchemaSettings.ADVISORY_LOCK_ID})
+
+
+def _stamp(conn: Connection, fingerprint: str, migration: int) -> None:
+    values = {"fingerprint": fingerprint, "migration": migration, "updated_at": datetime.utcnow()}
+    updated = conn.execute(
+        schema_version_table.update().where(schema_version_table.c.id == 1).values(**values)
+    ).rowcount
+    if not updated:
+        conn.execute(schema_version_table.insert().values(id=1, **values))
+
+
+def ensure_schema(engine: Engine, migrations: Sequence[Migration] = MIGRATIONS) -> bool:
+    """Create tables and apply pending migrations unless the stamp is current
+
+    Returns True when the schema was (re)built, False on the warm fast path.
+    """
+    fingerprint = schema_fingerprint(migrations)
+    latest = max((m.version for m in migrations), default=0)
+    current = read_schema_version(engine)
+    if current == (fingerprint, latest):
+        logger.info("Database schema is current (migration %d)", latest)
+        return False
+
+    with engine.begin() as conn:
+        _lock(conn)
+        _metadata.create_all(conn)
+        Base.metadata.create_all(conn)
+        row = conn.execute(
+            select(schema_version_table.c.fingerprint, schema_version_table.c.migration)
+            .where(schema_version_table.c.id == 1)
+        ).first()
+        if row is not None and (row.fingerprint, row.migration) == (fingerprint, latest):
+            return False  # another instance finished the bootstrap while we waited
+        applied = row.migration if row is not None else 0
+
+    for migration in sorted(migrations, key=lambda m: m.version):
+        if migration.version <= applied:
+            continue
+        with engine.begin() as conn:
+            _lock(conn)
+            logger.info("Applying schema migration %d: %s", migration.version, migration.description)
+            migration.apply(conn)
+            # Record progress; the fingerprint is stamped once every step is done
+            _stamp(conn, "", migration.version)
+        applied = migration.version
+
+    with engine.begin() as conn:
+        _stamp(conn, fingerprint, applied)
+    logger.info("Database schema bootstrapped (migration %d, fingerprint %s)", applied, fingerprint[:12])
+    return True
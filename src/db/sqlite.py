@@ -0,0 +1,75 @@
+"""
+Embedded SQLite storage mode
+
+Setting ``DATABASE_URL=sqlite:///data/samna_salta.db`` runs the bot on a
+local database file instead of a remote PostgreSQL server. A single-process
+deployment then pays no network round trip per statement; see
+``scripts/benchmark_storage.py`` for the comparison.
+
+``configure_sqlite`` tunes every connection for that use:
+
+- WAL journal with ``synchronous=NORMAL``: readers and the writer do not
+  block each other and a commit does not fsync (a power loss can only lose
+  the last transactions, never corrupt the file),
+- ``busy_timeout`` so a writer waits for the lock instead of failing,
+- foreign keys enforced, a larger page cache and memory-mapped reads.
+
+It also takes over ``BEGIN`` from the sqlite3 driver, which otherwise
+starts transactions lazily at the first write and never for reads. Every
+transaction now begins explicitly, as ``BEGIN IMMEDIATE`` when the
+connection's ``sqlite_begin`` execution option asks for it; the
+``ACIDTransactionManager`` sets it for transactions that will write.
+"""
+
+import logging
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from src.utils.constants import SQLiteSettings
+
+logger = logging.getLogger(__name__)
+
+_BEGIN_MODES = ("DEFERRED", "IMMEDIATE", "EXCLUSIVE")
+
+
+def is_sqlite_url(database_url: str) -> bool:
+    return database_url.startswith("sqlite")
+
+
+def sqlite_connect_args() -> dict:
+    """``connect_args`` for a SQLite engine shared by the bot's threads"""
+    # Pooled connections move between threads (asyncio.to_thread workers);
+    # each is only used by one thread at a time
+    return {"check_same_thread": False, "timeout": SQLiteSettings.BUSY_TIMEOUT_MS / 1000}
+
+
+def apply_pragmas(dbapi_connection: Any) -> None:
+    """Apply ``SQLiteSettings.PRAGMAS`` and the busy timeout to a raw connection"""
+    cursor = dbapi_connection.cursor()
+    try:
+        cursor.execute(f"PRAGMA busy_timeout = {int(SQLiteSettings.BUSY_TIMEOUT_MS)}")
+        for name, value in SQLiteSettings.PRAGMAS:
+            cursor.execute(f"PRAGMA {name} = {value}")
+    finally:
+        cursor.close()
+
+
+def configure_sqlite(engine: Engine) -> None:
+    """Install the connection pragmas and explicit ``BEGIN`` handling on ``engine``"""
+
+    @event.listens_for(engine, "connect")
+    def _on_connect(dbapi_connection, _connection_record):  # noqa: D401
+        # Driver autocommit: SQLAlchemy issues BEGIN itself in _on_begin
+        dbapi_connection.isolation_level = None
+        apply_pragmas(dbapi_connection)
+
+    @event.listens_for(engine, "begin")
+    def _on_begin(conn):  # noqa: D401
+        mode = str(conn.get_execution_options().get("sqlite_begin", "DEFERRED")).upper()
+        if mode not in _BEGIN_MODES:
+            mode = "DEFERRED"
+        conn.exec_driver_sql(f"BEGIN {mode}")
+
+    logger.info("SQLite storage mode: WAL journal, busy timeout %d ms", SQLiteSettings.BUSY_TIMEOUT_MS)
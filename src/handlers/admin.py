@@ -20,10 +20,12 @@ from telegram.ext import (
 from telegram.error import BadRequest
 
 from src.container import get_container
+from src.utils.constants import TaskPoolSettings
 from src.utils.error_handler import BusinessLogicError, error_handler
 from src.utils.i18n import i18n
 from src.utils.multilingual_content import MultilingualContentManager
 from src.utils.language_manager import language_manager
+from src.utils.task_supervisor import DuplicateTask, TaskRejected, get_task_supervisor
 
 # Conversation states
 AWAITING_ORDER_ID, AWAITING_STATUS_UPDATE, AWAITING_PRODUCT_DETAILS, AWAITING_PRODUCT_UPDATE, AWAITING_PRODUCT_DELETE_CONFIRM = range(5)
@@ -87,8 +89,6 @@ class AdminHandler:
         self.admin_service = self.container.get_admin_service()
         self.notification_service = self.container.get_notification_service()
         self.admin_conversations = {}  # Initialize admin conversations storage
-        # Track in-flight invoice/receipt generations to deduplicate rapid clicks
-        self._inflight_invoice_tasks = set()
 
     async def _safe_edit_message(self, query: CallbackQuery, text: str, reply_markup=None, parse_mode: str = "HTML", image_url: Optional[str] | None = None):
         """Safely update the current admin window, handling text<->photo transitions.
@@ -209,6 +209,8 @@ class AdminHandler:
             await self._show_all_orders(query)
         elif data == "admin_completed_orders":
             await self._show_completed_orders(query)
+        elif data == "admin_day_invoices":
+            await self._start_day_invoice_export(query.message.chat_id, user_id, datetime.now().date(), query=query)
         elif data == "admin_customers":
             await self._show_customers(query)
         elif data.startswith("admin_customers_"):
@@ -666,16 +668,8 @@ class AdminHandler:
         try:
             user_id = query.from_user.id
             # Load current overrides
-            from src.db.operations import get_business_settings_dict
-            settings = get_business_settings_dict() or {}
-            overrides = settings.get("app_images")
-            if isinstance(overrides, str):
-                import json
-                try:
-                    overrides = json.loads(overrides)
-                except Exception:
-                    overrides = {}
-            overrides = overrides or {}
+            from src.utils.settings_snapshot import get_settings_snapshot
+            overrides = dict(get_settings_snapshot().app_images)
 
             current_url = overrides.get(key, None)
             # Always compute the effective image (override if set, otherwise default) for preview
@@ -724,16 +718,8 @@ class AdminHandler:
             cache.delete(f"app_images_edit_key:{user_id}")
 
             # Load current overrides
-            from src.db.operations import get_business_settings_dict
-            settings = get_business_settings_dict() or {}
-            overrides = settings.get("app_images")
-            if isinstance(overrides, str):
-                import json
-                try:
-                    overrides = json.loads(overrides)
-                except Exception:
-                    overrides = {}
-            overrides = overrides or {}
+            from src.utils.settings_snapshot import get_settings_snapshot
+            overrides = dict(get_settings_snapshot().app_images)
 
             # Update overrides
             if text.lower() in ["default", "remove", "reset", "none", "-"]:
@@ -767,7 +753,7 @@ class AdminHandler:
         """List all active delivery areas"""
         try:
             user_id = query.from_user.id
-            from src.db.operations import get_active_delivery_areas
+            from src.utils.constants_manager import get_active_delivery_areas
             areas = get_active_delivery_areas()
             if not areas:
                 text = i18n.get_text("ADMIN_NO_DELIVERY_AREAS", user_id=user_id)
@@ -986,6 +972,12 @@ class AdminHandler:
                         callback_data="admin_completed_orders"
                     ),
                 ],
+                [
+                    InlineKeyboardButton(
+                        i18n.get_text("ADMIN_DAY_INVOICES_BUTTON", user_id=user_id),
+                        callback_data="admin_day_invoices"
+                    )
+                ],
                 [
                     InlineKeyboardButton(
                         i18n.get_text("ADMIN_BACK_TO_DASHBOARD", user_id=user_id), 
@@ -1741,17 +1733,23 @@ class AdminHandler:
         callback_prefix: str, 
         user_id: int, 
         extra_buttons: list = None, 
-        show_page_size_options: bool = True
+        show_page_size_options: bool = True,
+        total_items: Optional[int] = None
     ) -> tuple[list, dict]:
         """
         Create pagination keyboard and get page info
         
+        When ``total_items`` is given, ``items`` already holds just the
+        requested page (paged in the database) and is not sliced again.
+        
         Returns:
             tuple: (keyboard, page_info)
                 - keyboard: List of keyboard rows
                 - page_info: Dict with pagination details
         """
-        total_items = len(items)
+        prepaged = total_items is not None
+        if not prepaged:
+            total_items = len(items)
         total_pages = (total_items + items_per_page - 1) // items_per_page if total_items > 0 else 1
         
         # Ensure page is within bounds
@@ -1760,7 +1758,7 @@ class AdminHandler:
         # Get items for current page
         start_idx = page * items_per_page
         end_idx = start_idx + items_per_page
-        page_items = items[start_idx:end_idx]
+        page_items = list(items) if prepaged else items[start_idx:end_idx]
         
         keyboard = []
         
@@ -1844,7 +1842,7 @@ class AdminHandler:
     async def _show_customers(self, query: CallbackQuery, page: int = 0, page_size: int = 5) -> None:
         """Show customers with pagination"""
         try:
-            customers = await self.admin_service.get_all_customers()
+            customers, total_customers = await self.admin_service.get_customers_page(page, page_size)
             user_id = query.from_user.id
 
             if not customers:
@@ -1860,7 +1858,8 @@ class AdminHandler:
                 # Use pagination helper
                 extra_buttons = []
                 pagination_keyboard, page_info = self._create_pagination_keyboard(
-                    customers, page, page_size, "admin_customers", user_id, extra_buttons
+                    customers, page, page_size, "admin_customers", user_id, extra_buttons,
+                    total_items=total_customers
                 )
                 
                 text = (
@@ -1907,9 +1906,7 @@ class AdminHandler:
             self.logger.info("📊 SHOWING CUSTOMER DETAILS FOR #%s", customer_id)
             user_id = query.from_user.id
             
-            # Get all customers and find the specific one
-            customers = await self.admin_service.get_all_customers()
-            customer = next((c for c in customers if c['customer_id'] == customer_id), None)
+            customer = await self.admin_service.get_customer_summary(customer_id)
             
             if not customer:
                 await query.edit_message_text(i18n.get_text("ADMIN_CUSTOMER_NOT_FOUND", user_id=user_id))
@@ -2006,24 +2003,28 @@ class AdminHandler:
         user_id = query.from_user.id
         task_key = (query.message.chat_id, order_id, "receipt" if receipt else "invoice")
         try:
-            # Deduplicate rapid clicks
-            if task_key in self._inflight_invoice_tasks:
+            # Bounded PDF pool; the key deduplicates rapid clicks
+            try:
+                get_task_supervisor().submit(
+                    TaskPoolSettings.PDF,
+                    self._generate_and_send_invoice_pdf_background(query.message.chat_id, order_id, receipt, user_id),
+                    key=task_key,
+                )
+            except TaskRejected as e:
+                self.logger.info("Invoice task not scheduled: %s", e)
+                text_key = "ADMIN_INVOICE_ALREADY_GENERATING" if isinstance(e, DuplicateTask) else "ADMIN_TASKS_BUSY"
                 try:
-                    await query.answer(i18n.get_text("ADMIN_INVOICE_ALREADY_GENERATING", user_id=user_id))
+                    await query.answer(i18n.get_text(text_key, user_id=user_id))
                 except Exception:
                     pass
                 return
-            self._inflight_invoice_tasks.add(task_key)
 
             # Immediate lightweight acknowledgement so Telegram doesn't expire the callback
             try:
                 await query.answer(i18n.get_text("ADMIN_INVOICE_GENERATING", user_id=user_id), show_alert=False)
             except Exception:
-                # Ignore callback errors; proceed to background generation
+                # Ignore callback errors; generation is already scheduled
                 pass
-
-            # Fire-and-forget the heavy work
-            asyncio.create_task(self._generate_and_send_invoice_pdf_background(query.message.chat_id, order_id, receipt, user_id))
         except Exception as e:
             self.logger.error("💥 INVOICE PDF ERROR (pre): %s", e)
             # As a fallback, notify via chat (avoid answering callback again)
@@ -2034,7 +2035,6 @@ class AdminHandler:
 
     async def _generate_and_send_invoice_pdf_background(self, chat_id: int, order_id: int, receipt: bool, user_id: int) -> None:
         """Heavy invoice generation runs here to keep the callback responsive."""
-        task_key = (chat_id, order_id, "receipt" if receipt else "invoice")
         try:
             # Fetch full order information
             order_info = await self.admin_service.get_order_by_id(order_id)
@@ -2046,52 +2046,39 @@ class AdminHandler:
             from src.db.operations import get_business_settings_dict
             business = get_business_settings_dict()
 
-            # Prepare items, excluding synthetic Delivery line
-            items = []
-            delivery_label = i18n.get_text("DELIVERY_ITEM_NAME", user_id=user_id)
-            for it in order_info.get("items", []):
-                if (it.get("product_name") or "").strip() == delivery_label:
-                    continue
-                unit = it.get("unit_price")
-                if unit is None:
-                    qty = it.get("quantity", 1)
-                    total_price = float(it.get("total_price", 0))
-                    unit = total_price / qty if qty else total_price
-                items.append({
-                    "product_name": it.get("product_name"),
-                    "quantity": it.get("quantity", 1),
-                    "unit_price": unit,
-                    "total_price": it.get("total_price", unit * it.get("quantity", 1)),
-                })
-
-            order_payload = {
-                "order_id": order_info.get("order_id"),
-                "order_number": order_info.get("order_number"),
-                "customer_name": order_info.get("customer_name"),
-                "customer_phone": order_info.get("customer_phone"),
-                "delivery_method": order_info.get("delivery_method"),
-                "delivery_address": order_info.get("delivery_address"),
-                "delivery_instructions": order_info.get("delivery_instructions"),
-                "items": items,
-                "subtotal": float(order_info.get("subtotal", 0) or (float(order_info.get("total", 0)) - float(order_info.get("delivery_charge", 0) or 0))),
-                "delivery_charge": float(order_info.get("delivery_charge", 0) or 0),
-                "total": float(order_info.get("total", 0)),
-                "created_at": order_info.get("created_at"),
-            }
+            from src.services.invoice_export import order_invoice_payload
+            # Exclude the synthetic Delivery line shown in the admin order view
+            order_payload = order_invoice_payload(order_info, i18n.get_text("DELIVERY_ITEM_NAME", user_id=user_id))
 
             from src.services.invoice_service import build_invoice_pdf
-            result = await build_invoice_pdf(order_payload, business, receipt=receipt, user_id=user_id)
-            pdf_bytes = result.get("pdf")
-            html = result.get("html")
+            from src.services.pdf_cache import get_pdf_cache
             from src.container import get_container
             bot = get_container().get_bot()
+            filename = f"invoice_{order_id}.pdf" if not receipt else f"receipt_{order_id}.pdf"
+            caption = f"Order #{order_id} invoice" if not receipt else f"Order #{order_id} receipt"
+
+            result = await build_invoice_pdf(order_payload, business, receipt=receipt, user_id=user_id, use_file_id=True)
+            if result.get("file_id"):
+                # Same document was uploaded before: re-send without uploading
+                try:
+                    await bot.send_document(chat_id=chat_id, document=result["file_id"], caption=caption)
+                    return
+                except Exception as e:
+                    self.logger.info("Cached invoice file_id rejected, re-uploading: %s", e)
+                    await asyncio.to_thread(get_pdf_cache().forget_file_id, result["cache_key"])
+                    result = await build_invoice_pdf(order_payload, business, receipt=receipt, user_id=user_id)
+            pdf_bytes = result.get("pdf")
+            html = result.get("html")
             if pdf_bytes:
-                await bot.send_document(
+                message = await bot.send_document(
                     chat_id=chat_id,
                     document=pdf_bytes,
-                    filename=f"invoice_{order_id}.pdf" if not receipt else f"receipt_{order_id}.pdf",
-                    caption=f"Order #{order_id} invoice" if not receipt else f"Order #{order_id} receipt",
+                    filename=filename,
+                    caption=caption,
                 )
+                document = getattr(message, "document", None)
+                if document is not None and getattr(document, "file_id", None):
+                    await asyncio.to_thread(get_pdf_cache().set_file_id, result["cache_key"], document.file_id)
             else:
                 await bot.send_message(chat_id=chat_id, text=i18n.get_text("ADMIN_INVOICE_HTML_FALLBACK", user_id=user_id), parse_mode="HTML")
                 await bot.send_message(chat_id=chat_id, text=html)
@@ -2102,12 +2089,258 @@ class AdminHandler:
                 await get_container().get_bot().send_message(chat_id=chat_id, text=i18n.get_text("ADMIN_ERROR_MESSAGE", user_id=user_id))
             except Exception:
                 pass
+
+    @error_handler("admin_day_invoices")
+    async def handle_invoices_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+        """Handle /invoices [YYYY-MM-DD] - send the day's invoices as one ZIP"""
+        user_id = update.effective_user.id
+        if not await self._is_admin_user(user_id):
+            await update.message.reply_text(i18n.get_text("ADMIN_ACCESS_DENIED", user_id=user_id))
+            return
+        day = datetime.now().date()
+        if context.args:
+            try:
+                day = datetime.strptime(context.args[0], "%Y-%m-%d").date()
+            except ValueError:
+                await update.message.reply_text(i18n.get_text("ADMIN_DAY_INVOICES_USAGE", user_id=user_id))
+                return
+        await self._start_day_invoice_export(update.effective_chat.id, user_id, day)
+
+    async def _start_day_invoice_export(self, chat_id: int, user_id: int, day, query: Optional[CallbackQuery] = None) -> None:
+        """Start the end-of-day ZIP export in the invoice export pool, one per chat and day."""
+        try:
+            get_task_supervisor().submit(
+                TaskPoolSettings.INVOICE_EXPORT,
+                self._export_day_invoices_background(chat_id, user_id, day),
+                key=(chat_id, day.isoformat()),
+            )
+        except TaskRejected as e:
+            self.logger.info("Invoice export not scheduled: %s", e)
+            text_key = "ADMIN_INVOICE_ALREADY_GENERATING" if isinstance(e, DuplicateTask) else "ADMIN_TASKS_BUSY"
+            text = i18n.get_text(text_key, user_id=user_id)
+            if query is not None:
+                try:
+                    await query.answer(text)
+                except Exception:
+                    pass
+            else:
+                await get_container().get_bot().send_message(chat_id=chat_id, text=text)
+            return
+        if query is not None:
+            try:
+                await query.answer(i18n.get_text("ADMIN_INVOICE_GENERATING", user_id=user_id), show_alert=False)
+            except Exception:
+                pass
+
+    async def _export_day_invoices_background(self, chat_id: int, user_id: int, day) -> None:
+        """Render the day's invoices into one ZIP, reporting progress in a single edited message."""
+        from src.utils.constants import OrderExportSettings
+
+        bot = get_container().get_bot()
+        status = None
+        result = None
+        try:
+            from src.services.invoice_export import export_day_invoices
+
+            status = await bot.send_message(
+                chat_id=chat_id,
+                text=i18n.get_text("ADMIN_DAY_INVOICES_STARTED", user_id=user_id).format(day=day.isoformat()),
+            )
+
+            async def progress(done: int, total: int) -> None:
+                await bot.edit_message_text(
+                    chat_id=chat_id,
+                    message_id=status.message_id,
+                    text=i18n.get_text("ADMIN_DAY_INVOICES_PROGRESS", user_id=user_id).format(
+                        day=day.isoformat(), done=done, total=total
+                    ),
+                )
+
+            result = await export_day_invoices(day, user_id=user_id, progress=progress)
+            if not result.total:
+                text = i18n.get_text("ADMIN_DAY_INVOICES_EMPTY", user_id=user_id).format(day=day.isoformat())
+                await bot.edit_message_text(chat_id=chat_id, message_id=status.message_id, text=text)
+                return
+
+            summary = i18n.get_text("ADMIN_DAY_INVOICES_DONE", user_id=user_id).format(
+                day=day.isoformat(),
+                total=result.total,
+                rendered=result.rendered,
+                cached=result.cached,
+                failed=len(result.failed),
+            )
+            if result.archive is None:
+                await bot.send_message(chat_id=chat_id, text=summary)
+            elif result.size > OrderExportSettings.MAX_UPLOAD_BYTES:
+                too_large = i18n.get_text("ADMIN_DAY_INVOICES_TOO_LARGE", user_id=user_id).format(
+                    day=day.isoformat(), size_mb=result.size / (1024 * 1024)
+                )
+                await bot.send_message(chat_id=chat_id, text=f"{summary}\n{too_large}")
+            else:
+                await bot.send_document(chat_id=chat_id, document=result.archive, filename=result.filename, caption=summary)
+        except Exception as e:
+            self.logger.error("💥 DAY INVOICES EXPORT ERROR: %s", e)
+            try:
+                await bot.send_message(chat_id=chat_id, text=i18n.get_text("ADMIN_ERROR_MESSAGE", user_id=user_id))
+            except Exception:
+                pass
         finally:
-            # Clear inflight flag
+            if result is not None:
+                result.cleanup()
+
+    async def handle_export_orders_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+        """Handle /export_orders [YYYY-MM|YYYY-MM-DD|FROM..TO] [csv|parquet] [status,...]"""
+        user_id = update.effective_user.id
+        if not await self._is_admin_user(user_id):
+            await update.message.reply_text(i18n.get_text("ADMIN_ACCESS_DENIED", user_id=user_id))
+            return
+        from src.services.order_export import parse_export_request
+
+        try:
+            request = parse_export_request(context.args or [])
+        except ValueError:
+            await update.message.reply_text(i18n.get_text("ADMIN_ORDER_EXPORT_USAGE", user_id=user_id))
+            return
+        chat_id = update.effective_chat.id
+        try:
+            get_task_supervisor().submit(
+                TaskPoolSettings.EXPORT,
+                self._export_orders_background(chat_id, user_id, request),
+                key=(chat_id, "orders", request.label, request.fmt),
+            )
+        except TaskRejected as e:
+            self.logger.info("Order export not scheduled: %s", e)
+            text_key = "ADMIN_ORDER_EXPORT_RUNNING" if isinstance(e, DuplicateTask) else "ADMIN_TASKS_BUSY"
+            await update.message.reply_text(i18n.get_text(text_key, user_id=user_id))
+
+    async def _export_orders_background(self, chat_id: int, user_id: int, request) -> None:
+        """Stream the period's orders into a CSV/Parquet ZIP on disk and send it to the chat."""
+        from src.services.order_export import ExportFormatUnavailable, export_orders
+        from src.utils.constants import OrderExportSettings
+
+        bot = get_container().get_bot()
+        result = None
+        try:
+            await bot.send_message(
+                chat_id=chat_id,
+                text=i18n.get_text("ADMIN_ORDER_EXPORT_STARTED", user_id=user_id).format(
+                    period=request.label, format=request.fmt.upper()
+                ),
+            )
+            result = await asyncio.to_thread(export_orders, request)
+            if not result.orders:
+                await bot.send_message(
+                    chat_id=chat_id,
+                    text=i18n.get_text("ADMIN_ORDER_EXPORT_EMPTY", user_id=user_id).format(period=request.label),
+                )
+                return
+            if result.size > OrderExportSettings.MAX_UPLOAD_BYTES:
+                await bot.send_message(
+                    chat_id=chat_id,
+                    text=i18n.get_text("ADMIN_ORDER_EXPORT_TOO_LARGE", user_id=user_id).format(
+                        period=request.label, size_mb=result.size / (1024 * 1024)
+                    ),
+                )
+                return
+            caption = i18n.get_text("ADMIN_ORDER_EXPORT_DONE", user_id=user_id).format(
+                period=request.label, orders=result.orders, lines=result.lines
+            )
+            with open(result.path, "rb") as document:
+                await bot.send_document(chat_id=chat_id, document=document, filename=result.filename, caption=caption)
+        except ExportFormatUnavailable:
+            await bot.send_message(chat_id=chat_id, text=i18n.get_text("ADMIN_ORDER_EXPORT_NO_PARQUET", user_id=user_id))
+        except Exception as e:
+            self.logger.error("💥 ORDER EXPORT ERROR: %s", e)
             try:
-                self._inflight_invoice_tasks.discard(task_key)
+                await bot.send_message(chat_id=chat_id, text=i18n.get_text("ADMIN_ERROR_MESSAGE", user_id=user_id))
             except Exception:
                 pass
+        finally:
+            if result is not None:
+                result.cleanup()
+
+    async def handle_import_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+        """Handle /import without a file - explain how to send one"""
+        user_id = update.effective_user.id
+        if not await self._is_admin_user(user_id):
+            await update.message.reply_text(i18n.get_text("ADMIN_ACCESS_DENIED", user_id=user_id))
+            return
+        await update.message.reply_text(i18n.get_text("ADMIN_IMPORT_USAGE", user_id=user_id))
+
+    async def handle_import_document(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+        """Handle a CSV/YAML file sent with the caption /import [kind] [dry]"""
+        from src.services.bulk_import import KINDS
+        from src.utils.constants import BulkImportSettings
+
+        user_id = update.effective_user.id
+        if not await self._is_admin_user(user_id):
+            await update.message.reply_text(i18n.get_text("ADMIN_ACCESS_DENIED", user_id=user_id))
+            return
+        document = update.message.document
+        file_name = document.file_name or ""
+        args = [arg.lower() for arg in (update.message.caption or "").split()[1:]]
+        kind = next((arg for arg in args if arg in KINDS), None)
+        dry_run = "dry" in args
+        if not file_name.lower().endswith(BulkImportSettings.FORMATS):
+            await update.message.reply_text(i18n.get_text("ADMIN_IMPORT_USAGE", user_id=user_id))
+            return
+        if (document.file_size or 0) > BulkImportSettings.MAX_FILE_BYTES:
+            await update.message.reply_text(
+                i18n.get_text("ADMIN_IMPORT_TOO_LARGE", user_id=user_id).format(
+                    size_mb=BulkImportSettings.MAX_FILE_BYTES // (1024 * 1024)
+                )
+            )
+            return
+        chat_id = update.effective_chat.id
+        try:
+            get_task_supervisor().submit(
+                TaskPoolSettings.IMPORT,
+                self._import_file_background(chat_id, user_id, document, kind, dry_run),
+                key=(chat_id, "import"),
+            )
+        except TaskRejected as e:
+            self.logger.info("Import not scheduled: %s", e)
+            text_key = "ADMIN_IMPORT_RUNNING" if isinstance(e, DuplicateTask) else "ADMIN_TASKS_BUSY"
+            await update.message.reply_text(i18n.get_text(text_key, user_id=user_id))
+
+    async def _import_file_background(self, chat_id: int, user_id: int, document, kind: Optional[str], dry_run: bool) -> None:
+        """Download an uploaded file and import it in a worker thread, then report the outcome."""
+        import os
+        import tempfile
+        from pathlib import Path
+
+        from src.services.bulk_import import ImportFileError, import_file
+
+        bot = get_container().get_bot()
+        file_name = document.file_name
+        handle, path = tempfile.mkstemp(prefix="import_", suffix=Path(file_name).suffix)
+        os.close(handle)
+        try:
+            await bot.send_message(
+                chat_id=chat_id, text=i18n.get_text("ADMIN_IMPORT_STARTED", user_id=user_id).format(file=file_name)
+            )
+            telegram_file = await document.get_file()
+            await telegram_file.download_to_drive(path)
+            result = await asyncio.to_thread(import_file, path, kind, file_name, dry_run)
+            text_key = "ADMIN_IMPORT_DRY_RUN_DONE" if dry_run else "ADMIN_IMPORT_DONE"
+            text = i18n.get_text(text_key, user_id=user_id).format(file=file_name, summary=result.summary())
+            await bot.send_message(chat_id=chat_id, text=text)
+        except ImportFileError as e:
+            await bot.send_message(
+                chat_id=chat_id,
+                text=i18n.get_text("ADMIN_IMPORT_FAILED", user_id=user_id).format(file=file_name, error=e),
+            )
+        except Exception as e:
+            self.logger.error("💥 BULK IMPORT ERROR: %s", e)
+            try:
+                await bot.send_message(chat_id=chat_id, text=i18n.get_text("ADMIN_ERROR_MESSAGE", user_id=user_id))
+            except Exception:
+                pass
+        finally:
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
 
     async def _get_formatted_order_details(self, order_id: int, user_id: int = None) -> str | None:
         """Helper to get and format order details."""
@@ -2918,10 +3151,11 @@ class AdminHandler:
                 session.commit()
             finally:
                 session.close()
-            # Clear cache
+            # Invalidate cached category data
             try:
-                from src.utils.helpers import SimpleCache
-                SimpleCache().clear()
+                from src.utils.constants import CacheNamespaces
+                from src.utils.invalidation_bus import publish_invalidation
+                publish_invalidation(CacheNamespaces.CATEGORIES)
             except Exception:
                 pass
             await update.message.reply_text(i18n.get_text("ADMIN_CATEGORY_IMAGE_SAVED", user_id=user_id), reply_markup=InlineKeyboardMarkup([
@@ -5908,6 +6142,12 @@ def register_admin_handlers(application: Application):
 
     # Admin command handler
     application.add_handler(CommandHandler("admin", handler.handle_admin_command))
+    application.add_handler(CommandHandler("invoices", handler.handle_invoices_command))
+    application.add_handler(CommandHandler("export_orders", handler.handle_export_orders_command))
+    application.add_handler(CommandHandler("import", handler.handle_import_command))
+    application.add_handler(
+        MessageHandler(filters.Document.ALL & filters.CaptionRegex(r"^/import(@\w+)?(\s|$)"), handler.handle_import_document)
+    )
     # Product option create wizard (conversation)
     option_create_conv = ConversationHandler(
         entry_points=[
@@ -518,7 +518,7 @@ class CartHandler:
 
             if delivery_method == "delivery":
                 # First, prompt for delivery area (pre-step) before address
-                from src.db.operations import get_active_delivery_areas
+                from src.utils.constants_manager import get_active_delivery_areas
                 areas = get_active_delivery_areas()
                 if areas:
                     from src.utils.language_manager import language_manager
@@ -1673,8 +1673,8 @@ class CartHandler:
                 try:
                     charge = None
                     if getattr(cart, "delivery_area_id", None):
-                        from src.db.operations import get_delivery_area_by_id
-                        area = get_delivery_area_by_id(cart.delivery_area_id)
+                        from src.utils.constants_manager import get_delivery_area
+                        area = get_delivery_area(cart.delivery_area_id)
                         if area and area.charge is not None:
                             charge = float(area.charge)
                     if charge is None:
@@ -1791,8 +1791,8 @@ class CartHandler:
                 try:
                     charge = None
                     if getattr(cart, "delivery_area_id", None):
-                        from src.db.operations import get_delivery_area_by_id
-                        area = get_delivery_area_by_id(cart.delivery_area_id)
+                        from src.utils.constants_manager import get_delivery_area
+                        area = get_delivery_area(cart.delivery_area_id)
                         if area and area.charge is not None:
                             charge = float(area.charge)
                     if charge is None:
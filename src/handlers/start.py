@@ -190,9 +190,8 @@ class OnboardingHandler:
                     
                     # Fetch optional business description to show under the welcome headline
                     try:
-                        from src.db.operations import get_business_settings_dict
-                        _settings = get_business_settings_dict()
-                        _desc = (_settings or {}).get("business_description")
+                        from src.utils.settings_snapshot import get_settings_snapshot
+                        _desc = get_settings_snapshot().get("business_description")
                         description_line = f"\n{_desc}" if _desc else ""
                     except Exception:
                         description_line = ""
@@ -214,9 +213,8 @@ class OnboardingHandler:
             user_id = user.id
             # Fetch optional business description to show under the welcome headline
             try:
-                from src.db.operations import get_business_settings_dict
-                _settings = get_business_settings_dict()
-                _desc = (_settings or {}).get("business_description")
+                from src.utils.settings_snapshot import get_settings_snapshot
+                _desc = get_settings_snapshot().get("business_description")
                 description_line = f"\n{_desc}" if _desc else ""
             except Exception:
                 description_line = ""
@@ -16,78 +16,73 @@ from src.utils.constants_manager import get_product_option_name, get_product_siz
 def get_dynamic_main_menu_keyboard(user_id: int = None):
     """Get dynamic main menu keyboard that shows categories first."""
     try:
-        from src.db.operations import get_db_manager
         from src.utils.language_manager import language_manager
         
         # Get user language for localization
         user_language = language_manager.get_user_language(user_id) if user_id else "en"
         
-        # Use session context to ensure relationships are loaded properly
-        with get_db_manager().get_session_context() as session:
-            from src.db.models import Product
-            
-            # Get all active products with their categories loaded
-            products = session.query(Product).filter(Product.is_active).all()
-            
-            if not products:
-                # Fallback to static menu if no products found
-                return get_main_menu_keyboard(user_id)
-            
-            # Group products by category
-            categories = {}
-            for product in products:
-                # Skip products without a proper category
-                if not product.category_rel:
-                    continue
-                    
-                # Get category name based on user language
-                if user_language == "he":
-                    category_name = product.category_rel.name_he
-                else:
-                    category_name = product.category_rel.name_en
+        # Get all active products with their categories loaded
+        products = get_all_products()
+        
+        if not products:
+            # Fallback to static menu if no products found
+            return get_main_menu_keyboard(user_id)
+        
+        # Group products by category
+        categories = {}
+        for product in products:
+            # Skip products without a proper category
+            if not product.category_rel:
+                continue
                 
-                if category_name not in categories:
-                    categories[category_name] = []
-                categories[category_name].append(product)
+            # Get category name based on user language
+            if user_language == "he":
+                category_name = product.category_rel.name_he
+            else:
+                category_name = product.category_rel.name_en
             
-            # Build keyboard with only category buttons
-            keyboard = []
-            
-            # Add category buttons (each on its own line)
-            for category, category_products in categories.items():
-                # Skip "other" category if it's empty or has no valid products
-                if category.lower() == "other" and len(category_products) == 0:
-                    continue
-                    
-                # Create professional category button with beautiful icons and product count
-                translated_category = translate_category_name(category, user_id)
-                category_emoji = {
-                    'kubaneh': '🥖',
-                    'samneh': '🧈', 
-                    'red_bisbas': '🌶️',
-                    'hawaij_soup': '🍲',
-                    'hawaij_coffee': '☕',
-                    'white_coffee': '🤍',
-                    'hilbeh': '🫘'
-                }.get(category.lower(), '')
-                
-                button_text = f"{category_emoji} {translated_category} ({len(category_products)})"
-                callback_data = f"category_{category}"
+            if category_name not in categories:
+                categories[category_name] = []
+            categories[category_name].append(product)
+        
+        # Build keyboard with only category buttons
+        keyboard = []
+        
+        # Add category buttons (each on its own line)
+        for category, category_products in categories.items():
+            # Skip "other" category if it's empty or has no valid products
+            if category.lower() == "other" and len(category_products) == 0:
+                continue
                 
-                # Add each category button on its own line
-                keyboard.append([InlineKeyboardButton(button_text, callback_data=callback_data)])
+            # Create professional category button with beautiful icons and product count
+            translated_category = translate_category_name(category, user_id)
+            category_emoji = {
+                'kubaneh': '🥖',
+                'samneh': '🧈', 
+                'red_bisbas': '🌶️',
+                'hawaij_soup': '🍲',
+                'hawaij_coffee': '☕',
+                'white_coffee': '🤍',
+                'hilbeh': '🫘'
+            }.get(category.lower(), '')
             
-            # Add professional action buttons with beautiful styling
-            keyboard.append([InlineKeyboardButton(
-                i18n.get_text('BUTTON_VIEW_CART', user_id=user_id), 
-                callback_data="cart_view"
-            )])
-            keyboard.append([InlineKeyboardButton(
-                i18n.get_text('BACK_TO_MAIN', user_id=user_id), 
-                callback_data="main_page"
-            )])
+            button_text = f"{category_emoji} {translated_category} ({len(category_products)})"
+            callback_data = f"category_{category}"
             
-            return InlineKeyboardMarkup(keyboard)
+            # Add each category button on its own line
+            keyboard.append([InlineKeyboardButton(button_text, callback_data=callback_data)])
+        
+        # Add professional action buttons with beautiful styling
+        keyboard.append([InlineKeyboardButton(
+            i18n.get_text('BUTTON_VIEW_CART', user_id=user_id), 
+            callback_data="cart_view"
+        )])
+        keyboard.append([InlineKeyboardButton(
+            i18n.get_text('BACK_TO_MAIN', user_id=user_id), 
+            callback_data="main_page"
+        )])
+        
+        return InlineKeyboardMarkup(keyboard)
         
     except Exception as e:
         print(f"Error creating dynamic menu: {e}")
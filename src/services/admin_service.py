@@ -10,6 +10,7 @@ from dataclasses import dataclass
 
 from src.db.operations import (
     get_all_orders, 
+    get_orders_by_status,
     update_order_status, 
     get_all_products_admin,
     create_product,
@@ -20,6 +21,11 @@ from src.db.operations import (
     get_product_by_id
 )
 from src.db.models import Order
+from src.db.operations import get_order_fact_rows
+from src.services.analytics_cache import get_cached_analytics
+from src.services.analytics_engine import OrderFacts
+from src.services.order_history import get_order_history_store
+from src.utils.constants import OrderStatusGroups
 from src.utils.multilingual_content import MultilingualContentManager
 from src.db.operations import (
     create_product_option as db_create_product_option,
@@ -125,22 +131,23 @@ class AnalyticsService:
             end_date = date.today()
             start_date = end_date - timedelta(days=period_days)
             
-            orders = self._get_orders_in_period(start_date, end_date)
+            # Order and order-line facts, loaded once as columns
+            facts = self._load_order_facts(start_date, end_date)
             
             # Revenue analytics
-            revenue_analytics = self._calculate_revenue_analytics(orders, start_date, end_date)
+            revenue_analytics = self._revenue_from_facts(facts)
             
             # Order analytics
-            order_analytics = self._calculate_order_analytics(orders, start_date, end_date)
+            order_analytics = self._orders_from_facts(facts)
             
             # Product analytics
-            product_analytics = self._calculate_product_analytics(orders)
+            product_analytics = self._products_from_facts(facts)
             
             # Customer analytics
-            customer_analytics = self._calculate_customer_analytics(orders)
+            customer_analytics = self._customers_from_facts(facts)
             
             # Time-based trends
-            trends = self._calculate_trends(orders, start_date, end_date)
+            trends = self._trends_from_facts(facts)
             
             return {
                 "period": {
@@ -160,6 +167,93 @@ class AnalyticsService:
             self.logger.error("Error getting comprehensive analytics: %s", e)
             return {}
     
+    def _load_order_facts(self, start_date: date, end_date: date) -> OrderFacts:
+        """Columnar facts for orders created between start_date and end_date (inclusive)
+
+        Closed months come from the memory-mapped order history when it
+        covers them; only the remaining days are queried.
+        """
+        start = datetime.combine(start_date, datetime.min.time())
+        end = datetime.combine(end_date + timedelta(days=1), datetime.min.time())
+        history = []
+        store = get_order_history_store()
+        covered_until = store.covered_until() if store is not None else None
+        if covered_until is not None and start_date < covered_until:
+            history = store.blocks(start_date, min(end_date, covered_until - timedelta(days=1)))
+            start = max(start, datetime.combine(covered_until, datetime.min.time()))
+        orders, lines, customer_names = get_order_fact_rows(start, end) if start < end else ([], [], {})
+        return OrderFacts.from_rows(start_date, end_date, orders, lines, customer_names, history=history)
+
+    def _revenue_from_facts(self, facts: OrderFacts) -> RevenueAnalytics:
+        totals = facts.totals()
+        revenue_by_day, _ = facts.daily()
+        return RevenueAnalytics(
+            avg_order_value=totals["total_revenue"] / totals["total_orders"] if totals["total_orders"] > 0 else 0,
+            revenue_by_day=revenue_by_day,
+            revenue_by_week=facts.revenue_by_week(),
+            **totals,
+        )
+
+    def _orders_from_facts(self, facts: OrderFacts) -> OrderAnalytics:
+        status_counts = facts.status_counts()
+        _, orders_by_day = facts.daily()
+        return OrderAnalytics(
+            total_orders=facts.order_count,
+            pending_orders=status_counts.get('pending', 0),
+            active_orders=status_counts.get('confirmed', 0) + status_counts.get('preparing', 0) + status_counts.get('ready', 0),
+            completed_orders=status_counts.get('delivered', 0),
+            cancelled_orders=status_counts.get('cancelled', 0),
+            avg_processing_time=facts.avg_processing_hours(),
+            status_distribution=status_counts,
+            orders_by_day=orders_by_day
+        )
+
+    def _products_from_facts(self, facts: OrderFacts) -> List[ProductAnalytics]:
+        products = [
+            ProductAnalytics(
+                product_name=name,
+                total_orders=lines,
+                total_quantity=quantity,
+                total_revenue=revenue,
+                avg_order_value=revenue / lines if lines > 0 else 0,
+                popularity_rank=0
+            )
+            for name, lines, quantity, revenue in facts.product_totals()
+        ]
+        products.sort(key=lambda x: x.total_revenue, reverse=True)
+        for i, product in enumerate(products):
+            product.popularity_rank = i + 1
+        return products
+
+    def _customers_from_facts(self, facts: OrderFacts) -> List[CustomerAnalytics]:
+        customers = [
+            CustomerAnalytics(
+                customer_id=customer_id,
+                customer_name=name,
+                total_orders=total_orders,
+                total_spent=spent,
+                avg_order_value=spent / total_orders if total_orders > 0 else 0,
+                last_order_date=last_order,
+                favorite_products=favorites
+            )
+            for customer_id, name, total_orders, spent, last_order, favorites in facts.customer_totals()
+        ]
+        customers.sort(key=lambda x: x.total_spent, reverse=True)
+        return customers
+
+    def _trends_from_facts(self, facts: OrderFacts) -> Dict:
+        if not facts.order_count:
+            return {}
+        daily_revenue, daily_orders = facts.daily()
+        return {
+            "daily_revenue": daily_revenue,
+            "daily_orders": daily_orders,
+            "daily_avg_order_value": {day: daily_revenue[day] / daily_orders[day] for day in daily_revenue}
+        }
+
+    # Per-order reference implementations; the reports above use OrderFacts
+    # (see scripts/benchmark_analytics.py for the comparison)
+
     def _calculate_revenue_analytics(self, orders: List[Order], start_date: date, end_date: date) -> RevenueAnalytics:
         """Calculate revenue and financial metrics"""
         total_revenue = sum(order.total for order in orders)
@@ -403,8 +497,7 @@ class AdminService:
     async def get_pending_orders(self) -> List[Dict]:
         """Get all pending orders for admin dashboard"""
         try:
-            orders = get_all_orders()
-            pending_orders = [order for order in orders if order.status == "pending"]
+            pending_orders = get_orders_by_status(("pending",))
             
             # Convert to dict format expected by admin handler
             result = []
@@ -428,9 +521,7 @@ class AdminService:
     async def get_active_orders(self) -> List[Dict]:
         """Get all active orders (confirmed, preparing, ready) for admin dashboard"""
         try:
-            orders = get_all_orders()
-            active_statuses = ["confirmed", "preparing", "ready"]
-            active_orders = [order for order in orders if order.status in active_statuses]
+            active_orders = get_orders_by_status(OrderStatusGroups.IN_PROGRESS)
             
             # Convert to dict format expected by admin handler
             result = []
@@ -488,44 +579,11 @@ class AdminService:
             if not order:
                 return None
             
-            # Convert to dict format expected by admin handler
-            result = {
-                "order_id": order.id,
-                "order_number": order.order_number,
-                "customer_name": order.customer.name if order.customer else "Unknown",
-                "customer_phone": order.customer.phone if order.customer else "Unknown",
-                "total": order.total,
-                "subtotal": getattr(order, "subtotal", 0.0),
-                "delivery_charge": getattr(order, "delivery_charge", 0.0),
-                "status": order.status,
-                "created_at": order.created_at,
-                "delivery_method": getattr(order, "delivery_method", None),
-                "delivery_address": getattr(order, "delivery_address", None),
-                "delivery_instructions": getattr(order, "delivery_instructions", None),
-                "items": []
-            }
+            # Convert to dict format expected by admin handler; shared with the invoice export
+            from src.services.invoice_export import order_details
+            result = order_details(order)
+            result["status"] = order.status
             
-            # Add order items if available, localized for the admin's language
-            if hasattr(order, 'order_items') and order.order_items:
-                from src.utils.language_manager import language_manager
-                admin_lang = language_manager.get_user_language(order.customer.telegram_id) if order.customer else "he"
-                for item in order.order_items:
-                    localized_name = item.product_name
-                    try:
-                        # Try to map product_id to a multilingual name when possible
-                        if item.product_id:
-                            from src.db.operations import get_product_by_id, get_localized_name
-                            product = get_product_by_id(item.product_id)
-                            if product:
-                                localized_name = get_localized_name(product, admin_lang)
-                    except Exception:
-                        pass
-                    result["items"].append({
-                        "product_name": localized_name,
-                        "quantity": item.quantity,
-                        "total_price": item.total_price,
-                        "unit_price": item.unit_price
-                    })
             # Append delivery as a pseudo-item for admin display
             try:
                 if (getattr(order, "delivery_method", "").lower() == "delivery") and float(getattr(order, "delivery_charge", 0) or 0) > 0:
@@ -650,28 +708,38 @@ class AdminService:
             logger.error("Error deleting order %d: %s", order_id, e)
             return False
 
-    async def get_business_analytics(self) -> Dict:
-        """Get enhanced business analytics for admin dashboard"""
+    async def get_business_analytics(self, period_days: int = 30) -> Dict:
+        """Get enhanced business analytics for admin dashboard.
+        Served from the analytics cache until an order is created, changed or deleted.
+        """
         try:
-            # Get comprehensive analytics for last 30 days
-            analytics = await self.analytics_service.get_comprehensive_analytics(period_days=30)
-            
-            # Also get quick analytics for current overview
-            quick_analytics = await self.analytics_service.get_quick_analytics()
-            
-            # Combine both for a complete picture
-            result = {
-                **analytics,
-                "quick_overview": quick_analytics,
-                "generated_at": datetime.now()
-            }
-            
-            logger.info("Generated comprehensive business analytics")
-            return result
+            return await get_cached_analytics(
+                "business", period_days, lambda: self._compute_business_analytics(period_days)
+            )
         except Exception as e:
             logger.error("Error getting business analytics: %s", e)
             return {}
 
+    async def _compute_business_analytics(self, period_days: int) -> Dict:
+        # Get comprehensive analytics for the period
+        analytics = await self.analytics_service.get_comprehensive_analytics(period_days=period_days)
+        if not analytics:
+            # Failed; nothing is cached and the screen reports the error
+            return {}
+        
+        # Also get quick analytics for current overview
+        quick_analytics = await self.analytics_service.get_quick_analytics()
+        
+        # Combine both for a complete picture
+        result = {
+            **analytics,
+            "quick_overview": quick_analytics,
+            "generated_at": datetime.now()
+        }
+        
+        logger.info("Generated comprehensive business analytics")
+        return result
+
     async def get_today_orders(self) -> List[Dict]:
         """Get orders created today"""
         try:
@@ -742,42 +810,37 @@ class AdminService:
         }
 
     async def get_all_customers(self) -> List[Dict]:
-        """Get all customers for admin dashboard"""
+        """Get all customers for admin dashboard, most valuable first"""
         try:
-            from src.db.operations import get_all_customers
-            customers = get_all_customers()
-            
-            # Convert to dict format expected by admin handler
-            result = []
-            for customer in customers:
-                result.append({
-                    "customer_id": customer.id,
-                    "telegram_id": customer.telegram_id,
-                    "full_name": customer.name,
-                    "phone_number": customer.phone,
-                    "delivery_address": customer.delivery_address,
-                    "language": customer.language,
-                    "created_at": customer.created_at,
-                    "total_orders": 0,  # Will be calculated below
-                    "total_spent": 0.0  # Will be calculated below
-                })
-            
-            # Calculate order statistics for each customer
-            orders = get_all_orders()
-            for customer in result:
-                customer_orders = [order for order in orders if order.customer_id == customer["customer_id"]]
-                customer["total_orders"] = len(customer_orders)
-                customer["total_spent"] = sum(order.total for order in customer_orders)
-            
-            # Sort by total spent (most valuable customers first)
-            result.sort(key=lambda x: x["total_spent"], reverse=True)
-            
+            from src.db.operations import get_customer_summaries
+            result = get_customer_summaries()
             logger.info("Retrieved %d customers", len(result))
             return result
         except Exception as e:
             logger.error("Error getting all customers: %s", e)
             return []
 
+    async def get_customers_page(self, page: int, page_size: int) -> Tuple[List[Dict], int]:
+        """Get one page of customers (most valuable first) and the total customer count"""
+        try:
+            from src.db.operations import count_customers, get_customer_summaries
+            total = count_customers()
+            total_pages = max(1, (total + page_size - 1) // page_size)
+            page = max(0, min(page, total_pages - 1))
+            return get_customer_summaries(offset=page * page_size, limit=page_size), total
+        except Exception as e:
+            logger.error("Error getting customers page: %s", e)
+            return [], 0
+
+    async def get_customer_summary(self, customer_id: int) -> Optional[Dict]:
+        """Get one customer with order count and total spent"""
+        try:
+            from src.db.operations import get_customer_summary
+            return get_customer_summary(customer_id)
+        except Exception as e:
+            logger.error("Error getting customer %s: %s", customer_id, e)
+            return None
+
     # Menu Management Methods
     async def get_all_products_for_admin(self, user_id: int = None) -> List[Dict]:
         """Get all products (including inactive) for admin management with multilingual support"""
@@ -1450,10 +1513,10 @@ class AdminService:
                 
                 # Clear cache after updating category
                 try:
-                    from src.utils.helpers import SimpleCache
-                    cache = SimpleCache()
-                    cache.clear()  # Clear all cache entries to ensure fresh data
-                    logger.info("Cleared cache after updating category from '%s' to '%s'", old_category, new_category)
+                    from src.utils.constants import CacheNamespaces
+                    from src.utils.invalidation_bus import publish_invalidation
+                    publish_invalidation(CacheNamespaces.CATEGORIES, CacheNamespaces.PRODUCTS)
+                    logger.info("Invalidated caches after updating category from '%s' to '%s'", old_category, new_category)
                 except Exception as cache_error:
                     logger.warning("Failed to clear cache after updating category: %s", cache_error)
                 
@@ -0,0 +1,60 @@
+"""
+Cache of computed analytics, keyed by period and order-data version
+
+Every analytics screen (overview, revenue, products, customer pages) needs
+the same computed reports. They are cached per (report, period, local day,
+timezone) together with an order-data version that order writes bump, so a
+new order, a status change or a deletion makes the next read recompute while
+paging through a report in between is served from memory.
+"""
+
+import logging
+import threading
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+from src.utils.cache import get_cache, invalidate_namespaces
+from src.utils.constants import CacheNamespaces
+
+logger = logging.getLogger(__name__)
+
+_version_lock = threading.Lock()
+_order_data_version = 1
+
+
+def get_order_data_version() -> int:
+    """Current order-data version"""
+    return _order_data_version
+
+
+def bump_order_data_version() -> int:
+    """Mark cached analytics stale after orders were created, changed or deleted"""
+    global _order_data_version
+    with _version_lock:
+        _order_data_version += 1
+        version = _order_data_version
+    invalidate_namespaces(CacheNamespaces.ORDERS)
+    return version
+
+
+def analytics_cache_key(report: str, period_days: int, now: Optional[datetime] = None) -> Hashable:
+    """Key for ``report`` over ``period_days`` as seen today in the local timezone"""
+    local = (now or datetime.now()).astimezone()
+    return (report, period_days, local.date().isoformat(), local.tzname(), get_order_data_version())
+
+
+async def get_cached_analytics(
+    report: str,
+    period_days: int,
+    loader: Callable[[], Awaitable[Dict[str, Any]]],
+) -> Dict[str, Any]:
+    """Return cached analytics or compute them once; empty results are not cached"""
+    key = analytics_cache_key(report, period_days)
+
+    async def load() -> Optional[Dict[str, Any]]:
+        result = await loader()
+        # Analytics methods return {} on errors; let the next read retry
+        return result or None
+
+    result = await get_cache(CacheNamespaces.ORDERS).aget_or_load(key, load, cache_none=False)
+    return result or {}
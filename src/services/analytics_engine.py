@@ -0,0 +1,399 @@
+"""
+Columnar analytics over order facts
+
+Loads a period's orders and order lines once into flat columns (day index,
+status code, totals, product and customer codes) and answers the analytics
+reports with group-by reductions over those columns: ``bincount`` and
+``ufunc.at`` when NumPy is installed, and equivalent single-pass loops
+otherwise. Day and week labels are formatted once per calendar day instead
+of once per order.
+"""
+
+from __future__ import annotations
+
+import math
+from array import array
+from collections import Counter
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Mapping, NamedTuple, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # optional dependency
+    np = None
+
+HAS_NUMPY = np is not None
+
+# (id, created_at, status, total, delivery_method, customer_id, updated_at)
+OrderRow = Tuple[int, datetime, Optional[str], float, Optional[str], Optional[int], Optional[datetime]]
+# (order_id, product_name, quantity, total_price)
+LineRow = Tuple[int, str, int, float]
+
+_METHOD_CODES = {"delivery": 1, "pickup": 2}
+_FINISHED_STATUSES = ("delivered", "cancelled")
+
+
+class HistoryBlock(NamedTuple):
+    """Pre-built columns of one closed month (see ``order_history``)
+
+    Order columns, sorted by creation time: ``ordinal`` (date ordinal),
+    ``created_ts``, ``status`` (index into ``statuses``), ``total``,
+    ``method`` (delivery method code), ``customer`` (customer id, -1 for
+    none) and ``processing_hours``. Line columns, sorted by ``order``:
+    ``order`` (row of the order above), ``product`` (index into
+    ``products``), ``quantity`` and ``revenue``.
+    """
+
+    orders: Mapping[str, Any]
+    lines: Mapping[str, Any]
+    statuses: Sequence[str]
+    products: Sequence[str]
+    customer_names: Dict[int, str]
+    aware: bool  # created_at values were timezone-aware (UTC)
+
+
+class _Codes:
+    """Interns values to dense integer codes in first-seen order"""
+
+    def __init__(self):
+        self.index: Dict = {}
+        self.values: List = []
+
+    def code(self, value) -> int:
+        code = self.index.get(value)
+        if code is None:
+            code = self.index[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+
+def _column(typecode: str, values):
+    if HAS_NUMPY:
+        return np.asarray(values, dtype={"l": np.int64, "d": np.float64}[typecode])
+    return array(typecode, values)
+
+
+def _recode(codes: _Codes, column, values: Optional[Sequence] = None):
+    """Map ``column`` onto ``codes``, interning its values in first-seen order
+
+    ``column`` holds indexes into ``values``, or the values themselves when
+    ``values`` is None.
+    """
+    if len(column) == 0:
+        return np.zeros(0, dtype=np.int64)
+    used, first, inverse = np.unique(column, return_index=True, return_inverse=True)
+    mapped = np.empty(len(used), dtype=np.int64)
+    for i in np.argsort(first, kind="stable").tolist():
+        value = used[i].item()
+        mapped[i] = codes.code(values[value] if values is not None else value)
+    return mapped[inverse.reshape(-1)]
+
+
+def _sum_by(codes, weights, size: int) -> List[float]:
+    """Per-code sum of ``weights`` (count when ``weights`` is None)"""
+    if HAS_NUMPY:
+        if len(codes) == 0:
+            return [0.0] * size
+        return np.bincount(codes, weights=weights, minlength=size).tolist()
+    out = [0.0] * size
+    if weights is None:
+        for code in codes:
+            out[code] += 1
+    else:
+        for code, weight in zip(codes, weights):
+            out[code] += weight
+    return out
+
+
+class OrderFacts:
+    """Order and order-line facts of one period, stored column-wise"""
+
+    def __init__(self, start_date: date, end_date: date):
+        self.start_date = start_date
+        self.end_date = end_date
+        self.days = (end_date - start_date).days + 1
+        self.statuses = _Codes()
+        self.products = _Codes()
+        self.customers = _Codes()  # customer ids
+        self.customer_names: Dict[int, str] = {}
+        self.created_at: List[datetime] = []  # rows after the history rows
+        self.history_rows = 0
+        self._history_tz: Optional[timezone] = None
+        # order columns
+        self.created_ts = _column("d", [])
+        self.day = _column("l", [])
+        self.status = _column("l", [])
+        self.total = _column("d", [])
+        self.method = _column("l", [])
+        self.customer = _column("l", [])  # -1 = no customer
+        self.processing_hours = _column("d", [])  # NaN unless delivered/cancelled
+        # order-line columns
+        self.line_order = _column("l", [])
+        self.line_product = _column("l", [])
+        self.line_quantity = _column("l", [])
+        self.line_revenue = _column("d", [])
+
+    @property
+    def order_count(self) -> int:
+        return self.history_rows + len(self.created_at)
+
+    def order_created_at(self, index: int) -> datetime:
+        """Creation time of the order in row ``index``"""
+        if index < self.history_rows:
+            return datetime.fromtimestamp(float(self.created_ts[index]), self._history_tz)
+        return self.created_at[index - self.history_rows]
+
+    @classmethod
+    def from_rows(
+        cls,
+        start_date: date,
+        end_date: date,
+        orders: Iterable[OrderRow],
+        lines: Iterable[LineRow],
+        customer_names: Optional[Dict[int, str]] = None,
+        history: Sequence[HistoryBlock] = (),
+    ) -> "OrderFacts":
+        """Build from plain query rows; orders outside the period are skipped
+
+        ``history`` blocks (NumPy only) hold orders created before the rows;
+        their rows come first and are sliced to the period without copying.
+        """
+        facts = cls(start_date, end_date)
+        first, last = start_date.toordinal(), end_date.toordinal()
+        parts = facts._history_parts(history, first, last) if history else None
+        facts.customer_names.update(customer_names or {})
+        offset = facts.history_rows
+        day, status, total, method, customer, hours, stamps = [], [], [], [], [], [], []
+        position: Dict[int, int] = {}
+        for order_id, created_at, order_status, order_total, delivery_method, customer_id, updated_at in orders:
+            if created_at is None:
+                continue
+            ordinal = created_at.toordinal()
+            if not first <= ordinal <= last:
+                continue
+            position[order_id] = offset + len(day)
+            facts.created_at.append(created_at)
+            stamps.append(created_at.timestamp())
+            day.append(ordinal - first)
+            status.append(facts.statuses.code(order_status))
+            total.append(float(order_total or 0))
+            method.append(_METHOD_CODES.get(delivery_method, 0))
+            customer.append(facts.customers.code(customer_id) if customer_id is not None else -1)
+            if updated_at is not None and order_status in _FINISHED_STATUSES:
+                hours.append((updated_at - created_at).total_seconds() / 3600)
+            else:
+                hours.append(math.nan)
+
+        line_order, line_product, line_quantity, line_revenue = [], [], [], []
+        for order_id, product_name, quantity, total_price in lines:
+            index = position.get(order_id)
+            if index is None:
+                continue
+            line_order.append(index)
+            line_product.append(facts.products.code(product_name))
+            line_quantity.append(int(quantity or 0))
+            line_revenue.append(float(total_price or 0))
+
+        facts.day, facts.status, facts.total = _column("l", day), _column("l", status), _column("d", total)
+        facts.method, facts.customer = _column("l", method), _column("l", customer)
+        facts.processing_hours, facts.created_ts = _column("d", hours), _column("d", stamps)
+        facts.line_order, facts.line_product = _column("l", line_order), _column("l", line_product)
+        facts.line_quantity, facts.line_revenue = _column("l", line_quantity), _column("d", line_revenue)
+        if parts is not None:
+            for name, chunks in parts.items():
+                setattr(facts, name, np.concatenate(chunks + [getattr(facts, name)]))
+        return facts
+
+    def _history_parts(self, history: Sequence[HistoryBlock], first: int, last: int) -> Dict[str, list]:
+        """Period slices of the history blocks, re-coded to this instance's codes"""
+        if not HAS_NUMPY:
+            raise RuntimeError("Order history blocks need NumPy")
+        parts: Dict[str, list] = {
+            name: []
+            for name in (
+                "day", "status", "total", "method", "customer", "processing_hours", "created_ts",
+                "line_order", "line_product", "line_quantity", "line_revenue",
+            )
+        }
+        for block in history:
+            orders, lines = block.orders, block.lines
+            lo, hi = np.searchsorted(orders["ordinal"], [first, last + 1]).tolist()
+            if lo == hi:
+                continue
+            line_lo, line_hi = np.searchsorted(lines["order"], [lo, hi]).tolist()
+            self.customer_names.update(block.customer_names)
+            self._history_tz = timezone.utc if block.aware else None
+
+            customer_ids = orders["customer"][lo:hi]
+            customer = np.full(hi - lo, -1, dtype=np.int64)
+            known = customer_ids >= 0
+            customer[known] = _recode(self.customers, customer_ids[known])
+            parts["day"].append(orders["ordinal"][lo:hi] - first)
+            parts["status"].append(_recode(self.statuses, orders["status"][lo:hi], block.statuses))
+            parts["total"].append(orders["total"][lo:hi])
+            parts["method"].append(orders["method"][lo:hi])
+            parts["customer"].append(customer)
+            parts["processing_hours"].append(orders["processing_hours"][lo:hi])
+            parts["created_ts"].append(orders["created_ts"][lo:hi])
+            parts["line_order"].append(lines["order"][line_lo:line_hi] - lo + self.history_rows)
+            parts["line_product"].append(_recode(self.products, lines["product"][line_lo:line_hi], block.products))
+            parts["line_quantity"].append(lines["quantity"][line_lo:line_hi])
+            parts["line_revenue"].append(lines["revenue"][line_lo:line_hi])
+            self.history_rows += hi - lo
+        return parts
+
+    @classmethod
+    def from_orders(cls, start_date: date, end_date: date, orders: Sequence) -> "OrderFacts":
+        """Build from ``Order`` objects loaded with their customer and items"""
+        order_rows, line_rows, names = [], [], {}
+        for order in orders:
+            customer = getattr(order, "customer", None)
+            customer_id = customer.id if customer is not None else None
+            if customer is not None:
+                names.setdefault(customer_id, customer.full_name)
+            order_rows.append((
+                order.id, order.created_at, order.status, order.total,
+                order.delivery_method, customer_id, order.updated_at,
+            ))
+            for item in getattr(order, "order_items", None) or []:
+                line_rows.append((order.id, item.product_name, item.quantity, item.total_price))
+        return cls.from_rows(start_date, end_date, order_rows, line_rows, names)
+
+    # ------------------------------------------------------------ reductions
+
+    def _day_labels(self) -> List[str]:
+        return [(self.start_date + timedelta(days=i)).strftime("%Y-%m-%d") for i in range(self.days)]
+
+    def daily(self) -> Tuple[Dict[str, float], Dict[str, int]]:
+        """(revenue by day, orders by day) for days that have orders"""
+        revenue = _sum_by(self.day, self.total, self.days)
+        counts = _sum_by(self.day, None, self.days)
+        labels = self._day_labels()
+        by_revenue, by_count = {}, {}
+        for i, count in enumerate(counts):
+            if count:
+                by_revenue[labels[i]] = revenue[i]
+                by_count[labels[i]] = int(count)
+        return by_revenue, by_count
+
+    def revenue_by_week(self) -> Dict[str, float]:
+        revenue = _sum_by(self.day, self.total, self.days)
+        counts = _sum_by(self.day, None, self.days)
+        weeks: Dict[str, float] = {}
+        for i, count in enumerate(counts):
+            if count:
+                key = (self.start_date + timedelta(days=i)).strftime("%Y-W%U")
+                weeks[key] = weeks.get(key, 0.0) + revenue[i]
+        return weeks
+
+    def totals(self) -> Dict[str, float]:
+        """Overall and per delivery method revenue and order counts"""
+        revenue = _sum_by(self.method, self.total, len(_METHOD_CODES) + 1)
+        counts = _sum_by(self.method, None, len(_METHOD_CODES) + 1)
+        return {
+            "total_revenue": sum(revenue),
+            "total_orders": self.order_count,
+            "delivery_revenue": revenue[_METHOD_CODES["delivery"]],
+            "pickup_revenue": revenue[_METHOD_CODES["pickup"]],
+            "delivery_orders": int(counts[_METHOD_CODES["delivery"]]),
+            "pickup_orders": int(counts[_METHOD_CODES["pickup"]]),
+        }
+
+    def status_counts(self) -> Dict[str, int]:
+        counts = _sum_by(self.status, None, len(self.statuses))
+        return {status: int(count) for status, count in zip(self.statuses.values, counts) if count}
+
+    def avg_processing_hours(self) -> Optional[float]:
+        if HAS_NUMPY:
+            finished = self.processing_hours[~np.isnan(self.processing_hours)]
+            return float(finished.mean()) if finished.size else None
+        finished = [h for h in self.processing_hours if not math.isnan(h)]
+        return sum(finished) / len(finished) if finished else None
+
+    def product_totals(self) -> List[Tuple[str, int, int, float]]:
+        """(product name, order lines, quantity, revenue) per product"""
+        size = len(self.products)
+        lines = _sum_by(self.line_product, None, size)
+        quantity = _sum_by(self.line_product, self.line_quantity, size)
+        revenue = _sum_by(self.line_product, self.line_revenue, size)
+        return [
+            (name, int(lines[i]), int(quantity[i]), revenue[i])
+            for i, name in enumerate(self.products.values)
+        ]
+
+    def customer_totals(self, favorites: int = 3) -> List[Tuple[int, str, int, float, datetime, List[str]]]:
+        """(customer id, name, orders, spent, last order, favorite products) per customer"""
+        size = len(self.customers)
+        if not size:
+            return []
+        if HAS_NUMPY:
+            has_customer = self.customer >= 0
+            codes = self.customer[has_customer]
+            orders = np.bincount(codes, minlength=size)
+            spent = np.bincount(codes, weights=self.total[has_customer], minlength=size)
+            # Latest order per customer: maximum rank in created_at order
+            ranked = np.argsort(self.created_ts, kind="stable")
+            rank = np.empty(len(ranked), dtype=np.int64)
+            rank[ranked] = np.arange(len(ranked))
+            latest = np.full(size, -1, dtype=np.int64)
+            np.maximum.at(latest, codes, rank[has_customer])
+            last_order = [self.order_created_at(int(ranked[r])) for r in latest.tolist()]
+            top = self._favorites_numpy(size, favorites)
+            orders, spent = orders.tolist(), spent.tolist()
+        else:
+            orders, spent = [0] * size, [0.0] * size
+            last_order: List[Optional[datetime]] = [None] * size
+            for index, code in enumerate(self.customer):
+                if code < 0:
+                    continue
+                orders[code] += 1
+                spent[code] += self.total[index]
+                created = self.order_created_at(index)
+                if last_order[code] is None or created > last_order[code]:
+                    last_order[code] = created
+            quantities = [Counter() for _ in range(size)]
+            for order_index, product, quantity in zip(self.line_order, self.line_product, self.line_quantity):
+                code = self.customer[order_index]
+                if code >= 0:
+                    quantities[code][product] += quantity
+            top = [[self.products.values[p] for p, _ in counter.most_common(favorites)] for counter in quantities]
+
+        return [
+            (
+                customer_id,
+                self.customer_names.get(customer_id, "Unknown"),
+                int(orders[code]),
+                spent[code],
+                last_order[code],
+                top[code],
+            )
+            for code, customer_id in enumerate(self.customers.values)
+        ]
+
+    def _favorites_numpy(self, size: int, limit: int) -> List[List[str]]:
+        """Top products by quantity per customer via one sort over (customer, product) pairs"""
+        top: List[List[str]] = [[] for _ in range(size)]
+        line_customer = self.customer[self.line_order] if len(self.line_order) else self.line_order
+        keep = line_customer >= 0
+        if not keep.any():
+            return top
+        products = len(self.products)
+        pairs, inverse = np.unique(line_customer[keep] * products + self.line_product[keep], return_inverse=True)
+        quantity = np.bincount(inverse, weights=self.line_quantity[keep])
+        # Ties go to the product the customer bought first, as Counter.most_common does
+        first = np.full(len(pairs), len(inverse), dtype=np.int64)
+        np.minimum.at(first, inverse, np.arange(len(inverse)))
+        pair_customer, pair_product = pairs // products, pairs % products
+        order = np.lexsort((first, -quantity, pair_customer))
+        pair_customer, pair_product = pair_customer[order], pair_product[order]
+        # Position of each pair within its customer's group
+        starts = np.r_[0, np.flatnonzero(np.diff(pair_customer)) + 1]
+        within = np.arange(len(order)) - np.repeat(starts, np.diff(np.r_[starts, len(order)]))
+        selected = within < limit
+        names = self.products.values
+        for customer, product in zip(pair_customer[selected].tolist(), pair_product[selected].tolist()):
+            top[customer].append(names[product])
+        return top
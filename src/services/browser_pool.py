@@ -0,0 +1,324 @@
+"""
+Persistent headless Chromium pool for invoice/receipt PDFs
+
+Launching Playwright and Chromium costs seconds and hundreds of MB, so the
+pool keeps one browser with a few warm contexts (each with a reusable page)
+for the lifetime of the application. The contexts are opened when the pool
+starts, so the first renders do not pay for them either. Render jobs go
+through a bounded queue; a crashed browser is relaunched and every context
+reopened before the next jobs run. When Chromium fails to launch, renders
+fail fast for ``LAUNCH_RETRY_SECONDS`` before the next launch attempt.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import sys
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from src.utils.constants import PdfRenderSettings
+
+logger = logging.getLogger(__name__)
+
+
+class BrowserPoolUnavailable(Exception):
+    """Raised when the pool cannot render (Playwright missing, not started or stopped)"""
+
+
+class BrowserPoolBusy(BrowserPoolUnavailable):
+    """Raised when the render queue is full"""
+
+
+@dataclass
+class _RenderJob:
+    html: str
+    options: Dict[str, Any]
+    future: asyncio.Future
+    queued_at: float = field(default_factory=time.monotonic)
+
+
+@dataclass
+class _Slot:
+    context: Any
+    page: Any
+    generation: int
+    renders: int = 0
+
+
+async def install_chromium() -> bool:
+    """Install the Chromium build Playwright expects, without blocking the loop"""
+    logger.info("Installing Playwright Chromium...")
+    try:
+        proc = await asyncio.create_subprocess_exec(
+            sys.executable, "-m", "playwright", "install", "chromium",
+            stdout=asyncio.subprocess.DEVNULL, stderr=asyncio.subprocess.PIPE,
+        )
+        _, stderr = await asyncio.wait_for(proc.communicate(), PdfRenderSettings.INSTALL_TIMEOUT_SECONDS)
+    except Exception as e:
+        logger.warning("Playwright Chromium install failed: %s", e)
+        return False
+    if proc.returncode != 0:
+        logger.warning(
+            "Playwright Chromium install exited with %s: %s", proc.returncode, stderr.decode(errors="ignore")[-500:]
+        )
+        return False
+    return True
+
+
+class BrowserPool:
+    """Warm Chromium contexts fed from a bounded render queue"""
+
+    def __init__(
+        self,
+        size: int = PdfRenderSettings.DEFAULT_POOL_SIZE,
+        queue_size: int = PdfRenderSettings.QUEUE_SIZE,
+        render_timeout: float = PdfRenderSettings.RENDER_TIMEOUT_SECONDS,
+        launch_retry: float = PdfRenderSettings.LAUNCH_RETRY_SECONDS,
+    ):
+        self.size = max(1, size)
+        self.queue_size = queue_size
+        self.render_timeout = render_timeout
+        self.launch_retry = launch_retry
+        self._playwright = None
+        self._browser = None
+        self._generation = 0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: List[asyncio.Task] = []
+        self._slots: List[Optional[_Slot]] = []
+        self._start_lock: Optional[asyncio.Lock] = None
+        self._restart_lock: Optional[asyncio.Lock] = None
+        self._started = False
+        self._failed_at: Optional[float] = None
+        self._stats = {"renders": 0, "failures": 0, "restarts": 0, "rejected": 0, "render_ms_total": 0.0}
+
+    @property
+    def started(self) -> bool:
+        return self._started
+
+    async def start(self) -> bool:
+        """Launch Chromium and the workers; returns False if rendering is unavailable"""
+        loop = asyncio.get_running_loop()
+        if self._loop is not None and self._loop is not loop:
+            raise BrowserPoolUnavailable("browser pool is bound to another event loop")
+        if self._start_lock is None or self._loop is None:
+            self._start_lock = asyncio.Lock()
+            self._restart_lock = asyncio.Lock()
+        self._loop = loop
+        async with self._start_lock:
+            if self._started:
+                return True
+            if self._failed_at is not None and time.monotonic() - self._failed_at < self.launch_retry:
+                # Do not relaunch for every render (e.g. each invoice of a day export)
+                self._loop = None
+                return False
+            try:
+                from playwright.async_api import async_playwright
+            except Exception as e:
+                logger.info("Playwright not installed; PDF rendering disabled: %s", e)
+                self._failed_at = time.monotonic()
+                self._loop = None
+                return False
+            try:
+                self._playwright = await async_playwright().start()
+                await self._launch_browser()
+                await self._warm_slots()
+            except Exception as e:
+                logger.warning("Failed to start browser pool, not retrying for %ss: %s", self.launch_retry, e)
+                await self._close_playwright()
+                self._failed_at = time.monotonic()
+                self._loop = None
+                return False
+            self._failed_at = None
+            self._queue = asyncio.Queue(maxsize=self.queue_size)
+            self._workers = [
+                asyncio.create_task(self._worker(i), name=f"pdf-render-{i}") for i in range(self.size)
+            ]
+            self._started = True
+            logger.info("Browser pool started with %d contexts", self.size)
+            return True
+
+    async def stop(self) -> None:
+        """Fail queued jobs, stop the workers and close Chromium"""
+        if not self._started:
+            return
+        self._started = False
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        for slot in self._slots:
+            await self._close_slot(slot)
+        self._slots = []
+        while self._queue is not None and not self._queue.empty():
+            job = self._queue.get_nowait()
+            if not job.future.done():
+                job.future.set_exception(BrowserPoolUnavailable("browser pool stopped"))
+        await self._close_browser()
+        await self._close_playwright()
+        self._loop = None
+        logger.info("Browser pool stopped")
+
+    async def render_pdf(self, html: str, **options: Any) -> bytes:
+        """Render ``html`` to PDF on a warm page (``options`` go to ``page.pdf``)"""
+        if not self._started and not await self.start():
+            raise BrowserPoolUnavailable("PDF rendering is not available")
+        if asyncio.get_running_loop() is not self._loop:
+            raise BrowserPoolUnavailable("browser pool is bound to another event loop")
+        job = _RenderJob(html, options, self._loop.create_future())
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            self._stats["rejected"] += 1
+            raise BrowserPoolBusy(f"{self.queue_size} PDF renders already queued")
+        return await asyncio.wait_for(job.future, self.render_timeout)
+
+    def stats(self) -> Dict[str, Any]:
+        renders = self._stats["renders"]
+        return dict(
+            self._stats,
+            size=self.size,
+            started=self._started,
+            queue_depth=self._queue.qsize() if self._queue is not None else 0,
+            avg_render_ms=(self._stats["render_ms_total"] / renders) if renders else 0.0,
+        )
+
+    # ----------------------------------------------------------------- internals
+
+    async def _launch_browser(self) -> None:
+        args = list(PdfRenderSettings.CHROMIUM_ARGS)
+        try:
+            self._browser = await self._playwright.chromium.launch(args=args)
+        except Exception as e:
+            if "Executable doesn't exist" not in str(e) or not await install_chromium():
+                raise
+            self._browser = await self._playwright.chromium.launch(args=args)
+        self._generation += 1
+
+    async def _restart_browser(self, seen_generation: int) -> None:
+        async with self._restart_lock:
+            # Another worker already restarted it
+            if self._generation != seen_generation:
+                return
+            logger.warning("Restarting crashed Chromium (generation %d)", seen_generation)
+            self._stats["restarts"] += 1
+            await self._close_browser()
+            await self._launch_browser()
+            await self._warm_slots()
+
+    async def _close_browser(self) -> None:
+        browser, self._browser = self._browser, None
+        if browser is not None:
+            try:
+                await browser.close()
+            except Exception:
+                pass
+
+    async def _close_playwright(self) -> None:
+        playwright, self._playwright = self._playwright, None
+        if playwright is not None:
+            try:
+                await playwright.stop()
+            except Exception:
+                pass
+
+    async def _open_slot(self) -> _Slot:
+        context = await self._browser.new_context()
+        return _Slot(context, await context.new_page(), self._generation)
+
+    async def _warm_slots(self) -> None:
+        """Open a context for every worker on the current browser"""
+        opened = await asyncio.gather(*(self._open_slot() for _ in range(self.size)), return_exceptions=True)
+        old, self._slots = self._slots, []
+        for result in opened:
+            if isinstance(result, BaseException):
+                # The worker opens one on its next job instead
+                logger.warning("Failed to open a warm browser context: %s", result)
+                result = None
+            self._slots.append(result)
+        for slot in old:
+            await self._close_slot(slot)
+
+    async def _reopen_slot(self, index: int) -> None:
+        try:
+            self._slots[index] = await self._open_slot()
+        except Exception as e:
+            logger.warning("Failed to reopen browser context %d: %s", index, e)
+
+    @staticmethod
+    async def _close_slot(slot: Optional[_Slot]) -> None:
+        if slot is not None:
+            try:
+                await slot.context.close()
+            except Exception:
+                pass
+
+    async def _render(self, slot: _Slot, job: _RenderJob) -> bytes:
+        await slot.page.set_content(job.html, wait_until="load")
+        options = {"format": "A4", "print_background": True}
+        options.update(job.options)
+        pdf = await slot.page.pdf(**options)
+        slot.renders += 1
+        return pdf
+
+    async def _worker(self, index: int) -> None:
+        while True:
+            job = await self._queue.get()
+            if job.future.done():  # caller timed out or was cancelled
+                continue
+            started = time.monotonic()
+            for attempt in (1, 2):
+                slot = self._slots[index]
+                try:
+                    if slot is None or slot.generation != self._generation:
+                        await self._close_slot(slot)
+                        slot = self._slots[index] = await self._open_slot()
+                    pdf = await self._render(slot, job)
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    generation = slot.generation if slot else self._generation
+                    # A restart may already have put a fresh context in this slot
+                    if self._slots[index] is slot:
+                        self._slots[index] = None
+                    await self._close_slot(slot)
+                    if attempt == 1:
+                        logger.warning("PDF render failed on context %d, retrying: %s", index, e)
+                        if self._browser is None or not self._browser.is_connected():
+                            try:
+                                await self._restart_browser(generation)
+                            except Exception as restart_error:
+                                logger.error("Chromium restart failed: %s", restart_error)
+                        continue
+                    self._stats["failures"] += 1
+                    if not job.future.done():
+                        job.future.set_exception(e)
+                else:
+                    self._stats["renders"] += 1
+                    self._stats["render_ms_total"] += (time.monotonic() - started) * 1000
+                    if not job.future.done():
+                        job.future.set_result(pdf)
+                    if slot.renders >= PdfRenderSettings.PAGE_RECYCLE_AFTER:
+                        await self._close_slot(slot)
+                        self._slots[index] = None
+                        await self._reopen_slot(index)
+                break
+
+
+_browser_pool: Optional[BrowserPool] = None
+
+
+def get_browser_pool() -> BrowserPool:
+    """Get the application-wide browser pool"""
+    global _browser_pool
+    if _browser_pool is None:
+        try:
+            from src.config import get_config
+            size = get_config().pdf_browser_pool_size
+        except Exception:
+            size = PdfRenderSettings.DEFAULT_POOL_SIZE
+        _browser_pool = BrowserPool(size=size)
+    return _browser_pool
@@ -0,0 +1,411 @@
+"""
+Bulk import of customers, categories, products and options
+
+Admins send a CSV or YAML file to the bot with the caption ``/import`` (or
+run ``scripts/bulk_import.py``) instead of creating records one
+conversation at a time.
+
+- A CSV file holds one kind of record, named by the file (``products.csv``)
+  or given explicitly, with a header row of field names.
+- A YAML file maps kinds to lists of records::
+
+      categories:
+        - {name_en: Breads, name_he: לחמים}
+      options:
+        - {option_type: kubaneh_type, name: classic}
+      products:
+        - {name: Kubaneh, category: Breads, price: 25, options: [kubaneh_type:classic]}
+
+Records are matched on a natural key (customers by ``telegram_id``,
+categories by ``name_en``, products by ``name``, options by ``option_type``
+and ``name``): existing ones are updated, others created, and only the
+fields present in the file are written. A product's ``category`` is a
+category's English name; its ``options`` (a list, or ``;``-separated in
+CSV) are ``option_type:name`` references linked to the product.
+
+Rows are validated as they are read and written in batches by
+``src.db.bulk.upsert_rows``; invalid rows are skipped and reported with
+their line. The whole file is one transaction, rolled back for a dry run,
+and the catalog caches are invalidated once at the end, so the catalog
+snapshot gets one new version per import however many rows it had.
+"""
+
+import csv
+import logging
+import math
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Tuple
+
+import yaml
+from sqlalchemy import Boolean, Float, Integer, String
+from sqlalchemy.engine import Connection, Engine
+
+from src.db.bulk import UpsertCounts, insert_missing, lookup_ids, upsert_rows
+from src.db.models import Base, product_option_links
+from src.utils.constants import BulkImportSettings, CacheNamespaces
+
+logger = logging.getLogger(__name__)
+
+_TRUE = frozenset({"1", "true", "yes", "y"})
+_FALSE = frozenset({"0", "false", "no", "n"})
+_LANGUAGES = ("en", "he")
+
+
+class ImportFileError(ValueError):
+    """Raised when a whole file cannot be imported (format, kind or header)"""
+
+
+@dataclass(frozen=True)
+class ImportKind:
+    """Table, natural key and accepted fields of one kind of record"""
+
+    table: str
+    key: Tuple[str, ...]
+    required: Tuple[str, ...]
+    columns: Tuple[str, ...]  # model columns that may be set
+    extra: Tuple[str, ...] = ()  # fields resolved to other tables
+
+
+KINDS: Dict[str, ImportKind] = {
+    "categories": ImportKind(
+        "menu_categories",
+        key=("name_en",),
+        required=("name_en", "name_he"),
+        columns=("name_en", "name_he", "description", "description_en", "description_he",
+                 "display_order", "is_active", "image_url"),
+    ),
+    "options": ImportKind(
+        "product_options",
+        key=("option_type", "name"),
+        required=("option_type", "name"),
+        columns=("option_type", "name", "display_name", "description", "price_modifier", "is_active",
+                 "display_order", "name_en", "name_he", "display_name_en", "display_name_he",
+                 "description_en", "description_he"),
+    ),
+    "products": ImportKind(
+        "menu_products",
+        key=("name",),
+        required=("name", "category", "price"),
+        columns=("name", "description", "price", "is_active", "image_url", "preparation_time_minutes",
+                 "name_en", "name_he", "description_en", "description_he"),
+        extra=("category", "options"),
+    ),
+    "customers": ImportKind(
+        "customers",
+        key=("telegram_id",),
+        required=("telegram_id", "name"),
+        columns=("telegram_id", "name", "phone", "language", "delivery_address", "is_admin"),
+    ),
+}
+_CATALOG_KINDS = ("categories", "options", "products")
+
+
+@dataclass
+class RowError:
+    """One rejected record"""
+
+    kind: str
+    row: str  # "line 7" for CSV, "products #3" for YAML
+    message: str
+
+    def __str__(self) -> str:
+        return f"{self.row}: {self.message}"
+
+
+@dataclass
+class ImportResult:
+    """Rows written per kind and the rejected records"""
+
+    dry_run: bool = False
+    counts: Dict[str, UpsertCounts] = field(default_factory=dict)
+    errors: List[RowError] = field(default_factory=list)  # the first MAX_REPORTED_ERRORS
+    error_count: int = 0
+
+    def add_error(self, kind: str, row: str, message: str) -> None:
+        self.error_count += 1
+        if len(self.errors) < BulkImportSettings.MAX_REPORTED_ERRORS:
+            self.errors.append(RowError(kind, row, message))
+
+    @property
+    def written(self) -> int:
+        return sum(c.inserted + c.updated for c in self.counts.values())
+
+    def summary(self) -> str:
+        lines = [f"{kind}: {c.inserted} new, {c.updated} updated" for kind, c in self.counts.items()]
+        if self.error_count:
+            lines.append(f"{self.error_count} rows skipped")
+            lines.extend(f"  {error}" for error in self.errors)
+            if self.error_count > len(self.errors):
+                lines.append(f"  ... and {self.error_count - len(self.errors)} more")
+        return "\n".join(lines) or "nothing to import"
+
+
+def _parse_value(column, value: Any) -> Any:
+    column_type = column.type
+    if isinstance(column_type, Boolean):
+        if isinstance(value, bool):
+            return value
+        text = str(value).strip().lower()
+        if text in _TRUE or text in _FALSE:
+            return text in _TRUE
+        raise ValueError("expected true or false")
+    if isinstance(column_type, Integer):
+        if isinstance(value, bool) or (isinstance(value, float) and not value.is_integer()):
+            raise ValueError("expected a whole number")
+        try:
+            return int(value) if isinstance(value, (int, float)) else int(str(value).strip())
+        except ValueError:
+            raise ValueError("expected a whole number") from None
+    if isinstance(column_type, Float):
+        try:
+            number = float(value)
+        except (TypeError, ValueError):
+            raise ValueError("expected a number") from None
+        if not math.isfinite(number):
+            raise ValueError("expected a number")
+        return number
+    text = str(value).strip()
+    length = getattr(column_type, "length", None) if isinstance(column_type, String) else None
+    if length and len(text) > length:
+        raise ValueError(f"longer than {length} characters")
+    return text
+
+
+def _option_refs(value: Any) -> List[Tuple[str, str]]:
+    items = value if isinstance(value, list) else str(value).split(";")
+    refs = []
+    for item in items:
+        item = str(item).strip()
+        if not item:
+            continue
+        option_type, _, name = item.partition(":")
+        if not option_type.strip() or not name.strip():
+            raise ValueError(f"option {item!r} is not option_type:name")
+        refs.append((option_type.strip(), name.strip()))
+    return refs
+
+
+def validate_record(kind: str, raw: Mapping[str, Any]) -> Dict[str, Any]:
+    """Parsed fields of one record; raises ValueError naming the bad field
+
+    Empty values count as absent, so a CSV cell left blank keeps the stored value.
+    """
+    spec = KINDS[kind]
+    table = Base.metadata.tables[spec.table]
+    if None in raw:  # csv.DictReader puts cells beyond the header there
+        raise ValueError("more values than columns")
+    unknown = sorted(str(name) for name in raw if name not in spec.columns and name not in spec.extra)
+    if unknown:
+        raise ValueError(f"unknown fields: {', '.join(unknown)}")
+    record: Dict[str, Any] = {}
+    for name, value in raw.items():
+        if value is None or (isinstance(value, str) and not value.strip()):
+            continue
+        try:
+            if name == "options":
+                record[name] = _option_refs(value)
+            elif name == "category":
+                record[name] = str(value).strip()
+            else:
+                record[name] = _parse_value(table.c[name], value)
+        except ValueError as e:
+            raise ValueError(f"{name}: {e}") from None
+    missing = [name for name in spec.required if name not in record]
+    if missing:
+        raise ValueError(f"missing {', '.join(missing)}")
+    if record.get("price", 0) < 0:
+        raise ValueError("price: must not be negative")
+    if "telegram_id" in record and record["telegram_id"] <= 0:
+        raise ValueError("telegram_id: must be positive")
+    if record.get("language", "en") not in _LANGUAGES:
+        raise ValueError(f"language: expected one of {', '.join(_LANGUAGES)}")
+    return record
+
+
+def _kind_from_name(name: str) -> str:
+    stem = Path(name).stem.lower()
+    for kind in KINDS:
+        if stem.startswith(kind):
+            return kind
+    raise ImportFileError(f"cannot tell what {name} holds; name it after one of {', '.join(KINDS)} or give the kind")
+
+
+def _csv_records(path: Path, kind: str) -> Iterator[Tuple[str, str, Dict[str, Any]]]:
+    spec = KINDS[kind]
+    # utf-8-sig: spreadsheet apps save Hebrew text with a BOM
+    with open(path, encoding="utf-8-sig", newline="") as handle:
+        reader = csv.DictReader(handle)
+        header = [name.strip() for name in reader.fieldnames or ()]
+        unknown = [name for name in header if name not in spec.columns and name not in spec.extra]
+        if unknown:
+            raise ImportFileError(f"unknown {kind} columns: {', '.join(unknown)}")
+        missing = [name for name in spec.required if name not in header]
+        if missing:
+            raise ImportFileError(f"{kind} file is missing columns: {', '.join(missing)}")
+        reader.fieldnames = header
+        for row in reader:
+            yield kind, f"line {reader.line_num}", row
+
+
+def _yaml_records(path: Path) -> Iterator[Tuple[str, str, Dict[str, Any]]]:
+    with open(path, encoding="utf-8") as handle:
+        try:
+            document = yaml.safe_load(handle)
+        except yaml.YAMLError as e:
+            raise ImportFileError(f"invalid YAML: {e}") from None
+    if not isinstance(document, dict):
+        raise ImportFileError("a YAML import maps kinds to lists of records")
+    unknown = [str(name) for name in document if name not in KINDS]
+    if unknown:
+        raise ImportFileError(f"unknown sections: {', '.join(unknown)}; expected {', '.join(KINDS)}")
+    for kind in BulkImportSettings.KINDS:
+        records = document.get(kind) or []
+        if not isinstance(records, list):
+            raise ImportFileError(f"{kind} must be a list of records")
+        for index, raw in enumerate(records, start=1):
+            yield kind, f"{kind} #{index}", raw
+
+
+def read_records(path: str, kind: Optional[str] = None, name: Optional[str] = None) -> Iterator[Tuple[str, str, Dict[str, Any]]]:
+    """(kind, row label, raw record) for every record of the file, kinds in import order"""
+    name = name or path
+    suffix = Path(name).suffix.lower()
+    if suffix not in BulkImportSettings.FORMATS:
+        raise ImportFileError(f"unsupported file type {suffix or name}; use {', '.join(BulkImportSettings.FORMATS)}")
+    if kind is not None and kind not in KINDS:
+        raise ImportFileError(f"unknown kind {kind}; expected one of {', '.join(KINDS)}")
+    if suffix == ".csv":
+        return _csv_records(Path(path), kind or _kind_from_name(name))
+    return _yaml_records(Path(path))
+
+
+class _Writer:
+    """Validated rows of the current kind, written a batch at a time"""
+
+    def __init__(self, conn: Connection, result: ImportResult, batch_size: int):
+        self.conn = conn
+        self.result = result
+        self.batch_size = batch_size
+        self.kind: Optional[str] = None
+        self.batch: List[Tuple[str, Dict[str, Any]]] = []
+        self.seen: Dict[Tuple[str, Tuple], str] = {}
+        self.category_ids: Dict[Tuple, int] = {}
+        self.option_ids: Dict[Tuple, int] = {}
+
+    def add(self, kind: str, row: str, raw: Dict[str, Any]) -> None:
+        if kind != self.kind:
+            self.flush()
+            self.kind = kind
+        if not isinstance(raw, dict):
+            self.result.add_error(kind, row, "expected a record with named fields")
+            return
+        try:
+            record = validate_record(kind, raw)
+        except ValueError as e:
+            self.result.add_error(kind, row, str(e))
+            return
+        key = tuple(record[name] for name in KINDS[kind].key)
+        first = self.seen.setdefault((kind, key), row)
+        if first != row:
+            self.result.add_error(kind, row, f"duplicate of {first}")
+            return
+        self.batch.append((row, record))
+        if len(self.batch) >= self.batch_size:
+            self.flush()
+
+    def _resolve(self, table: str, key: Tuple[str, ...], cache: Dict[Tuple, int], wanted) -> None:
+        missing = {k for k in wanted if k not in cache}
+        if missing:
+            cache.update(lookup_ids(self.conn, Base.metadata.tables[table], key, missing))
+
+    def _product_rows(self) -> Tuple[List[Dict[str, Any]], List[Tuple[str, List[Tuple[str, str]]]]]:
+        self._resolve("menu_categories", ("name_en",), self.category_ids,
+                      {(record["category"],) for _row, record in self.batch})
+        self._resolve("product_options", ("option_type", "name"), self.option_ids,
+                      {ref for _row, record in self.batch for ref in record.get("options", ())})
+        rows, links = [], []
+        for row, record in self.batch:
+            category_id = self.category_ids.get((record["category"],))
+            if category_id is None:
+                self.result.add_error("products", row, f"category: no category named {record['category']!r}")
+                continue
+            unknown = [f"{t}:{n}" for t, n in record.get("options", ()) if (t, n) not in self.option_ids]
+            if unknown:
+                self.result.add_error("products", row, f"options: not found: {', '.join(unknown)}")
+                continue
+            if record.get("options"):
+                links.append((record["name"], record["options"]))
+            rows.append({**{k: v for k, v in record.items() if k not in ("category", "options")},
+                         "category_id": category_id})
+        return rows, links
+
+    def flush(self) -> None:
+        if not self.batch:
+            return
+        kind, spec = self.kind, KINDS[self.kind]
+        links: List[Tuple[str, List[Tuple[str, str]]]] = []
+        if kind == "products":
+            rows, links = self._product_rows()
+        else:
+            rows = [record for _row, record in self.batch]
+        counts = upsert_rows(self.conn, Base.metadata.tables[spec.table], spec.key, rows)
+        if links:
+            product_ids = lookup_ids(self.conn, Base.metadata.tables[spec.table], spec.key,
+                                     [(name,) for name, _refs in links])
+            insert_missing(self.conn, product_option_links, [
+                {"product_id": product_ids[(name,)], "option_id": self.option_ids[ref]}
+                for name, refs in links
+                for ref in dict.fromkeys(refs)
+            ])
+        total = self.result.counts.setdefault(kind, UpsertCounts())
+        total.inserted += counts.inserted
+        total.updated += counts.updated
+        self.batch = []
+
+
+def import_file(
+    path: str,
+    kind: Optional[str] = None,
+    name: Optional[str] = None,
+    dry_run: bool = False,
+    engine: Optional[Engine] = None,
+    batch_size: int = BulkImportSettings.BATCH_SIZE,
+) -> ImportResult:
+    """Import the records of a CSV or YAML file; blocking, run it in a worker thread
+
+    ``name`` is the original file name when ``path`` is a temporary copy; it
+    picks the format and, for CSV without ``kind``, the kind of record.
+    Raises ``ImportFileError`` when the file as a whole cannot be imported.
+    """
+    if engine is None:
+        from src.db.operations import get_db_manager
+
+        engine = get_db_manager().get_engine()
+    records = read_records(path, kind, name)
+    result = ImportResult(dry_run=dry_run)
+    with engine.connect() as conn:
+        # SQLite mode: take the write lock up front (see src.db.sqlite)
+        conn = conn.execution_options(sqlite_begin="IMMEDIATE")
+        with conn.begin() as transaction:
+            writer = _Writer(conn, result, batch_size)
+            for record_kind, row, raw in records:
+                writer.add(record_kind, row, raw)
+            writer.flush()
+            if dry_run:
+                transaction.rollback()
+
+    logger.info(
+        "Bulk import of %s%s: %d rows written, %d skipped",
+        name or path, " (dry run)" if dry_run else "", result.written, result.error_count,
+    )
+    if not dry_run and any(kind in result.counts for kind in _CATALOG_KINDS):
+        from src.utils.invalidation_bus import publish_invalidation
+
+        namespaces = [CacheNamespaces.PRODUCTS, CacheNamespaces.CATEGORIES, CacheNamespaces.TRANSLATIONS]
+        if "options" in result.counts:
+            # Product options also feed the constants registry
+            namespaces.append(CacheNamespaces.CONSTANTS)
+        # Once per import: the catalog snapshot is rebuilt a single time
+        publish_invalidation(*namespaces)
+    return result
@@ -6,7 +6,7 @@ import logging
 from typing import List, Dict, Optional
 from datetime import datetime
 
-from src.db.operations import get_all_orders
+from src.db.operations import get_all_orders, get_orders_by_status
 from src.db.models import Order
 
 logger = logging.getLogger(__name__)
@@ -17,14 +17,8 @@ class CustomerOrderService:
     def get_customer_active_orders(self, customer_telegram_id: int) -> List[Dict]:
         """Get active orders for a specific customer"""
         try:
-            orders = get_all_orders()
             active_statuses = ["pending", "confirmed", "preparing", "ready"]
-            
-            customer_orders = [
-                order for order in orders 
-                if order.customer and order.customer.telegram_id == customer_telegram_id 
-                and order.status in active_statuses
-            ]
+            customer_orders = get_orders_by_status(active_statuses, telegram_id=customer_telegram_id)
             
             # Convert to dict format
             result = []
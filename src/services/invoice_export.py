@@ -0,0 +1,248 @@
+"""
+End-of-day invoice export
+
+Streams a day's orders from the database in small pages, renders their
+invoices (or receipts) through a fixed number of workers and packs the PDFs
+into one ZIP archive. Rendering goes through ``build_invoice_pdf`` so PDFs
+that were already generated come straight from the PDF cache.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import tempfile
+import time
+import zipfile
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from typing import IO, Any, Awaitable, Callable, Dict, List, Optional
+
+from src.utils.constants import InvoiceExportSettings
+
+logger = logging.getLogger(__name__)
+
+ProgressCallback = Callable[[int, int], Awaitable[None]]
+
+
+@dataclass
+class InvoiceExportResult:
+    """Outcome of an export; ``archive`` is the ZIP (a spooled temporary
+    file, rewound) or None when there were no PDFs, closed by ``cleanup``"""
+
+    day: date
+    total: int = 0
+    rendered: int = 0
+    cached: int = 0
+    failed: List[int] = field(default_factory=list)
+    archive: Optional[IO[bytes]] = None
+    size: int = 0
+
+    @property
+    def filename(self) -> str:
+        return f"invoices_{self.day.isoformat()}.zip"
+
+    def cleanup(self) -> None:
+        if self.archive is not None:
+            self.archive.close()
+            self.archive = None
+
+
+def order_invoice_payload(order_info: Dict[str, Any], delivery_label: Optional[str] = None) -> Dict[str, Any]:
+    """Invoice payload for ``build_invoice_pdf`` from an admin order dict.
+
+    Items named ``delivery_label`` (the synthetic delivery line shown to
+    admins) are left out; the charge is printed as its own total line.
+    """
+    items = []
+    for it in order_info.get("items", []):
+        if delivery_label and (it.get("product_name") or "").strip() == delivery_label:
+            continue
+        unit = it.get("unit_price")
+        if unit is None:
+            qty = it.get("quantity", 1)
+            total_price = float(it.get("total_price", 0))
+            unit = total_price / qty if qty else total_price
+        items.append({
+            "product_name": it.get("product_name"),
+            "quantity": it.get("quantity", 1),
+            "unit_price": unit,
+            "total_price": it.get("total_price", unit * it.get("quantity", 1)),
+        })
+
+    return {
+        "order_id": order_info.get("order_id"),
+        "order_number": order_info.get("order_number"),
+        "customer_name": order_info.get("customer_name"),
+        "customer_phone": order_info.get("customer_phone"),
+        "delivery_method": order_info.get("delivery_method"),
+        "delivery_address": order_info.get("delivery_address"),
+        "delivery_instructions": order_info.get("delivery_instructions"),
+        "items": items,
+        "subtotal": float(order_info.get("subtotal", 0) or (float(order_info.get("total", 0)) - float(order_info.get("delivery_charge", 0) or 0))),
+        "delivery_charge": float(order_info.get("delivery_charge", 0) or 0),
+        "total": float(order_info.get("total", 0)),
+        "created_at": order_info.get("created_at"),
+    }
+
+
+def _localized_item_name(item, language: str) -> str:
+    name = item.product_name
+    try:
+        if getattr(item, "product_id", None):
+            from src.db.operations import get_localized_name, get_product_by_id
+
+            product = get_product_by_id(item.product_id)
+            if product:
+                name = get_localized_name(product, language)
+    except Exception:
+        pass
+    return name
+
+
+def order_details(order) -> Dict[str, Any]:
+    """Admin order dict for an ``Order`` loaded with its customer and items.
+
+    Item names are localized to the customer's language. The invoice button
+    and the day export both build their payload from this, so the same order
+    renders the same invoice (and PDF cache entry) either way. Blocking.
+    """
+    customer = order.customer
+    language = "he"
+    if customer is not None and getattr(customer, "telegram_id", None):
+        from src.utils.language_manager import language_manager
+
+        language = language_manager.get_user_language(customer.telegram_id)
+    return {
+        "order_id": order.id,
+        "order_number": order.order_number,
+        "customer_name": customer.name if customer else "Unknown",
+        "customer_phone": customer.phone if customer else "Unknown",
+        "total": order.total,
+        "subtotal": getattr(order, "subtotal", 0.0),
+        "delivery_charge": getattr(order, "delivery_charge", 0.0),
+        "created_at": order.created_at,
+        "delivery_method": getattr(order, "delivery_method", None),
+        "delivery_address": getattr(order, "delivery_address", None),
+        "delivery_instructions": getattr(order, "delivery_instructions", None),
+        "items": [
+            {
+                "product_name": _localized_item_name(item, language),
+                "quantity": item.quantity,
+                "total_price": item.total_price,
+                "unit_price": item.unit_price,
+            }
+            for item in order.order_items or []
+        ],
+    }
+
+
+async def export_day_invoices(
+    day: date,
+    business: Optional[Dict] = None,
+    receipt: bool = False,
+    user_id: Optional[int] = None,
+    concurrency: int = InvoiceExportSettings.CONCURRENCY,
+    progress: Optional[ProgressCallback] = None,
+) -> InvoiceExportResult:
+    """Render every invoice of ``day`` into a single ZIP.
+
+    At most ``concurrency`` invoices are rendered at once and at most one
+    page of orders is held in memory ahead of the workers. ``progress`` is
+    awaited with (done, total) at most every few seconds and once at the end.
+    """
+    from src.db.operations import count_orders_between, get_business_settings_dict, get_orders_page_between
+    from src.services.invoice_service import build_invoice_pdf
+
+    start = datetime.combine(day, datetime.min.time())
+    end = start + timedelta(days=1)
+    result = InvoiceExportResult(day=day)
+    result.total = await asyncio.to_thread(count_orders_between, start, end)
+    if not result.total:
+        return result
+    if business is None:
+        business = await asyncio.to_thread(get_business_settings_dict)
+
+    queue: asyncio.Queue = asyncio.Queue(maxsize=InvoiceExportSettings.PAGE_SIZE)
+    spool = tempfile.SpooledTemporaryFile(max_size=InvoiceExportSettings.SPOOL_MAX_BYTES)
+    archive = zipfile.ZipFile(spool, "w", compression=zipfile.ZIP_STORED)  # PDFs are already compressed
+    done = 0
+    last_report = time.monotonic()
+    kind = "receipt" if receipt else "invoice"
+
+    async def report(final: bool = False) -> None:
+        nonlocal last_report
+        if progress is None:
+            return
+        now = time.monotonic()
+        if final or now - last_report >= InvoiceExportSettings.PROGRESS_INTERVAL_SECONDS:
+            last_report = now
+            try:
+                await progress(done, result.total)
+            except Exception as e:
+                logger.debug("Invoice export progress update failed: %s", e)
+
+    async def produce() -> None:
+        after_id = 0
+        while True:
+            page = await asyncio.to_thread(
+                get_orders_page_between, start, end, after_id, InvoiceExportSettings.PAGE_SIZE
+            )
+            if not page:
+                break
+            # Localizing item names may read the database
+            payloads = await asyncio.to_thread(lambda: [order_invoice_payload(order_details(o)) for o in page])
+            for payload in payloads:
+                await queue.put(payload)
+            after_id = page[-1].id
+
+    async def work() -> None:
+        nonlocal done
+        while True:
+            payload = await queue.get()
+            if payload is None:
+                return
+            order_id = payload.get("order_id")
+            try:
+                built = await build_invoice_pdf(payload, business, receipt=receipt, user_id=user_id)
+                if not built.get("pdf"):
+                    raise RuntimeError("PDF rendering unavailable")
+                archive.writestr(f"{kind}_{payload.get('order_number') or order_id}.pdf", built["pdf"])
+                if built.get("cached"):
+                    result.cached += 1
+                else:
+                    result.rendered += 1
+            except Exception as e:
+                logger.warning("Invoice export failed for order %s: %s", order_id, e)
+                result.failed.append(order_id)
+            done += 1
+            await report()
+
+    workers = [asyncio.create_task(work(), name=f"invoice-export-{i}") for i in range(max(1, concurrency))]
+    try:
+        await produce()
+        for _ in workers:
+            await queue.put(None)
+        await asyncio.gather(*workers)
+    except BaseException:
+        for task in workers:
+            task.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+        archive.close()
+        spool.close()
+        raise
+
+    archive.close()
+    result.total = max(result.total, done)  # orders placed while exporting
+    if result.rendered or result.cached:
+        result.size = spool.tell()
+        spool.seek(0)
+        result.archive = spool
+    else:
+        spool.close()
+    await report(final=True)
+    logger.info(
+        "Exported %d %ss for %s (%d rendered, %d cached, %d failed)",
+        result.total, kind, day, result.rendered, result.cached, len(result.failed),
+    )
+    return result
@@ -1,22 +1,50 @@
 """
 Invoice/Receipt generation service.
 
-Generates a printable HTML invoice and, when available, a PDF using headless Chromium (Playwright).
-Falls back to returning HTML if PDF generation is not available at runtime.
+Generates a printable HTML invoice and, when available, a PDF using headless Chromium (Playwright)
+from the persistent browser pool. 58 mm receipts are rendered natively (no browser) with the
+bundled Hebrew-capable font. Falls back to returning HTML if PDF generation is not available at runtime.
 """
 
 from __future__ import annotations
 
 import asyncio
 import logging
-import os
+import re
 from datetime import datetime
-from typing import Dict, Optional
+from typing import Dict, Optional, Tuple
+
+from src.services.browser_pool import BrowserPoolUnavailable, get_browser_pool
+from src.services.pdf_cache import get_pdf_cache, invoice_cache_key
+from src.services.receipt_renderer import (
+    ReceiptFontUnavailable,
+    load_receipt_font,
+    render_receipt_escpos,
+    render_receipt_pdf,
+)
 from src.utils.i18n import i18n
 
 logger = logging.getLogger(__name__)
 
 
+def _clean_item_name(name: str) -> str:
+    """Strip emojis for invoice aesthetics"""
+    try:
+        return re.sub(r"[\U00010000-\U0010ffff]", "", name or "")
+    except Exception:
+        return name or ""
+
+
+def invoice_totals(order: Dict) -> Tuple[float, float, float]:
+    """(subtotal, delivery charge, total); subtotal is the sum of item totals"""
+    delivery_charge = float(order.get("delivery_charge") or 0)
+    try:
+        subtotal = sum(float(it.get("total_price", float(it.get("unit_price", 0)) * int(it.get("quantity", 1)))) for it in order.get("items", []))
+    except Exception:
+        subtotal = float(order.get("subtotal") or 0)
+    return subtotal, delivery_charge, subtotal + delivery_charge
+
+
 def _build_invoice_html(order: Dict, business: Dict | None = None, receipt_width_mm: Optional[int] = None, user_id: Optional[int] = None) -> str:
     """Build minimal, RTL-aware HTML for invoice/receipt.
 
@@ -39,25 +67,13 @@ def _build_invoice_html(order: Dict, business: Dict | None = None, receipt_width
 
     items_html = []
     for idx, item in enumerate(order.get("items", []), start=1):
-        name = item.get("product_name", "")
-        # Strip emojis for invoice aesthetics
-        try:
-            import re
-            name = re.sub(r"[\U00010000-\U0010ffff]", "", name)
-        except Exception:
-            pass
+        name = _clean_item_name(item.get("product_name", ""))
         qty = item.get("quantity", 1)
         unit = item.get("unit_price", 0)
         total = item.get("total_price", unit * qty)
         items_html.append(f"<tr><td>{idx}. {name}</td><td class='c'>{qty}</td><td class='r'>₪{unit:.2f}</td><td class='r'>₪{total:.2f}</td></tr>")
 
-    delivery_charge = float(order.get("delivery_charge") or 0)
-    # Compute subtotal as sum of item totals
-    try:
-        subtotal = sum(float(it.get("total_price", float(it.get("unit_price", 0)) * int(it.get("quantity", 1)))) for it in order.get("items", []))
-    except Exception:
-        subtotal = float(order.get("subtotal") or 0)
-    total = subtotal + delivery_charge
+    subtotal, delivery_charge, total = invoice_totals(order)
 
     delivery_block = ""
     if (order.get("delivery_method") or "").lower() == "delivery":
@@ -127,94 +143,85 @@ def _build_invoice_html(order: Dict, business: Dict | None = None, receipt_width
     return html
 
 
-async def generate_pdf_from_html(html: str) -> Optional[bytes]:
-    """Generate a PDF from HTML using Playwright Chromium, if available.
+async def generate_pdf_from_html(html: str, **pdf_options) -> Optional[bytes]:
+    """Generate a PDF from HTML on the shared Chromium pool, if available.
     Returns PDF bytes or None on failure.
     """
     try:
-        from playwright.async_api import async_playwright
+        return await get_browser_pool().render_pdf(html, **pdf_options)
+    except BrowserPoolUnavailable as e:
+        logger.warning("PDF rendering unavailable: %s", e)
     except Exception as e:
-        logger.warning("Playwright not available for PDF generation: %s", e)
-        return None
-
-    async def _render() -> Optional[bytes]:
-        async with async_playwright() as p:
-            # Launch with flags that are friendly to containers like Render/Heroku
-            browser = await p.chromium.launch(
-                args=[
-                    "--no-sandbox",
-                    "--disable-setuid-sandbox",
-                    "--disable-dev-shm-usage",
-                    "--disable-gpu",
-                ]
-            )
-            page = await browser.new_page()
-            await page.set_content(html, wait_until="load")
-            pdf_bytes = await page.pdf(format="A4", print_background=True)
-            await browser.close()
-            return pdf_bytes
-    try:
-        return await _render()
-    except Exception as e:
-        # Attempt one-time browser install at runtime, then retry
         logger.error("Failed to render PDF via Playwright: %s", e)
-        try:
-            import subprocess, sys
-            subprocess.run([sys.executable, "-m", "playwright", "install", "chromium"], check=False)
-            return await _render()
-        except Exception as e2:
-            logger.error("PDF retry after install failed: %s", e2)
-            return None
+    return None
 
 
 async def warmup_playwright_chromium() -> None:
-    """Warm up Playwright by ensuring Chromium is installed and can launch.
+    """Start the browser pool so the first invoice does not pay the launch cost.
 
-    Called at service startup to avoid slow first invoice and repeated taps.
-    Safe to run multiple times.
+    Installs Chromium if it is missing. Safe to run multiple times.
     """
+    if await get_browser_pool().start():
+        logger.info("Playwright warm-up completed")
+
+
+def _native_receipts_available() -> bool:
     try:
-        from playwright.async_api import async_playwright  # noqa: F401
+        load_receipt_font()
+        return True
+    except ReceiptFontUnavailable as e:
+        logger.debug("Native receipt renderer unavailable, using Chromium: %s", e)
     except Exception as e:
-        logger.info("Playwright not installed; skipping warm-up: %s", e)
-        return
+        logger.warning("Receipt font could not be loaded, using Chromium: %s", e)
+    return False
 
-    # Heuristic: if cache dir lacks chromium, perform install
-    try:
-        cache_dir = os.environ.get("PLAYWRIGHT_BROWSERS_PATH") or "/opt/render/.cache/ms-playwright"
-        needs_install = not os.path.isdir(cache_dir) or not any(
-            name.startswith("chromium") for name in os.listdir(cache_dir)
-        )
-    except Exception:
-        needs_install = True
-
-    if needs_install:
-        try:
-            import subprocess, sys
-            logger.info("Playwright warm-up: installing chromium...")
-            subprocess.run([sys.executable, "-m", "playwright", "install", "chromium"], check=False)
-        except Exception as e:
-            logger.warning("Playwright warm-up install failed: %s", e)
-            return
-
-    # Verify we can launch a browser
+
+async def _render_native_receipt(order: Dict, business: Dict | None, user_id: Optional[int]) -> Optional[bytes]:
+    """58 mm receipt PDF without Chromium; None on failure"""
     try:
-        from playwright.async_api import async_playwright
-        async with async_playwright() as p:
-            browser = await p.chromium.launch(args=["--no-sandbox", "--disable-dev-shm-usage", "--disable-gpu"])  # type: ignore
-            await browser.close()
-        logger.info("Playwright warm-up completed")
+        return await asyncio.to_thread(render_receipt_pdf, order, business, user_id)
     except Exception as e:
-        logger.warning("Playwright warm-up verification failed: %s", e)
+        logger.error("Native receipt rendering failed, using Chromium: %s", e)
+        return None
+
 
+def build_receipt_escpos(order: Dict, business: Dict | None = None, user_id: Optional[int] = None) -> bytes:
+    """ESC/POS byte stream of the 58 mm receipt, for printing directly to a thermal printer"""
+    return render_receipt_escpos(order, business, user_id)
 
-async def build_invoice_pdf(order: Dict, business: Dict | None = None, receipt: bool = False, user_id: Optional[int] = None) -> Dict[str, Optional[bytes]]:
+
+async def build_invoice_pdf(
+    order: Dict,
+    business: Dict | None = None,
+    receipt: bool = False,
+    user_id: Optional[int] = None,
+    use_file_id: bool = False,
+) -> Dict[str, Optional[bytes]]:
     """Build invoice or receipt PDF (and always return the HTML too for fallback).
 
-    Returns dict: {"pdf": bytes|None, "html": str}
+    Receipts are rendered natively with the bundled font, or on Chromium if
+    that fails. PDFs are cached by the hash of their HTML. With ``use_file_id`` a known
+    Telegram file_id is returned instead of the PDF bytes, skipping the render.
+
+    Returns dict: {"pdf": bytes|None, "html": str, "cache_key": str, "file_id": str|None, "cached": bool}
     """
     html = _build_invoice_html(order, business, receipt_width_mm=58 if receipt else None, user_id=user_id)
-    pdf = await generate_pdf_from_html(html)
-    return {"pdf": pdf, "html": html}
-
-
+    # Font lookup and the cache's file reads, writes and eviction block: keep them off the event loop
+    native = receipt and await asyncio.to_thread(_native_receipts_available)
+    # Native receipts differ from Chromium's output, so they get their own key
+    cache_key = invoice_cache_key(("native-receipt:" + html) if native else html)
+    cache = get_pdf_cache()
+    if use_file_id:
+        file_id = await asyncio.to_thread(cache.get_file_id, cache_key)
+        if file_id:
+            return {"pdf": None, "html": html, "cache_key": cache_key, "file_id": file_id, "cached": True}
+    pdf = await asyncio.to_thread(cache.get, cache_key)
+    cached = pdf is not None
+    if pdf is None:
+        if native:
+            pdf = await _render_native_receipt(order, business, user_id)
+        if pdf is None:
+            pdf = await generate_pdf_from_html(html)
+        if pdf:
+            await asyncio.to_thread(cache.put, cache_key, pdf)
+    return {"pdf": pdf, "html": html, "cache_key": cache_key, "file_id": None, "cached": cached}
@@ -0,0 +1,210 @@
+"""
+Streaming order export for accounting
+
+Writes the orders and order lines of a period to ``orders`` and
+``order_lines`` tables (CSV, or Parquet when pyarrow is installed) inside
+one ZIP file on disk. Rows come from a server-side cursor a batch at a time
+and are appended to the output as they arrive, so memory stays flat however
+many orders the period has.
+"""
+
+from __future__ import annotations
+
+import calendar
+import csv
+import io
+import json
+import logging
+import os
+import shutil
+import tempfile
+import zipfile
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+from src.utils.constants import OrderExportSettings, OrderStatusGroups
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # optional dependency
+    pa = None
+    pq = None
+
+logger = logging.getLogger(__name__)
+
+
+class ExportFormatUnavailable(Exception):
+    """Raised when Parquet is requested but pyarrow is not installed"""
+
+
+@dataclass
+class OrderExportRequest:
+    """Period (inclusive), output format and optional status filter"""
+
+    start_date: date
+    end_date: date
+    fmt: str = "csv"
+    statuses: List[str] = field(default_factory=list)
+
+    @property
+    def label(self) -> str:
+        start, end = self.start_date, self.end_date
+        if start.day == 1 and end == start.replace(day=calendar.monthrange(start.year, start.month)[1]):
+            return start.strftime("%Y-%m")
+        return start.isoformat() if start == end else f"{start.isoformat()}_{end.isoformat()}"
+
+
+@dataclass
+class OrderExportResult:
+    """Outcome of an export; ``path`` is the ZIP on disk, removed by ``cleanup``"""
+
+    request: OrderExportRequest
+    orders: int = 0
+    lines: int = 0
+    path: Optional[str] = None
+    size: int = 0
+
+    @property
+    def filename(self) -> str:
+        return f"orders_{self.request.label}_{self.request.fmt}.zip"
+
+    def cleanup(self) -> None:
+        if self.path:
+            try:
+                os.unlink(self.path)
+            except FileNotFoundError:
+                pass
+            self.path = None
+
+
+def _parse_period(text: str) -> Tuple[date, date]:
+    if ".." in text:
+        first, last = text.split("..", 1)
+        start, end = _parse_period(first)[0], _parse_period(last)[1]
+    elif len(text) == 7:
+        start = datetime.strptime(text, "%Y-%m").date()
+        end = start.replace(day=calendar.monthrange(start.year, start.month)[1])
+    else:
+        start = end = datetime.strptime(text, "%Y-%m-%d").date()
+    if end < start:
+        raise ValueError(f"period ends before it starts: {text}")
+    return start, end
+
+
+def parse_export_request(args: Sequence[str], today: Optional[date] = None) -> OrderExportRequest:
+    """Parse ``[period] [csv|parquet] [status,...]`` in any order.
+
+    The period is ``YYYY-MM``, ``YYYY-MM-DD`` or ``FROM..TO``; without one
+    the previous calendar month is exported. Raises ``ValueError`` for a
+    malformed period or an unknown status.
+    """
+    today = today or date.today()
+    last_month_end = today.replace(day=1) - timedelta(days=1)
+    request = OrderExportRequest(start_date=last_month_end.replace(day=1), end_date=last_month_end)
+    for arg in args:
+        token = arg.strip().lower()
+        if not token:
+            continue
+        if token in OrderExportSettings.FORMATS:
+            request.fmt = token
+        elif token[:1].isdigit():
+            request.start_date, request.end_date = _parse_period(token)
+        else:
+            statuses = [s for s in token.split(",") if s]
+            unknown = [s for s in statuses if s not in OrderStatusGroups.ALL]
+            if unknown:
+                raise ValueError(f"unknown order status: {', '.join(unknown)}")
+            request.statuses.extend(statuses)
+    return request
+
+
+def _cell(value):
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, ensure_ascii=False)
+    return value
+
+
+def _write_csv(archive: zipfile.ZipFile, name: str, columns: List[str], batches: Iterable[List[tuple]]) -> int:
+    rows = 0
+    # BOM so spreadsheet apps detect UTF-8 (Hebrew customer and product names)
+    with io.TextIOWrapper(archive.open(f"{name}.csv", "w"), encoding="utf-8-sig", newline="") as out:
+        writer = csv.writer(out)
+        writer.writerow(columns)
+        for batch in batches:
+            writer.writerows([_cell(value) for value in row] for row in batch)
+            rows += len(batch)
+    return rows
+
+
+def _arrow_type(column: str):
+    if column in ("order_id", "customer_id", "product_id", "quantity"):
+        return pa.int64()
+    if column in ("subtotal", "delivery_charge", "total", "unit_price", "total_price"):
+        return pa.float64()
+    if column in ("created_at", "updated_at", "order_created_at"):
+        return pa.timestamp("us")
+    return pa.string()
+
+
+def _write_parquet(archive: zipfile.ZipFile, name: str, columns: List[str], batches: Iterable[List[tuple]]) -> int:
+    schema = pa.schema([(column, _arrow_type(column)) for column in columns])
+    rows = 0
+    with tempfile.TemporaryFile() as buffer:
+        with pq.ParquetWriter(buffer, schema) as writer:
+            for batch in batches:
+                arrays = [
+                    pa.array([_cell(row[i]) for row in batch], type=schema.field(i).type)
+                    for i in range(len(columns))
+                ]
+                writer.write_batch(pa.RecordBatch.from_arrays(arrays, schema=schema))
+                rows += len(batch)
+        buffer.seek(0)
+        # Parquet pages are already compressed
+        with archive.open(zipfile.ZipInfo(f"{name}.parquet"), "w") as entry:
+            shutil.copyfileobj(buffer, entry)
+    return rows
+
+
+def export_orders(
+    request: OrderExportRequest,
+    batch_size: int = OrderExportSettings.BATCH_SIZE,
+) -> OrderExportResult:
+    """Write the period's orders and order lines into a ZIP file.
+
+    Blocking; run it in a worker thread. The caller owns the file and must
+    call ``result.cleanup()`` once it has been sent.
+    """
+    from src.db.operations import stream_order_export
+
+    if request.fmt not in OrderExportSettings.FORMATS:
+        raise ValueError(f"Unsupported export format: {request.fmt}")
+    if request.fmt == "parquet" and pa is None:
+        raise ExportFormatUnavailable("Parquet export requires pyarrow")
+    write = _write_parquet if request.fmt == "parquet" else _write_csv
+
+    start = datetime.combine(request.start_date, datetime.min.time())
+    end = datetime.combine(request.end_date + timedelta(days=1), datetime.min.time())
+    statuses = request.statuses or None
+    result = OrderExportResult(request=request)
+    handle = tempfile.NamedTemporaryFile(prefix="orders_", suffix=".zip", delete=False)
+    result.path = handle.name
+    try:
+        with zipfile.ZipFile(handle, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+            columns, batches = stream_order_export(start, end, statuses, lines=False, batch_size=batch_size)
+            result.orders = write(archive, "orders", columns, batches)
+            columns, batches = stream_order_export(start, end, statuses, lines=True, batch_size=batch_size)
+            result.lines = write(archive, "order_lines", columns, batches)
+        handle.close()
+        result.size = os.path.getsize(result.path)
+    except BaseException:
+        handle.close()
+        result.cleanup()
+        raise
+
+    logger.info(
+        "Exported %d orders and %d order lines for %s as %s (%d bytes)",
+        result.orders, result.lines, request.label, request.fmt, result.size,
+    )
+    return result
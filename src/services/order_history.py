@@ -0,0 +1,358 @@
+"""
+Closed months of orders as memory-mapped column files
+
+Analytics over long ranges (yearly reports, customer lifetime totals) would
+otherwise reload every order and line of the range from the database. Once
+a month is closed (it ended a while ago and none of its orders is still
+active) its facts are written once to an immutable directory of NumPy
+``.npy`` files, one per column::
+
+    data/order_history/
+        manifest.json            months written so far and their row counts
+        2025-03/
+            meta.json            status and product names, customer names
+            orders.ordinal.npy   date ordinal, sorted by creation time
+            orders.created_ts.npy ...
+            lines.order.npy      row of the order in this month ...
+
+Months are exported oldest first without gaps, so the files cover every
+order before ``covered_until()``. ``AnalyticsService`` reads that part of a
+period from the files, memory-mapped so only the pages of the requested
+days are touched, and the rest from the database.
+
+Exported months are not rewritten in place: when an order of an exported
+month is changed or deleted, ``reopen_month`` drops that month and every
+later one from the manifest, so analytics reads them from the database
+again until the next export run writes them anew.
+"""
+
+import asyncio
+import json
+import logging
+import math
+import os
+import shutil
+import tempfile
+import threading
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from src.services.analytics_engine import _FINISHED_STATUSES, _METHOD_CODES, HAS_NUMPY, HistoryBlock
+from src.utils.constants import OrderHistorySettings, OrderStatusGroups
+
+if HAS_NUMPY:
+    import numpy as np
+
+logger = logging.getLogger(__name__)
+
+ORDER_COLUMNS = {
+    "ordinal": "int64",
+    "created_ts": "float64",
+    "status": "int64",
+    "total": "float64",
+    "method": "int64",
+    "customer": "int64",
+    "processing_hours": "float64",
+}
+LINE_COLUMNS = {"order": "int64", "product": "int64", "quantity": "int64", "revenue": "float64"}
+
+
+def _month_key(month: date) -> str:
+    return f"{month:%Y-%m}"
+
+
+def _next_month(month: date) -> date:
+    return date(month.year + month.month // 12, month.month % 12 + 1, 1)
+
+
+def month_columns(orders: list, lines: list) -> Tuple[Dict[str, list], Dict[str, list], dict]:
+    """Order and line columns plus metadata for one month of fact rows
+
+    ``orders`` and ``lines`` are the rows of ``get_order_fact_rows``.
+    """
+    ordered = sorted((row for row in orders if row[1] is not None), key=lambda row: row[1])
+    statuses: Dict[Optional[str], int] = {}
+    products: Dict[str, int] = {}
+    position: Dict[int, int] = {}
+    order_columns: Dict[str, list] = {name: [] for name in ORDER_COLUMNS}
+    for index, (order_id, created_at, status, total, method, customer_id, updated_at) in enumerate(ordered):
+        position[order_id] = index
+        order_columns["ordinal"].append(created_at.toordinal())
+        order_columns["created_ts"].append(created_at.timestamp())
+        order_columns["status"].append(statuses.setdefault(status, len(statuses)))
+        order_columns["total"].append(float(total or 0))
+        order_columns["method"].append(_METHOD_CODES.get(method, 0))
+        order_columns["customer"].append(customer_id if customer_id is not None else -1)
+        finished = updated_at is not None and status in _FINISHED_STATUSES
+        order_columns["processing_hours"].append(
+            (updated_at - created_at).total_seconds() / 3600 if finished else math.nan
+        )
+
+    line_columns: Dict[str, list] = {name: [] for name in LINE_COLUMNS}
+    for order_id, product_name, quantity, total_price in sorted(
+        (line for line in lines if line[0] in position), key=lambda line: position[line[0]]
+    ):
+        line_columns["order"].append(position[order_id])
+        line_columns["product"].append(products.setdefault(product_name, len(products)))
+        line_columns["quantity"].append(int(quantity or 0))
+        line_columns["revenue"].append(float(total_price or 0))
+
+    meta = {
+        "statuses": list(statuses),
+        "products": list(products),
+        "aware": bool(ordered) and ordered[0][1].tzinfo is not None,
+    }
+    return order_columns, line_columns, meta
+
+
+class OrderHistoryStore:
+    """Manifest and memory-mapped columns of the exported months"""
+
+    def __init__(self, directory: str):
+        self.directory = Path(directory)
+        self._lock = threading.Lock()
+        # Held across reading, changing and writing the manifest
+        self._manifest_lock = threading.Lock()
+        self._manifest: Dict[str, Dict] = {}
+        self._manifest_mtime: Optional[float] = None
+        self._blocks: Dict[str, HistoryBlock] = {}
+
+    @property
+    def available(self) -> bool:
+        return HAS_NUMPY
+
+    def _load_manifest(self) -> Dict[str, Dict]:
+        path = self.directory / OrderHistorySettings.MANIFEST
+        try:
+            mtime = path.stat().st_mtime
+        except FileNotFoundError:
+            return {}
+        with self._lock:
+            if mtime != self._manifest_mtime:
+                try:
+                    data = json.loads(path.read_text(encoding="utf-8"))
+                except (OSError, ValueError) as e:
+                    logger.warning("Unreadable order history manifest %s: %s", path, e)
+                    return {}
+                if data.get("format") != OrderHistorySettings.FORMAT_VERSION:
+                    logger.warning("Ignoring order history manifest with format %s", data.get("format"))
+                    return {}
+                self._manifest, self._manifest_mtime = data.get("months", {}), mtime
+                self._blocks = {}
+            return self._manifest
+
+    def months(self) -> List[date]:
+        """Exported months, oldest first"""
+        return sorted(datetime.strptime(key, "%Y-%m").date() for key in self._load_manifest())
+
+    def covered_until(self) -> Optional[date]:
+        """First day not covered by the files (None when nothing is exported)"""
+        if not self.available:
+            return None
+        months = self.months()
+        return _next_month(months[-1]) if months else None
+
+    def _block(self, key: str) -> HistoryBlock:
+        block = self._blocks.get(key)
+        if block is None:
+            folder = self.directory / key
+            meta = json.loads((folder / "meta.json").read_text(encoding="utf-8"))
+            entry = self._load_manifest()[key]
+
+            def load(prefix: str, columns: Dict[str, str], rows: int):
+                if not rows:
+                    return {name: np.zeros(0, dtype=dtype) for name, dtype in columns.items()}
+                return {name: np.load(folder / f"{prefix}.{name}.npy", mmap_mode="r") for name in columns}
+
+            block = HistoryBlock(
+                orders=load("orders", ORDER_COLUMNS, entry["orders"]),
+                lines=load("lines", LINE_COLUMNS, entry["lines"]),
+                statuses=meta["statuses"],
+                products=meta["products"],
+                customer_names={int(k): v for k, v in meta["customer_names"].items()},
+                aware=meta["aware"],
+            )
+            self._blocks[key] = block
+        return block
+
+    def blocks(self, start_date: date, end_date: date) -> List[HistoryBlock]:
+        """Memory-mapped blocks of the exported months overlapping [start_date, end_date]"""
+        if not self.available:
+            return []
+        first = date(start_date.year, start_date.month, 1)
+        return [self._block(_month_key(m)) for m in self.months() if first <= m <= end_date]
+
+    def write_month(
+        self,
+        month: date,
+        orders: list,
+        lines: list,
+        customer_names: Dict[int, str],
+        covered_until: Optional[date],
+    ) -> Optional[Dict]:
+        """Write one month's columns and add it to the manifest
+
+        ``covered_until`` is what ``covered_until()`` returned when the rows
+        were loaded. If months were reopened since, nothing is written and
+        None is returned: the rows may be stale and the month would leave a
+        gap.
+        """
+        key = _month_key(month)
+        order_columns, line_columns, meta = month_columns(orders, lines)
+        meta["customer_names"] = {str(k): v for k, v in customer_names.items()}
+        self.directory.mkdir(parents=True, exist_ok=True)
+        staging = Path(tempfile.mkdtemp(prefix=f".{key}-", dir=self.directory))
+        try:
+            for prefix, columns, dtypes in (
+                ("orders", order_columns, ORDER_COLUMNS),
+                ("lines", line_columns, LINE_COLUMNS),
+            ):
+                for name, values in columns.items():
+                    np.save(staging / f"{prefix}.{name}.npy", np.asarray(values, dtype=dtypes[name]))
+            (staging / "meta.json").write_text(json.dumps(meta, ensure_ascii=False), encoding="utf-8")
+        except BaseException:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+
+        entry = {
+            "orders": len(order_columns["ordinal"]),
+            "lines": len(line_columns["order"]),
+            "exported_at": datetime.utcnow().isoformat(timespec="seconds"),
+        }
+        with self._manifest_lock:
+            if self.covered_until() != covered_until:
+                shutil.rmtree(staging, ignore_errors=True)
+                logger.info("Order history export of %s skipped: months were reopened meanwhile", key)
+                return None
+            try:
+                final = self.directory / key
+                if final.exists():
+                    shutil.rmtree(final)  # left behind by an export that died or by a reopened month
+                os.replace(staging, final)
+            except BaseException:
+                shutil.rmtree(staging, ignore_errors=True)
+                raise
+            months = dict(self._load_manifest())
+            months[key] = entry
+            self._write_manifest(months)
+        logger.info("Exported order history for %s (%d orders, %d lines)", key, entry["orders"], entry["lines"])
+        return entry
+
+    def _write_manifest(self, months: Dict[str, Dict]) -> None:
+        manifest = self.directory / OrderHistorySettings.MANIFEST
+        temporary = manifest.with_suffix(".tmp")
+        temporary.write_text(
+            json.dumps({"format": OrderHistorySettings.FORMAT_VERSION, "months": months}, indent=1, sort_keys=True),
+            encoding="utf-8",
+        )
+        os.replace(temporary, manifest)
+        with self._lock:
+            self._manifest, self._manifest_mtime = months, manifest.stat().st_mtime
+            self._blocks = {}
+
+    def reopen_month(self, moment: datetime) -> List[date]:
+        """Drop the exported month containing ``moment`` and every later one
+
+        Called when an order of an exported month changes, so analytics
+        reads those months from the database until they are exported again.
+        Later months go too, keeping the exported months free of gaps; their
+        directories are replaced by the next export.
+        """
+        month = date(moment.year, moment.month, 1)
+        with self._manifest_lock:
+            until = self.covered_until()
+            if until is None or month >= until:
+                return []
+            months = self._load_manifest()
+            dropped = sorted(key for key in months if key >= _month_key(month))
+            if not dropped:
+                return []
+            self._write_manifest({key: entry for key, entry in months.items() if key not in dropped})
+        logger.warning("Order history reopened from %s: an order of an exported month changed", dropped[0])
+        return [datetime.strptime(key, "%Y-%m").date() for key in dropped]
+
+    def export_closed_months(
+        self,
+        today: Optional[date] = None,
+        load_rows: Optional[Callable[[datetime, datetime], tuple]] = None,
+        first_order_time: Optional[Callable[[], Optional[datetime]]] = None,
+    ) -> List[date]:
+        """Export every closed month after the last exported one, oldest first
+
+        Stops at the first month that still has active orders so the
+        exported months never have gaps.
+        """
+        if not self.available:
+            return []
+        if load_rows is None or first_order_time is None:
+            from src.db.operations import get_first_order_time, get_order_fact_rows
+
+            load_rows = load_rows or get_order_fact_rows
+            first_order_time = first_order_time or get_first_order_time
+
+        cutoff = (today or date.today()) - timedelta(days=OrderHistorySettings.CLOSE_AFTER_DAYS)
+        month = covered_until = self.covered_until()
+        if month is None:
+            oldest = first_order_time()
+            if oldest is None:
+                return []
+            month = date(oldest.year, oldest.month, 1)
+
+        exported = []
+        while _next_month(month) <= cutoff:
+            start = datetime.combine(month, datetime.min.time())
+            end = datetime.combine(_next_month(month), datetime.min.time())
+            orders, lines, names = load_rows(start, end)
+            if any(row[2] in OrderStatusGroups.ACTIVE for row in orders):
+                logger.info("Order history stops at %s: it still has active orders", _month_key(month))
+                break
+            if self.write_month(month, orders, lines, names, covered_until) is None:
+                break
+            exported.append(month)
+            month = covered_until = _next_month(month)
+        return exported
+
+
+_order_history_store: Optional[OrderHistoryStore] = None
+
+
+def get_order_history_store() -> Optional[OrderHistoryStore]:
+    """Application-wide order history, or None when disabled or NumPy is missing"""
+    global _order_history_store
+    if _order_history_store is None:
+        try:
+            from src.config import get_config
+            directory = get_config().order_history_dir
+        except Exception:
+            directory = "data/order_history"
+        if not directory or not HAS_NUMPY:
+            return None
+        _order_history_store = OrderHistoryStore(directory)
+    return _order_history_store
+
+
+def reopen_order_history(created_at: Optional[datetime]) -> None:
+    """Drop the exported month of an order that was changed or deleted, if any"""
+    if created_at is None:
+        return
+    store = get_order_history_store()
+    if store is None:
+        return
+    try:
+        store.reopen_month(created_at)
+    except Exception as e:
+        logger.error("Failed to reopen order history for %s: %s", created_at, e)
+
+
+async def run_order_history_export(interval: float = OrderHistorySettings.EXPORT_INTERVAL_SECONDS) -> None:
+    """Export newly closed months now and then every ``interval`` seconds"""
+    store = get_order_history_store()
+    if store is None:
+        return
+    while True:
+        try:
+            await asyncio.to_thread(store.export_closed_months)
+        except Exception as e:
+            logger.error("Order history export failed: %s", e)
+        await asyncio.sleep(interval)
@@ -45,9 +45,9 @@ class OrderService:
                 logger.info("DEBUG: Order creation - delivery_method: %s, delivery_address: %s", delivery_method, delivery_address)
                 # Use area-specific charge if selected
                 try:
-                    from src.db.operations import get_delivery_area_by_id
+                    from src.utils.constants_manager import get_delivery_area
                     if getattr(cart, "delivery_area_id", None):
-                        area = get_delivery_area_by_id(cart.delivery_area_id)
+                        area = get_delivery_area(cart.delivery_area_id)
                         if area and area.charge is not None:
                             # override charge when delivery selected
                             pass  # we'll set below
@@ -63,8 +63,8 @@ class OrderService:
                 try:
                     charge = None
                     if cart and getattr(cart, "delivery_area_id", None):
-                        from src.db.operations import get_delivery_area_by_id
-                        area = get_delivery_area_by_id(cart.delivery_area_id)
+                        from src.utils.constants_manager import get_delivery_area
+                        area = get_delivery_area(cart.delivery_area_id)
                         if area and area.charge is not None:
                             charge = float(area.charge)
                     if charge is None:
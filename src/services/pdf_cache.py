@@ -0,0 +1,162 @@
+"""
+Content-addressed cache for generated invoice/receipt PDFs
+
+PDFs are stored on disk under the SHA-256 of the HTML they were rendered
+from. The HTML already reflects everything that changes the document
+(order contents, business settings, language, receipt width), so an
+unchanged order is never rendered twice and any change produces a new key.
+
+The Telegram ``file_id`` returned by the first upload is stored next to the
+PDF so re-sending the same document costs no upload at all. The directory
+is bounded by total size with least-recently-used eviction.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Optional
+
+from src.utils.constants import PdfRenderSettings
+
+logger = logging.getLogger(__name__)
+
+
+def invoice_cache_key(html: str) -> str:
+    """Cache key for a rendered invoice document"""
+    return hashlib.sha256(html.encode("utf-8")).hexdigest()
+
+
+class PdfCache:
+    """Size-bounded LRU of PDFs on disk, plus their Telegram file_ids"""
+
+    def __init__(self, directory: str, max_bytes: int = PdfRenderSettings.CACHE_MAX_BYTES):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._index: Optional["OrderedDict[str, int]"] = None  # key -> size, least recent first
+        self._total = 0
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0, "file_id_hits": 0}
+
+    def _pdf_path(self, key: str) -> Path:
+        return self.directory / key[:2] / f"{key}.pdf"
+
+    def _file_id_path(self, key: str) -> Path:
+        return self.directory / key[:2] / f"{key}.fid"
+
+    def _load_index(self) -> "OrderedDict[str, int]":
+        if self._index is None:
+            entries = []
+            if self.directory.is_dir():
+                for path in self.directory.glob("*/*.pdf"):
+                    try:
+                        st = path.stat()
+                    except OSError:
+                        continue
+                    entries.append((st.st_mtime, path.stem, st.st_size))
+            entries.sort()
+            self._index = OrderedDict((key, size) for _, key, size in entries)
+            self._total = sum(self._index.values())
+        return self._index
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Cached PDF bytes, or None"""
+        path = self._pdf_path(key)
+        with self._lock:
+            index = self._load_index()
+            try:
+                data = path.read_bytes()
+            except OSError:
+                if key in index:
+                    self._total -= index.pop(key)
+                self._stats["misses"] += 1
+                return None
+            index[key] = len(data)
+            index.move_to_end(key)
+            self._stats["hits"] += 1
+        try:
+            os.utime(path)  # keep recency across restarts
+        except OSError:
+            pass
+        return data
+
+    def put(self, key: str, data: bytes) -> None:
+        """Store a PDF and evict least recently used ones over the size budget"""
+        path = self._pdf_path(key)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+        except OSError as e:
+            logger.warning("Failed to cache invoice PDF %s: %s", key[:12], e)
+            return
+        with self._lock:
+            index = self._load_index()
+            self._total += len(data) - index.pop(key, 0)
+            index[key] = len(data)
+            self._evict_locked()
+
+    def _evict_locked(self) -> None:
+        index = self._index
+        while self._total > self.max_bytes and len(index) > 1:
+            key, size = index.popitem(last=False)
+            self._total -= size
+            self._stats["evictions"] += 1
+            for path in (self._pdf_path(key), self._file_id_path(key)):
+                try:
+                    path.unlink()
+                except OSError:
+                    pass
+
+    def get_file_id(self, key: str) -> Optional[str]:
+        """Telegram file_id of a previous upload of this document"""
+        try:
+            file_id = self._file_id_path(key).read_text().strip()
+        except OSError:
+            return None
+        if file_id:
+            self._stats["file_id_hits"] += 1
+        return file_id or None
+
+    def set_file_id(self, key: str, file_id: str) -> None:
+        path = self._file_id_path(key)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(file_id)
+        except OSError as e:
+            logger.warning("Failed to store Telegram file_id for %s: %s", key[:12], e)
+
+    def forget_file_id(self, key: str) -> None:
+        """Drop a file_id Telegram no longer accepts"""
+        try:
+            self._file_id_path(key).unlink()
+        except OSError:
+            pass
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            self._load_index()
+            return dict(self._stats, entries=len(self._index), bytes=self._total, max_bytes=self.max_bytes)
+
+
+_pdf_cache: Optional[PdfCache] = None
+
+
+def get_pdf_cache() -> PdfCache:
+    """Get the application-wide invoice PDF cache"""
+    global _pdf_cache
+    if _pdf_cache is None:
+        try:
+            from src.config import get_config
+            directory = get_config().pdf_cache_dir
+        except Exception:
+            directory = "data/pdf_cache"
+        _pdf_cache = PdfCache(directory)
+    return _pdf_cache
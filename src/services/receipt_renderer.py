@@ -0,0 +1,659 @@
+"""
+Native 58 mm receipt renderer
+
+Renders the thermal-printer receipt directly, without a browser, from the
+same order payload ``_build_invoice_html`` uses:
+
+- ``render_receipt_pdf`` writes a single-page PDF sized to the paper roll,
+  with a subset of a Hebrew-capable TrueType font embedded, and
+- ``render_receipt_escpos`` produces an ESC/POS byte stream for printing
+  straight to the printer.
+
+The font is DejaVu Sans, bundled in ``src/assets/fonts`` so receipts render
+the same on every host; ``RECEIPT_FONT_PATH`` points at another one.
+
+Hebrew needs no glyph shaping, only bidirectional reordering, which is done
+here with a compact implementation of the Unicode bidi rules that matter
+for receipts (strong letters, numbers with their separators and currency
+signs, neutrals and mirrored brackets).
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import struct
+import unicodedata
+import zlib
+from dataclasses import dataclass
+from datetime import datetime
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from src.utils.constants import ReceiptSettings
+
+logger = logging.getLogger(__name__)
+
+MM_TO_PT = 72 / 25.4
+BUNDLED_FONT = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "assets", "fonts", "DejaVuSans.ttf"
+)
+
+
+class ReceiptFontUnavailable(Exception):
+    """Raised when no Hebrew-capable TrueType font can be found"""
+
+
+# ---------------------------------------------------------------------------
+# TrueType font: metrics, character map and glyph subsetting
+# ---------------------------------------------------------------------------
+
+class TrueTypeFont:
+    """Just enough of a TrueType parser to measure text and embed a subset"""
+
+    _SUBSET_TABLES = (b"cvt ", b"fpgm", b"glyf", b"head", b"hhea", b"hmtx", b"loca", b"maxp", b"prep")
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            self.data = f.read()
+        num_tables = struct.unpack_from(">H", self.data, 4)[0]
+        self.tables: Dict[bytes, Tuple[int, int]] = {}
+        for i in range(num_tables):
+            tag, _, offset, length = struct.unpack_from(">4sIII", self.data, 12 + 16 * i)
+            self.tables[tag] = (offset, length)
+        for required in (b"head", b"hhea", b"hmtx", b"maxp", b"cmap", b"loca", b"glyf"):
+            if required not in self.tables:
+                raise ValueError(f"{path} is not a TrueType (glyf) font: missing {required.decode()}")
+
+        head = self.tables[b"head"][0]
+        self.units_per_em = struct.unpack_from(">H", self.data, head + 18)[0]
+        self.bbox = struct.unpack_from(">hhhh", self.data, head + 36)
+        self.index_to_loc_format = struct.unpack_from(">h", self.data, head + 50)[0]
+        hhea = self.tables[b"hhea"][0]
+        self.ascent, self.descent = struct.unpack_from(">hh", self.data, hhea + 4)
+        num_hmetrics = struct.unpack_from(">H", self.data, hhea + 34)[0]
+        self.num_glyphs = struct.unpack_from(">H", self.data, self.tables[b"maxp"][0] + 4)[0]
+
+        hmtx = self.tables[b"hmtx"][0]
+        advances = list(struct.unpack_from(f">{num_hmetrics * 2}H", self.data, hmtx)[::2])
+        advances.extend([advances[-1]] * (self.num_glyphs - num_hmetrics))
+        self.advances = advances
+        self.cmap = self._parse_cmap()
+
+        loca = self.tables[b"loca"][0]
+        if self.index_to_loc_format == 0:
+            self.loca = [v * 2 for v in struct.unpack_from(f">{self.num_glyphs + 1}H", self.data, loca)]
+        else:
+            self.loca = list(struct.unpack_from(f">{self.num_glyphs + 1}I", self.data, loca))
+
+    def _parse_cmap(self) -> Dict[int, int]:
+        base = self.tables[b"cmap"][0]
+        count = struct.unpack_from(">H", self.data, base + 2)[0]
+        subtables = {}
+        for i in range(count):
+            platform, encoding, offset = struct.unpack_from(">HHI", self.data, base + 4 + 8 * i)
+            subtables[(platform, encoding)] = base + offset
+        for key in ((3, 10), (0, 4), (3, 1), (0, 3)):
+            offset = subtables.get(key)
+            if offset is None:
+                continue
+            fmt = struct.unpack_from(">H", self.data, offset)[0]
+            if fmt == 12:
+                return self._parse_cmap12(offset)
+            if fmt == 4:
+                return self._parse_cmap4(offset)
+        raise ValueError(f"{self.path} has no Unicode cmap")
+
+    def _parse_cmap4(self, offset: int) -> Dict[int, int]:
+        seg_count = struct.unpack_from(">H", self.data, offset + 6)[0] // 2
+        ends = struct.unpack_from(f">{seg_count}H", self.data, offset + 14)
+        starts = struct.unpack_from(f">{seg_count}H", self.data, offset + 16 + 2 * seg_count)
+        deltas = struct.unpack_from(f">{seg_count}h", self.data, offset + 16 + 4 * seg_count)
+        range_base = offset + 16 + 6 * seg_count
+        range_offsets = struct.unpack_from(f">{seg_count}H", self.data, range_base)
+        mapping = {}
+        for i in range(seg_count):
+            for code in range(starts[i], ends[i] + 1):
+                if code == 0xFFFF:
+                    continue
+                if range_offsets[i] == 0:
+                    gid = (code + deltas[i]) & 0xFFFF
+                else:
+                    addr = range_base + 2 * i + range_offsets[i] + 2 * (code - starts[i])
+                    gid = struct.unpack_from(">H", self.data, addr)[0]
+                    if gid:
+                        gid = (gid + deltas[i]) & 0xFFFF
+                if gid:
+                    mapping[code] = gid
+        return mapping
+
+    def _parse_cmap12(self, offset: int) -> Dict[int, int]:
+        groups = struct.unpack_from(">I", self.data, offset + 12)[0]
+        mapping = {}
+        for i in range(groups):
+            start, end, glyph = struct.unpack_from(">III", self.data, offset + 16 + 12 * i)
+            for code in range(start, end + 1):
+                mapping[code] = glyph + code - start
+        return mapping
+
+    def has_glyphs(self, text: str) -> bool:
+        return all(ord(ch) in self.cmap for ch in text)
+
+    def glyph_id(self, ch: str) -> int:
+        return self.cmap.get(ord(ch), 0)
+
+    def width(self, text: str, size: float) -> float:
+        """Advance width of ``text`` in points"""
+        return sum(self.advances[self.glyph_id(ch)] for ch in text) * size / self.units_per_em
+
+    def scaled_advance(self, gid: int) -> int:
+        """Advance in PDF glyph-space units (1/1000 em)"""
+        return round(self.advances[gid] * 1000 / self.units_per_em)
+
+    def _glyph(self, gid: int) -> bytes:
+        glyf = self.tables[b"glyf"][0]
+        return self.data[glyf + self.loca[gid]:glyf + self.loca[gid + 1]]
+
+    def _components(self, glyph: bytes) -> Iterable[int]:
+        if len(glyph) < 10 or struct.unpack_from(">h", glyph, 0)[0] >= 0:
+            return
+        pos = 10
+        while True:
+            flags, gid = struct.unpack_from(">HH", glyph, pos)
+            yield gid
+            pos += 4 + (4 if flags & 0x0001 else 2)
+            if flags & 0x0008:
+                pos += 2
+            elif flags & 0x0040:
+                pos += 4
+            elif flags & 0x0080:
+                pos += 8
+            if not flags & 0x0020:
+                break
+
+    def subset(self, gids: Set[int]) -> bytes:
+        """Font program keeping only ``gids`` (and their components) outlines.
+        Glyph ids are unchanged, so the PDF can address glyphs directly.
+        """
+        keep = {0} | set(gids)
+        pending = list(keep)
+        while pending:
+            for component in self._components(self._glyph(pending.pop())):
+                if component not in keep:
+                    keep.add(component)
+                    pending.append(component)
+
+        glyf = bytearray()
+        loca = []
+        for gid in range(self.num_glyphs):
+            loca.append(len(glyf))
+            if gid in keep:
+                glyf += self._glyph(gid)
+                glyf += b"\0" * (-len(glyf) % 4)
+        loca.append(len(glyf))
+
+        tables = {}
+        for tag in self._SUBSET_TABLES:
+            if tag in self.tables:
+                offset, length = self.tables[tag]
+                tables[tag] = self.data[offset:offset + length]
+        head = bytearray(tables[b"head"])
+        head[8:12] = b"\0\0\0\0"  # checkSumAdjustment
+        struct.pack_into(">h", head, 50, 1)  # long loca offsets
+        tables[b"head"] = bytes(head)
+        tables[b"glyf"] = bytes(glyf)
+        tables[b"loca"] = struct.pack(f">{len(loca)}I", *loca)
+        return _build_sfnt(tables)
+
+
+def _table_checksum(data: bytes) -> int:
+    padded = data + b"\0" * (-len(data) % 4)
+    return sum(struct.unpack(f">{len(padded) // 4}I", padded)) & 0xFFFFFFFF
+
+
+def _build_sfnt(tables: Dict[bytes, bytes]) -> bytes:
+    tags = sorted(tables)
+    count = len(tags)
+    entry_selector = max(count.bit_length() - 1, 0)
+    search_range = (1 << entry_selector) * 16
+    header = struct.pack(">IHHHH", 0x00010000, count, search_range, entry_selector, count * 16 - search_range)
+    directory = b""
+    body = b""
+    offset = 12 + 16 * count
+    for tag in tags:
+        data = tables[tag]
+        directory += struct.pack(">4sIII", tag, _table_checksum(data), offset + len(body), len(data))
+        body += data + b"\0" * (-len(data) % 4)
+    return header + directory + body
+
+
+def find_receipt_font(configured: Optional[str] = None) -> Optional[str]:
+    """Path of the first available Hebrew-capable TrueType font"""
+    for path in ([configured] if configured else []) + [BUNDLED_FONT] + list(ReceiptSettings.FONT_CANDIDATES):
+        if path and os.path.isfile(path):
+            return path
+    return None
+
+
+@lru_cache(maxsize=4)
+def load_receipt_font(path: Optional[str] = None) -> TrueTypeFont:
+    """Parse the receipt font once per process"""
+    if path is None:
+        try:
+            from src.config import get_config
+            configured = get_config().receipt_font_path
+        except Exception:
+            configured = ""
+        path = find_receipt_font(configured)
+    if path is None:
+        raise ReceiptFontUnavailable("no Hebrew-capable TrueType font found")
+    font = TrueTypeFont(path)
+    if not font.has_glyphs("שלום₪"):
+        raise ReceiptFontUnavailable(f"{path} has no Hebrew glyphs")
+    return font
+
+
+# ---------------------------------------------------------------------------
+# Bidirectional text
+# ---------------------------------------------------------------------------
+
+_MIRRORS = {"(": ")", ")": "(", "[": "]", "]": "[", "{": "}", "}": "{", "<": ">", ">": "<", "«": "»", "»": "«"}
+
+
+def _bidi_class(ch: str) -> str:
+    cls = unicodedata.bidirectional(ch)
+    if cls in ("R", "AL"):
+        return "R"
+    if cls in ("EN", "AN"):
+        return "EN"
+    if cls in ("L", "ES", "ET", "CS", "NSM"):
+        return cls
+    return "N"
+
+
+def is_rtl(text: str, default: bool = False) -> bool:
+    """Paragraph direction from the first strong character"""
+    for ch in text:
+        cls = _bidi_class(ch)
+        if cls in ("L", "R"):
+            return cls == "R"
+    return default
+
+
+def visual_order(text: str, rtl: Optional[bool] = None) -> str:
+    """Reorder a single line from logical to left-to-right display order"""
+    if not text:
+        return text
+    if rtl is None:
+        rtl = is_rtl(text)
+    sos = "R" if rtl else "L"
+    classes = [_bidi_class(ch) for ch in text]
+    n = len(classes)
+
+    # W1: combining marks take the class of what they attach to
+    for i, cls in enumerate(classes):
+        if cls == "NSM":
+            classes[i] = classes[i - 1] if i else sos
+    # W4: a single separator between two numbers joins them
+    for i in range(1, n - 1):
+        if classes[i] in ("ES", "CS") and classes[i - 1] == "EN" and classes[i + 1] == "EN":
+            classes[i] = "EN"
+    # W5: currency/percent signs next to a number belong to it
+    for i in range(n):
+        if classes[i] == "ET":
+            j = i
+            while j < n and classes[j] == "ET":
+                j += 1
+            if (i > 0 and classes[i - 1] == "EN") or (j < n and classes[j] == "EN"):
+                for k in range(i, j):
+                    classes[k] = "EN"
+    # W6: remaining separators are neutral
+    classes = ["N" if cls in ("ES", "ET", "CS") else cls for cls in classes]
+    # W7: numbers in a left-to-right context are plain L
+    last_strong = sos
+    for i, cls in enumerate(classes):
+        if cls in ("L", "R"):
+            last_strong = cls
+        elif cls == "EN" and last_strong == "L":
+            classes[i] = "L"
+    # N1/N2: neutrals between same-direction text take it, otherwise the paragraph's
+    i = 0
+    while i < n:
+        if classes[i] != "N":
+            i += 1
+            continue
+        j = i
+        while j < n and classes[j] == "N":
+            j += 1
+        before = sos if i == 0 else ("R" if classes[i - 1] == "EN" else classes[i - 1])
+        after = sos if j == n else ("R" if classes[j] == "EN" else classes[j])
+        resolved = before if before == after else sos
+        for k in range(i, j):
+            classes[k] = resolved
+        i = j
+
+    # I1/I2: embedding levels
+    base = 1 if rtl else 0
+    levels = []
+    for cls in classes:
+        if base == 0:
+            levels.append(0 if cls == "L" else (1 if cls == "R" else 2))
+        else:
+            levels.append(1 if cls == "R" else 2)
+
+    # L2: reverse runs from the highest level down to the lowest odd level
+    chars = [_MIRRORS.get(ch, ch) if level % 2 else ch for ch, level in zip(text, levels)]
+    top = max(levels)
+    lowest_odd = min(level for level in levels + [top] if level % 2) if any(level % 2 for level in levels) else top + 1
+    for level in range(top, lowest_odd - 1, -1):
+        i = 0
+        while i < n:
+            if levels[i] >= level:
+                j = i
+                while j < n and levels[j] >= level:
+                    j += 1
+                chars[i:j] = chars[i:j][::-1]
+                levels[i:j] = levels[i:j][::-1]
+                i = j
+            else:
+                i += 1
+    return "".join(chars)
+
+
+# ---------------------------------------------------------------------------
+# Layout
+# ---------------------------------------------------------------------------
+
+@dataclass(frozen=True)
+class ReceiptLine:
+    """One printed row: ``start`` at the reading-start edge, ``end`` at the other.
+    ``align="center"`` centres ``start``; ``rule`` draws a separator.
+    """
+
+    start: str = ""
+    end: str = ""
+    align: str = "start"
+    size: float = ReceiptSettings.FONT_SIZE
+    bold: bool = False
+    rule: bool = False
+
+
+def _wrap(text: str, fits) -> List[str]:
+    """Greedy word wrap; words longer than a line are split"""
+    lines: List[str] = []
+    current = ""
+    for word in text.split():
+        candidate = f"{current} {word}" if current else word
+        if fits(candidate):
+            current = candidate
+            continue
+        if current:
+            lines.append(current)
+        while not fits(word) and len(word) > 1:
+            cut = len(word) - 1
+            while cut > 1 and not fits(word[:cut]):
+                cut -= 1
+            lines.append(word[:cut])
+            word = word[cut:]
+        current = word
+    if current or not lines:
+        lines.append(current)
+    return lines
+
+
+def build_receipt_lines(order: Dict, business: Dict | None = None, user_id: Optional[int] = None) -> List[ReceiptLine]:
+    """Receipt content in reading order, shared by the PDF and ESC/POS outputs"""
+    from src.services.invoice_service import _clean_item_name, invoice_totals  # lazy import to avoid cycles
+    from src.utils.i18n import i18n
+
+    L = lambda k: i18n.get_text(k, user_id=user_id)
+    biz_name = (business or {}).get("business_name", "Samna Salta")
+    biz_desc = (business or {}).get("business_description", "") or ""
+    created_at = order.get("created_at")
+    if isinstance(created_at, datetime):
+        created_at_str = created_at.strftime("%Y-%m-%d %H:%M")
+    else:
+        created_at_str = str(created_at or datetime.utcnow().strftime("%Y-%m-%d %H:%M"))
+    title = L("INVOICE_TITLE").format(id=order.get("order_id", order.get("order_number", "")))
+
+    lines = [
+        ReceiptLine(biz_name, align="center", size=ReceiptSettings.TITLE_FONT_SIZE, bold=True),
+    ]
+    if biz_desc:
+        lines.append(ReceiptLine(biz_desc, align="center", size=ReceiptSettings.SMALL_FONT_SIZE))
+    lines += [
+        ReceiptLine(title, align="center", bold=True),
+        ReceiptLine(created_at_str, align="center", size=ReceiptSettings.SMALL_FONT_SIZE),
+        ReceiptLine(rule=True),
+        ReceiptLine(f"{L('INVOICE_CUSTOMER')}: {order.get('customer_name', '')}"),
+        ReceiptLine(f"{L('INVOICE_PHONE')}: {order.get('customer_phone', '')}"),
+        ReceiptLine(f"{L('INVOICE_METHOD')}: {(order.get('delivery_method') or '').title()}"),
+    ]
+    if (order.get("delivery_method") or "").lower() == "delivery":
+        if order.get("delivery_address"):
+            lines.append(ReceiptLine(f"Address: {order['delivery_address']}"))
+        if order.get("delivery_instructions"):
+            lines.append(ReceiptLine(f"Delivery Instructions: {order['delivery_instructions']}"))
+    lines += [ReceiptLine(rule=True), ReceiptLine(L("INVOICE_ITEM"), L("INVOICE_TOTAL"), bold=True)]
+
+    for idx, item in enumerate(order.get("items", []), start=1):
+        qty = item.get("quantity", 1)
+        unit = item.get("unit_price", 0)
+        total = item.get("total_price", unit * qty)
+        lines.append(ReceiptLine(f"{idx}. {_clean_item_name(item.get('product_name', ''))}"))
+        lines.append(ReceiptLine(f"  {qty} × ₪{unit:.2f}", f"₪{total:.2f}", size=ReceiptSettings.SMALL_FONT_SIZE))
+
+    subtotal, delivery_charge, total = invoice_totals(order)
+    lines += [
+        ReceiptLine(rule=True),
+        ReceiptLine(L("INVOICE_SUBTOTAL"), f"₪{subtotal:.2f}"),
+        ReceiptLine(L("INVOICE_DELIVERY"), f"₪{delivery_charge:.2f}"),
+        ReceiptLine(L("INVOICE_GRAND_TOTAL"), f"₪{total:.2f}", bold=True),
+    ]
+    return lines
+
+
+# ---------------------------------------------------------------------------
+# PDF output
+# ---------------------------------------------------------------------------
+
+def _pdf_hex(font: TrueTypeFont, text: str, used: Set[int]) -> str:
+    gids = [font.glyph_id(ch) for ch in text]
+    used.update(gids)
+    return "<" + "".join(f"{gid:04X}" for gid in gids) + ">"
+
+
+def render_receipt_pdf(
+    order: Dict,
+    business: Dict | None = None,
+    user_id: Optional[int] = None,
+    width_mm: int = ReceiptSettings.PAPER_WIDTH_MM,
+    font: Optional[TrueTypeFont] = None,
+    rtl: bool = True,
+) -> bytes:
+    """Render the receipt as a one-page PDF exactly as wide as the paper roll.
+    Like the HTML invoice, the layout is right-to-left unless ``rtl`` is False.
+    """
+    font = font or load_receipt_font()
+    page_width = width_mm * MM_TO_PT
+    margin = ReceiptSettings.MARGIN_MM * MM_TO_PT
+    usable = page_width - 2 * margin
+    gap = ReceiptSettings.FONT_SIZE  # between start and end columns
+
+    # Wrap into physical rows: (start, end, align, size, bold, rule)
+    rows = []
+    for line in build_receipt_lines(order, business, user_id):
+        if line.rule:
+            rows.append(line)
+            continue
+        end_width = font.width(line.end, line.size) + gap if line.end else 0
+        parts = _wrap(line.start, lambda t: font.width(t, line.size) <= usable - end_width)
+        for i, part in enumerate(parts):
+            last = i == len(parts) - 1
+            rows.append(ReceiptLine(part, line.end if last else "", line.align, line.size, line.bold))
+
+    leading = 1.35
+    height = 2 * margin + sum(
+        ReceiptSettings.FONT_SIZE * 0.8 if row.rule else row.size * leading for row in rows
+    )
+
+    used: Set[int] = set()
+    ops = ["0 g 0 G"]
+    y = height - margin
+    for row in rows:
+        if row.rule:
+            y -= ReceiptSettings.FONT_SIZE * 0.4
+            ops.append(f"0.4 w [1 1] 0 d {margin:.2f} {y:.2f} m {page_width - margin:.2f} {y:.2f} l S [] 0 d")
+            y -= ReceiptSettings.FONT_SIZE * 0.4
+            continue
+        y -= row.size * leading
+        baseline = y + row.size * 0.3
+        mode = "2 Tr 0.25 w" if row.bold else "0 Tr"
+        pieces = []
+        start = visual_order(row.start)  # each row keeps its own direction
+        start_w = font.width(start, row.size)
+        if row.align == "center":
+            pieces.append(((page_width - start_w) / 2, start))
+        elif rtl:
+            pieces.append((page_width - margin - start_w, start))
+        else:
+            pieces.append((margin, start))
+        if row.end:
+            end = visual_order(row.end, rtl)
+            end_w = font.width(end, row.size)
+            pieces.append((margin if rtl else page_width - margin - end_w, end))
+        for x, text in pieces:
+            if text:
+                ops.append(f"BT /F1 {row.size:.2f} Tf {mode} {x:.2f} {baseline:.2f} Td {_pdf_hex(font, text, used)} Tj ET")
+
+    return _write_pdf(font, used, "\n".join(ops).encode("latin-1"), page_width, height)
+
+
+def _to_unicode_cmap(font: TrueTypeFont, used: Set[int]) -> bytes:
+    reverse: Dict[int, int] = {}
+    for code, gid in font.cmap.items():
+        if gid in used and gid not in reverse:
+            reverse[gid] = code
+    entries = [f"<{gid:04X}> <{code:04X}>" for gid, code in sorted(reverse.items()) if code <= 0xFFFF]
+    chunks = []
+    for i in range(0, len(entries), 100):
+        block = entries[i:i + 100]
+        chunks.append(f"{len(block)} beginbfchar\n" + "\n".join(block) + "\nendbfchar")
+    return (
+        "/CIDInit /ProcSet findresource begin 12 dict begin begincmap\n"
+        "/CIDSystemInfo << /Registry (Adobe) /Ordering (UCS) /Supplement 0 >> def\n"
+        "/CMapName /Adobe-Identity-UCS def /CMapType 2 def\n"
+        "1 begincodespacerange <0000> <FFFF> endcodespacerange\n"
+        + "\n".join(chunks)
+        + "\nendcmap CMapName currentdict /CMap defineresource pop end end"
+    ).encode("ascii")
+
+
+def _write_pdf(font: TrueTypeFont, used: Set[int], content: bytes, width: float, height: float) -> bytes:
+    scale = 1000 / font.units_per_em
+    font_name = "AAAAAA+" + "".join(ch for ch in os.path.splitext(os.path.basename(font.path))[0] if ch.isalnum())
+    font_file = zlib.compress(font.subset(used), 6)
+    widths = " ".join(f"{gid} [{font.scaled_advance(gid)}]" for gid in sorted(used))
+    bbox = " ".join(str(round(v * scale)) for v in font.bbox)
+    stream = zlib.compress(content, 6)
+
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        (
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {width:.2f} {height:.2f}] "
+            f"/Resources << /Font << /F1 5 0 R >> >> /Contents 4 0 R >>"
+        ).encode("ascii"),
+        b"<< /Length %d /Filter /FlateDecode >>\nstream\n%s\nendstream" % (len(stream), stream),
+        (
+            f"<< /Type /Font /Subtype /Type0 /BaseFont /{font_name} /Encoding /Identity-H "
+            f"/DescendantFonts [6 0 R] /ToUnicode 9 0 R >>"
+        ).encode("ascii"),
+        (
+            f"<< /Type /Font /Subtype /CIDFontType2 /BaseFont /{font_name} "
+            f"/CIDSystemInfo << /Registry (Adobe) /Ordering (Identity) /Supplement 0 >> "
+            f"/FontDescriptor 7 0 R /CIDToGIDMap /Identity /DW 1000 /W [{widths}] >>"
+        ).encode("ascii"),
+        (
+            f"<< /Type /FontDescriptor /FontName /{font_name} /Flags 4 /FontBBox [{bbox}] /ItalicAngle 0 "
+            f"/Ascent {round(font.ascent * scale)} /Descent {round(font.descent * scale)} "
+            f"/CapHeight {round(font.ascent * scale)} /StemV 80 /FontFile2 8 0 R >>"
+        ).encode("ascii"),
+        b"<< /Length %d /Filter /FlateDecode >>\nstream\n%s\nendstream" % (len(font_file), font_file),
+    ]
+    cmap = zlib.compress(_to_unicode_cmap(font, used), 6)
+    objects.append(b"<< /Length %d /Filter /FlateDecode >>\nstream\n%s\nendstream" % (len(cmap), cmap))
+
+    out = bytearray(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    for offset in offsets:
+        out += b"%010d 00000 n \n" % offset
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return bytes(out)
+
+
+# ---------------------------------------------------------------------------
+# ESC/POS output
+# ---------------------------------------------------------------------------
+
+ESC = b"\x1b"
+GS = b"\x1d"
+
+
+def _escpos_clean(text: str) -> str:
+    """Replace characters the printer code page lacks"""
+    for src, dst in ReceiptSettings.ESCPOS_REPLACEMENTS.items():
+        text = text.replace(src, dst)
+    return text
+
+
+def _escpos_text(text: str) -> bytes:
+    return text.encode(ReceiptSettings.ESCPOS_ENCODING, errors="replace")
+
+
+def render_receipt_escpos(
+    order: Dict,
+    business: Dict | None = None,
+    user_id: Optional[int] = None,
+    columns: int = ReceiptSettings.ESCPOS_COLUMNS,
+    cut: bool = True,
+    rtl: bool = True,
+) -> bytes:
+    """ESC/POS byte stream for a 58 mm printer (Font A, ``columns`` characters per line).
+    Thermal printers do not reorder bidirectional text, so rows are sent in
+    visual order.
+    """
+    out = bytearray(ESC + b"@" + ESC + b"t" + bytes([ReceiptSettings.ESCPOS_CODE_PAGE]))
+    for line in build_receipt_lines(order, business, user_id):
+        if line.rule:
+            out += ESC + b"a\x00" + b"-" * columns + b"\n"
+            continue
+        large = line.size >= ReceiptSettings.TITLE_FONT_SIZE
+        width = columns // 2 if large else columns
+        out += ESC + b"E" + (b"\x01" if line.bold else b"\x00")
+        out += GS + b"!" + (b"\x11" if large else b"\x00")
+        line_end = _escpos_clean(line.end)
+        end_len = len(line_end) + 1 if line_end else 0
+        parts = _wrap(_escpos_clean(line.start), lambda t: len(t) <= width - end_len)
+        for i, part in enumerate(parts):
+            end = line_end if i == len(parts) - 1 else ""
+            start = visual_order(part)
+            if line.align == "center":
+                out += ESC + b"a\x01" + _escpos_text(start)
+            else:
+                end = visual_order(end, rtl) if end else ""
+                pad = " " * max(width - len(start) - len(end), 1 if end else 0)
+                row = (end + pad + start) if rtl else (start + pad + end)
+                out += ESC + b"a" + (b"\x02" if rtl and not end else b"\x00") + _escpos_text(row)
+            out += b"\n"
+    out += ESC + b"E\x00" + GS + b"!\x00" + ESC + b"a\x00"
+    out += ESC + b"d" + bytes([ReceiptSettings.ESCPOS_FEED_LINES])
+    if cut:
+        out += GS + b"V\x42\x00"  # feed and partial cut
+    return bytes(out)
@@ -0,0 +1,570 @@
+"""
+In-process cache subsystem for the Samna Salta bot
+
+Caches are grouped into namespaces (products, settings, translations, ...).
+Each namespace is a size-bounded LRU store with per-entry TTLs, split into
+independently locked shards so that hot keys do not serialize on one lock.
+Lookups that produce no value can be cached as negative entries, and
+concurrent misses for the same key are collapsed into a single load.
+"""
+
+import asyncio
+import inspect
+import logging
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from functools import wraps
+from typing import Any, Awaitable, Callable, Dict, Generic, Hashable, Optional, Tuple, TypeVar
+
+from src.utils.constants import CacheNamespaces, CacheSettings
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+_MISSING = object()
+# Result handed to waiters when the leading task was cancelled: they retry the load
+_LEADER_CANCELLED = object()
+
+
+class CacheEntry(Generic[T]):
+    """Cache entry with timestamp and value"""
+
+    __slots__ = ("value", "expires_at", "created_at", "negative")
+
+    def __init__(self, value: T, ttl: float, negative: bool = False):
+        now = time.time()
+        self.value = value
+        self.expires_at = now + ttl
+        self.created_at = now
+        self.negative = negative
+
+    def is_expired(self, now: Optional[float] = None) -> bool:
+        """Check if cache entry is expired"""
+        return (now if now is not None else time.time()) > self.expires_at
+
+
+@dataclass
+class CacheStats:
+    """Hit/miss counters for a single namespace"""
+
+    hits: int = 0
+    negative_hits: int = 0
+    misses: int = 0
+    loads: int = 0
+    load_errors: int = 0
+    coalesced: int = 0
+    evictions: int = 0
+    expirations: int = 0
+    invalidations: int = 0
+
+    @property
+    def hit_ratio(self) -> float:
+        lookups = self.hits + self.negative_hits + self.misses
+        return (self.hits + self.negative_hits) / lookups if lookups else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        data["hit_ratio"] = round(self.hit_ratio, 4)
+        return data
+
+
+class _Shard:
+    """One independently locked LRU partition of a namespace"""
+
+    __slots__ = ("lock", "entries", "capacity", "stats")
+
+    def __init__(self, capacity: int):
+        self.lock = threading.Lock()
+        self.entries: "OrderedDict[Hashable, CacheEntry[Any]]" = OrderedDict()
+        self.capacity = capacity
+        # Updated under ``lock`` so hot lookups never touch a shared counter lock
+        self.stats = CacheStats()
+
+
+class _Flight:
+    """A load in progress that other threads can wait on"""
+
+    __slots__ = ("event", "value", "error", "owner")
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.value: Any = None
+        self.error: Optional[BaseException] = None
+        self.owner = threading.get_ident()
+
+
+class NamespacedCache:
+    """Size-bounded LRU+TTL cache for one namespace"""
+
+    def __init__(
+        self,
+        name: str,
+        max_entries: int = CacheSettings.DEFAULT_MAX_ENTRIES,
+        default_ttl: float = CacheSettings.GENERAL_CACHE_TTL_SECONDS,
+        negative_ttl: float = CacheSettings.NEGATIVE_CACHE_TTL_SECONDS,
+        shard_count: int = CacheSettings.DEFAULT_SHARD_COUNT,
+    ):
+        self.name = name
+        self.max_entries = max(1, int(max_entries))
+        self.default_ttl = default_ttl
+        self.negative_ttl = negative_ttl
+        shard_count = max(1, min(int(shard_count), self.max_entries))
+        per_shard = max(1, -(-self.max_entries // shard_count))
+        self._shards = tuple(_Shard(per_shard) for _ in range(shard_count))
+        self._load_stats = CacheStats()
+        self._flights: Dict[Hashable, _Flight] = {}
+        self._async_flights: Dict[Hashable, "asyncio.Future[Any]"] = {}
+        self._flights_lock = threading.Lock()
+
+    # Internal helpers
+
+    def _shard(self, key: Hashable) -> _Shard:
+        return self._shards[hash(key) % len(self._shards)]
+
+    def _count_load(self, field: str) -> None:
+        with self._flights_lock:
+            setattr(self._load_stats, field, getattr(self._load_stats, field) + 1)
+
+    def _lookup(self, key: Hashable) -> Tuple[bool, Any]:
+        """Return (found, value); negative entries are found with value None"""
+        shard = self._shard(key)
+        with shard.lock:
+            entry = shard.entries.get(key)
+            if entry is not None and entry.is_expired():
+                del shard.entries[key]
+                shard.stats.expirations += 1
+                entry = None
+            if entry is None:
+                shard.stats.misses += 1
+                return False, None
+            shard.entries.move_to_end(key)
+            if entry.negative:
+                shard.stats.negative_hits += 1
+            else:
+                shard.stats.hits += 1
+            return True, entry.value
+
+    def _store(self, key: Hashable, entry: CacheEntry[Any]) -> None:
+        shard = self._shard(key)
+        with shard.lock:
+            shard.entries[key] = entry
+            shard.entries.move_to_end(key)
+            if len(shard.entries) > shard.capacity:
+                # Reclaim expired entries first, then fall back to LRU order
+                shard.stats.expirations += self._purge_shard(shard, time.time())
+                while len(shard.entries) > shard.capacity:
+                    shard.entries.popitem(last=False)
+                    shard.stats.evictions += 1
+
+    @staticmethod
+    def _purge_shard(shard: _Shard, now: float) -> int:
+        """Drop expired entries; caller holds ``shard.lock``"""
+        stale = [k for k, e in shard.entries.items() if e.is_expired(now)]
+        for stale_key in stale:
+            del shard.entries[stale_key]
+        return len(stale)
+
+    def _store_loaded(self, key: Hashable, value: Any, ttl: Optional[float], cache_none: bool) -> None:
+        if value is None:
+            if cache_none:
+                self.set_negative(key)
+            return
+        self.set(key, value, ttl)
+
+    # Public API
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Get value from cache, or ``default`` when absent or negative"""
+        found, value = self._lookup(key)
+        return value if found and value is not None else default
+
+    def contains(self, key: Hashable) -> bool:
+        """Whether a live (possibly negative) entry exists for ``key``"""
+        return self._lookup(key)[0]
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        """Set value in cache with TTL"""
+        self._store(key, CacheEntry(value, self.default_ttl if ttl is None else ttl))
+
+    def set_negative(self, key: Hashable, ttl: Optional[float] = None) -> None:
+        """Remember that ``key`` has no value for a short while"""
+        self._store(key, CacheEntry(None, self.negative_ttl if ttl is None else ttl, negative=True))
+
+    def delete(self, key: Hashable) -> bool:
+        """Delete value from cache"""
+        shard = self._shard(key)
+        with shard.lock:
+            removed = shard.entries.pop(key, _MISSING) is not _MISSING
+            if removed:
+                shard.stats.invalidations += 1
+        return removed
+
+    def clear(self) -> int:
+        """Drop every entry in this namespace and return how many were removed"""
+        removed = 0
+        for shard in self._shards:
+            with shard.lock:
+                shard.stats.invalidations += len(shard.entries)
+                removed += len(shard.entries)
+                shard.entries.clear()
+        return removed
+
+    def purge_expired(self) -> int:
+        """Remove expired entries without waiting for them to be read"""
+        now = time.time()
+        removed = 0
+        for shard in self._shards:
+            with shard.lock:
+                purged = self._purge_shard(shard, now)
+                shard.stats.expirations += purged
+                removed += purged
+        return removed
+
+    def get_or_load(
+        self,
+        key: Hashable,
+        loader: Callable[[], T],
+        ttl: Optional[float] = None,
+        cache_none: bool = True,
+    ) -> Optional[T]:
+        """Return the cached value or load it once, even under concurrent misses"""
+        found, value = self._lookup(key)
+        if found:
+            return value
+
+        with self._flights_lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = _Flight()
+                self._flights[key] = flight
+
+        if not leader:
+            if flight.owner == threading.get_ident():
+                # Re-entrant load of the same key; waiting would deadlock
+                return loader()
+            self._count_load("coalesced")
+            flight.event.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+
+        try:
+            self._count_load("loads")
+            value = loader()
+            self._store_loaded(key, value, ttl, cache_none)
+            flight.value = value
+            return value
+        except BaseException as e:
+            self._count_load("load_errors")
+            flight.error = e
+            raise
+        finally:
+            with self._flights_lock:
+                self._flights.pop(key, None)
+            flight.event.set()
+
+    async def aget_or_load(
+        self,
+        key: Hashable,
+        loader: Callable[[], Awaitable[T]],
+        ttl: Optional[float] = None,
+        cache_none: bool = True,
+    ) -> Optional[T]:
+        """Async variant of :meth:`get_or_load` that coalesces awaiting tasks"""
+        loop = asyncio.get_running_loop()
+        while True:
+            found, value = self._lookup(key)
+            if found:
+                return value
+
+            with self._flights_lock:
+                pending = self._async_flights.get(key)
+                if pending is None or pending.get_loop() is not loop:
+                    pending = None
+                    future = loop.create_future()
+                    self._async_flights[key] = future
+            if pending is None:
+                break
+
+            self._count_load("coalesced")
+            value = await asyncio.shield(pending)
+            if value is not _LEADER_CANCELLED:
+                return value
+            # The leader was cancelled: retry, the first waiter to get here loads
+
+        try:
+            self._count_load("loads")
+            value = await loader()
+            self._store_loaded(key, value, ttl, cache_none)
+            future.set_result(value)
+            return value
+        except asyncio.CancelledError:
+            # Only this task was cancelled; the waiters must not be
+            future.set_result(_LEADER_CANCELLED)
+            raise
+        except BaseException as e:
+            self._count_load("load_errors")
+            future.set_exception(e)
+            # Waiters re-raise it; mark as retrieved so asyncio does not log it twice
+            future.exception()
+            raise
+        finally:
+            with self._flights_lock:
+                if self._async_flights.get(key) is future:
+                    del self._async_flights[key]
+
+    def stats(self) -> Dict[str, Any]:
+        """Snapshot of counters and occupancy"""
+        total = CacheStats()
+        with self._flights_lock:
+            total.loads = self._load_stats.loads
+            total.load_errors = self._load_stats.load_errors
+            total.coalesced = self._load_stats.coalesced
+        for shard in self._shards:
+            with shard.lock:
+                for field in ("hits", "negative_hits", "misses", "evictions", "expirations", "invalidations"):
+                    setattr(total, field, getattr(total, field) + getattr(shard.stats, field))
+        data = total.to_dict()
+        data["size"] = len(self)
+        data["max_entries"] = self.max_entries
+        return data
+
+    def __len__(self) -> int:
+        return sum(len(shard.entries) for shard in self._shards)
+
+
+# Per-namespace defaults: (ttl, max_entries)
+_NAMESPACE_DEFAULTS: Dict[str, Tuple[int, int]] = {
+    CacheNamespaces.GENERAL: (CacheSettings.GENERAL_CACHE_TTL_SECONDS, CacheSettings.DEFAULT_MAX_ENTRIES),
+    CacheNamespaces.PRODUCTS: (CacheSettings.PRODUCTS_CACHE_TTL_SECONDS, CacheSettings.DEFAULT_MAX_ENTRIES),
+    CacheNamespaces.CATEGORIES: (CacheSettings.PRODUCTS_CACHE_TTL_SECONDS, 256),
+    CacheNamespaces.SETTINGS: (CacheSettings.GENERAL_CACHE_TTL_SECONDS, 256),
+    CacheNamespaces.TRANSLATIONS: (CacheSettings.TRANSLATIONS_CACHE_TTL_SECONDS, 4096),
+    CacheNamespaces.AVAILABILITY: (CacheSettings.GENERAL_CACHE_TTL_SECONDS, 64),
+    CacheNamespaces.ORDERS: (CacheSettings.ORDERS_CACHE_TTL_SECONDS, 64),
+}
+
+
+class CacheRegistry:
+    """Owns every namespace so they can be invalidated and inspected together"""
+
+    def __init__(self):
+        self._namespaces: Dict[str, NamespacedCache] = {}
+        self._lock = threading.Lock()
+
+    def get(
+        self,
+        namespace: str,
+        max_entries: Optional[int] = None,
+        default_ttl: Optional[float] = None,
+        negative_ttl: Optional[float] = None,
+    ) -> NamespacedCache:
+        """Return the namespace, creating it on first use"""
+        cache = self._namespaces.get(namespace)
+        if cache is not None:
+            return cache
+        with self._lock:
+            cache = self._namespaces.get(namespace)
+            if cache is None:
+                ttl, size = _NAMESPACE_DEFAULTS.get(namespace, _NAMESPACE_DEFAULTS[CacheNamespaces.GENERAL])
+                cache = NamespacedCache(
+                    namespace,
+                    max_entries=max_entries or size,
+                    default_ttl=default_ttl if default_ttl is not None else ttl,
+                    negative_ttl=negative_ttl if negative_ttl is not None else CacheSettings.NEGATIVE_CACHE_TTL_SECONDS,
+                )
+                self._namespaces[namespace] = cache
+            return cache
+
+    def invalidate(self, *namespaces: str) -> int:
+        """Clear the given namespaces; unknown names are ignored"""
+        removed = 0
+        for namespace in namespaces:
+            cache = self._namespaces.get(namespace)
+            if cache is not None:
+                removed += cache.clear()
+        if namespaces:
+            logger.debug("Invalidated cache namespaces %s (%d entries)", list(namespaces), removed)
+        return removed
+
+    def clear_all(self) -> int:
+        """Clear every namespace"""
+        return self.invalidate(*list(self._namespaces))
+
+    def purge_expired(self) -> int:
+        """Sweep expired entries from every namespace"""
+        return sum(cache.purge_expired() for cache in list(self._namespaces.values()))
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Per-namespace hit/miss metrics"""
+        return {name: cache.stats() for name, cache in list(self._namespaces.items())}
+
+
+_registry = CacheRegistry()
+
+
+def get_cache_registry() -> CacheRegistry:
+    """Get the process-wide cache registry"""
+    return _registry
+
+
+def get_cache(namespace: str = CacheNamespaces.GENERAL) -> NamespacedCache:
+    """Get a cache namespace"""
+    return _registry.get(namespace)
+
+
+def invalidate_namespaces(*namespaces: str) -> int:
+    """Clear the given cache namespaces"""
+    return _registry.invalidate(*namespaces)
+
+
+def get_cache_stats() -> Dict[str, Dict[str, Any]]:
+    """Hit/miss metrics for every namespace"""
+    return _registry.stats()
+
+
+def _freeze(value: Any) -> Hashable:
+    """Turn nested dicts/lists into a hashable, order-independent form"""
+    if isinstance(value, dict):
+        return tuple(sorted((str(k), _freeze(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    if isinstance(value, (set, frozenset)):
+        return tuple(sorted(repr(v) for v in value))
+    try:
+        hash(value)
+        return value
+    except TypeError:
+        return repr(value)
+
+
+def make_key(*args: Any, **kwargs: Any) -> Hashable:
+    """Build a cache key from call arguments"""
+    return (_freeze(args), _freeze(kwargs)) if kwargs else _freeze(args)
+
+
+def cached(
+    ttl: Optional[int] = None,
+    namespace: str = CacheNamespaces.GENERAL,
+    key: Optional[Callable[..., Hashable]] = None,
+    cache_none: bool = True,
+):
+    """Cache decorator for sync and async functions
+
+    ``key`` receives the call arguments and returns the part of the key that
+    matters (for example the user's language instead of the user id). ``None``
+    results are stored as short-lived negative entries when ``cache_none``.
+    """
+
+    def decorator(func):
+        prefix = func.__qualname__
+
+        def build_key(args, kwargs) -> Hashable:
+            return (prefix, _freeze(key(*args, **kwargs)) if key else make_key(*args, **kwargs))
+
+        if inspect.iscoroutinefunction(func):
+
+            @wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                cache = _registry.get(namespace)
+                return await cache.aget_or_load(
+                    build_key(args, kwargs), lambda: func(*args, **kwargs), ttl, cache_none
+                )
+
+            wrapper = async_wrapper
+        else:
+
+            @wraps(func)
+            def sync_wrapper(*args, **kwargs):
+                cache = _registry.get(namespace)
+                return cache.get_or_load(build_key(args, kwargs), lambda: func(*args, **kwargs), ttl, cache_none)
+
+            wrapper = sync_wrapper
+
+        wrapper.cache_namespace = namespace
+        wrapper.invalidate = lambda *args, **kwargs: _registry.get(namespace).delete(build_key(args, kwargs))
+        return wrapper
+
+    return decorator
+
+
+class VersionedSnapshot(Generic[T]):
+    """Holds one immutable value that is rebuilt only when its version is bumped
+
+    ``loader(version)`` builds the value. If a rebuild fails the previous
+    value keeps being served and the rebuild is retried after
+    ``retry_seconds``. With no previous value, ``fallback(version)`` is served
+    instead when given and not None; otherwise the error propagates.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        loader: Callable[[int], T],
+        retry_seconds: float,
+        fallback: Optional[Callable[[int], T]] = None,
+    ):
+        self.name = name
+        self._loader = loader
+        self._fallback = fallback
+        self._retry_seconds = retry_seconds
+        self._reload_lock = threading.Lock()
+        self._version_lock = threading.Lock()
+        self._version = 1
+        self._value: Optional[T] = None
+        self._value_version = 0
+        self._retry_after = 0.0
+
+    @property
+    def version(self) -> int:
+        return self._version
+
+    def bump(self) -> int:
+        """Mark the value stale; the next read rebuilds it"""
+        with self._version_lock:
+            self._version += 1
+            return self._version
+
+    def reset(self) -> None:
+        """Drop the held value entirely (used by tests and shutdown)"""
+        with self._reload_lock:
+            self._value = None
+            self._value_version = 0
+            self._retry_after = 0.0
+
+    def peek(self) -> Optional[T]:
+        """Current value without triggering a reload"""
+        return self._value
+
+    def get(self) -> T:
+        value = self._value
+        if value is not None and (self._value_version == self._version or time.monotonic() < self._retry_after):
+            return value
+
+        with self._reload_lock:
+            value = self._value
+            version = self._version
+            if value is not None and self._value_version == version:
+                return value
+            try:
+                new_value = self._loader(version)
+            except Exception as e:
+                if value is None:
+                    value = self._fallback(version) if self._fallback is not None else None
+                    if value is None:
+                        raise
+                    # Served until the retry succeeds; version 0 never matches
+                    self._value = value
+                    self._value_version = 0
+                self._retry_after = time.monotonic() + self._retry_seconds
+                logger.warning("Failed to reload %s, serving version %d: %s", self.name, self._value_version, e)
+                return value
+            self._value = new_value
+            self._value_version = version
+            self._retry_after = 0.0
+            logger.debug("Loaded %s version %d", self.name, version)
+            return new_value
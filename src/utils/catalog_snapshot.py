@@ -0,0 +1,338 @@
+"""
+Disk-persisted catalog snapshot
+
+The customer-facing catalog (categories, products, option configs, business
+settings and constants) is small and changes only when an admin edits it.
+It is kept in memory and mirrored to a compact, checksummed file so that:
+
+- right after boot the menu is served from the file before the database
+  has even been reached, and
+- during a database outage menu browsing keeps working from the last good
+  snapshot instead of failing on every screen.
+
+Menu reads go through ``catalog_read``: they are served from memory while
+the snapshot is current, from the database after an invalidation until the
+background refresher has rebuilt it, and from the last snapshot if the
+database read fails.
+"""
+
+import gzip
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from dataclasses import dataclass
+from functools import wraps
+from pathlib import Path
+from types import MappingProxyType
+from typing import Any, Callable, Dict, List, Mapping, Optional
+
+from src.utils.constants import CacheNamespaces, CatalogSnapshotSettings
+
+logger = logging.getLogger(__name__)
+
+# Namespaces whose invalidation makes the catalog stale
+CATALOG_NAMESPACES = (
+    CacheNamespaces.PRODUCTS,
+    CacheNamespaces.CATEGORIES,
+    CacheNamespaces.SETTINGS,
+    CacheNamespaces.CONSTANTS,
+)
+
+
+class CatalogSnapshotError(Exception):
+    """Raised when a snapshot file is unreadable, corrupt or of another format"""
+
+
+def _json_keys(value: Any) -> Any:
+    # The unlocalized display name is keyed by None, which sort_keys rejects
+    if isinstance(value, dict):
+        return {("null" if k is None else k): _json_keys(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_json_keys(v) for v in value]
+    return value
+
+
+def _canonical_json(payload: Dict[str, Any]) -> bytes:
+    return json.dumps(
+        _json_keys(payload), sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str
+    ).encode("utf-8")
+
+
+def _restore_constants(constants: Dict[str, List[Dict[str, Any]]]) -> Dict[str, List[Dict[str, Any]]]:
+    for rows in constants.values():
+        for row in rows:
+            names = row.get("display_names")
+            if isinstance(names, dict) and "null" in names:
+                names[None] = names.pop("null")
+    return constants
+
+
+@dataclass(frozen=True)
+class CatalogSnapshot:
+    """One immutable catalog version"""
+
+    version: int
+    checksum: str
+    created_at: float
+    payload: Mapping[str, Any]
+
+    @classmethod
+    def build(cls, payload: Dict[str, Any], version: int) -> "CatalogSnapshot":
+        # Round-trip through JSON so in-memory and on-disk snapshots are identical
+        canonical = _canonical_json(payload)
+        data = json.loads(canonical)
+        _restore_constants(data.get("constants") or {})
+        return cls(version, hashlib.sha256(canonical).hexdigest(), time.time(), MappingProxyType(data))
+
+    # ------------------------------------------------------------- persistence
+
+    def to_bytes(self) -> bytes:
+        header = {
+            "format": CatalogSnapshotSettings.FORMAT_VERSION,
+            "version": self.version,
+            "checksum": self.checksum,
+            "created_at": self.created_at,
+        }
+        body = b"%s\n%s" % (json.dumps(header).encode("utf-8"), _canonical_json(dict(self.payload)))
+        return gzip.compress(body, compresslevel=6)
+
+    @classmethod
+    def from_bytes(cls, blob: bytes) -> "CatalogSnapshot":
+        try:
+            header_line, body = gzip.decompress(blob).split(b"\n", 1)
+            header = json.loads(header_line)
+        except Exception as e:
+            raise CatalogSnapshotError(f"unreadable snapshot: {e}") from e
+        if header.get("format") != CatalogSnapshotSettings.FORMAT_VERSION:
+            raise CatalogSnapshotError(f"unsupported snapshot format {header.get('format')}")
+        if hashlib.sha256(body).hexdigest() != header.get("checksum"):
+            raise CatalogSnapshotError("snapshot checksum mismatch")
+        data = json.loads(body)
+        _restore_constants(data.get("constants") or {})
+        return cls(int(header["version"]), header["checksum"], float(header["created_at"]), MappingProxyType(data))
+
+    # ----------------------------------------------------------------- queries
+    # Rows are rebuilt as detached model instances so callers keep working
+    # with the same attributes and helpers as database results.
+
+    @property
+    def settings(self) -> Dict[str, Any]:
+        return dict(self.payload.get("settings") or {})
+
+    @property
+    def constants(self) -> Dict[str, List[Dict[str, Any]]]:
+        return self.payload.get("constants") or {}
+
+    def _category_rows(self) -> List[Dict[str, Any]]:
+        return self.payload.get("categories") or []
+
+    def _product_rows(self) -> List[Dict[str, Any]]:
+        return self.payload.get("products") or []
+
+    def _category_row(self, name: str) -> Optional[Dict[str, Any]]:
+        for row in self._category_rows():
+            if row["name_en"] == name or row["name_he"] == name:
+                return row
+        return None
+
+    @staticmethod
+    def _make_category(row: Dict[str, Any]):
+        from src.db.models import MenuCategory
+        return MenuCategory(**row)
+
+    def _make_products(self, rows: List[Dict[str, Any]]) -> list:
+        from src.db.models import Product
+        categories = {row["id"]: self._make_category(row) for row in self._category_rows()}
+        return [Product(**row, category_rel=categories.get(row["category_id"])) for row in rows]
+
+    def category(self, name: str):
+        row = self._category_row(name)
+        return self._make_category(row) if row else None
+
+    def category_names(self, with_active_products: bool = False) -> List[str]:
+        if with_active_products:
+            used = {p["category_id"] for p in self._product_rows() if p["is_active"]}
+            return [c["name_en"] for c in self._category_rows() if c["id"] in used]
+        return [c["name_en"] for c in self._category_rows() if c["is_active"]]
+
+    def product(self, product_id: int):
+        rows = [p for p in self._product_rows() if p["id"] == product_id]
+        return self._make_products(rows)[0] if rows else None
+
+    def active_products(self) -> list:
+        return self._make_products([p for p in self._product_rows() if p["is_active"]])
+
+    def products_in_category(self, category: str, include_inactive: bool = False) -> list:
+        row = self._category_row(category)
+        if row is None:
+            return []
+        return self._make_products(
+            [p for p in self._product_rows() if p["category_id"] == row["id"] and (include_inactive or p["is_active"])]
+        )
+
+    def option_config(self, product_id: int) -> Dict[str, Any]:
+        config = (self.payload.get("option_configs") or {}).get(str(product_id))
+        return json.loads(json.dumps(config)) if config else {"rules": [], "choices": {}}
+
+
+class CatalogStore:
+    """Holds the current catalog snapshot and keeps it and its file fresh"""
+
+    def __init__(self, path: Optional[str] = None, loader: Optional[Callable[[], Dict[str, Any]]] = None):
+        self._path = Path(path) if path else None
+        self._loader = loader
+        self._snapshot: Optional[CatalogSnapshot] = None
+        self._stale = True
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def path(self) -> Path:
+        if self._path is None:
+            from src.config import get_config
+            self._path = Path(get_config().catalog_snapshot_path)
+        return self._path
+
+    def current(self) -> Optional[CatalogSnapshot]:
+        """Snapshot to serve reads from, or None while it is stale"""
+        return None if self._stale else self._snapshot
+
+    def latest(self) -> Optional[CatalogSnapshot]:
+        """Last known snapshot even if stale (outage fallback)"""
+        return self._snapshot
+
+    def mark_stale(self, *_args) -> None:
+        """Route reads to the database until the next refresh"""
+        self._stale = True
+        self._wake.set()
+
+    def load_from_disk(self) -> Optional[CatalogSnapshot]:
+        """Load the persisted snapshot; a missing or corrupt file is ignored"""
+        try:
+            snapshot = CatalogSnapshot.from_bytes(self.path.read_bytes())
+        except FileNotFoundError:
+            logger.info("No catalog snapshot at %s", self.path)
+            return None
+        except (OSError, CatalogSnapshotError) as e:
+            logger.warning("Ignoring catalog snapshot %s: %s", self.path, e)
+            return None
+        with self._lock:
+            if self._snapshot is None:
+                self._snapshot = snapshot
+                self._stale = False
+        logger.info("Loaded catalog snapshot version %d from %s", snapshot.version, self.path)
+        return snapshot
+
+    def refresh(self) -> CatalogSnapshot:
+        """Rebuild the snapshot from the database and persist it if it changed"""
+        with self._refresh_lock:
+            self._wake.clear()
+            loader = self._loader
+            if loader is None:
+                from src.db.operations import load_catalog_tables  # lazy import to avoid cycles
+                loader = load_catalog_tables
+            payload = loader()
+            current = self._snapshot
+            snapshot = CatalogSnapshot.build(payload, (current.version + 1) if current else 1)
+            if current is not None and current.checksum == snapshot.checksum:
+                snapshot = current
+            with self._lock:
+                self._snapshot = snapshot
+                # An invalidation that arrived during the load keeps us stale
+                if not self._wake.is_set():
+                    self._stale = False
+            if snapshot is not current:
+                self._persist(snapshot)
+            return snapshot
+
+    def _persist(self, snapshot: CatalogSnapshot) -> None:
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=self.path.parent, prefix=".catalog-")
+            with os.fdopen(fd, "wb") as f:
+                f.write(snapshot.to_bytes())
+            os.replace(tmp, self.path)
+            logger.info("Persisted catalog snapshot version %d to %s", snapshot.version, self.path)
+        except OSError as e:
+            logger.warning("Failed to persist catalog snapshot: %s", e)
+
+    def start(self, interval: float = CatalogSnapshotSettings.REFRESH_INTERVAL_SECONDS) -> None:
+        """Refresh now and then in the background on invalidation or every ``interval``"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._wake.set()
+        self._thread = threading.Thread(target=self._run, args=(interval,), name="catalog-refresher", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._wake.set()
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join(timeout=5)
+        self._thread = None
+
+    def _run(self, interval: float) -> None:
+        while not self._stop.is_set():
+            self._wake.wait(interval)
+            if self._stop.is_set():
+                break
+            # Let a burst of admin edits settle into one rebuild
+            self._stop.wait(CatalogSnapshotSettings.STALE_REFRESH_DELAY_SECONDS)
+            try:
+                self.refresh()
+            except Exception as e:
+                logger.warning("Catalog refresh failed, serving last snapshot: %s", e)
+                self._stop.wait(CatalogSnapshotSettings.RETRY_DELAY_SECONDS)
+                if self._stale:
+                    self._wake.set()
+
+
+_store = CatalogStore()
+
+
+def get_catalog_store() -> CatalogStore:
+    """Get the process-wide catalog store"""
+    return _store
+
+
+def attach_catalog_store(bus) -> CatalogStore:
+    """Mark the catalog stale whenever one of its namespaces is invalidated"""
+    for namespace in CATALOG_NAMESPACES:
+        bus.subscribe(namespace, _store.mark_stale)
+    return _store
+
+
+def catalog_read(select: Callable[..., Any]):
+    """Serve a read from the catalog snapshot, falling back to it on DB failure
+
+    ``select(catalog, *args, **kwargs)`` answers the call from a snapshot.
+    """
+
+    def decorator(func: Callable) -> Callable:
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            catalog = _store.current()
+            if catalog is not None:
+                return select(catalog, *args, **kwargs)
+            try:
+                return func(*args, **kwargs)
+            except Exception as e:
+                catalog = _store.latest()
+                if catalog is None:
+                    raise
+                logger.warning(
+                    "%s failed, serving catalog snapshot version %d: %s", func.__name__, catalog.version, e
+                )
+                return select(catalog, *args, **kwargs)
+
+        return wrapper
+
+    return decorator
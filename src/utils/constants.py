@@ -18,6 +18,19 @@ class RetrySettings:
     CONNECTION_TIMEOUT_SECONDS: Final[int] = 60
 
 
+class DatabaseRetrySettings:
+    """Database retry backoff and circuit breaker"""
+
+    MAX_ATTEMPTS: Final[int] = 3
+    BASE_DELAY_SECONDS: Final[float] = 0.2
+    MAX_DELAY_SECONDS: Final[float] = 2.0
+    # Synchronous calls on the event-loop thread retry once, without sleeping
+    LOOP_THREAD_MAX_ATTEMPTS: Final[int] = 2
+    BREAKER_FAILURE_THRESHOLD: Final[int] = 5  # consecutive failures that open the breaker
+    BREAKER_RESET_SECONDS: Final[float] = 30.0  # open time before one probe call is let through
+    PRIMARY_TARGET: Final[str] = "primary"
+
+
 # Database configuration constants
 class DatabaseSettings:
     """Database connection and pool configuration"""
@@ -34,6 +47,80 @@ class DatabaseSettings:
     DEVELOPMENT_POOL_SIZE: Final[int] = 5
     DEVELOPMENT_MAX_OVERFLOW: Final[int] = 10
 
+    # Sent once per connection as a startup option instead of per transaction
+    LOCK_TIMEOUT_SECONDS: Final[int] = 30
+
+    # Connection liveness: TCP keepalives detect dead peers in the background;
+    # a connection is only pinged on checkout after sitting idle this long
+    LIVENESS_IDLE_SECONDS: Final[int] = 300
+    TCP_KEEPALIVE_IDLE_SECONDS: Final[int] = 30
+    TCP_KEEPALIVE_INTERVAL_SECONDS: Final[int] = 10
+    TCP_KEEPALIVE_COUNT: Final[int] = 3
+
+
+class SchemaSettings:
+    """Schema version stamp checked at startup"""
+
+    VERSION_TABLE: Final[str] = "schema_version"
+    ADVISORY_LOCK_ID: Final[int] = 0x53414D4E  # serializes concurrent Postgres bootstraps
+
+
+class PoolSettings:
+    """Connection pool monitoring, pooler profile and adaptive sizing"""
+
+    TIMEOUT_SECONDS: Final[float] = 10.0  # wait for a connection before failing
+    WAIT_BUCKETS: Final[tuple] = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0)
+    # Pool modes: "session" keeps a QueuePool; "transaction" is for PgBouncer /
+    # Supavisor in transaction mode; "auto" picks transaction on the pooler port
+    MODES: Final[tuple] = ("auto", "session", "transaction")
+    TRANSACTION_POOLER_PORT: Final[int] = 6543  # Supavisor transaction mode
+    # Adaptive sizing follows the peak concurrent checkouts of each window
+    ADAPTIVE_WINDOW_SECONDS: Final[float] = 60.0
+    ADAPTIVE_HEADROOM: Final[float] = 1.25
+    ADAPTIVE_MIN_SIZE: Final[int] = 2
+
+
+class ReplicaSettings:
+    """Read-replica routing"""
+
+    TARGET: Final[str] = "replica"  # pool and circuit breaker name
+    MAX_LAG_SECONDS: Final[float] = 5.0  # replay lag above which reads go to the primary
+    LAG_CHECK_INTERVAL_SECONDS: Final[float] = 5.0
+    # Reads stay on the primary this long after any write, so flows that
+    # re-read what was just written never see the replica behind
+    READ_AFTER_WRITE_SECONDS: Final[float] = 5.0
+
+
+class PartitionSettings:
+    """Monthly hot/cold partitions of orders and order_items on PostgreSQL"""
+
+    TABLES: Final[tuple] = ("orders", "order_items")  # in conversion order
+    MONTHS_AHEAD: Final[int] = 2  # hot partitions created ahead of the current month
+    ARCHIVE_AFTER_MONTHS: Final[int] = 6
+    ARCHIVE_STATUSES: Final[tuple] = ("delivered", "cancelled")
+    ARCHIVE_BATCH_SIZE: Final[int] = 5000  # orders moved per transaction
+    MAINTENANCE_INTERVAL_SECONDS: Final[float] = 6 * 3600
+    # Attaching or detaching a partition waits for readers of the default
+    # partition; give up and retry on the next run instead of queueing orders
+    LOCK_TIMEOUT_MS: Final[int] = 5000
+
+
+class SQLiteSettings:
+    """Connection tuning for running on an embedded SQLite database file"""
+
+    # Wait this long for the write lock instead of failing with "database is locked"
+    BUSY_TIMEOUT_MS: Final[int] = DatabaseSettings.LOCK_TIMEOUT_SECONDS * 1000
+    # Applied to every new connection, in order
+    PRAGMAS: Final[tuple] = (
+        ("journal_mode", "WAL"),  # readers never block the writer and vice versa
+        ("synchronous", "NORMAL"),  # fsync at checkpoints only; safe with WAL
+        ("foreign_keys", "ON"),
+        ("temp_store", "MEMORY"),
+        ("cache_size", -64000),  # KiB (negative), per connection
+        ("mmap_size", 256 * 1024 * 1024),
+        ("wal_autocheckpoint", 1000),  # pages
+    )
+
 
 # Logging configuration constants
 class LoggingSettings:
@@ -60,6 +147,162 @@ class CacheSettings:
     CUSTOMERS_CACHE_TTL_SECONDS: Final[int] = 300  # 5 minutes
     ORDERS_CACHE_TTL_SECONDS: Final[int] = 180  # 3 minutes
     GENERAL_CACHE_TTL_SECONDS: Final[int] = 300  # 5 minutes
+    TRANSLATIONS_CACHE_TTL_SECONDS: Final[int] = 3600  # 1 hour
+    NEGATIVE_CACHE_TTL_SECONDS: Final[int] = 30
+    DEFAULT_MAX_ENTRIES: Final[int] = 2048
+    DEFAULT_SHARD_COUNT: Final[int] = 8
+    SETTINGS_RELOAD_RETRY_SECONDS: Final[int] = 10
+
+
+# Cache namespaces
+class CacheNamespaces:
+    """Names of the in-process cache namespaces"""
+
+    GENERAL: Final[str] = "general"
+    PRODUCTS: Final[str] = "products"
+    CATEGORIES: Final[str] = "categories"
+    SETTINGS: Final[str] = "settings"
+    TRANSLATIONS: Final[str] = "translations"
+    AVAILABILITY: Final[str] = "availability"
+    ORDERS: Final[str] = "orders"  # analytics computed from orders
+    # Not a cache namespace: the constants registry in ConstantsManager
+    CONSTANTS: Final[str] = "constants"
+
+
+# Disk-persisted catalog snapshot
+class CatalogSnapshotSettings:
+    """Catalog snapshot file and refresh settings"""
+
+    FORMAT_VERSION: Final[int] = 1
+    REFRESH_INTERVAL_SECONDS: Final[int] = 300  # 5 minutes
+    STALE_REFRESH_DELAY_SECONDS: Final[float] = 0.5  # debounce bursts of admin edits
+    RETRY_DELAY_SECONDS: Final[int] = 15
+
+
+# Cross-process invalidation bus
+class InvalidationBusSettings:
+    """Postgres LISTEN/NOTIFY invalidation bus settings"""
+
+    CHANNEL: Final[str] = "samna_cache_invalidation"
+    POLL_TIMEOUT_SECONDS: Final[float] = 5.0
+    RECONNECT_DELAY_SECONDS: Final[float] = 5.0
+
+
+# Invoice/receipt PDF rendering
+class PdfRenderSettings:
+    """Headless Chromium pool settings for invoice PDFs"""
+
+    DEFAULT_POOL_SIZE: Final[int] = 2  # warm browser contexts
+    QUEUE_SIZE: Final[int] = 32  # pending render jobs before callers are rejected
+    RENDER_TIMEOUT_SECONDS: Final[int] = 30
+    PAGE_RECYCLE_AFTER: Final[int] = 200  # renders before a page is replaced
+    INSTALL_TIMEOUT_SECONDS: Final[int] = 300
+    LAUNCH_RETRY_SECONDS: Final[int] = 60  # renders fail fast this long after a failed launch
+    CACHE_MAX_BYTES: Final[int] = 100 * 1024 * 1024  # on-disk PDF cache budget
+    CHROMIUM_ARGS: Final[tuple] = (
+        "--no-sandbox",
+        "--disable-setuid-sandbox",
+        "--disable-dev-shm-usage",
+        "--disable-gpu",
+    )
+
+class LoopWatchdogSettings:
+    """Event-loop lag measurement and blocking-call sampling"""
+
+    INTERVAL_SECONDS: Final[float] = 0.1  # heartbeat period on the loop
+    THRESHOLD_SECONDS: Final[float] = 0.25  # lag reported as a stall
+    SAMPLE_INTERVAL_SECONDS: Final[float] = 0.05  # how often the helper thread checks the heartbeat
+    LAG_BUCKETS: Final[tuple] = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+    STACK_DEPTH: Final[int] = 12  # frames logged per stall
+    TOP_SITES: Final[int] = 10
+
+
+class TaskPoolSettings:
+    """Background task pools: (max running, max waiting) per pool"""
+
+    PDF: Final[str] = "pdf"
+    INVOICE_EXPORT: Final[str] = "invoice_export"  # end-of-day invoice ZIPs
+    EXPORT: Final[str] = "export"  # /export_orders
+    IMPORT: Final[str] = "import"  # /import
+    LIMITS: Final[dict] = {
+        PDF: (2, 16),
+        INVOICE_EXPORT: (1, 2),
+        EXPORT: (1, 2),
+        IMPORT: (1, 2),
+    }
+    SHUTDOWN_TIMEOUT_SECONDS: Final[float] = 20.0  # drain time before tasks are cancelled
+
+
+class InvoiceExportSettings:
+    """End-of-day invoice ZIP export"""
+
+    CONCURRENCY: Final[int] = 4  # invoices rendered at once
+    PAGE_SIZE: Final[int] = 50  # orders fetched per query
+    PROGRESS_INTERVAL_SECONDS: Final[float] = 3.0
+    SPOOL_MAX_BYTES: Final[int] = 16 * 1024 * 1024  # ZIP kept in memory up to this size
+
+
+class OrderStatusGroups:
+    """Order statuses grouped by lifecycle stage"""
+
+    # Orders still being worked on; matches the partial indexes on orders
+    ACTIVE: Final[tuple] = ("pending", "confirmed", "preparing", "missing", "ready")
+    IN_PROGRESS: Final[tuple] = ("confirmed", "preparing", "ready")
+    ALL: Final[tuple] = ACTIVE + ("delivered", "cancelled")
+
+
+class OrderExportSettings:
+    """Streaming CSV/Parquet export of orders for accounting"""
+
+    FORMATS: Final[tuple] = ("csv", "parquet")
+    BATCH_SIZE: Final[int] = 1000  # rows fetched per cursor round trip
+    MAX_UPLOAD_BYTES: Final[int] = 50 * 1024 * 1024  # Telegram bot API document limit
+
+
+class BulkImportSettings:
+    """CSV/YAML bulk import of customers and the menu"""
+
+    # Processed in this order so products can refer to the categories and
+    # options of the same file
+    KINDS: Final[tuple] = ("categories", "options", "products", "customers")
+    FORMATS: Final[tuple] = (".csv", ".yaml", ".yml")
+    BATCH_SIZE: Final[int] = 500  # rows written per statement
+    MAX_FILE_BYTES: Final[int] = 10 * 1024 * 1024
+    MAX_REPORTED_ERRORS: Final[int] = 20  # row errors kept for the report; all are counted
+
+
+class OrderHistorySettings:
+    """Closed months of orders stored as memory-mapped column files"""
+
+    MANIFEST: Final[str] = "manifest.json"
+    FORMAT_VERSION: Final[int] = 1
+    # A month is closed this long after it ends, once none of its orders is active
+    CLOSE_AFTER_DAYS: Final[int] = 7
+    EXPORT_INTERVAL_SECONDS: Final[float] = 24 * 3600
+
+
+class ReceiptSettings:
+    """Native 58 mm thermal receipt rendering"""
+
+    PAPER_WIDTH_MM: Final[int] = 58
+    MARGIN_MM: Final[int] = 3
+    FONT_SIZE: Final[float] = 8.0
+    SMALL_FONT_SIZE: Final[float] = 7.0
+    TITLE_FONT_SIZE: Final[float] = 11.0
+    # System fonts, tried if the bundled one is missing from a deployment
+    FONT_CANDIDATES: Final[tuple] = (
+        "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf",
+        "/usr/share/fonts/truetype/noto/NotoSansHebrew-Regular.ttf",
+        "/usr/share/fonts/truetype/freefont/FreeSans.ttf",
+        "/Library/Fonts/Arial Unicode.ttf",
+        "C:/Windows/Fonts/arial.ttf",
+    )
+    ESCPOS_COLUMNS: Final[int] = 32  # Font A on 58 mm paper
+    ESCPOS_CODE_PAGE: Final[int] = 15  # PC862 Hebrew on most Epson-compatible printers
+    ESCPOS_ENCODING: Final[str] = "cp862"
+    ESCPOS_FEED_LINES: Final[int] = 3
+    ESCPOS_REPLACEMENTS: Final[dict] = {"₪": "NIS", "×": "x", "״": '"', "׳": "'"}
+
 
 
 # Performance monitoring constants
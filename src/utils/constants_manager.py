@@ -6,178 +6,249 @@ with database-driven values that support multilingual content.
 """
 
 import logging
-from typing import Optional, Dict, List, Any
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Optional, Dict, List, Any, Mapping, Tuple
 from src.db.operations import (
     get_product_options,
     get_product_sizes,
     get_order_statuses,
     get_delivery_methods,
     get_payment_methods,
-    get_localized_constant,
-    get_delivery_charge
+    load_constant_tables,
 )
+from src.utils.cache import VersionedSnapshot
+from src.utils.constants import CacheSettings
 
 logger = logging.getLogger(__name__)
 
 
+# Hardcoded fallbacks, used when a constant is missing from the database
+_FALLBACK_PRODUCT_OPTIONS = {
+    "kubaneh_type": {
+        "classic": {"en": "Classic", "he": "קלאסית"},
+        "seeded": {"en": "Seeded", "he": "עם זרעים"},
+        "herb": {"en": "Herb", "he": "עשבי תיבול"},
+        "aromatic": {"en": "Aromatic", "he": "ארומטי"}
+    },
+    "samneh_type": {
+        "classic": {"en": "Classic", "he": "קלאסי"},
+        "spicy": {"en": "Spicy", "he": "חריף"},
+        "herb": {"en": "Herb", "he": "עשבי תיבול"},
+        "honey": {"en": "Honey", "he": "דבש"},
+        "smoked": {"en": "Smoked", "he": "מעושן"},
+        "not_smoked": {"en": "Not Smoked", "he": "לא מעושן"}
+    },
+    "hilbeh_type": {
+        "classic": {"en": "Classic", "he": "קלאסי"},
+        "spicy": {"en": "Spicy", "he": "חריף"},
+        "sweet": {"en": "Sweet", "he": "מתוק"},
+        "premium": {"en": "Premium", "he": "פרימיום"}
+    }
+}
+
+_FALLBACK_CONSTANTS = {
+    "product_size": {
+        "small": {"en": "Small", "he": "קטן"},
+        "medium": {"en": "Medium", "he": "בינוני"},
+        "large": {"en": "Large", "he": "גדול"},
+        "xl": {"en": "Extra Large", "he": "גדול מאוד"}
+    },
+    "order_status": {
+        "pending": {"en": "Pending", "he": "ממתין"},
+        "confirmed": {"en": "Confirmed", "he": "אושר"},
+        "preparing": {"en": "Preparing", "he": "בהכנה"},
+        "ready": {"en": "Ready", "he": "מוכן"},
+        "delivered": {"en": "Delivered", "he": "נמסר"},
+        "cancelled": {"en": "Cancelled", "he": "בוטל"}
+    },
+    "delivery_method": {
+        "pickup": {"en": "Pickup (Free)", "he": "איסוף עצמי (חינם)"},
+        "delivery": {"en": "Delivery (+5 ₪)", "he": "משלוח (+5 ₪)"}
+    },
+    "payment_method": {
+        "cash": {"en": "Cash", "he": "מזומן"}
+    },
+}
+
+_FALLBACK_DELIVERY_CHARGES = {
+    "pickup": 0.0,
+    "delivery": 5.0
+}
+
+
+def _compile_default_layer() -> Mapping[Tuple[str, str, str], str]:
+    """Flatten the fallbacks into one (type, name, language) lookup table"""
+    layer = {}
+    # Product option fallbacks are keyed by their option type (e.g. 'kubaneh_type')
+    for table in (_FALLBACK_PRODUCT_OPTIONS, _FALLBACK_CONSTANTS):
+        for constant_type, names in table.items():
+            for name, labels in names.items():
+                for language, label in labels.items():
+                    layer[(constant_type, name, language)] = label
+    return MappingProxyType(layer)
+
+
+DEFAULT_CONSTANT_NAMES = _compile_default_layer()
+
+
+@dataclass(frozen=True)
+class DeliveryAreaInfo:
+    """Read-only delivery area, detached from any database session"""
+
+    id: int
+    name_en: str
+    name_he: str
+    charge: Optional[float]
+    is_active: bool
+    display_order: int
+
+    def get_localized_name(self, language: str = "he") -> str:
+        if language == "he":
+            return self.name_he or self.name_en
+        return self.name_en or self.name_he
+
+
+@dataclass(frozen=True)
+class ConstantsRegistry:
+    """All constant tables for one registry version.
+
+    ``display_names`` is keyed by (type, name, language). Product options are
+    stored under 'product_option' and under their own option type; the
+    language ``None`` entry is the unlocalized display name.
+    """
+
+    version: int
+    display_names: Mapping[Tuple[str, str, Optional[str]], str]
+    delivery_charges: Mapping[str, float]
+    delivery_areas: Tuple[DeliveryAreaInfo, ...]
+
+    def display_name(self, constant_type: str, name: str, language: str) -> Optional[str]:
+        names = self.display_names
+        return names.get((constant_type, name, language)) or names.get((constant_type, name, None))
+
+    def delivery_area(self, area_id: int) -> Optional[DeliveryAreaInfo]:
+        return next((a for a in self.delivery_areas if a.id == area_id), None)
+
+
+def build_constants_registry(tables: Dict[str, List[Dict[str, Any]]], version: int) -> ConstantsRegistry:
+    """Index the rows returned by ``load_constant_tables``"""
+    names: Dict[Tuple[str, str, Optional[str]], str] = {}
+    for constant_type, rows in tables.items():
+        if constant_type == "delivery_area":
+            continue
+        for row in rows:
+            for language, label in row["display_names"].items():
+                if not label:
+                    continue
+                # Rows arrive in display order; the first match wins, like .first()
+                names.setdefault((constant_type, row["name"], language), label)
+                if row.get("option_type"):
+                    names.setdefault((row["option_type"], row["name"], language), label)
+    charges = {
+        row["name"]: float(row["charge"] or 0.0)
+        for row in tables.get("delivery_method", [])
+    }
+    areas = tuple(DeliveryAreaInfo(**row) for row in tables.get("delivery_area", []))
+    return ConstantsRegistry(
+        version=version,
+        display_names=MappingProxyType(names),
+        delivery_charges=MappingProxyType(charges),
+        delivery_areas=areas,
+    )
+
+
+def _fallback_registry(version: int) -> ConstantsRegistry:
+    """Registry from the persisted catalog snapshot, else only the default layer"""
+    from src.utils.catalog_snapshot import get_catalog_store  # lazy import to avoid cycles
+    catalog = get_catalog_store().latest()
+    return build_constants_registry(dict(catalog.constants) if catalog else {}, version)
+
+
 class ConstantsManager:
-    """Manager for database-driven constants"""
-    
+    """Manager for database-driven constants.
+
+    Lookups resolve against an in-memory registry of every constants table,
+    loaded once and rebuilt only after ``invalidate()``; anything missing
+    from the database falls through to ``DEFAULT_CONSTANT_NAMES``.
+    """
+
     def __init__(self):
-        self._cache = {}
-        self._cache_ttl = 300  # 5 minutes cache
-    
-    def get_product_option_display_name(self, option_name: str, option_type: str, language: str = "en") -> str:
-        """Get localized display name for a product option"""
+        self._registry = VersionedSnapshot(
+            "constants registry",
+            lambda version: build_constants_registry(load_constant_tables(), version),
+            CacheSettings.SETTINGS_RELOAD_RETRY_SECONDS,
+            fallback=_fallback_registry,
+        )
+
+    def get_registry(self) -> ConstantsRegistry:
+        """Current registry, loading it on first use"""
+        return self._registry.get()
+
+    def invalidate(self) -> int:
+        """Reload the registry on next access (call after admin edits)"""
+        return self._registry.bump()
+
+    def _display_name(self, constant_type: str, name: str, language: str, option_type: Optional[str] = None) -> str:
         try:
-            # Try to get from database first
-            option = get_localized_constant("product_option", option_name, language)
-            if option:
-                return option
-            
-            # Fallback to hardcoded values if database lookup fails
-            fallback_values = {
-                "kubaneh_type": {
-                    "classic": {"en": "Classic", "he": "קלאסית"},
-                    "seeded": {"en": "Seeded", "he": "עם זרעים"},
-                    "herb": {"en": "Herb", "he": "עשבי תיבול"},
-                    "aromatic": {"en": "Aromatic", "he": "ארומטי"}
-                },
-                "samneh_type": {
-                    "classic": {"en": "Classic", "he": "קלאסי"},
-                    "spicy": {"en": "Spicy", "he": "חריף"},
-                    "herb": {"en": "Herb", "he": "עשבי תיבול"},
-                    "honey": {"en": "Honey", "he": "דבש"},
-                    "smoked": {"en": "Smoked", "he": "מעושן"},
-                    "not_smoked": {"en": "Not Smoked", "he": "לא מעושן"}
-                },
-                "hilbeh_type": {
-                    "classic": {"en": "Classic", "he": "קלאסי"},
-                    "spicy": {"en": "Spicy", "he": "חריף"},
-                    "sweet": {"en": "Sweet", "he": "מתוק"},
-                    "premium": {"en": "Premium", "he": "פרימיום"}
-                }
-            }
-            
-            if option_type in fallback_values and option_name in fallback_values[option_type]:
-                return fallback_values[option_type][option_name].get(language, option_name)
-            
-            return option_name
-            
+            registry = self.get_registry()
+            # Prefer the option's own type so 'classic' kubaneh and samneh stay distinct
+            label = (option_type and registry.display_name(option_type, name, language)) or registry.display_name(
+                constant_type, name, language
+            )
+            if label:
+                return label
         except Exception as e:
-            logger.error(f"Error getting product option display name: {e}")
-            return option_name
-    
+            logger.error("Error getting %s display name: %s", constant_type, e)
+        return DEFAULT_CONSTANT_NAMES.get((option_type or constant_type, name, language), name)
+
+    def get_product_option_display_name(self, option_name: str, option_type: str, language: str = "en") -> str:
+        """Get localized display name for a product option"""
+        return self._display_name("product_option", option_name, language, option_type=option_type)
+
     def get_product_size_display_name(self, size_name: str, language: str = "en") -> str:
         """Get localized display name for a product size"""
-        try:
-            # Try to get from database first
-            size = get_localized_constant("product_size", size_name, language)
-            if size:
-                return size
-            
-            # Fallback to hardcoded values
-            fallback_values = {
-                "small": {"en": "Small", "he": "קטן"},
-                "medium": {"en": "Medium", "he": "בינוני"},
-                "large": {"en": "Large", "he": "גדול"},
-                "xl": {"en": "Extra Large", "he": "גדול מאוד"}
-            }
-            
-            if size_name in fallback_values:
-                return fallback_values[size_name].get(language, size_name)
-            
-            return size_name
-            
-        except Exception as e:
-            logger.error(f"Error getting product size display name: {e}")
-            return size_name
-    
+        return self._display_name("product_size", size_name, language)
+
     def get_order_status_display_name(self, status_name: str, language: str = "en") -> str:
         """Get localized display name for an order status"""
-        try:
-            # Try to get from database first
-            status = get_localized_constant("order_status", status_name, language)
-            if status:
-                return status
-            
-            # Fallback to hardcoded values
-            fallback_values = {
-                "pending": {"en": "Pending", "he": "ממתין"},
-                "confirmed": {"en": "Confirmed", "he": "אושר"},
-                "preparing": {"en": "Preparing", "he": "בהכנה"},
-                "ready": {"en": "Ready", "he": "מוכן"},
-                "delivered": {"en": "Delivered", "he": "נמסר"},
-                "cancelled": {"en": "Cancelled", "he": "בוטל"}
-            }
-            
-            if status_name in fallback_values:
-                return fallback_values[status_name].get(language, status_name)
-            
-            return status_name
-            
-        except Exception as e:
-            logger.error(f"Error getting order status display name: {e}")
-            return status_name
-    
+        return self._display_name("order_status", status_name, language)
+
     def get_delivery_method_display_name(self, method_name: str, language: str = "en") -> str:
         """Get localized display name for a delivery method"""
-        try:
-            # Try to get from database first
-            method = get_localized_constant("delivery_method", method_name, language)
-            if method:
-                return method
-            
-            # Fallback to hardcoded values
-            fallback_values = {
-                "pickup": {"en": "Pickup (Free)", "he": "איסוף עצמי (חינם)"},
-                "delivery": {"en": "Delivery (+5 ₪)", "he": "משלוח (+5 ₪)"}
-            }
-            
-            if method_name in fallback_values:
-                return fallback_values[method_name].get(language, method_name)
-            
-            return method_name
-            
-        except Exception as e:
-            logger.error(f"Error getting delivery method display name: {e}")
-            return method_name
-    
+        return self._display_name("delivery_method", method_name, language)
+
     def get_payment_method_display_name(self, method_name: str, language: str = "en") -> str:
         """Get localized display name for a payment method"""
-        try:
-            # Try to get from database first
-            method = get_localized_constant("payment_method", method_name, language)
-            if method:
-                return method
-            
-            # Fallback to hardcoded values
-            fallback_values = {
-                "cash": {"en": "Cash", "he": "מזומן"}
-            }
-            
-            if method_name in fallback_values:
-                return fallback_values[method_name].get(language, method_name)
-            
-            return method_name
-            
-        except Exception as e:
-            logger.error(f"Error getting payment method display name: {e}")
-            return method_name
-    
+        return self._display_name("payment_method", method_name, language)
+
     def get_delivery_charge_amount(self, method_name: str) -> float:
         """Get delivery charge amount for a method"""
         try:
-            return get_delivery_charge(method_name)
+            charge = self.get_registry().delivery_charges.get(method_name)
+            if charge is not None:
+                return charge
         except Exception as e:
             logger.error(f"Error getting delivery charge: {e}")
-            # Fallback to hardcoded values
-            fallback_charges = {
-                "pickup": 0.0,
-                "delivery": 5.0
-            }
-            return fallback_charges.get(method_name, 0.0)
-    
+        return _FALLBACK_DELIVERY_CHARGES.get(method_name, 0.0)
+
+    def get_delivery_areas(self, include_inactive: bool = False) -> List[DeliveryAreaInfo]:
+        """Delivery areas in display order"""
+        try:
+            areas = self.get_registry().delivery_areas
+        except Exception as e:
+            logger.error("Error getting delivery areas: %s", e)
+            return []
+        return [a for a in areas if include_inactive or a.is_active]
+
+    def get_delivery_area(self, area_id: int) -> Optional[DeliveryAreaInfo]:
+        """Delivery area by id (active or not)"""
+        try:
+            return self.get_registry().delivery_area(area_id)
+        except Exception as e:
+            logger.error("Error getting delivery area %s: %s", area_id, e)
+            return None
+
     def format_product_display_name(self, product_name: str, options: Dict[str, str] = None, language: str = "en") -> str:
         """Format product display name with options"""
         if not options:
@@ -303,6 +374,21 @@ def get_delivery_charge_for_method(method_name: str) -> float:
     return constants_manager.get_delivery_charge_amount(method_name)
 
 
+def get_active_delivery_areas() -> List[DeliveryAreaInfo]:
+    """Get active delivery areas from the constants registry"""
+    return constants_manager.get_delivery_areas()
+
+
+def get_delivery_area(area_id: int) -> Optional[DeliveryAreaInfo]:
+    """Get a delivery area from the constants registry"""
+    return constants_manager.get_delivery_area(area_id)
+
+
+def invalidate_constants() -> int:
+    """Reload constants on next access"""
+    return constants_manager.invalidate()
+
+
 def format_product_name_with_options(product_name: str, options: Dict[str, str] = None, language: str = "en") -> str:
     """Format product name with options"""
     return constants_manager.format_product_display_name(product_name, options, language) 
\ No newline at end of file
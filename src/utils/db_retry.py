@@ -0,0 +1,363 @@
+"""
+Database retry policy and circuit breakers
+
+``retry_on_database_error`` retries transient database failures (dropped
+connections, pool timeouts, serialization failures, deadlocks, a server that
+is restarting) with exponential backoff and full jitter. Coroutine functions
+back off with ``asyncio.sleep``; plain functions sleep only when they are not
+on the event-loop thread. A synchronous call made on the loop thread gets one
+immediate retry, which is enough to replace a stale pooled connection
+without stalling every other update.
+
+Each database target (``primary``, a read replica, ...) has one shared
+circuit breaker. After several consecutive transient failures it opens and
+calls fail fast with ``CircuitOpenError`` instead of queueing more
+connections on a sick database; after a cool-down one probe call is let
+through and its outcome closes or re-opens the breaker. Failures that the
+wrapped function catches itself are still seen through the engine's
+``handle_error`` hook (see ``install_engine_hooks``). A guarded function
+calling another one on the same target counts as one call: the inner guard
+neither asks the breaker nor records an outcome.
+"""
+
+import asyncio
+import contextvars
+import inspect
+import logging
+import random
+import threading
+import time
+from dataclasses import dataclass
+from functools import wraps
+from typing import Any, Callable, Dict, Optional, Tuple, Type
+
+from src.utils.constants import DatabaseRetrySettings
+from src.utils.error_handler import (
+    CircuitOpenError,
+    DatabaseConnectionError,
+    DatabaseRetryExhaustedError,
+    DatabaseTimeoutError,
+)
+from src.utils.metrics import get_metrics
+
+logger = logging.getLogger(__name__)
+
+# SQLSTATE codes worth retrying: connection exceptions (class 08), serialization
+# failure, deadlock, server shutting down / starting up, too many connections
+_RETRYABLE_SQLSTATE_CLASSES = ("08",)
+_RETRYABLE_SQLSTATES = {"40001", "40P01", "57P01", "57P02", "57P03", "53300"}
+_RETRYABLE_SQLITE_CODES = {5, 6}  # SQLITE_BUSY, SQLITE_LOCKED
+
+
+def _sqlstate(exc: BaseException) -> Optional[str]:
+    orig = getattr(exc, "orig", None) or exc
+    # psycopg2 exposes pgcode, psycopg 3 sqlstate
+    return getattr(orig, "pgcode", None) or getattr(orig, "sqlstate", None)
+
+
+def _retryable_sqlstate(state: str) -> bool:
+    return state in _RETRYABLE_SQLSTATES or state.startswith(_RETRYABLE_SQLSTATE_CLASSES)
+
+
+def is_retryable_db_error(exc: BaseException) -> bool:
+    """Whether ``exc`` (or an error it wraps) is a transient database failure"""
+    from sqlalchemy import exc as sa_exc
+
+    seen = set()
+    while exc is not None and id(exc) not in seen:
+        seen.add(id(exc))
+        if isinstance(exc, (CircuitOpenError, DatabaseRetryExhaustedError)):
+            return False
+        if isinstance(exc, (DatabaseConnectionError, DatabaseTimeoutError)):
+            return True
+        if isinstance(exc, sa_exc.DBAPIError) and exc.connection_invalidated:
+            return True
+        state = _sqlstate(exc)
+        if state:
+            # The server said exactly what went wrong
+            return _retryable_sqlstate(state)
+        sqlite_code = getattr(getattr(exc, "orig", None) or exc, "sqlite_errorcode", None)
+        if sqlite_code is not None:
+            return sqlite_code & 0xFF in _RETRYABLE_SQLITE_CODES
+        if isinstance(exc, (sa_exc.IntegrityError, sa_exc.ProgrammingError, sa_exc.DataError)):
+            return False
+        if isinstance(exc, (sa_exc.OperationalError, sa_exc.InterfaceError, sa_exc.DisconnectionError, sa_exc.TimeoutError)):
+            # Connection refused/reset, pool exhausted, locked database
+            return True
+        exc = getattr(exc, "original_error", None) or exc.__cause__
+    return False
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """Exponential backoff with full jitter"""
+
+    max_attempts: int = DatabaseRetrySettings.MAX_ATTEMPTS
+    base_delay: float = DatabaseRetrySettings.BASE_DELAY_SECONDS
+    max_delay: float = DatabaseRetrySettings.MAX_DELAY_SECONDS
+    multiplier: float = 2.0
+
+    def delay(self, attempt: int) -> float:
+        """Sleep before retry number ``attempt`` (1-based)"""
+        return random.uniform(0, min(self.max_delay, self.base_delay * self.multiplier ** (attempt - 1)))
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker shared by every caller of one target"""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = DatabaseRetrySettings.BREAKER_FAILURE_THRESHOLD,
+        reset_timeout: float = DatabaseRetrySettings.BREAKER_RESET_SECONDS,
+    ):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        """Whether a call may go to the database now"""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self._set_state(self.HALF_OPEN)
+            if self.state == self.HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.failures = 0
+            self._probe_in_flight = False
+            if self.state != self.CLOSED:
+                logger.info("Database circuit %s closed", self.name)
+                self._set_state(self.CLOSED)
+
+    def release_probe(self) -> None:
+        """Let another call probe; the probe ended without reaching the database"""
+        with self._lock:
+            self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            self._probe_in_flight = False
+            if self.state == self.HALF_OPEN or (self.state == self.CLOSED and self.failures >= self.failure_threshold):
+                self.opened_at = time.monotonic()
+                logger.warning(
+                    "Database circuit %s opened after %d failures; failing fast for %.0fs",
+                    self.name, self.failures, self.reset_timeout,
+                )
+                get_metrics().increment("db_circuit_opened_total", labels={"target": self.name})
+                self._set_state(self.OPEN)
+
+    def _set_state(self, state: str) -> None:
+        self.state = state
+        get_metrics().set_gauge(
+            "db_circuit_open", 0 if state == self.CLOSED else 1, labels={"target": self.name}
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        return {"state": self.state, "failures": self.failures}
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def get_circuit_breaker(target: str = DatabaseRetrySettings.PRIMARY_TARGET) -> CircuitBreaker:
+    """Shared circuit breaker of a database target"""
+    breaker = _breakers.get(target)
+    if breaker is None:
+        with _breakers_lock:
+            breaker = _breakers.setdefault(target, CircuitBreaker(target))
+    return breaker
+
+
+# Set by the engine's handle_error hook while a guarded call runs, so failures
+# swallowed inside the wrapped function still count against the breaker
+_failure_seen: contextvars.ContextVar[Optional[list]] = contextvars.ContextVar("db_failure_seen", default=None)
+# Targets with a guarded call in progress in this context (thread or task)
+_guarded_targets: contextvars.ContextVar[frozenset] = contextvars.ContextVar("db_guarded_targets", default=frozenset())
+
+
+def install_engine_hooks(engine) -> None:
+    """Report transient errors raised inside ``engine`` to the guarded call in progress"""
+    from sqlalchemy import event
+
+    @event.listens_for(engine, "handle_error")
+    def _on_error(context):  # noqa: D401
+        seen = _failure_seen.get()
+        if seen is not None and (context.is_disconnect or is_retryable_db_error(context.original_exception)):
+            seen.append(context.original_exception)
+
+
+def _on_event_loop_thread() -> bool:
+    try:
+        asyncio.get_running_loop()
+        return True
+    except RuntimeError:
+        return False
+
+
+class _Guard:
+    """Breaker bookkeeping for one attempt"""
+
+    def __init__(self, breaker: CircuitBreaker, name: str):
+        self.breaker = breaker
+        self.name = name
+        self._token = None
+        self._targets_token = None
+        self._nested = False
+        self._seen: list = []
+
+    def __enter__(self) -> "_Guard":
+        targets = _guarded_targets.get()
+        if self.breaker.name in targets:
+            # The outer call already holds the breaker's permission (maybe the probe)
+            self._nested = True
+            return self
+        if not self.breaker.allow():
+            get_metrics().increment("db_circuit_rejected_total", labels={"target": self.breaker.name})
+            raise CircuitOpenError(message=f"Database {self.breaker.name} unavailable, skipped {self.name}")
+        self._targets_token = _guarded_targets.set(targets | {self.breaker.name})
+        self._token = _failure_seen.set(self._seen)
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if self._nested:
+            return
+        _failure_seen.reset(self._token)
+        _guarded_targets.reset(self._targets_token)
+        if (exc is not None and is_retryable_db_error(exc)) or (exc is None and self._seen):
+            self.breaker.record_failure()
+        elif isinstance(exc, CircuitOpenError) or (exc is not None and not isinstance(exc, Exception)):
+            # Another target's breaker stopped the call, or it was cancelled or
+            # interrupted before the database answered: no evidence about this one
+            self.breaker.release_probe()
+        else:
+            # The database answered, even if with an error such as a constraint violation
+            self.breaker.record_success()
+
+
+def _should_retry(exc: BaseException, extra: Tuple[Type[BaseException], ...]) -> bool:
+    if isinstance(exc, (CircuitOpenError, DatabaseRetryExhaustedError)):
+        return False
+    return is_retryable_db_error(exc) or (bool(extra) and isinstance(exc, extra))
+
+
+def _log_retry(name: str, attempt: int, policy: RetryPolicy, delay: float, exc: BaseException, target: str) -> None:
+    get_metrics().increment("db_retries_total", labels={"target": target})
+    logger.warning(
+        "DB retry %d/%d for %s in %.2fs due to: %s", attempt, policy.max_attempts - 1, name, delay, exc
+    )
+
+
+def retry_on_database_error(
+    max_retries: int = DatabaseRetrySettings.MAX_ATTEMPTS,
+    delay: float = DatabaseRetrySettings.BASE_DELAY_SECONDS,
+    allowed_exceptions: Tuple[Type[BaseException], ...] = (),
+    target: str = DatabaseRetrySettings.PRIMARY_TARGET,
+    policy: Optional[RetryPolicy] = None,
+):
+    """Retry transient database errors with backoff, guarded by the target's circuit breaker.
+
+    ``max_retries`` is the total number of attempts and ``delay`` the base
+    backoff; ``allowed_exceptions`` adds exception types to retry on top of
+    the built-in classification. Works on plain and coroutine functions.
+    """
+    policy = policy or RetryPolicy(max_attempts=max(1, max_retries), base_delay=delay)
+
+    def decorator(func: Callable):
+        name = func.__name__
+
+        def exhausted(exc: BaseException):
+            return DatabaseRetryExhaustedError(message=f"All retries failed for {name}", original_error=exc)
+
+        if inspect.iscoroutinefunction(func):
+            @wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                breaker = get_circuit_breaker(target)
+                for attempt in range(1, policy.max_attempts + 1):
+                    try:
+                        with _Guard(breaker, name):
+                            return await func(*args, **kwargs)
+                    except Exception as exc:
+                        if not _should_retry(exc, allowed_exceptions):
+                            raise
+                        if attempt == policy.max_attempts:
+                            raise exhausted(exc) from exc
+                        wait = policy.delay(attempt)
+                        _log_retry(name, attempt, policy, wait, exc, target)
+                        await asyncio.sleep(wait)
+
+            return async_wrapper
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            breaker = get_circuit_breaker(target)
+            on_loop = _on_event_loop_thread()
+            attempts = min(policy.max_attempts, DatabaseRetrySettings.LOOP_THREAD_MAX_ATTEMPTS) if on_loop else policy.max_attempts
+            for attempt in range(1, attempts + 1):
+                try:
+                    with _Guard(breaker, name):
+                        return func(*args, **kwargs)
+                except Exception as exc:
+                    if not _should_retry(exc, allowed_exceptions):
+                        raise
+                    if attempt == attempts:
+                        raise exhausted(exc) from exc
+                    # Never sleep on the event-loop thread; it would stall every update
+                    wait = 0.0 if on_loop else policy.delay(attempt)
+                    _log_retry(name, attempt, policy, wait, exc, target)
+                    if wait:
+                        time.sleep(wait)
+
+        return wrapper
+
+    return decorator
+
+
+async def run_db(
+    func: Callable[..., Any],
+    *args: Any,
+    target: str = DatabaseRetrySettings.PRIMARY_TARGET,
+    policy: Optional[RetryPolicy] = None,
+    **kwargs: Any,
+) -> Any:
+    """Run a blocking database function in a worker thread with async backoff.
+
+    For handlers: the event loop keeps serving other updates while the query
+    runs and while waiting between attempts.
+    """
+    policy = policy or RetryPolicy()
+    breaker = get_circuit_breaker(target)
+    name = getattr(func, "__name__", "db call")
+    for attempt in range(1, policy.max_attempts + 1):
+        try:
+            # The guard runs in the worker thread so it sees that thread's engine errors
+            return await asyncio.to_thread(_guarded_call, breaker, name, func, args, kwargs)
+        except Exception as exc:
+            if not _should_retry(exc, ()):
+                raise
+            if attempt == policy.max_attempts:
+                raise DatabaseRetryExhaustedError(message=f"All retries failed for {name}", original_error=exc) from exc
+            wait = policy.delay(attempt)
+            _log_retry(name, attempt, policy, wait, exc, target)
+            await asyncio.sleep(wait)
+
+
+def _guarded_call(breaker: CircuitBreaker, name: str, func: Callable, args: tuple, kwargs: dict) -> Any:
+    with _Guard(breaker, name):
+        return func(*args, **kwargs)
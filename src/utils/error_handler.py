@@ -12,7 +12,6 @@ from typing import Any, Dict, Optional, Callable
 
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import ContextTypes
-import time
 
 from src.utils.i18n import i18n
 
@@ -527,54 +526,12 @@ class DatabaseTimeoutError(DatabaseError):
     severity: ErrorSeverity = ErrorSeverity.HIGH
     category: ErrorCategory = ErrorCategory.DATABASE
 
-# --- CircuitBreaker from exceptions.py ---
-
-class CircuitBreaker:
-    """Simple circuit breaker for external services"""
-    def __init__(self, failure_threshold: int = 5, timeout: int = 60):
-        self.failure_threshold = failure_threshold
-        self.timeout = timeout
-        self.failure_count = 0
-        self.last_failure_time = 0
-        self.state = "CLOSED"  # CLOSED, OPEN, HALF_OPEN
-    def call(self, func, *args, **kwargs):
-        if self.state == "OPEN":
-            if time.time() - self.last_failure_time > self.timeout:
-                self.state = "HALF_OPEN"
-            else:
-                raise DatabaseError("Service temporarily unavailable")
-        try:
-            result = func(*args, **kwargs)
-            if self.state == "HALF_OPEN":
-                self.state = "CLOSED"
-                self.failure_count = 0
-            return result
-        except Exception as e:
-            self.failure_count += 1
-            self.last_failure_time = time.time()
-            if self.failure_count >= self.failure_threshold:
-                self.state = "OPEN"
-            raise e
-
-def retry_on_database_error(max_retries: int = 3, delay: float = 0.5, allowed_exceptions: tuple = (DatabaseError,)):
-    """Retry decorator for database operations, DRY and robust."""
-    def decorator(func):
-        @wraps(func)
-        def wrapper(*args, **kwargs):
-            last_exc = None
-            for attempt in range(1, max_retries + 1):
-                try:
-                    return func(*args, **kwargs)
-                except allowed_exceptions as exc:
-                    last_exc = exc
-                    logging.getLogger(__name__).warning(
-                        f"DB retry {attempt}/{max_retries} for {func.__name__} due to: {exc}"
-                    )
-                    time.sleep(delay)
-            # If we get here, all retries failed
-            raise DatabaseRetryExhaustedError(message=f"All retries failed for {func.__name__}", original_error=last_exc)
-        return wrapper
-    return decorator
+@dataclass
+class CircuitOpenError(DatabaseError):
+    """Raised without touching the database while its circuit breaker is open"""
+    error_code: str = "DB_CIRCUIT_OPEN"
+    severity: ErrorSeverity = ErrorSeverity.HIGH
+    category: ErrorCategory = ErrorCategory.DATABASE
 
 # --- Unified handle_error and error_handler decorator ---
 
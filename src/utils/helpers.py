@@ -3,36 +3,24 @@ Utility functions for the Samna Salta bot
 """
 
 import logging
-import threading
-import time
 from datetime import datetime
-from functools import wraps
 from threading import Lock
-from typing import Any, Dict, Generic, Optional, TypeVar, Union
+from typing import Any, Optional
 
 from src.config import get_config
-from src.utils.constants import CacheSettings
+from src.utils.cache import CacheEntry, NamespacedCache, cached, get_cache, get_cache_registry
+from src.utils.constants import CacheNamespaces, CacheSettings
 from src.utils.constants_manager import get_product_option_name, get_product_size_name
 from telegram import InlineKeyboardMarkup, InlineKeyboardButton
 
 logger = logging.getLogger(__name__)
 
-T = TypeVar("T")
-
-class CacheEntry(Generic[T]):
-    """Cache entry with timestamp and value"""
-
-    def __init__(self, value: T, ttl: int):
-        self.value = value
-        self.expires_at = time.time() + ttl
-        self.created_at = time.time()
-
-    def is_expired(self) -> bool:
-        """Check if cache entry is expired"""
-        return time.time() > self.expires_at
-
 class SimpleCache:
-    """Simple in-memory cache with TTL support"""
+    """Key/value facade over the general cache namespace
+
+    Kept for callers that stash short-lived state (e.g. admin edit flows);
+    new code should use namespaced caches from ``src.utils.cache``.
+    """
 
     _instance = None
     _lock = Lock()
@@ -42,73 +30,41 @@ class SimpleCache:
             with cls._lock:
                 if cls._instance is None:
                     cls._instance = super(SimpleCache, cls).__new__(cls)
-                    cls._instance._initialize()
         return cls._instance
 
-    def _initialize(self) -> None:
-        self.cache: Dict[str, CacheEntry[Any]] = {}
-        self.lock = Lock()
+    @property
+    def cache(self) -> NamespacedCache:
+        return get_cache(CacheNamespaces.GENERAL)
 
     def get(self, key: str) -> Optional[Any]:
         """Get value from cache"""
-        with self.lock:
-            if key in self.cache:
-                entry = self.cache[key]
-                if entry.is_expired():
-                    del self.cache[key]
-                    return None
-                return entry.value
-            return None
+        return self.cache.get(key)
 
     def set(self, key: str, value: Any, ttl: Optional[int] = None) -> None:
         """Set value in cache with TTL"""
-        if ttl is None:
-            ttl = CacheSettings.GENERAL_CACHE_TTL_SECONDS
-
-        with self.lock:
-            self.cache[key] = CacheEntry(value, ttl)
+        self.cache.set(key, value, ttl)
 
     def delete(self, key: str) -> bool:
         """Delete value from cache"""
-        with self.lock:
-            if key in self.cache:
-                del self.cache[key]
-                return True
-            return False
+        return self.cache.delete(key)
 
     def clear(self) -> None:
-        """Clear all cache entries"""
-        with self.lock:
-            self.cache.clear()
+        """Clear all cache entries in every namespace"""
+        get_cache_registry().clear_all()
 
-def cached(ttl: Optional[int] = None):
-    """Cache decorator with optional TTL"""
-    def decorator(func):
-        @wraps(func)
-        def wrapper(*args, **kwargs):
-            cache = SimpleCache()
-            
-            # Create cache key from function name and arguments
-            key_parts = [func.__name__]
-            key_parts.extend(str(arg) for arg in args)
-            key_parts.extend(f"{k}={v}" for k, v in sorted(kwargs.items()))
-            cache_key = ":".join(key_parts)
 
-            # Try to get from cache
-            result = cache.get(cache_key)
-            if result is not None:
-                return result
+def _language_of(user_id: Optional[int]) -> str:
+    """Resolve the display language used as a cache key instead of the user id"""
+    from src.utils.language_manager import language_manager
 
-            # If not in cache, call function and cache result
-            result = func(*args, **kwargs)
-            cache.set(cache_key, result, ttl)
-            return result
-        return wrapper
-    return decorator
+    try:
+        return language_manager.get_user_language(user_id) if user_id else "en"
+    except Exception:
+        return "en"
 
 # Helper functions
 
-@cached(ttl=300)  # Cache for 5 minutes
+@cached(ttl=300, namespace=CacheNamespaces.AVAILABILITY)  # Cache for 5 minutes, including False
 def is_hilbeh_available() -> bool:
     """Check if Hilbeh is available today"""
     try:
@@ -119,7 +75,11 @@ def is_hilbeh_available() -> bool:
         # Return False on any error
         return False
 
-@cached(ttl=3600)  # Cache for 1 hour
+@cached(
+    ttl=CacheSettings.TRANSLATIONS_CACHE_TTL_SECONDS,
+    namespace=CacheNamespaces.TRANSLATIONS,
+    key=lambda product_name, options=None, user_id=None: (product_name, options, _language_of(user_id)),
+)
 def translate_product_name(product_name: str, options: Optional[dict] = None, user_id: Optional[int] = None) -> str:
     """Translate a product name from database format to localized display name"""
     from src.utils.i18n import i18n
@@ -256,15 +216,15 @@ def translate_category_name(category_name: str, user_id: Optional[int] = None) -
         # Fallback to capitalized category name if translation not found
         return category_name.title()
 
-@cached(ttl=300)  # Cache for 5 minutes
+@cached(ttl=300, namespace=CacheNamespaces.SETTINGS, key=lambda user_id=None: _language_of(user_id))
 def get_dynamic_welcome_message(user_id: Optional[int] = None) -> str:
     """Get dynamic welcome message based on business settings"""
     from src.utils.i18n import i18n
-    from src.db.operations import get_business_settings_dict
+    from src.utils.settings_snapshot import get_settings_snapshot
     
     try:
         # Get business settings
-        settings = get_business_settings_dict()
+        settings = get_settings_snapshot()
         business_name = settings.get('business_name', 'Samna Salta')
         
         # Get the welcome message template from i18n
@@ -285,15 +245,15 @@ def get_dynamic_welcome_message(user_id: Optional[int] = None) -> str:
         except:
             return "Welcome to Samna Salta!"
 
-@cached(ttl=300)  # Cache for 5 minutes
+@cached(ttl=300, namespace=CacheNamespaces.SETTINGS, key=lambda user_id=None: _language_of(user_id))
 def get_dynamic_welcome_for_returning_users(user_id: Optional[int] = None) -> str:
     """Get dynamic welcome message for returning users based on business settings"""
     from src.utils.i18n import i18n
-    from src.db.operations import get_business_settings_dict
+    from src.utils.settings_snapshot import get_settings_snapshot
     
     try:
         # Get business settings
-        settings = get_business_settings_dict()
+        settings = get_settings_snapshot()
         business_name = settings.get('business_name', 'Samna Salta')
         
         # Use the simple header-only template
@@ -314,15 +274,15 @@ def get_dynamic_welcome_for_returning_users(user_id: Optional[int] = None) -> st
         except:
             return "Welcome to Samna Salta!"
 
-@cached(ttl=300)  # Cache for 5 minutes
+@cached(ttl=300, namespace=CacheNamespaces.SETTINGS, key=lambda user_id=None, compact=False: compact)
 def get_business_info_for_customers(user_id: Optional[int] = None, compact: bool = False) -> str:
     """Get formatted business information for display to customers"""
     from src.utils.i18n import i18n
-    from src.db.operations import get_business_settings_dict
+    from src.utils.settings_snapshot import get_settings_snapshot
     
     try:
         # Get business settings
-        settings = get_business_settings_dict()
+        settings = get_settings_snapshot().values
         
         if not settings:
             return ""
@@ -110,44 +110,43 @@ STEP_IMAGES = {
 }
 
 
+# Steps that fall back to another step's override when they have none of their own
+STEP_IMAGE_ALIASES = {
+    "main_page": ("welcome",),
+    "registration_complete": ("welcome",),
+}
+
+
+def resolve_step_images(overrides: Optional[dict]) -> dict:
+    """Resolve every step key to its effective (unformatted) image URL.
+    Order: exact override, alias override (e.g. 'welcome'), built-in default.
+    """
+    overrides = overrides if isinstance(overrides, dict) else {}
+    resolved = {}
+    for step_key in list(STEP_IMAGES) + [k for k in overrides if k not in STEP_IMAGES]:
+        for candidate in (step_key, *STEP_IMAGE_ALIASES.get(step_key, ())):
+            url = overrides.get(candidate)
+            if url and ImageHandler.validate_image_url(url):
+                resolved[step_key] = url
+                break
+        else:
+            if STEP_IMAGES.get(step_key):
+                resolved[step_key] = STEP_IMAGES[step_key]
+    return resolved
+
+
 def get_step_image(step_key: str, width: int = 900, height: int = 600) -> str:
     """Return a formatted illustrative image URL for a given interaction step.
-    Checks DB overrides in business settings (app_images) before falling back.
-    Includes alias support so a generic 'welcome' override can be used for
-    early customer views like the main page and registration complete.
+    Uses the pre-resolved map from the business settings snapshot, which
+    already applies DB overrides (app_images) and alias fallbacks.
     """
-    # Try DB overrides
+    url = None
     try:
-        from src.db.operations import get_business_settings_dict  # lazy import to avoid cycles
-        settings = get_business_settings_dict() or {}
-        overrides = settings.get("app_images")
-        # Parse JSON string if needed
-        if isinstance(overrides, str):
-            import json
-            try:
-                overrides = json.loads(overrides)
-            except Exception:
-                overrides = None
-        if isinstance(overrides, dict):
-            # 1) Exact key override
-            override_url = overrides.get(step_key)
-            if override_url and ImageHandler.validate_image_url(override_url):
-                return ImageHandler.format_image_url(override_url, width, height)
-
-            # 2) Alias fallbacks: allow 'welcome' to drive certain early steps
-            alias_map = {
-                "main_page": ["welcome"],
-                "registration_complete": ["welcome"],
-            }
-            for alias in alias_map.get(step_key, []):
-                alias_url = overrides.get(alias)
-                if alias_url and ImageHandler.validate_image_url(alias_url):
-                    return ImageHandler.format_image_url(alias_url, width, height)
+        from src.utils.settings_snapshot import get_settings_snapshot  # lazy import to avoid cycles
+        url = get_settings_snapshot().step_images.get(step_key)
     except Exception:
         # Silently ignore override errors and fall back to defaults
-        pass
-
-    url = STEP_IMAGES.get(step_key)
+        url = STEP_IMAGES.get(step_key)
     return ImageHandler.format_image_url(url, width, height) if url else ""
 
 
@@ -0,0 +1,366 @@
+"""
+Cross-process cache invalidation bus
+
+Every bot process keeps its own in-memory caches (namespaced caches, the
+business settings snapshot, the constants registry). When an admin edit is
+committed in one process the others must drop their copies too, otherwise
+they keep serving stale menus and prices until the TTL runs out.
+
+Writers call ``publish_invalidation(namespace, ...)`` after commit. The
+event is applied to the local caches immediately and broadcast to the other
+processes through the configured backend:
+
+- ``PostgresNotifyBackend`` sends ``pg_notify`` on a channel and listens on
+  a dedicated autocommit connection in a daemon thread. LISTEN needs a
+  session-mode connection; Supabase's transaction pooler does not deliver
+  notifications, so point the bot at the direct/session connection string.
+- ``LoopbackBackend`` delivers to buses in the same process only. It is the
+  fallback for SQLite and single-process setups and is what the tests use.
+"""
+
+import itertools
+import json
+import logging
+import select
+import threading
+import uuid
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from src.utils.constants import CacheNamespaces, InvalidationBusSettings
+
+logger = logging.getLogger(__name__)
+
+EventHandler = Callable[["InvalidationEvent"], None]
+EventReceiver = Callable[["InvalidationEvent"], None]
+
+# Handlers registered under this namespace run for every event, after the
+# namespace-specific ones
+ANY_NAMESPACE = "*"
+
+
+@dataclass(frozen=True)
+class InvalidationEvent:
+    """One invalidation: a namespace, optionally narrowed to a key"""
+
+    namespace: str
+    key: Optional[str] = None
+    version: int = 0
+    origin: str = ""
+
+    def to_payload(self) -> str:
+        return json.dumps(
+            {"ns": self.namespace, "key": self.key, "v": self.version, "origin": self.origin},
+            separators=(",", ":"),
+        )
+
+    @classmethod
+    def from_payload(cls, payload: str) -> "InvalidationEvent":
+        data = json.loads(payload)
+        return cls(
+            namespace=str(data["ns"]),
+            key=data.get("key"),
+            version=int(data.get("v") or 0),
+            origin=str(data.get("origin") or ""),
+        )
+
+
+class LoopbackBackend:
+    """In-process backend: delivers events to every started bus in this process"""
+
+    name = "loopback"
+
+    def __init__(self):
+        self._receivers: List[EventReceiver] = []
+        self._lock = threading.Lock()
+
+    def publish(self, events: Sequence[InvalidationEvent]) -> None:
+        with self._lock:
+            receivers = list(self._receivers)
+        for event in events:
+            for receiver in receivers:
+                receiver(event)
+
+    def start(self, receiver: EventReceiver) -> None:
+        with self._lock:
+            if receiver not in self._receivers:
+                self._receivers.append(receiver)
+
+    def stop(self, receiver: EventReceiver) -> None:
+        with self._lock:
+            if receiver in self._receivers:
+                self._receivers.remove(receiver)
+
+
+class PostgresNotifyBackend:
+    """Postgres LISTEN/NOTIFY backend"""
+
+    name = "postgres"
+
+    def __init__(self, engine_getter: Optional[Callable] = None, channel: str = InvalidationBusSettings.CHANNEL):
+        self._engine_getter = engine_getter
+        self.channel = channel
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._receiver: Optional[EventReceiver] = None
+        self._connection = None
+        # Set when the listener reconnects, since notifications sent while it
+        # was disconnected are lost
+        self.on_resync: Optional[Callable[[], None]] = None
+
+    def _engine(self):
+        if self._engine_getter is not None:
+            return self._engine_getter()
+        from src.db.operations import get_db_manager  # lazy import to avoid cycles
+        return get_db_manager().get_engine()
+
+    def publish(self, events: Sequence[InvalidationEvent]) -> None:
+        """Send all events in one round trip; delivered to listeners at commit"""
+        if not events:
+            return
+        from sqlalchemy import text
+
+        statement = text("SELECT pg_notify(:channel, :payload)")
+        with self._engine().begin() as conn:
+            conn.execute(statement, [{"channel": self.channel, "payload": e.to_payload()} for e in events])
+
+    def start(self, receiver: EventReceiver) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        self._receiver = receiver
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._listen_forever, name="cache-invalidation-listener", daemon=True)
+        self._thread.start()
+
+    def stop(self, receiver: Optional[EventReceiver] = None) -> None:
+        self._stop.set()
+        self._close_connection()
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join(timeout=InvalidationBusSettings.POLL_TIMEOUT_SECONDS + 1)
+        self._thread = None
+
+    def _open_connection(self):
+        # Take a dedicated connection out of the pool for good; LISTEN is
+        # bound to the session and must not be handed to other requests
+        fairy = self._engine().raw_connection()
+        fairy.detach()
+        dbapi_conn = fairy.driver_connection
+        dbapi_conn.autocommit = True
+        with dbapi_conn.cursor() as cursor:
+            cursor.execute(f'LISTEN "{self.channel}"')
+        return dbapi_conn
+
+    def _close_connection(self) -> None:
+        conn, self._connection = self._connection, None
+        if conn is not None:
+            try:
+                conn.close()
+            except Exception:
+                pass
+
+    def _listen_forever(self) -> None:
+        connected_once = False
+        while not self._stop.is_set():
+            try:
+                self._connection = self._open_connection()
+                logger.info("Listening for cache invalidations on channel %s", self.channel)
+                if connected_once and self.on_resync:
+                    self.on_resync()
+                connected_once = True
+                self._poll(self._connection)
+            except Exception as e:
+                if self._stop.is_set():
+                    break
+                logger.warning(
+                    "Cache invalidation listener disconnected: %s; reconnecting in %ss",
+                    e,
+                    InvalidationBusSettings.RECONNECT_DELAY_SECONDS,
+                )
+                self._close_connection()
+                self._stop.wait(InvalidationBusSettings.RECONNECT_DELAY_SECONDS)
+        self._close_connection()
+
+    def _poll(self, conn) -> None:
+        while not self._stop.is_set():
+            ready, _, _ = select.select([conn], [], [], InvalidationBusSettings.POLL_TIMEOUT_SECONDS)
+            if not ready:
+                continue
+            conn.poll()
+            while conn.notifies:
+                notify = conn.notifies.pop(0)
+                try:
+                    event = InvalidationEvent.from_payload(notify.payload)
+                except Exception:
+                    logger.warning("Ignoring malformed invalidation payload: %r", notify.payload)
+                    continue
+                if self._receiver:
+                    self._receiver(event)
+
+
+class InvalidationBus:
+    """Applies invalidations locally and broadcasts them to other processes"""
+
+    def __init__(self, backend, origin: Optional[str] = None):
+        self.backend = backend
+        self.origin = origin or uuid.uuid4().hex
+        self._handlers: Dict[str, List[EventHandler]] = {}
+        self._seen: Dict[Tuple[str, str, Optional[str]], int] = {}
+        self._lock = threading.Lock()
+        self._versions = itertools.count(1)
+        self._started = False
+        if hasattr(backend, "on_resync"):
+            backend.on_resync = self.resync
+
+    def subscribe(self, namespace: str, handler: EventHandler) -> None:
+        """Run ``handler`` for every event in ``namespace`` (or ``ANY_NAMESPACE``)"""
+        with self._lock:
+            self._handlers.setdefault(namespace, []).append(handler)
+
+    def publish(self, *namespaces: str, key: Optional[str] = None, version: Optional[int] = None) -> List[InvalidationEvent]:
+        """Invalidate ``namespaces`` here and in every other process.
+        Call after the write has been committed.
+        """
+        events = [
+            InvalidationEvent(namespace, key, version if version is not None else next(self._versions), self.origin)
+            for namespace in namespaces
+        ]
+        for event in events:
+            self._dispatch(event)
+        try:
+            self.backend.publish(events)
+        except Exception as e:
+            # Other processes converge when their cache TTLs expire
+            logger.warning("Failed to broadcast cache invalidation %s: %s", list(namespaces), e)
+        return events
+
+    def start(self) -> None:
+        """Start receiving events from other processes"""
+        if self._started:
+            return
+        self.backend.start(self._on_remote)
+        self._started = True
+        logger.info("Cache invalidation bus started (%s backend)", self.backend.name)
+
+    def stop(self) -> None:
+        if not self._started:
+            return
+        self.backend.stop(self._on_remote)
+        self._started = False
+
+    def resync(self) -> None:
+        """Drop every local cache after events may have been missed"""
+        logger.info("Resynchronising caches after invalidation listener reconnect")
+        with self._lock:
+            namespaces = [ns for ns in self._handlers if ns != ANY_NAMESPACE]
+        for namespace in namespaces + list(_RESYNC_NAMESPACES):
+            self._dispatch(InvalidationEvent(namespace, origin=self.origin))
+
+    def _on_remote(self, event: InvalidationEvent) -> None:
+        if event.origin == self.origin:
+            return
+        seen_key = (event.origin, event.namespace, event.key)
+        with self._lock:
+            if event.version and self._seen.get(seen_key, 0) >= event.version:
+                return
+            self._seen[seen_key] = event.version
+        self._dispatch(event)
+
+    def _dispatch(self, event: InvalidationEvent) -> None:
+        with self._lock:
+            handlers = self._handlers.get(event.namespace, []) + self._handlers.get(ANY_NAMESPACE, [])
+        for handler in handlers:
+            try:
+                handler(event)
+            except Exception as e:
+                logger.warning("Invalidation handler for %s failed: %s", event.namespace, e)
+
+
+_RESYNC_NAMESPACES = (
+    CacheNamespaces.PRODUCTS,
+    CacheNamespaces.CATEGORIES,
+    CacheNamespaces.TRANSLATIONS,
+    CacheNamespaces.AVAILABILITY,
+)
+
+
+def _invalidate_settings(event: InvalidationEvent) -> None:
+    from src.utils.settings_snapshot import bump_settings_version
+
+    bump_settings_version()
+
+
+def _invalidate_constants(event: InvalidationEvent) -> None:
+    from src.utils.cache import invalidate_namespaces
+    from src.utils.constants_manager import invalidate_constants
+
+    invalidate_constants()
+    invalidate_namespaces(CacheNamespaces.TRANSLATIONS)
+
+
+def _invalidate_orders(event: InvalidationEvent) -> None:
+    from src.services.analytics_cache import bump_order_data_version
+
+    bump_order_data_version()
+
+
+def _pin_reads_to_primary(event: InvalidationEvent) -> None:
+    from src.db.replica import note_primary_write
+
+    note_primary_write()
+
+
+def _invalidate_namespace(event: InvalidationEvent) -> None:
+    from src.utils.cache import invalidate_namespaces
+
+    invalidate_namespaces(event.namespace)
+
+
+def register_default_handlers(bus: InvalidationBus) -> InvalidationBus:
+    """Wire the bus to the settings snapshot, constants registry, order-data version, caches and replica routing"""
+    bus.subscribe(CacheNamespaces.SETTINGS, _invalidate_settings)
+    bus.subscribe(CacheNamespaces.CONSTANTS, _invalidate_constants)
+    bus.subscribe(CacheNamespaces.ORDERS, _invalidate_orders)
+    bus.subscribe(ANY_NAMESPACE, _invalidate_namespace)
+    # Every write publishes an invalidation: keep reads off the replica until it caught up
+    bus.subscribe(ANY_NAMESPACE, _pin_reads_to_primary)
+    return bus
+
+
+def _create_backend():
+    try:
+        from src.config import get_config
+
+        config = get_config()
+        choice = (config.cache_invalidation_backend or "auto").lower()
+        database_url = config.supabase_connection_string or config.database_url
+    except Exception as e:
+        logger.debug("Config unavailable for invalidation bus, using loopback: %s", e)
+        return LoopbackBackend()
+
+    if choice == "loopback":
+        return LoopbackBackend()
+    if choice == "postgres" or (choice == "auto" and database_url.startswith(("postgresql", "postgres://"))):
+        return PostgresNotifyBackend()
+    return LoopbackBackend()
+
+
+_bus: Optional[InvalidationBus] = None
+_bus_lock = threading.Lock()
+
+
+def get_invalidation_bus() -> InvalidationBus:
+    """Get the process-wide invalidation bus"""
+    global _bus
+    if _bus is None:
+        with _bus_lock:
+            if _bus is None:
+                _bus = register_default_handlers(InvalidationBus(_create_backend()))
+    return _bus
+
+
+def publish_invalidation(*namespaces: str, key: Optional[str] = None) -> None:
+    """Invalidate cache namespaces in this and every other bot process"""
+    try:
+        get_invalidation_bus().publish(*namespaces, key=key)
+    except Exception as e:
+        logger.warning("Failed to publish cache invalidation %s: %s", list(namespaces), e)
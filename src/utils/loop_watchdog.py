@@ -0,0 +1,173 @@
+"""
+Event-loop lag watchdog and blocking-call detector
+
+A heartbeat task on the event loop sleeps for a fixed interval and records
+how late it wakes up as the ``event_loop_lag_seconds`` histogram. A helper
+thread watches the heartbeat; when the loop has not beaten for longer than
+the threshold, the loop is blocked by synchronous code (a DB query, a
+``time.sleep`` in a retry, a subprocess) and the helper samples the loop
+thread's stack with ``sys._current_frames``. Each sample is attributed to
+the innermost frame in this code base, counted in
+``event_loop_blocked_samples_total{site=...}`` and the first sample of every
+stall is logged with its stack. Only the first ``TOP_SITES`` sites get a
+label of their own, later ones are counted as ``site="other"`` so the number
+of series stays bounded; ``top_blocking_sites`` ranks every site.
+"""
+
+import asyncio
+import logging
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import Counter
+from typing import List, Optional, Tuple
+
+from src.utils.constants import LoopWatchdogSettings
+from src.utils.metrics import get_metrics
+
+logger = logging.getLogger(__name__)
+
+_PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+_THIRD_PARTY = ("site-packages", "dist-packages")
+
+
+def _is_project_file(filename: str) -> bool:
+    return filename.startswith(_PROJECT_ROOT) and not any(part in filename for part in _THIRD_PARTY)
+
+
+def blocking_site(stack: traceback.StackSummary) -> str:
+    """``file:line (function)`` of the innermost project frame, else the innermost frame"""
+    if not stack:
+        return "unknown"
+    frame = next((f for f in reversed(stack) if _is_project_file(f.filename)), stack[-1])
+    filename = os.path.relpath(frame.filename, _PROJECT_ROOT) if _is_project_file(frame.filename) else frame.filename
+    return f"{filename}:{frame.lineno} ({frame.name})"
+
+
+class LoopWatchdog:
+    """Measures event-loop lag and samples the stack of code that blocks it"""
+
+    def __init__(
+        self,
+        interval: float = LoopWatchdogSettings.INTERVAL_SECONDS,
+        threshold: float = LoopWatchdogSettings.THRESHOLD_SECONDS,
+        sample_interval: float = LoopWatchdogSettings.SAMPLE_INTERVAL_SECONDS,
+        top_sites: int = LoopWatchdogSettings.TOP_SITES,
+    ):
+        self.interval = interval
+        self.threshold = threshold
+        self.sample_interval = sample_interval
+        self.top_sites = top_sites
+        self._task: Optional[asyncio.Task] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._loop_thread_id: Optional[int] = None
+        self._beat = time.monotonic()
+        self._stall_site: Optional[str] = None  # site of the stall in progress
+        self._lock = threading.Lock()
+        self._sites: Counter = Counter()
+        self._labelled_sites: set = set()  # sites exported with their own metric label
+        self.max_lag = 0.0
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        """Start the heartbeat on the running loop and the sampling thread"""
+        if self.running:
+            return
+        self._loop_thread_id = threading.get_ident()
+        self._beat = time.monotonic()
+        self._stop.clear()
+        self._task = asyncio.get_running_loop().create_task(self._heartbeat(), name="loop-watchdog")
+        self._thread = threading.Thread(target=self._sample_forever, name="loop-watchdog-sampler", daemon=True)
+        self._thread.start()
+        logger.info(
+            "Event-loop watchdog started (interval %.0f ms, threshold %.0f ms)",
+            self.interval * 1000, self.threshold * 1000,
+        )
+
+    async def stop(self) -> None:
+        sites = self.top_blocking_sites()
+        if sites:
+            logger.info(
+                "Top event-loop blocking sites: %s",
+                "; ".join(f"{site} x{samples}" for site, samples in sites),
+            )
+        self._stop.set()
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        if self._thread is not None:
+            await asyncio.to_thread(self._thread.join, self.sample_interval * 4)
+            self._thread = None
+
+    async def _heartbeat(self) -> None:
+        metrics = get_metrics()
+        while True:
+            expected = time.monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            self._beat = now
+            lag = max(0.0, now - expected)
+            self.max_lag = max(self.max_lag, lag)
+            metrics.observe_histogram("event_loop_lag_seconds", lag, LoopWatchdogSettings.LAG_BUCKETS)
+            if lag >= self.threshold:
+                site, self._stall_site = self._stall_site, None
+                metrics.increment("event_loop_stalls_total")
+                logger.warning("Event loop was blocked for %.0f ms at %s", lag * 1000, site or "unknown")
+
+    def _sample_forever(self) -> None:
+        while not self._stop.wait(self.sample_interval):
+            try:
+                self.sample()
+            except Exception as e:
+                logger.debug("Loop watchdog sample failed: %s", e)
+
+    def sample(self) -> Optional[str]:
+        """Sample the loop thread if it is blocked; returns the blocking site"""
+        blocked = time.monotonic() - self._beat - self.interval
+        if blocked < self.threshold:
+            return None
+        frame = sys._current_frames().get(self._loop_thread_id)
+        if frame is None:
+            return None
+        stack = traceback.extract_stack(frame)
+        del frame
+        site = blocking_site(stack)
+        with self._lock:
+            self._sites[site] += 1
+            if site not in self._labelled_sites and len(self._labelled_sites) < self.top_sites:
+                self._labelled_sites.add(site)
+            label = site if site in self._labelled_sites else "other"
+        get_metrics().increment("event_loop_blocked_samples_total", labels={"site": label})
+        if self._stall_site is None:
+            # First sample of this stall: log where the loop is stuck
+            self._stall_site = site
+            logger.warning(
+                "Event loop blocked for %.0f ms so far at %s\n%s",
+                blocked * 1000,
+                site,
+                "".join(traceback.format_list(stack[-LoopWatchdogSettings.STACK_DEPTH:])).rstrip(),
+            )
+        return site
+
+    def top_blocking_sites(self, limit: int = LoopWatchdogSettings.TOP_SITES) -> List[Tuple[str, int]]:
+        """Call sites seen blocking the loop, by number of samples"""
+        with self._lock:
+            return self._sites.most_common(limit)
+
+
+_watchdog: Optional[LoopWatchdog] = None
+
+
+def get_loop_watchdog() -> LoopWatchdog:
+    """Get the process-wide event-loop watchdog"""
+    global _watchdog
+    if _watchdog is None:
+        _watchdog = LoopWatchdog()
+    return _watchdog
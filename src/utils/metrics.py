@@ -0,0 +1,169 @@
+"""
+In-process metrics and health checks
+
+A small thread-safe registry of counters, gauges, timings and histograms,
+served by the ``/health`` and ``/metrics`` endpoints as JSON or in the
+Prometheus text format. Labels are folded into the metric key
+Prometheus-style, e.g. ``task_queue_depth{pool="pdf"}``.
+"""
+
+import logging
+import threading
+import time
+from typing import Callable, Dict, Mapping, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+HealthCheck = Callable[[], bool]
+
+
+def metric_key(name: str, labels: Optional[Mapping[str, str]] = None) -> str:
+    """Metric name with its labels, as used in the Prometheus exposition format"""
+    if not labels:
+        return name
+    rendered = ",".join(f'{k}="{v}"' for k, v in sorted(labels.items()))
+    return f"{name}{{{rendered}}}"
+
+
+class MetricsCollector:
+    """Process-wide counters, gauges, timing summaries and histograms"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.started_at = time.time()
+        self.counters: Dict[str, float] = {}
+        self.gauges: Dict[str, float] = {}
+        self.timings: Dict[str, Dict[str, float]] = {}
+        self.histograms: Dict[str, Dict] = {}
+
+    def increment(self, name: str, value: float = 1, labels: Optional[Mapping[str, str]] = None) -> None:
+        key = metric_key(name, labels)
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def set_gauge(self, name: str, value: float, labels: Optional[Mapping[str, str]] = None) -> None:
+        with self._lock:
+            self.gauges[metric_key(name, labels)] = value
+
+    def observe(self, name: str, seconds: float, labels: Optional[Mapping[str, str]] = None) -> None:
+        """Record a duration; kept as count/sum/max"""
+        key = metric_key(name, labels)
+        with self._lock:
+            summary = self.timings.setdefault(key, {"count": 0, "sum": 0.0, "max": 0.0})
+            summary["count"] += 1
+            summary["sum"] += seconds
+            summary["max"] = max(summary["max"], seconds)
+
+    def observe_histogram(
+        self,
+        name: str,
+        value: float,
+        buckets: Sequence[float],
+        labels: Optional[Mapping[str, str]] = None,
+    ) -> None:
+        """Record ``value`` in cumulative ``le`` buckets (bucket bounds are fixed on first use)"""
+        key = metric_key(name, labels)
+        with self._lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = {
+                    "buckets": {bound: 0 for bound in sorted(buckets)}, "count": 0, "sum": 0.0,
+                }
+            histogram["count"] += 1
+            histogram["sum"] += value
+            for bound in histogram["buckets"]:
+                if value <= bound:
+                    histogram["buckets"][bound] += 1
+
+    def get_summary(self) -> Dict:
+        with self._lock:
+            return {
+                "uptime_seconds": round(time.time() - self.started_at, 3),
+                "counters": dict(self.counters),
+                "gauges": dict(self.gauges),
+                "timings": {key: dict(value) for key, value in self.timings.items()},
+                "histograms": {
+                    key: {**value, "buckets": dict(value["buckets"])} for key, value in self.histograms.items()
+                },
+            }
+
+    def export_metrics(self, format_type: str = "prometheus") -> str:
+        """Metrics in the Prometheus text format (``format_type="json"`` gives JSON)"""
+        summary = self.get_summary()
+        if format_type == "json":
+            import json
+            return json.dumps(summary)
+        lines = [f"process_uptime_seconds {summary['uptime_seconds']}"]
+        lines += [f"{key} {value}" for key, value in sorted(summary["counters"].items())]
+        lines += [f"{key} {value}" for key, value in sorted(summary["gauges"].items())]
+        for key, value in sorted(summary["timings"].items()):
+            name, _, labels = key.partition("{")
+            suffix = "{" + labels if labels else ""
+            lines.append(f"{name}_count{suffix} {value['count']}")
+            lines.append(f"{name}_sum{suffix} {value['sum']:.6f}")
+            lines.append(f"{name}_max{suffix} {value['max']:.6f}")
+        for key, value in sorted(summary["histograms"].items()):
+            name, _, labels = key.partition("{")
+            labels = labels.rstrip("}")
+            prefix = labels + "," if labels else ""
+            for bound, count in value["buckets"].items():
+                lines.append(f'{name}_bucket{{{prefix}le="{bound:g}"}} {count}')
+            lines.append(f'{name}_bucket{{{prefix}le="+Inf"}} {value["count"]}')
+            suffix = "{" + labels + "}" if labels else ""
+            lines.append(f"{name}_count{suffix} {value['count']}")
+            lines.append(f"{name}_sum{suffix} {value['sum']:.6f}")
+        return "\n".join(lines) + "\n"
+
+    def reset(self) -> None:
+        with self._lock:
+            self.counters.clear()
+            self.gauges.clear()
+            self.timings.clear()
+            self.histograms.clear()
+
+
+class HealthMonitor:
+    """Named health checks run on demand"""
+
+    def __init__(self):
+        self._checks: Dict[str, HealthCheck] = {}
+
+    def register_check(self, name: str, check: HealthCheck) -> None:
+        self._checks[name] = check
+
+    def run_health_checks(self) -> Dict:
+        results = {}
+        for name, check in self._checks.items():
+            started = time.monotonic()
+            try:
+                ok = bool(check())
+                error = None
+            except Exception as e:
+                ok, error = False, str(e)
+            results[name] = {"healthy": ok, "duration_ms": round((time.monotonic() - started) * 1000, 2)}
+            if error:
+                results[name]["error"] = error
+        healthy = all(result["healthy"] for result in results.values())
+        return {"status": "healthy" if healthy else "unhealthy", "checks": results}
+
+
+_metrics = MetricsCollector()
+_health_monitor = HealthMonitor()
+
+
+def get_metrics() -> MetricsCollector:
+    """Get the process-wide metrics collector"""
+    return _metrics
+
+
+def get_health_monitor() -> HealthMonitor:
+    """Get the process-wide health monitor"""
+    return _health_monitor
+
+
+def setup_metrics_collection() -> None:
+    """Register the default health checks"""
+    from src.db.operations import check_database_connection
+
+    _health_monitor.register_check("database", check_database_connection)
+    logger.info("Metrics collection enabled")
@@ -0,0 +1,115 @@
+"""
+Versioned, immutable snapshot of business settings
+
+Business settings are read on almost every screen (step images, welcome
+texts, delivery charge, invoices) but change only when an admin edits them.
+The snapshot is parsed once and served from memory until
+``update_business_settings`` bumps the settings version.
+"""
+
+import json
+import logging
+import time
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Any, Dict, Mapping, Optional
+
+from src.utils.cache import VersionedSnapshot
+from src.utils.constants import CacheSettings
+from src.utils.image_handler import ImageHandler, resolve_step_images
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class BusinessSettingsSnapshot:
+    """Parsed business settings for one settings version"""
+
+    version: int
+    values: Mapping[str, Any]
+    app_images: Mapping[str, str]
+    step_images: Mapping[str, str]
+    delivery_charge: Optional[float]
+    loaded_at: float
+
+    def get(self, key: str, default: Any = None) -> Any:
+        value = self.values.get(key)
+        return default if value is None else value
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Mutable copy in the shape returned by ``BusinessSettings.to_dict()``"""
+        return dict(self.values)
+
+    def step_image(self, step_key: str, width: int = 900, height: int = 600) -> str:
+        url = self.step_images.get(step_key)
+        return ImageHandler.format_image_url(url, width, height) if url else ""
+
+
+def _parse_app_images(raw: Any) -> Dict[str, str]:
+    if isinstance(raw, str):
+        try:
+            raw = json.loads(raw)
+        except Exception:
+            logger.warning("Ignoring malformed app_images JSON in business settings")
+            return {}
+    if not isinstance(raw, dict):
+        return {}
+    return {str(k): v for k, v in raw.items() if isinstance(v, str) and v}
+
+
+def _parse_delivery_charge(raw: Any) -> Optional[float]:
+    if raw is None:
+        return None
+    try:
+        return float(raw)
+    except (TypeError, ValueError):
+        logger.warning("Ignoring non-numeric delivery_charge in business settings: %r", raw)
+        return None
+
+
+def build_settings_snapshot(values: Dict[str, Any], version: int) -> BusinessSettingsSnapshot:
+    """Parse a settings dict into an immutable snapshot"""
+    app_images = _parse_app_images(values.get("app_images"))
+    return BusinessSettingsSnapshot(
+        version=version,
+        values=MappingProxyType(dict(values)),
+        app_images=MappingProxyType(app_images),
+        step_images=MappingProxyType(resolve_step_images(app_images)),
+        delivery_charge=_parse_delivery_charge(values.get("delivery_charge")),
+        loaded_at=time.time(),
+    )
+
+
+def _load_snapshot(version: int) -> BusinessSettingsSnapshot:
+    from src.db.operations import load_business_settings_dict  # lazy import to avoid cycles
+    return build_settings_snapshot(load_business_settings_dict(), version)
+
+
+def _fallback_snapshot(version: int) -> Optional[BusinessSettingsSnapshot]:
+    # Settings persisted with the catalog snapshot, used while the database is unreachable
+    from src.utils.catalog_snapshot import get_catalog_store  # lazy import to avoid cycles
+    catalog = get_catalog_store().latest()
+    return build_settings_snapshot(catalog.settings, version) if catalog and catalog.settings else None
+
+
+_holder: VersionedSnapshot[BusinessSettingsSnapshot] = VersionedSnapshot(
+    "business settings", _load_snapshot, CacheSettings.SETTINGS_RELOAD_RETRY_SECONDS, fallback=_fallback_snapshot
+)
+
+
+def get_settings_version() -> int:
+    """Current business-settings version"""
+    return _holder.version
+
+
+def bump_settings_version() -> int:
+    """Mark the snapshot stale; the next read reloads it from the database"""
+    return _holder.bump()
+
+
+def get_settings_snapshot() -> BusinessSettingsSnapshot:
+    """Return the snapshot for the current version, loading it if needed.
+    If reloading fails, the previous snapshot keeps being served and the
+    reload is retried after a short back-off.
+    """
+    return _holder.get()
@@ -0,0 +1,205 @@
+"""
+Bounded background task supervisor
+
+Heavy work started from handlers (invoice PDFs, invoice and order exports,
+imports) runs in named pools instead of bare ``asyncio.create_task``:
+
+- each pool runs at most ``concurrency`` tasks and keeps at most
+  ``max_queue`` more waiting; beyond that ``submit`` raises ``TaskPoolFull``,
+- a dedup key (e.g. chat + order) rejects a second submit while the first is
+  still queued or running with ``DuplicateTask``,
+- ``cancel`` stops a task by key and ``shutdown`` drains all pools on
+  application shutdown, cancelling whatever does not finish in time.
+
+Queue depth, running count and wait/run times are published to the metrics
+registry.
+"""
+
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Dict, Hashable, Optional, Set, Tuple
+
+from src.utils.constants import TaskPoolSettings
+from src.utils.metrics import get_metrics
+
+logger = logging.getLogger(__name__)
+
+
+class TaskRejected(Exception):
+    """Raised when a task cannot be accepted"""
+
+
+class TaskPoolFull(TaskRejected):
+    """Raised when the pool's queue is at its bound"""
+
+
+class DuplicateTask(TaskRejected):
+    """Raised when a task with the same key is already queued or running"""
+
+
+class SupervisorClosed(TaskRejected):
+    """Raised when submitting after shutdown started"""
+
+
+class TaskPool:
+    """Runs at most ``concurrency`` coroutines with a bounded wait queue"""
+
+    def __init__(self, name: str, concurrency: int, max_queue: int):
+        self.name = name
+        self.concurrency = max(1, concurrency)
+        self.max_queue = max(0, max_queue)
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._tasks: Set[asyncio.Task] = set()
+        self._keys: Dict[Hashable, asyncio.Task] = {}
+        self.waiting = 0
+        self.running = 0
+        self._labels = {"pool": name}
+
+    def submit(self, coro: Awaitable[Any], key: Optional[Hashable] = None) -> asyncio.Task:
+        if key is not None and key in self._keys:
+            _close(coro)
+            get_metrics().increment("task_rejected_total", labels={**self._labels, "reason": "duplicate"})
+            raise DuplicateTask(f"{self.name} task {key!r} is already scheduled")
+        if self.running + self.waiting >= self.concurrency + self.max_queue:
+            _close(coro)
+            get_metrics().increment("task_rejected_total", labels={**self._labels, "reason": "full"})
+            raise TaskPoolFull(f"{self.name} pool is full ({self.waiting} waiting)")
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+
+        self.waiting += 1
+        self._publish()
+        job = {"acquired": False, "status": "cancelled"}
+        task = asyncio.get_running_loop().create_task(self._run(coro, job), name=f"{self.name}:{key}")
+        self._tasks.add(task)
+        if key is not None:
+            self._keys[key] = task
+        task.add_done_callback(lambda t: self._finish(t, key, coro, job))
+        return task
+
+    async def _run(self, coro: Awaitable[Any], job: Dict[str, Any]) -> Any:
+        queued_at = time.monotonic()
+        await self._semaphore.acquire()
+        job["acquired"] = True
+        self.waiting -= 1
+        self.running += 1
+        self._publish()
+        metrics = get_metrics()
+        metrics.observe("task_wait_seconds", time.monotonic() - queued_at, self._labels)
+        started = time.monotonic()
+        try:
+            result = await coro
+            job["status"] = "ok"
+            return result
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            job["status"] = "error"
+            logger.exception("Background task failed in %s pool", self.name)
+        finally:
+            metrics.observe("task_run_seconds", time.monotonic() - started, self._labels)
+            self.running -= 1
+            self._semaphore.release()
+
+    def _finish(self, task: asyncio.Task, key: Optional[Hashable], coro: Awaitable[Any], job: Dict[str, Any]) -> None:
+        # A task cancelled while still waiting never reaches its own cleanup
+        if not job["acquired"]:
+            self.waiting -= 1
+            _close(coro)
+        self._tasks.discard(task)
+        if key is not None and self._keys.get(key) is task:
+            del self._keys[key]
+        self._publish()
+        get_metrics().increment("task_completed_total", labels={**self._labels, "status": job["status"]})
+
+    def _publish(self) -> None:
+        metrics = get_metrics()
+        metrics.set_gauge("task_queue_depth", self.waiting, self._labels)
+        metrics.set_gauge("task_running", self.running, self._labels)
+
+    def is_scheduled(self, key: Hashable) -> bool:
+        return key in self._keys
+
+    def cancel(self, key: Hashable) -> bool:
+        task = self._keys.get(key)
+        if task is None or task.done():
+            return False
+        return task.cancel()
+
+    @property
+    def tasks(self) -> Set[asyncio.Task]:
+        return set(self._tasks)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "concurrency": self.concurrency,
+            "max_queue": self.max_queue,
+            "running": self.running,
+            "waiting": self.waiting,
+        }
+
+
+def _close(coro: Awaitable[Any]) -> None:
+    """Close a coroutine that will never run, so it is not reported as never awaited"""
+    close = getattr(coro, "close", None)
+    if close is not None:
+        close()
+
+
+class TaskSupervisor:
+    """Named task pools with a common shutdown"""
+
+    def __init__(self, limits: Optional[Dict[str, Tuple[int, int]]] = None):
+        self._pools = {
+            name: TaskPool(name, concurrency, max_queue)
+            for name, (concurrency, max_queue) in (limits or TaskPoolSettings.LIMITS).items()
+        }
+        self._closed = False
+
+    def pool(self, name: str) -> TaskPool:
+        try:
+            return self._pools[name]
+        except KeyError:
+            raise ValueError(f"Unknown task pool: {name}") from None
+
+    def submit(self, pool: str, coro: Awaitable[Any], key: Optional[Hashable] = None) -> asyncio.Task:
+        """Schedule ``coro`` in ``pool``; raises ``TaskRejected`` if it is not accepted"""
+        if self._closed:
+            _close(coro)
+            raise SupervisorClosed("task supervisor is shutting down")
+        return self.pool(pool).submit(coro, key)
+
+    def is_scheduled(self, pool: str, key: Hashable) -> bool:
+        return self.pool(pool).is_scheduled(key)
+
+    def cancel(self, pool: str, key: Hashable) -> bool:
+        return self.pool(pool).cancel(key)
+
+    async def shutdown(self, timeout: float = TaskPoolSettings.SHUTDOWN_TIMEOUT_SECONDS) -> None:
+        """Stop accepting tasks, let running and queued ones finish, then cancel the rest"""
+        self._closed = True
+        tasks = set().union(*(pool.tasks for pool in self._pools.values()))
+        if not tasks:
+            return
+        logger.info("Draining %d background tasks", len(tasks))
+        _, pending = await asyncio.wait(tasks, timeout=timeout)
+        if pending:
+            logger.warning("Cancelling %d background tasks still running after %.0fs", len(pending), timeout)
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        return {name: pool.stats() for name, pool in self._pools.items()}
+
+
+_task_supervisor: Optional[TaskSupervisor] = None
+
+
+def get_task_supervisor() -> TaskSupervisor:
+    """Get the application-wide task supervisor"""
+    global _task_supervisor
+    if _task_supervisor is None:
+        _task_supervisor = TaskSupervisor()
+    return _task_supervisor
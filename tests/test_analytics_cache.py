@@ -0,0 +1,72 @@
+"""
+Tests for the analytics result cache
+"""
+
+import asyncio
+from datetime import datetime, timezone
+from unittest.mock import AsyncMock, patch
+
+from src.utils.cache import invalidate_namespaces
+from src.utils.constants import CacheNamespaces
+
+
+class TestAnalyticsCache:
+    """Test caching and order-write invalidation of analytics"""
+
+    def setup_method(self):
+        invalidate_namespaces(CacheNamespaces.ORDERS)
+
+    def test_served_until_order_write(self):
+        """Test that reports are computed once until an order event bumps the version"""
+        from src.services.admin_service import AdminService
+        from src.utils.invalidation_bus import InvalidationBus, LoopbackBackend, register_default_handlers
+
+        service = AdminService()
+        comprehensive = AsyncMock(return_value={"revenue": {"total_revenue": 10.0}})
+        quick = AsyncMock(return_value={"today": {"orders": 1}})
+        bus = register_default_handlers(InvalidationBus(LoopbackBackend()))
+
+        async def run():
+            with patch.object(service.analytics_service, "get_comprehensive_analytics", comprehensive), \
+                    patch.object(service.analytics_service, "get_quick_analytics", quick):
+                first = await service.get_business_analytics()
+                # Paging through a report re-reads the same analytics
+                again = await service.get_business_analytics()
+                bus.publish(CacheNamespaces.ORDERS)
+                after_write = await service.get_business_analytics()
+                other_period = await service.get_business_analytics(period_days=7)
+            return first, again, after_write, other_period
+
+        first, again, after_write, other_period = asyncio.run(run())
+        assert again is first
+        assert after_write is not first and after_write["revenue"] == first["revenue"]
+        assert other_period is not after_write
+        assert comprehensive.await_count == 3
+        assert comprehensive.await_args.kwargs == {"period_days": 7}
+
+    def test_failures_are_not_cached(self):
+        """Test that an empty (failed) result is recomputed on the next read"""
+        from src.services.admin_service import AdminService
+
+        service = AdminService()
+        comprehensive = AsyncMock(side_effect=[{}, {"revenue": {}}])
+
+        async def run():
+            with patch.object(service.analytics_service, "get_comprehensive_analytics", comprehensive), \
+                    patch.object(service.analytics_service, "get_quick_analytics", AsyncMock(return_value={})):
+                return await service.get_business_analytics(), await service.get_business_analytics()
+
+        failed, recovered = asyncio.run(run())
+        assert failed == {}
+        assert recovered["revenue"] == {}
+
+    def test_key_tracks_order_data_version(self):
+        """Test that the key is stable for a period until the version is bumped"""
+        from src.services.analytics_cache import analytics_cache_key, bump_order_data_version
+
+        now = datetime(2025, 3, 1, 23, 30, tzinfo=timezone.utc)
+        key = analytics_cache_key("business", 30, now)
+        assert key[:2] == ("business", 30)
+        assert analytics_cache_key("business", 30, now) == key
+        bump_order_data_version()
+        assert analytics_cache_key("business", 30, now) != key
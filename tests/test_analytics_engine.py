@@ -0,0 +1,120 @@
+"""
+Tests for the columnar analytics engine
+"""
+
+from datetime import date, datetime, timedelta
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+
+START = date(2025, 1, 1)
+END = date(2025, 1, 31)
+
+
+def _orders():
+    dana = SimpleNamespace(id=1, full_name="Dana")
+    avi = SimpleNamespace(id=2, full_name="Avi")
+    spec = [
+        # (day, status, method, customer, [(product, qty, price)])
+        (0, "delivered", "delivery", dana, [("Kubaneh", 2, 25.0), ("Jachnun", 1, 30.0)]),
+        (0, "pending", "pickup", avi, [("Kubaneh", 1, 25.0)]),
+        (3, "cancelled", "pickup", dana, [("Kubaneh", 3, 25.0), ("Hilbe", 1, 10.0)]),
+        (9, "ready", "delivery", None, [("Jachnun", 2, 30.0)]),
+        (9, "delivered", "pickup", avi, [("Hilbe", 4, 10.0), ("Jachnun", 1, 30.0)]),
+        (45, "delivered", "pickup", avi, [("Kubaneh", 9, 25.0)]),  # outside the period
+    ]
+    orders = []
+    for i, (day, status, method, customer, items) in enumerate(spec, start=1):
+        created = datetime(2025, 1, 1, 9) + timedelta(days=day, minutes=i)
+        lines = [SimpleNamespace(product_name=p, quantity=q, total_price=q * price) for p, q, price in items]
+        orders.append(SimpleNamespace(
+            id=i, created_at=created, updated_at=created + timedelta(hours=i), status=status,
+            delivery_method=method, customer=customer, order_items=lines,
+            total=sum(line.total_price for line in lines),
+        ))
+    return orders
+
+
+def _reports(service, facts):
+    return (
+        service._revenue_from_facts(facts).__dict__,
+        service._orders_from_facts(facts).__dict__,
+        [p.__dict__ for p in service._products_from_facts(facts)],
+        [c.__dict__ for c in service._customers_from_facts(facts)],
+        service._trends_from_facts(facts),
+    )
+
+
+@pytest.fixture(params=["numpy", "python"])
+def backend(request):
+    """Run with NumPy when it is installed and always with the pure-Python fallback"""
+    from src.services import analytics_engine
+
+    if request.param == "numpy" and not analytics_engine.HAS_NUMPY:
+        pytest.skip("NumPy not installed")
+    with patch.object(analytics_engine, "HAS_NUMPY", request.param == "numpy"):
+        yield request.param
+
+
+class TestOrderFacts:
+    """Test that columnar reports match the per-order implementation"""
+
+    def test_matches_per_order_reports(self, backend):
+        """Test revenue, order, product, customer and trend reports"""
+        from src.services.admin_service import AnalyticsService
+        from src.services.analytics_engine import OrderFacts
+
+        service = AnalyticsService()
+        orders = _orders()
+        in_period = [o for o in orders if START <= o.created_at.date() <= END]
+        facts = OrderFacts.from_orders(START, END, orders)
+
+        revenue, order_stats, products, customers, trends = _reports(service, facts)
+
+        assert facts.order_count == 5
+        assert revenue == service._calculate_revenue_analytics(in_period, START, END).__dict__
+        expected_orders = service._calculate_order_analytics(in_period, START, END).__dict__
+        assert order_stats.pop("avg_processing_time") == pytest.approx(expected_orders.pop("avg_processing_time"))
+        assert order_stats == expected_orders
+        assert products == [p.__dict__ for p in service._calculate_product_analytics(in_period)]
+        assert customers == [c.__dict__ for c in service._calculate_customer_analytics(in_period)]
+        assert trends == service._calculate_trends(in_period, START, END)
+
+    def test_favorite_ties_follow_first_purchase(self, backend):
+        """Test that products tied on quantity rank in the order the customer first bought them"""
+        from src.services.admin_service import AnalyticsService
+        from src.services.analytics_engine import OrderFacts
+
+        dana = SimpleNamespace(id=1, full_name="Dana")
+        avi = SimpleNamespace(id=2, full_name="Avi")
+        spec = [(dana, "Kubaneh"), (avi, "Hilbe"), (avi, "Jachnun"), (avi, "Kubaneh")]
+        orders = []
+        for i, (customer, product) in enumerate(spec, start=1):
+            created = datetime(2025, 1, 2, 9) + timedelta(hours=i)
+            lines = [SimpleNamespace(product_name=product, quantity=2, total_price=20.0)]
+            orders.append(SimpleNamespace(
+                id=i, created_at=created, updated_at=created, status="delivered", delivery_method="pickup",
+                customer=customer, order_items=lines, total=20.0,
+            ))
+
+        service = AnalyticsService()
+        customers = service._customers_from_facts(OrderFacts.from_orders(START, END, orders))
+
+        favorites = {c.customer_name: c.favorite_products for c in customers}
+        assert favorites["Avi"] == ["Hilbe", "Jachnun", "Kubaneh"]
+        assert [c.__dict__ for c in customers] == [c.__dict__ for c in service._calculate_customer_analytics(orders)]
+
+    def test_empty_period(self, backend):
+        """Test that a period without orders yields empty reports"""
+        from src.services.admin_service import AnalyticsService
+        from src.services.analytics_engine import OrderFacts
+
+        service = AnalyticsService()
+        facts = OrderFacts.from_rows(START, END, [], [])
+
+        revenue, order_stats, products, customers, trends = _reports(service, facts)
+
+        assert revenue["total_revenue"] == 0 and revenue["revenue_by_day"] == {}
+        assert order_stats["avg_processing_time"] is None
+        assert products == [] and customers == [] and trends == {}
@@ -0,0 +1,112 @@
+"""
+Tests for the invoice PDF browser pool
+"""
+
+import asyncio
+import importlib.util
+
+import pytest
+
+PLAYWRIGHT_INSTALLED = importlib.util.find_spec("playwright") is not None
+
+
+class TestBrowserPool:
+    """Test queueing and availability handling"""
+
+    @pytest.mark.skipif(PLAYWRIGHT_INSTALLED, reason="Playwright is installed")
+    def test_unavailable_without_playwright(self):
+        """Test that rendering reports unavailability instead of crashing"""
+        from src.services.browser_pool import BrowserPool, BrowserPoolUnavailable
+        from src.services.invoice_service import generate_pdf_from_html
+
+        async def run():
+            pool = BrowserPool(size=1)
+            assert await pool.start() is False
+            with pytest.raises(BrowserPoolUnavailable):
+                await pool.render_pdf("<html></html>")
+
+        asyncio.run(run())
+        assert asyncio.run(generate_pdf_from_html("<html></html>")) is None
+
+    def test_failed_launch_is_not_retried_during_cool_down(self):
+        """Test that renders fail fast after a failed launch instead of relaunching each time"""
+        import sys
+        import types
+        from unittest.mock import AsyncMock, MagicMock, patch
+
+        from src.services.browser_pool import BrowserPool, BrowserPoolUnavailable
+
+        launcher = MagicMock()
+        launcher.return_value.start = AsyncMock(side_effect=RuntimeError("chromium crashed on launch"))
+        async_api = types.ModuleType("playwright.async_api")
+        async_api.async_playwright = launcher
+
+        async def run():
+            pool = BrowserPool(size=1, launch_retry=60)
+            for _ in range(3):
+                with pytest.raises(BrowserPoolUnavailable):
+                    await pool.render_pdf("<html></html>")
+            first_attempts = launcher.call_count
+            pool._failed_at -= 60
+            with pytest.raises(BrowserPoolUnavailable):
+                await pool.render_pdf("<html></html>")
+            return first_attempts, launcher.call_count
+
+        with patch.dict(sys.modules, {"playwright": types.ModuleType("playwright"), "playwright.async_api": async_api}):
+            assert asyncio.run(run()) == (1, 2)
+
+    def test_full_queue_rejects_jobs(self):
+        """Test that the render queue is bounded"""
+        from src.services.browser_pool import BrowserPool, BrowserPoolBusy
+
+        async def run():
+            pool = BrowserPool(size=1, queue_size=1, render_timeout=0.05)
+            # Started pool whose workers are busy elsewhere
+            pool._loop = asyncio.get_running_loop()
+            pool._queue = asyncio.Queue(maxsize=1)
+            pool._started = True
+
+            first = asyncio.ensure_future(pool.render_pdf("<p>1</p>"))
+            await asyncio.sleep(0)
+            with pytest.raises(BrowserPoolBusy):
+                await pool.render_pdf("<p>2</p>")
+            with pytest.raises(asyncio.TimeoutError):
+                await first
+            return pool.stats()
+
+        stats = asyncio.run(run())
+        assert stats["rejected"] == 1
+        assert stats["queue_depth"] == 1
+
+    def test_contexts_are_warm_before_jobs_and_after_restart(self):
+        """Test that every worker has an open context at start and after a Chromium restart"""
+        from unittest.mock import AsyncMock, MagicMock
+
+        from src.services.browser_pool import BrowserPool
+
+        def fake_browser():
+            browser = MagicMock()
+            browser.is_connected.return_value = True
+            browser.close = AsyncMock()
+            browser.new_context = AsyncMock(side_effect=lambda: MagicMock(close=AsyncMock(), new_page=AsyncMock()))
+            return browser
+
+        async def run():
+            pool = BrowserPool(size=3)
+            pool._restart_lock = asyncio.Lock()
+            pool._playwright = MagicMock()
+            pool._playwright.chromium.launch = AsyncMock(side_effect=lambda args: fake_browser())
+
+            await pool._launch_browser()
+            await pool._warm_slots()
+            first = pool._browser
+            assert first.new_context.await_count == 3
+            assert all(slot.generation == 1 for slot in pool._slots)
+
+            old_slots = list(pool._slots)
+            await pool._restart_browser(seen_generation=1)
+            assert pool._browser.new_context.await_count == 3
+            assert all(slot.generation == 2 for slot in pool._slots)
+            assert all(slot.context.close.await_count == 1 for slot in old_slots)
+
+        asyncio.run(run())
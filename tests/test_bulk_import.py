@@ -0,0 +1,141 @@
+"""
+Tests for bulk CSV/YAML import of customers and the menu
+"""
+
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+
+CATALOG_YAML = """\
+categories:
+  - {name_en: Breads, name_he: לחמים, display_order: 1}
+options:
+  - {option_type: kubaneh_type, name: classic, price_modifier: 0}
+  - {option_type: kubaneh_type, name: seeded, price_modifier: 2.5}
+products:
+  - {name: Kubaneh, category: Breads, price: 25, options: [kubaneh_type:classic, kubaneh_type:seeded]}
+  - {name: Jachnun, category: Pastries, price: 30}
+  - {name: Kubaneh, category: Breads, price: 26}
+  - {name: Malawach, category: Breads, price: -1}
+"""
+
+CUSTOMERS_CSV = """\
+telegram_id,name,phone,language
+1001,Dana,+972501111111,he
+1002,Avi,+972502222222,en
+not-a-number,Broken,+972503333333,en
+"""
+
+
+@pytest.fixture
+def engine(tmp_path):
+    """Engine on a fresh SQLite file with the application schema"""
+    from src.db.operations import DatabaseManager
+
+    config = SimpleNamespace(
+        supabase_connection_string="",
+        database_url=f"sqlite:///{tmp_path / 'app.db'}",
+        database_replica_url="",
+        environment="test",
+        db_pool_mode="auto",
+        db_pool_size=0,
+        db_max_overflow=-1,
+        db_pool_adaptive=False,
+    )
+    db_manager = DatabaseManager(config)
+    db_manager.create_tables()
+    yield db_manager.get_engine()
+    db_manager.get_engine().dispose()
+
+
+def _write(tmp_path, name, content):
+    path = tmp_path / name
+    path.write_text(content, encoding="utf-8")
+    return str(path)
+
+
+class TestBulkImport:
+    """Test validation, batched upserts and cache invalidation of imports"""
+
+    def test_imports_catalog_and_reports_bad_rows(self, engine, tmp_path):
+        """Test that valid rows are written with option links and invalid ones reported by row"""
+        from sqlalchemy import func, select
+
+        from src.db.models import Product, product_option_links
+        from src.services.bulk_import import import_file
+        from src.utils.constants import CacheNamespaces
+
+        path = _write(tmp_path, "menu.yaml", CATALOG_YAML)
+        with patch("src.utils.invalidation_bus.publish_invalidation") as publish:
+            result = import_file(path, engine=engine, batch_size=2)
+
+        assert result.counts["categories"].inserted == 1
+        assert result.counts["options"].inserted == 2
+        assert result.counts["products"].inserted == 1
+        assert result.error_count == 3
+        assert [error.row for error in result.errors] == ["products #2", "products #3", "products #4"]
+        assert "duplicate of products #1" in str(result.errors[1])
+        publish.assert_called_once()
+        assert CacheNamespaces.CONSTANTS in publish.call_args.args
+
+        with engine.connect() as conn:
+            assert conn.execute(select(Product.name, Product.price)).all() == [("Kubaneh", 25.0)]
+            assert conn.execute(select(func.count()).select_from(product_option_links)).scalar() == 2
+
+    def test_reimport_updates_existing_rows(self, engine, tmp_path):
+        """Test that importing a file again updates records matched on their key"""
+        from sqlalchemy import select
+
+        from src.db.models import Customer
+        from src.services.bulk_import import import_file
+
+        path = _write(tmp_path, "customers.csv", CUSTOMERS_CSV)
+        first = import_file(path, engine=engine)
+        assert first.counts["customers"].inserted == 2
+        assert first.errors[0].row == "line 4"
+
+        updated = _write(tmp_path, "more.csv", "telegram_id,name\n1001,Dana Levi\n1003,Noa\n")
+        second = import_file(updated, kind="customers", engine=engine)
+        assert (second.counts["customers"].inserted, second.counts["customers"].updated) == (1, 1)
+
+        with engine.connect() as conn:
+            rows = conn.execute(select(Customer.telegram_id, Customer.name, Customer.phone).order_by(Customer.telegram_id))
+            assert rows.all() == [(1001, "Dana Levi", "+972501111111"), (1002, "Avi", "+972502222222"), (1003, "Noa", None)]
+
+    def test_catalog_without_options_keeps_constants(self, engine, tmp_path):
+        """Test that only imports with product options invalidate the constants registry"""
+        from src.services.bulk_import import import_file
+        from src.utils.constants import CacheNamespaces
+
+        path = _write(tmp_path, "menu.yaml", "categories:\n  - {name_en: Breads, name_he: לחמים}\n")
+        with patch("src.utils.invalidation_bus.publish_invalidation") as publish:
+            import_file(path, engine=engine)
+
+        publish.assert_called_once()
+        assert CacheNamespaces.PRODUCTS in publish.call_args.args
+        assert CacheNamespaces.CONSTANTS not in publish.call_args.args
+
+    def test_dry_run_writes_nothing(self, engine, tmp_path):
+        """Test that a dry run reports counts but rolls back and skips invalidation"""
+        from sqlalchemy import func, select
+
+        from src.db.models import MenuCategory
+        from src.services.bulk_import import import_file
+
+        path = _write(tmp_path, "menu.yaml", CATALOG_YAML)
+        with patch("src.utils.invalidation_bus.publish_invalidation") as publish:
+            result = import_file(path, engine=engine, dry_run=True)
+
+        assert result.counts["categories"].inserted == 1
+        publish.assert_not_called()
+        with engine.connect() as conn:
+            assert conn.execute(select(func.count()).select_from(MenuCategory)).scalar() == 0
+
+    def test_rejects_unknown_csv_kind(self, tmp_path):
+        """Test that a CSV file not named after a kind needs the kind given"""
+        from src.services.bulk_import import ImportFileError, read_records
+
+        path = _write(tmp_path, "data.csv", "name\nx\n")
+        with pytest.raises(ImportFileError):
+            list(read_records(path))
@@ -0,0 +1,167 @@
+"""
+Tests for the namespaced cache subsystem
+"""
+
+import asyncio
+import threading
+import time
+from unittest.mock import patch
+
+from src.utils.cache import CacheRegistry, NamespacedCache, cached, get_cache, invalidate_namespaces
+from src.utils.constants import CacheNamespaces
+
+
+class TestNamespacedCache:
+    """Test LRU/TTL behaviour of a single namespace"""
+
+    def test_lru_eviction_respects_max_entries(self):
+        """Test that the least recently used entry is evicted first"""
+        cache = NamespacedCache("test", max_entries=2, shard_count=1)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        assert cache.get("a") == 1  # "b" is now least recently used
+        cache.set("c", 3)
+
+        assert cache.get("b") is None
+        assert cache.get("a") == 1
+        assert cache.get("c") == 3
+        assert cache.stats()["evictions"] == 1
+
+    def test_ttl_expiry_and_purge(self):
+        """Test that expired entries are dropped by purge_expired"""
+        cache = NamespacedCache("test", max_entries=10)
+        cache.set("short", "x", ttl=0.01)
+        cache.set("long", "y", ttl=60)
+        time.sleep(0.02)
+
+        assert cache.purge_expired() == 1
+        assert len(cache) == 1
+        assert cache.get("long") == "y"
+
+    def test_negative_entries(self):
+        """Test that negative entries are found but read as None"""
+        cache = NamespacedCache("test")
+        cache.set_negative("missing")
+
+        assert cache.contains("missing") is True
+        assert cache.get("missing", "default") == "default"
+        assert cache.stats()["negative_hits"] == 2
+
+    def test_single_flight_loads_once(self):
+        """Test that concurrent misses for one key run the loader once"""
+        cache = NamespacedCache("test")
+        calls = []
+        started = threading.Event()
+
+        def loader():
+            calls.append(1)
+            started.set()
+            time.sleep(0.05)
+            return "value"
+
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(cache.get_or_load("k", loader))) for _ in range(5)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert len(calls) == 1
+        assert results == ["value"] * 5
+
+    def test_async_single_flight_loads_once(self):
+        """Test that concurrent awaiting tasks share one load"""
+        cache = NamespacedCache("test")
+        calls = []
+
+        async def loader():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return 42
+
+        async def run():
+            return await asyncio.gather(*(cache.aget_or_load("k", loader) for _ in range(5)))
+
+        assert asyncio.run(run()) == [42] * 5
+        assert len(calls) == 1
+
+    def test_async_waiters_survive_leader_cancellation(self):
+        """Test that cancelling the loading task hands the load to a waiter instead of cancelling all"""
+        cache = NamespacedCache("test")
+        calls = []
+
+        async def loader():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return 42
+
+        async def run():
+            leader = asyncio.create_task(cache.aget_or_load("k", loader))
+            await asyncio.sleep(0)
+            waiters = [asyncio.create_task(cache.aget_or_load("k", loader)) for _ in range(3)]
+            await asyncio.sleep(0)
+            leader.cancel()
+            results = await asyncio.gather(*waiters)
+            return leader.cancelled(), results
+
+        assert asyncio.run(run()) == (True, [42] * 3)
+        assert len(calls) == 2
+
+
+class TestCacheRegistry:
+    """Test namespace registry and decorator"""
+
+    def test_invalidate_only_touches_given_namespace(self):
+        """Test per-namespace invalidation"""
+        registry = CacheRegistry()
+        registry.get(CacheNamespaces.PRODUCTS).set("p", 1)
+        registry.get(CacheNamespaces.SETTINGS).set("s", 2)
+
+        registry.invalidate(CacheNamespaces.SETTINGS)
+
+        assert registry.get(CacheNamespaces.PRODUCTS).get("p") == 1
+        assert registry.get(CacheNamespaces.SETTINGS).get("s") is None
+
+    def test_cached_decorator_caches_falsy_results(self):
+        """Test that False results are cached instead of recomputed"""
+        calls = []
+
+        @cached(ttl=60, namespace="test_falsy")
+        def is_open():
+            calls.append(1)
+            return False
+
+        assert is_open() is False
+        assert is_open() is False
+        assert len(calls) == 1
+
+        is_open.invalidate()
+        is_open()
+        assert len(calls) == 2
+
+    def test_cached_decorator_custom_key(self):
+        """Test that a key function collapses equivalent calls"""
+        calls = []
+
+        @cached(ttl=60, namespace="test_key", key=lambda name, user_id=None: (name, user_id % 2))
+        def label(name, user_id=None):
+            calls.append(user_id)
+            return name.upper()
+
+        label("a", user_id=1)
+        label("a", user_id=3)
+        label("a", user_id=2)
+        assert calls == [1, 2]
+
+    def test_translate_product_name_keyed_by_language(self):
+        """Test that users sharing a language share translation cache entries"""
+        from src.utils.helpers import translate_product_name
+
+        invalidate_namespaces(CacheNamespaces.TRANSLATIONS)
+        with patch("src.utils.helpers._language_of", return_value="en"):
+            translate_product_name("Jachnun", None, 111)
+            translate_product_name("Jachnun", None, 222)
+
+        stats = get_cache(CacheNamespaces.TRANSLATIONS).stats()
+        assert stats["size"] == 1
+        assert stats["hits"] >= 1
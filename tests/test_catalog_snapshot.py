@@ -0,0 +1,180 @@
+"""
+Tests for the disk-persisted catalog snapshot
+"""
+
+import gzip
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from src.db.models import Product
+from src.utils.catalog_snapshot import (
+    CatalogSnapshot,
+    CatalogSnapshotError,
+    CatalogStore,
+    catalog_read,
+)
+
+PAYLOAD = {
+    "categories": [
+        {"id": 1, "name_en": "Bread", "name_he": "לחם", "description": None, "description_en": None,
+         "description_he": None, "display_order": 0, "is_active": True, "image_url": None},
+        {"id": 2, "name_en": "Spreads", "name_he": "ממרחים", "description": None, "description_en": None,
+         "description_he": None, "display_order": 1, "is_active": True, "image_url": None},
+    ],
+    "products": [
+        {"id": 10, "name": "Kubaneh", "name_en": "Kubaneh", "name_he": "קובנה", "description": "Bread",
+         "description_en": None, "description_he": None, "category_id": 1, "price": 25.0, "is_active": True,
+         "image_url": None, "preparation_time_minutes": 15, "allergens": [], "nutritional_info": {}},
+        {"id": 11, "name": "Old bread", "name_en": None, "name_he": None, "description": None,
+         "description_en": None, "description_he": None, "category_id": 1, "price": 10.0, "is_active": False,
+         "image_url": None, "preparation_time_minutes": 15, "allergens": [], "nutritional_info": {}},
+    ],
+    "option_configs": {"10": {"rules": [{"option_type": "size"}], "choices": {}}},
+    "settings": {"business_name": "Samna Salta", "delivery_charge": 5.0},
+    "constants": {"order_status": [{"name": "pending", "display_names": {"en": "Pending", "he": "ממתין", None: "Pending"}}]},
+}
+
+
+@pytest.fixture
+def store(tmp_path):
+    """Catalog store persisting to a temporary file"""
+    loader = MagicMock(return_value=PAYLOAD)
+    catalog_store = CatalogStore(path=str(tmp_path / "catalog.json.gz"), loader=loader)
+    catalog_store.loader = loader
+    return catalog_store
+
+
+class TestCatalogSnapshot:
+    """Test serialization and queries"""
+
+    def test_round_trip_preserves_content(self):
+        """Test that a snapshot survives the file format unchanged"""
+        snapshot = CatalogSnapshot.build(PAYLOAD, version=3)
+        restored = CatalogSnapshot.from_bytes(snapshot.to_bytes())
+
+        assert restored.version == 3
+        assert restored.checksum == snapshot.checksum
+        assert restored.constants["order_status"][0]["display_names"][None] == "Pending"
+
+    def test_corrupt_file_is_rejected(self):
+        """Test that tampered content fails the checksum"""
+        blob = gzip.decompress(CatalogSnapshot.build(PAYLOAD, 1).to_bytes()).replace(b"25.0", b"2.5")
+
+        with pytest.raises(CatalogSnapshotError):
+            CatalogSnapshot.from_bytes(gzip.compress(blob))
+
+    def test_queries_return_model_instances(self):
+        """Test that queries behave like the database reads they replace"""
+        snapshot = CatalogSnapshot.build(PAYLOAD, 1)
+
+        products = snapshot.products_in_category("לחם")
+        assert [p.id for p in products] == [10]
+        assert isinstance(products[0], Product)
+        assert products[0].category == "Bread"
+        assert [p.id for p in snapshot.products_in_category("Bread", include_inactive=True)] == [10, 11]
+        assert snapshot.category_names() == ["Bread", "Spreads"]
+        assert snapshot.category_names(with_active_products=True) == ["Bread"]
+        assert snapshot.option_config(10)["rules"][0]["option_type"] == "size"
+        assert snapshot.option_config(11) == {"rules": [], "choices": {}}
+
+
+class TestCatalogStore:
+    """Test refresh, persistence and read routing"""
+
+    def test_refresh_persists_and_keeps_version_when_unchanged(self, store):
+        """Test that identical content is neither re-versioned nor rewritten"""
+        first = store.refresh()
+        mtime = store.path.stat().st_mtime_ns
+        second = store.refresh()
+
+        assert second is first
+        assert store.path.stat().st_mtime_ns == mtime
+
+        reloaded = CatalogStore(path=str(store.path))
+        assert reloaded.load_from_disk().checksum == first.checksum
+        assert reloaded.current() is not None
+
+    def test_catalog_read_routing(self, store):
+        """Test memory, database and outage fallback paths"""
+        db_read = MagicMock(return_value=["from db"])
+
+        @catalog_read(lambda catalog: catalog.category_names())
+        def get_names():
+            return db_read()
+
+        with patch("src.utils.catalog_snapshot._store", store):
+            # No snapshot yet: database
+            assert get_names() == ["from db"]
+
+            store.refresh()
+            assert get_names() == ["Bread", "Spreads"]
+            assert db_read.call_count == 1
+
+            # Stale after an invalidation: database again
+            store.mark_stale()
+            assert get_names() == ["from db"]
+
+            # Database down: last snapshot
+            db_read.side_effect = Exception("db down")
+            assert get_names() == ["Bread", "Spreads"]
+
+    def test_settings_fall_back_to_catalog(self, store):
+        """Test that settings come from the snapshot when the database is down"""
+        from src.utils import settings_snapshot
+
+        store.refresh()
+        settings_snapshot._holder.reset()
+        try:
+            with patch("src.utils.catalog_snapshot._store", store), patch(
+                "src.db.operations.load_business_settings_dict", side_effect=Exception("db down")
+            ):
+                assert settings_snapshot.get_settings_snapshot().get("business_name") == "Samna Salta"
+        finally:
+            settings_snapshot._holder.reset()
+
+    def test_option_assignment_refreshes_option_config(self, tmp_path):
+        """Test that assigning an option shows up in the next option config read"""
+        from types import SimpleNamespace
+
+        from src.db import operations
+        from src.db.models import ProductOption
+        from src.utils.catalog_snapshot import attach_catalog_store
+        from src.utils.invalidation_bus import InvalidationBus, LoopbackBackend
+
+        config = SimpleNamespace(
+            supabase_connection_string="",
+            database_url=f"sqlite:///{tmp_path / 'app.db'}",
+            database_replica_url="",
+            environment="test",
+            db_pool_mode="auto",
+            db_pool_size=0,
+            db_max_overflow=-1,
+            db_pool_adaptive=False,
+        )
+        manager = operations.DatabaseManager(config)
+        manager.create_tables()
+        with manager.get_session_context() as session:
+            product = Product(name="Kubaneh", price=25.0)
+            option = ProductOption(option_type="kubaneh_type", name="seeded")
+            session.add_all([product, option])
+            session.flush()
+            product_id, option_id = product.id, option.id
+
+        store = CatalogStore(path=str(tmp_path / "catalog.json.gz"))
+        bus = InvalidationBus(LoopbackBackend())
+        try:
+            with patch.object(operations, "get_db_manager", return_value=manager), patch(
+                "src.utils.catalog_snapshot._store", store
+            ), patch("src.utils.invalidation_bus.get_invalidation_bus", return_value=bus):
+                attach_catalog_store(bus)
+                store.refresh()
+                assert operations.get_product_option_config(product_id)["choices"] == {}
+
+                assert operations.assign_option_to_product(product_id, option_id)
+                assert store.current() is None
+                config_after = operations.get_product_option_config(product_id)
+        finally:
+            manager.get_engine().dispose()
+
+        assert [c["id"] for c in config_after["choices"]["kubaneh_type"]] == [option_id]
@@ -0,0 +1,102 @@
+"""
+Tests for the preloaded constants registry
+"""
+
+from unittest.mock import patch
+
+import pytest
+
+from src.utils.constants_manager import (
+    DEFAULT_CONSTANT_NAMES,
+    ConstantsManager,
+    build_constants_registry,
+)
+
+
+def _row(name, en, he, **extra):
+    return dict({"name": name, "display_names": {"en": en, "he": he, None: en}}, **extra)
+
+
+TABLES = {
+    "product_option": [
+        _row("classic", "Classic Kubaneh", "קובנה קלאסית", option_type="kubaneh_type"),
+        _row("classic", "Classic Samneh", "סמנה קלאסית", option_type="samneh_type"),
+    ],
+    "product_size": [_row("small", "Small", "קטן")],
+    "order_status": [_row("pending", "Waiting", "ממתין")],
+    "delivery_method": [_row("delivery", "Delivery", "משלוח", charge=12.0)],
+    "payment_method": [],
+    "delivery_area": [
+        {"id": 1, "name_en": "North", "name_he": "צפון", "charge": 15.0, "is_active": True, "display_order": 0},
+        {"id": 2, "name_en": "South", "name_he": "דרום", "charge": None, "is_active": False, "display_order": 1},
+    ],
+}
+
+
+@pytest.fixture
+def manager():
+    """Constants manager backed by the in-memory tables"""
+    with patch("src.utils.constants_manager.load_constant_tables", return_value=TABLES) as load:
+        mgr = ConstantsManager()
+        mgr.load = load
+        yield mgr
+
+
+class TestConstantsRegistry:
+    """Test registry indexing"""
+
+    def test_keys_by_type_name_language(self):
+        """Test (type, name, language) lookups"""
+        registry = build_constants_registry(TABLES, version=1)
+
+        assert registry.display_name("order_status", "pending", "he") == "ממתין"
+        assert registry.display_name("samneh_type", "classic", "en") == "Classic Samneh"
+        # Unknown language uses the unlocalized name
+        assert registry.display_name("product_size", "small", "fr") == "Small"
+        # Legacy lookup by name only keeps the first row in display order
+        assert registry.display_name("product_option", "classic", "en") == "Classic Kubaneh"
+
+    def test_delivery_areas_and_charges(self):
+        """Test delivery data is part of the registry"""
+        registry = build_constants_registry(TABLES, version=1)
+
+        assert registry.delivery_charges["delivery"] == 12.0
+        assert registry.delivery_area(2).get_localized_name("he") == "דרום"
+
+
+class TestConstantsManager:
+    """Test lookups through the manager"""
+
+    def test_lookups_hit_database_once(self, manager):
+        """Test that repeated lookups reuse the loaded registry"""
+        for _ in range(3):
+            manager.get_order_status_display_name("pending", "en")
+            manager.get_product_option_display_name("classic", "samneh_type", "he")
+            manager.format_product_display_name("Samneh", {"samneh_type": "classic", "size": "small"}, "en")
+
+        assert manager.load.call_count == 1
+        assert manager.get_product_option_display_name("classic", "samneh_type", "he") == "סמנה קלאסית"
+
+    def test_invalidate_reloads(self, manager):
+        """Test that invalidate() triggers one reload"""
+        manager.get_order_status_display_name("pending")
+        manager.invalidate()
+        manager.get_order_status_display_name("pending")
+
+        assert manager.load.call_count == 2
+
+    def test_default_layer_fills_gaps(self, manager):
+        """Test hardcoded fallbacks for constants missing from the database"""
+        assert manager.get_order_status_display_name("cancelled", "he") == DEFAULT_CONSTANT_NAMES[("order_status", "cancelled", "he")]
+        assert manager.get_payment_method_display_name("cash", "en") == "Cash"
+        assert manager.get_delivery_charge_amount("pickup") == 0.0
+        assert manager.get_delivery_charge_amount("delivery") == 12.0
+        assert [a.id for a in manager.get_delivery_areas()] == [1]
+
+    def test_database_failure_uses_default_layer(self):
+        """Test that a failed load serves defaults without retrying every call"""
+        with patch("src.utils.constants_manager.load_constant_tables", side_effect=Exception("db down")) as load:
+            mgr = ConstantsManager()
+            assert mgr.get_product_size_display_name("large", "en") == "Large"
+            assert mgr.get_delivery_charge_amount("delivery") == 5.0
+            assert load.call_count == 1
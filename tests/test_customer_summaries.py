@@ -0,0 +1,60 @@
+"""
+Tests for the aggregated customer list queries
+"""
+
+import asyncio
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+
+@pytest.fixture
+def db_session():
+    """In-memory database with three customers and their orders"""
+    from src.db.models import Base, Customer, Order
+
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine, expire_on_commit=False)
+    with Session() as session:
+        dana = Customer(telegram_id=1, name="Dana", phone="+972500000001")
+        avi = Customer(telegram_id=2, name="Avi", phone="+972500000002")
+        noa = Customer(telegram_id=3, name="Noa", phone="+972500000003")
+        session.add_all([dana, avi, noa])
+        session.flush()
+        for number, (customer, total) in enumerate([(dana, 20.0), (avi, 50.0), (dana, 45.0)], start=1):
+            session.add(Order(customer_id=customer.id, order_number=f"SS{number}", total=total, subtotal=total))
+        session.commit()
+    with patch("src.db.operations.get_db_session", side_effect=Session):
+        yield
+
+
+class TestCustomerSummaries:
+    """Test order aggregates, sorting and paging done in SQL"""
+
+    def test_sorted_by_total_spent_with_paging(self, db_session):
+        """Test that customers without orders are kept and pages follow the sort"""
+        from src.db.operations import count_customers, get_customer_summaries
+
+        customers = get_customer_summaries()
+
+        assert count_customers() == 3
+        assert [(c["full_name"], c["total_orders"], c["total_spent"]) for c in customers] == [
+            ("Dana", 2, 65.0), ("Avi", 1, 50.0), ("Noa", 0, 0.0),
+        ]
+        assert [c["full_name"] for c in get_customer_summaries(offset=1, limit=1)] == ["Avi"]
+
+    def test_customer_detail_uses_same_aggregates(self, db_session):
+        """Test the single-customer lookup and the paged service call"""
+        from src.services.admin_service import AdminService
+
+        service = AdminService()
+        dana = asyncio.run(service.get_customer_summary(1))
+        page, total = asyncio.run(service.get_customers_page(page=5, page_size=2))
+
+        assert (dana["total_orders"], dana["total_spent"], dana["phone_number"]) == (2, 65.0, "+972500000001")
+        assert asyncio.run(service.get_customer_summary(99)) is None
+        # Out-of-range pages are clamped to the last page
+        assert total == 3 and [c["full_name"] for c in page] == ["Noa"]
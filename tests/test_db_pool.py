@@ -0,0 +1,106 @@
+"""
+Tests for connection pool monitoring, profiles and adaptive sizing
+"""
+
+import threading
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import create_engine, exc, text
+from sqlalchemy.pool import NullPool
+
+from src.db.pool import AdaptivePoolSizer, MonitoredQueuePool, pool_engine_kwargs, pool_status
+from src.utils.metrics import get_metrics
+
+
+def _config(**overrides):
+    values = {"environment": "production", "db_pool_mode": "auto", "db_pool_size": 0, "db_max_overflow": -1}
+    values.update(overrides)
+    return SimpleNamespace(**values)
+
+
+@pytest.fixture
+def engine(tmp_path, request):
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'pool.db'}", poolclass=MonitoredQueuePool, pool_size=1, max_overflow=1, pool_timeout=0.05
+    )
+    engine.pool.name = request.node.name
+    yield engine
+    engine.dispose()
+
+
+class TestMonitoredPool:
+    """Test exported pool metrics"""
+
+    def test_wait_overflow_and_timeout(self, engine):
+        """Test that checkouts are timed, overflow is counted and timeouts raise"""
+        metrics = get_metrics()
+        labels = f'{{pool="{engine.pool.name}"}}'
+        first, second = engine.connect(), engine.connect()
+        try:
+            with pytest.raises(exc.TimeoutError):
+                engine.connect()
+            status = pool_status(engine)
+        finally:
+            first.close()
+            second.close()
+
+        assert metrics.counters[f"db_pool_overflow_total{labels}"] == 1
+        assert metrics.counters[f"db_pool_timeouts_total{labels}"] == 1
+        assert metrics.histograms[f"db_pool_checkout_wait_seconds{labels}"]["count"] == 3
+        assert (status["checkedout"], status["connections"]) == (2, 2)
+        assert metrics.gauges[f"db_pool_checked_out{labels}"] == 0
+
+    def test_adaptive_resize(self, engine):
+        """Test that the pool follows measured concurrency within its bounds"""
+        pool = engine.pool
+        pool.sizer = sizer = AdaptivePoolSizer(min_size=1, max_size=4, window=60)
+        pool.resize(4)
+        assert pool.size() == 4
+
+        sizer._window_start -= 60
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+        # Peak concurrency was 1, so the pool shrinks to ceil(1 * 1.25)
+        assert pool.size() == 2 and sizer.target(10) == 4 and sizer.target(0) == 1
+
+        barrier, errors = threading.Barrier(2), []
+
+        def hold():
+            try:
+                with engine.connect():
+                    barrier.wait(timeout=2)
+            except Exception as e:  # pragma: no cover - reported below
+                errors.append(e)
+
+        threads = [threading.Thread(target=hold) for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert not errors and pool.size() == 2  # still inside the window
+
+        sizer._window_start -= 60
+        engine.connect().close()
+        assert pool.size() == 3  # ceil(2 * 1.25)
+        assert pool.checkedin() <= pool.size()
+
+
+class TestPoolProfiles:
+    """Test engine arguments for each profile"""
+
+    def test_session_and_transaction_profiles(self):
+        """Test that the pooler port selects NullPool without startup options"""
+        direct = pool_engine_kwargs(_config(db_pool_size=8), "postgresql://u:p@db.example.com:5432/app")
+        assert direct["poolclass"] is MonitoredQueuePool
+        assert (direct["pool_size"], direct["max_overflow"]) == (8, 30)
+        assert "lock_timeout" in direct["connect_args"]["options"]
+
+        pooled = pool_engine_kwargs(_config(), "postgresql://u:p@pooler.example.com:6543/app")
+        assert pooled["poolclass"] is NullPool
+        assert "options" not in pooled["connect_args"] and "pool_size" not in pooled
+
+        psycopg3 = pool_engine_kwargs(_config(db_pool_mode="transaction"), "postgresql+psycopg://u:p@db:5432/app")
+        assert psycopg3["connect_args"]["prepare_threshold"] is None
+        with pytest.raises(ValueError):
+            pool_engine_kwargs(_config(db_pool_mode="statement"), "postgresql://u:p@db:5432/app")
@@ -0,0 +1,216 @@
+"""
+Tests for the database retry policy and circuit breaker
+"""
+
+import asyncio
+import sqlite3
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy import create_engine, exc as sa_exc, text
+
+from src.utils import db_retry
+from src.utils.db_retry import CircuitBreaker, get_circuit_breaker, is_retryable_db_error, retry_on_database_error
+from src.utils.error_handler import CircuitOpenError, DatabaseRetryExhaustedError
+
+
+def _operational(pgcode=None):
+    return sa_exc.OperationalError("SELECT 1", {}, SimpleNamespace(pgcode=pgcode))
+
+
+class _Flaky:
+    """Fails with ``error`` ``failures`` times, then returns "ok\""""
+
+    __name__ = "flaky"
+
+    def __init__(self, failures, error=None):
+        self.failures = failures
+        self.error = error or _operational()
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise self.error
+        return "ok"
+
+
+@pytest.fixture
+def breaker(request):
+    """A fresh breaker registered under a per-test target"""
+    target = request.node.name
+    db_retry._breakers[target] = CircuitBreaker(target, failure_threshold=2, reset_timeout=60)
+    yield db_retry._breakers[target]
+    db_retry._breakers.pop(target, None)
+
+
+class TestClassification:
+    """Test which errors are retried"""
+
+    def test_transient_vs_permanent(self):
+        """Test connection/serialization errors against constraint and syntax errors"""
+        assert is_retryable_db_error(_operational())
+        assert is_retryable_db_error(_operational(pgcode="40001"))
+        assert is_retryable_db_error(_operational(pgcode="08006"))
+        assert not is_retryable_db_error(_operational(pgcode="57014"))  # statement timeout
+        assert not is_retryable_db_error(sa_exc.IntegrityError("INSERT", {}, Exception("duplicate key")))
+        assert not is_retryable_db_error(ValueError("bad input"))
+        wrapped = DatabaseRetryExhaustedError(message="gave up", original_error=_operational())
+        assert not is_retryable_db_error(wrapped)
+
+
+class TestRetry:
+    """Test backoff and event-loop behaviour"""
+
+    def test_backoff_off_the_loop(self, breaker):
+        """Test that a worker-thread call sleeps with jittered backoff and then succeeds"""
+        breaker.failure_threshold = 5
+        flaky = _Flaky(2)
+        call = retry_on_database_error(max_retries=3, delay=0.1, target=breaker.name)(flaky)
+
+        with patch.object(db_retry.time, "sleep") as sleep:
+            assert call() == "ok"
+
+        assert flaky.calls == 3
+        delays = [c.args[0] for c in sleep.call_args_list]
+        assert len(delays) == 2 and 0 <= delays[0] <= 0.1 and 0 <= delays[1] <= 0.2
+
+    def test_no_sleep_on_event_loop_thread(self, breaker):
+        """Test that a sync call on the loop retries once without blocking"""
+        flaky = _Flaky(5)
+        call = retry_on_database_error(max_retries=3, target=breaker.name)(flaky)
+
+        async def run():
+            with patch.object(db_retry.time, "sleep") as sleep:
+                with pytest.raises(DatabaseRetryExhaustedError):
+                    call()
+            return sleep.call_count
+
+        assert asyncio.run(run()) == 0
+        assert flaky.calls == 2
+
+    def test_async_variant_and_permanent_errors(self, breaker):
+        """Test coroutine functions back off with asyncio.sleep and permanent errors are not retried"""
+        flaky = _Flaky(1)
+
+        @retry_on_database_error(target=breaker.name)
+        async def query():
+            return flaky()
+
+        @retry_on_database_error(target=breaker.name)
+        async def insert():
+            raise sa_exc.IntegrityError("INSERT", {}, Exception("duplicate key"))
+
+        async def run():
+            with patch.object(db_retry.asyncio, "sleep", wraps=asyncio.sleep) as sleep:
+                result = await query()
+                with pytest.raises(sa_exc.IntegrityError):
+                    await insert()
+            return result, sleep.await_count
+
+        assert asyncio.run(run()) == ("ok", 1)
+        assert breaker.state == CircuitBreaker.CLOSED
+
+
+class TestCircuitBreaker:
+    """Test fail-fast while open and recovery through a probe"""
+
+    def test_open_fail_fast_and_probe(self, breaker):
+        """Test that the breaker opens, rejects without calling and closes after a good probe"""
+        failing = _Flaky(100)
+        call = retry_on_database_error(max_retries=1, target=breaker.name)(failing)
+
+        for _ in range(2):
+            with pytest.raises(DatabaseRetryExhaustedError):
+                call()
+        assert breaker.state == CircuitBreaker.OPEN
+        with pytest.raises(CircuitOpenError):
+            call()
+        assert failing.calls == 2
+
+        breaker.opened_at -= breaker.reset_timeout
+        healthy = retry_on_database_error(target=breaker.name)(lambda: "ok")
+        assert healthy() == "ok"
+        assert breaker.state == CircuitBreaker.CLOSED and get_circuit_breaker(breaker.name) is breaker
+
+    def test_swallowed_engine_errors_count(self, breaker, tmp_path):
+        """Test that errors caught inside the wrapped function still open the breaker"""
+        path = tmp_path / "locked.db"
+        holder = sqlite3.connect(path, isolation_level=None)
+        holder.execute("CREATE TABLE t (x INTEGER)")
+        holder.execute("BEGIN EXCLUSIVE")
+        engine = create_engine(f"sqlite:///{path}", connect_args={"timeout": 0})
+        db_retry.install_engine_hooks(engine)
+
+        @retry_on_database_error(max_retries=1, target=breaker.name)
+        def count_rows():
+            try:
+                with engine.connect() as conn:
+                    return conn.execute(text("SELECT COUNT(*) FROM t")).scalar()
+            except Exception:
+                return None
+
+        try:
+            assert count_rows() is None
+            assert count_rows() is None
+        finally:
+            holder.close()
+            engine.dispose()
+        assert breaker.state == CircuitBreaker.OPEN
+
+    def test_nested_calls_share_the_probe(self, breaker):
+        """Test that a guarded call made inside another one on the same target is not rejected"""
+        inner = retry_on_database_error(target=breaker.name)(lambda: "inner")
+
+        @retry_on_database_error(target=breaker.name)
+        def outer():
+            return inner()
+
+        breaker.record_failure()
+        breaker.record_failure()
+        assert breaker.state == CircuitBreaker.OPEN
+        breaker.opened_at -= breaker.reset_timeout
+
+        assert outer() == "inner"
+        assert breaker.state == CircuitBreaker.CLOSED
+
+    def test_other_circuit_open_does_not_close_the_breaker(self, breaker):
+        """Test that a probe stopped by another target's breaker records no success"""
+        other = CircuitBreaker(f"{breaker.name}-other", failure_threshold=1, reset_timeout=60)
+        db_retry._breakers[other.name] = other
+        try:
+            other.record_failure()
+            on_other = retry_on_database_error(target=other.name)(lambda: "other")
+
+            @retry_on_database_error(target=breaker.name)
+            def outer():
+                return on_other()
+
+            breaker.record_failure()
+            breaker.record_failure()
+            breaker.opened_at -= breaker.reset_timeout
+            with pytest.raises(CircuitOpenError):
+                outer()
+            assert breaker.state == CircuitBreaker.HALF_OPEN
+            # The probe was released, so the next call may probe
+            assert retry_on_database_error(target=breaker.name)(lambda: "ok")() == "ok"
+            assert breaker.state == CircuitBreaker.CLOSED
+        finally:
+            db_retry._breakers.pop(other.name, None)
+
+    def test_cancelled_probe_does_not_close_the_breaker(self, breaker):
+        """Test that a probe cancelled before the database answered only releases the probe"""
+
+        @retry_on_database_error(target=breaker.name)
+        def cancelled():
+            raise asyncio.CancelledError()
+
+        breaker.record_failure()
+        breaker.record_failure()
+        breaker.opened_at -= breaker.reset_timeout
+        with pytest.raises(asyncio.CancelledError):
+            cancelled()
+        assert breaker.state == CircuitBreaker.HALF_OPEN
+        assert retry_on_database_error(target=breaker.name)(lambda: "ok")() == "ok"
+        assert breaker.state == CircuitBreaker.CLOSED
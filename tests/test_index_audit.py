@@ -0,0 +1,37 @@
+"""
+Tests for the hot-path indexes and the EXPLAIN-based index audit
+"""
+
+from sqlalchemy import create_engine, inspect, text
+
+from src.db.index_audit import QUERY_SHAPES, audit_indexes
+from src.db.schema import ensure_schema
+
+
+class TestIndexAudit:
+    """Test that the app's query shapes are served by indexes"""
+
+    def test_no_sequential_scans_on_seeded_data(self, tmp_path):
+        """Test that every query shape uses an index and the seed is rolled back"""
+        engine = create_engine(f"sqlite:///{tmp_path / 'app.db'}")
+        ensure_schema(engine)
+
+        reports = audit_indexes(engine, seed_rows=200)
+        assert [r.name for r in reports] == [s.name for s in QUERY_SHAPES]
+        assert {r.name: r.seq_scans for r in reports if r.seq_scans} == {}
+        with engine.connect() as conn:
+            assert conn.execute(text("SELECT COUNT(*) FROM orders")).scalar() == 0
+        engine.dispose()
+
+    def test_missing_index_is_flagged(self, tmp_path):
+        """Test that dropping an index makes the audit report a full scan"""
+        engine = create_engine(f"sqlite:///{tmp_path / 'app.db'}")
+        ensure_schema(engine)
+        assert "idx_customers_phone" in {i["name"] for i in inspect(engine).get_indexes("customers")}
+        with engine.begin() as conn:
+            conn.execute(text("DROP INDEX idx_customers_phone"))
+
+        reports = {r.name: r for r in audit_indexes(engine)}
+        assert reports["customer_by_phone"].seq_scans == ["customers"]
+        assert reports["customer_by_telegram_id"].seq_scans == []
+        engine.dispose()
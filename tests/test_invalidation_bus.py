@@ -0,0 +1,114 @@
+"""
+Tests for the cross-process cache invalidation bus
+"""
+
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from src.utils.cache import get_cache
+from src.utils.constants import CacheNamespaces
+from src.utils.invalidation_bus import (
+    InvalidationBus,
+    InvalidationEvent,
+    LoopbackBackend,
+    PostgresNotifyBackend,
+    register_default_handlers,
+)
+
+
+@pytest.fixture
+def two_processes():
+    """Two buses sharing one loopback backend, standing in for two processes"""
+    backend = LoopbackBackend()
+    writer = InvalidationBus(backend, origin="writer")
+    reader = InvalidationBus(backend, origin="reader")
+    writer.start()
+    reader.start()
+    yield writer, reader
+    writer.stop()
+    reader.stop()
+
+
+class TestInvalidationEvent:
+    """Test payload encoding"""
+
+    def test_payload_round_trip(self):
+        """Test that events survive NOTIFY payload encoding"""
+        event = InvalidationEvent(CacheNamespaces.PRODUCTS, key="42", version=7, origin="abc")
+        assert InvalidationEvent.from_payload(event.to_payload()) == event
+
+
+class TestInvalidationBus:
+    """Test delivery through the loopback backend"""
+
+    def test_publish_applies_locally_and_remotely_once(self, two_processes):
+        """Test that the writer handles its own event once and the reader receives it"""
+        writer, reader = two_processes
+        writer_seen, reader_seen = [], []
+        writer.subscribe(CacheNamespaces.PRODUCTS, writer_seen.append)
+        reader.subscribe(CacheNamespaces.PRODUCTS, reader_seen.append)
+
+        writer.publish(CacheNamespaces.PRODUCTS, key="5")
+
+        assert [e.key for e in writer_seen] == ["5"]
+        assert [(e.namespace, e.key, e.origin) for e in reader_seen] == [(CacheNamespaces.PRODUCTS, "5", "writer")]
+
+    def test_stale_versions_are_ignored(self, two_processes):
+        """Test that redelivered or out-of-order events are dropped"""
+        _, reader = two_processes
+        seen = []
+        reader.subscribe(CacheNamespaces.SETTINGS, seen.append)
+
+        reader._on_remote(InvalidationEvent(CacheNamespaces.SETTINGS, version=2, origin="writer"))
+        reader._on_remote(InvalidationEvent(CacheNamespaces.SETTINGS, version=2, origin="writer"))
+        reader._on_remote(InvalidationEvent(CacheNamespaces.SETTINGS, version=1, origin="writer"))
+
+        assert len(seen) == 1
+
+    def test_default_handlers_evict_remote_caches(self, two_processes):
+        """Test that a remote write clears the cache namespace and bumps settings"""
+        writer, reader = two_processes
+        register_default_handlers(reader)
+        get_cache(CacheNamespaces.CATEGORIES).set("menu", ["Bread"])
+
+        with patch("src.utils.settings_snapshot.bump_settings_version") as bump:
+            writer.publish(CacheNamespaces.CATEGORIES, CacheNamespaces.SETTINGS)
+
+        assert get_cache(CacheNamespaces.CATEGORIES).get("menu") is None
+        assert bump.call_count == 1
+
+    def test_backend_failure_still_invalidates_locally(self):
+        """Test that a broadcast failure does not skip local invalidation"""
+        backend = MagicMock()
+        backend.publish.side_effect = Exception("db down")
+        bus = InvalidationBus(backend)
+        seen = []
+        bus.subscribe(CacheNamespaces.PRODUCTS, seen.append)
+
+        bus.publish(CacheNamespaces.PRODUCTS)
+
+        assert len(seen) == 1
+
+
+class TestPostgresNotifyBackend:
+    """Test the NOTIFY publisher without a server"""
+
+    def test_publish_sends_all_events_in_one_transaction(self):
+        """Test that several namespaces cost one round trip"""
+        engine = MagicMock()
+        conn = engine.begin.return_value.__enter__.return_value
+        backend = PostgresNotifyBackend(engine_getter=lambda: engine, channel="test_channel")
+
+        backend.publish([
+            InvalidationEvent(CacheNamespaces.PRODUCTS, version=1, origin="a"),
+            InvalidationEvent(CacheNamespaces.CATEGORIES, version=2, origin="a"),
+        ])
+
+        assert engine.begin.call_count == 1
+        params = conn.execute.call_args[0][1]
+        assert [InvalidationEvent.from_payload(p["payload"]).namespace for p in params] == [
+            CacheNamespaces.PRODUCTS,
+            CacheNamespaces.CATEGORIES,
+        ]
+        assert {p["channel"] for p in params} == {"test_channel"}
@@ -0,0 +1,110 @@
+"""
+Tests for the end-of-day invoice ZIP export
+"""
+
+import asyncio
+import zipfile
+from datetime import date, datetime
+from types import SimpleNamespace
+from unittest.mock import patch
+
+
+def _order(order_id):
+    item = SimpleNamespace(product_name="Kubaneh", quantity=1, unit_price=25.0, total_price=25.0)
+    return SimpleNamespace(
+        id=order_id,
+        order_number=f"SS{order_id}",
+        customer=SimpleNamespace(name="Dana", phone="+972500000000"),
+        total=25.0,
+        subtotal=25.0,
+        delivery_charge=0.0,
+        created_at=datetime(2025, 1, 1, 10, 0),
+        delivery_method="pickup",
+        delivery_address=None,
+        delivery_instructions=None,
+        order_items=[item],
+    )
+
+
+class TestExportDayInvoices:
+    """Test streaming, bounded rendering and ZIP packing"""
+
+    def test_zip_with_bounded_concurrency(self):
+        """Test that all orders are paged, rendered at most N at once and zipped"""
+        from src.services import invoice_export, invoice_service
+
+        orders = [_order(i) for i in range(1, 8)]
+        pages = []
+
+        def page(start, end, after_id, limit):
+            pages.append(after_id)
+            return [o for o in orders if o.id > after_id][:3]
+
+        running = 0
+        peak = 0
+
+        async def build(payload, business, receipt=False, user_id=None):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+            if payload["order_id"] == 5:
+                return {"pdf": None}
+            return {"pdf": b"%PDF " + str(payload["order_id"]).encode(), "cached": payload["order_id"] % 2 == 0}
+
+        progress_calls = []
+
+        async def progress(done, total):
+            progress_calls.append((done, total))
+
+        with patch("src.db.operations.count_orders_between", return_value=len(orders)), patch(
+            "src.db.operations.get_orders_page_between", side_effect=page
+        ), patch.object(invoice_service, "build_invoice_pdf", side_effect=build):
+            result = asyncio.run(
+                invoice_export.export_day_invoices(
+                    date(2025, 1, 1), business={}, concurrency=2, progress=progress
+                )
+            )
+
+        assert pages == [0, 3, 6, 7]
+        assert peak == 2
+        assert (result.total, result.rendered, result.cached, result.failed) == (7, 3, 3, [5])
+        assert progress_calls[-1] == (7, 7)
+        assert result.size == len(result.archive.read())
+        result.archive.seek(0)
+        names = zipfile.ZipFile(result.archive).namelist()
+        result.cleanup()
+        assert sorted(names) == [f"invoice_SS{i}.pdf" for i in (1, 2, 3, 4, 6, 7)]
+        assert result.filename == "invoices_2025-01-01.zip"
+
+    def test_no_orders(self):
+        """Test that an empty day produces no archive"""
+        from src.services import invoice_export
+
+        with patch("src.db.operations.count_orders_between", return_value=0):
+            result = asyncio.run(invoice_export.export_day_invoices(date(2025, 1, 2), business={}))
+
+        assert result.total == 0
+        assert result.archive is None
+
+    def test_export_and_invoice_button_build_the_same_payload(self):
+        """Test that both paths localize item names identically"""
+        from src.services import invoice_export
+        from src.services.admin_service import AdminService
+
+        order = _order(9)
+        order.customer.telegram_id = 42
+        order.order_items[0].product_id = 3
+        order.status = "delivered"
+
+        with patch("src.db.operations.get_product_by_id", return_value=SimpleNamespace(id=3)), patch(
+            "src.db.operations.get_localized_name", return_value="כובנה"
+        ), patch("src.utils.language_manager.language_manager.get_user_language", return_value="he"), patch(
+            "src.services.admin_service.get_all_orders", return_value=[order]
+        ):
+            exported = invoice_export.order_invoice_payload(invoice_export.order_details(order))
+            from_button = invoice_export.order_invoice_payload(asyncio.run(AdminService().get_order_by_id(9)))
+
+        assert exported == from_button
+        assert exported["items"][0]["product_name"] == "כובנה"
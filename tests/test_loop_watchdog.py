@@ -0,0 +1,91 @@
+"""
+Tests for the event-loop lag watchdog
+"""
+
+import asyncio
+import time
+
+from src.utils.loop_watchdog import LoopWatchdog
+from src.utils.metrics import MetricsCollector, get_metrics
+
+
+def _blocking_call(seconds):
+    time.sleep(seconds)
+
+
+class TestLoopWatchdog:
+    """Test lag measurement and blocking-site attribution"""
+
+    def test_blocking_call_is_sampled(self):
+        """Test that a synchronous sleep on the loop is attributed to its call site"""
+        watchdog = LoopWatchdog(interval=0.02, threshold=0.1, sample_interval=0.01)
+
+        async def run():
+            watchdog.start()
+            await asyncio.sleep(0.05)
+            _blocking_call(0.3)
+            await asyncio.sleep(0.05)
+            await watchdog.stop()
+
+        asyncio.run(run())
+
+        site, samples = watchdog.top_blocking_sites()[0]
+        assert site.startswith("tests/test_loop_watchdog.py:") and site.endswith("(_blocking_call)")
+        assert samples >= 2
+        assert watchdog.max_lag >= 0.2
+        histogram = get_metrics().histograms["event_loop_lag_seconds"]
+        assert histogram["count"] >= 3
+        assert histogram["buckets"][0.1] < histogram["count"]
+        assert f'event_loop_blocked_samples_total{{site="{site}"}}' in get_metrics().counters
+
+    def test_site_labels_are_bounded(self):
+        """Test that sites beyond the labelled ones are counted as other"""
+        import threading
+        from unittest.mock import patch
+
+        watchdog = LoopWatchdog(threshold=0.1, top_sites=2)
+        watchdog._loop_thread_id = threading.get_ident()
+        watchdog._beat = time.monotonic() - 10
+        sites = ["a.py:1 (f)", "b.py:2 (g)", "c.py:3 (h)", "d.py:4 (k)", "a.py:1 (f)"]
+        before = dict(get_metrics().counters)
+
+        with patch("src.utils.loop_watchdog.blocking_site", side_effect=sites):
+            for _ in sites:
+                watchdog.sample()
+
+        def added(label):
+            key = f'event_loop_blocked_samples_total{{site="{label}"}}'
+            return get_metrics().counters.get(key, 0) - before.get(key, 0)
+
+        assert (added("a.py:1 (f)"), added("b.py:2 (g)"), added("other")) == (2, 1, 2)
+        assert added("c.py:3 (h)") == 0
+        assert len(watchdog.top_blocking_sites()) == 4
+
+    def test_idle_loop_is_not_sampled(self):
+        """Test that nothing is reported while the loop keeps up"""
+        watchdog = LoopWatchdog(interval=0.01, threshold=0.2, sample_interval=0.01)
+
+        async def run():
+            watchdog.start()
+            await asyncio.sleep(0.1)
+            await watchdog.stop()
+
+        asyncio.run(run())
+        assert watchdog.top_blocking_sites() == []
+        assert not watchdog.running
+
+
+class TestHistogramExport:
+    """Test the Prometheus rendering of histograms"""
+
+    def test_cumulative_buckets(self):
+        """Test that buckets are cumulative and labels are merged with le"""
+        metrics = MetricsCollector()
+        for value in (0.01, 0.2, 3.0):
+            metrics.observe_histogram("lag_seconds", value, (0.05, 0.5), labels={"loop": "main"})
+
+        text = metrics.export_metrics()
+        assert 'lag_seconds_bucket{loop="main",le="0.05"} 1' in text
+        assert 'lag_seconds_bucket{loop="main",le="0.5"} 2' in text
+        assert 'lag_seconds_bucket{loop="main",le="+Inf"} 3' in text
+        assert 'lag_seconds_count{loop="main"} 3' in text
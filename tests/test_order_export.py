@@ -0,0 +1,114 @@
+"""
+Tests for the streaming order export
+"""
+
+import csv
+import io
+import os
+import zipfile
+from datetime import date, datetime
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+
+@pytest.fixture
+def db_session():
+    """In-memory database with orders in January and February"""
+    from src.db.models import Base, Customer, Order, OrderItem
+
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine, expire_on_commit=False)
+    with Session() as session:
+        dana = Customer(telegram_id=1, name="דנה", phone="+972500000001")
+        session.add(dana)
+        session.flush()
+        spec = [
+            ("SS1", datetime(2025, 1, 5, 10), "delivered", [("Kubaneh", 2, 25.0)]),
+            ("SS2", datetime(2025, 1, 20, 12), "cancelled", [("Jachnun", 1, 30.0)]),
+            ("SS3", datetime(2025, 1, 31, 23), "delivered", [("Hilbe", 3, 10.0), ("Kubaneh", 1, 25.0)]),
+            ("SS4", datetime(2025, 2, 1, 8), "delivered", [("Kubaneh", 1, 25.0)]),
+        ]
+        for number, created, status, items in spec:
+            total = sum(q * p for _, q, p in items)
+            order = Order(
+                customer_id=dana.id, order_number=number, created_at=created, status=status,
+                subtotal=total, total=total,
+            )
+            session.add(order)
+            session.flush()
+            for name, quantity, price in items:
+                session.add(OrderItem(
+                    order_id=order.id, product_id=1, product_name=name, product_options={"size": "L"},
+                    quantity=quantity, unit_price=price, total_price=quantity * price,
+                ))
+        session.commit()
+    with patch("src.db.operations.get_db_session", side_effect=Session):
+        yield
+
+
+def _read_csv(archive, name):
+    return list(csv.DictReader(io.TextIOWrapper(archive.open(name), encoding="utf-8-sig")))
+
+
+class TestOrderExport:
+    """Test filters, batching and the written files"""
+
+    def test_csv_month_with_status_filter(self, db_session):
+        """Test that a month export is streamed in batches and filtered by status"""
+        from src.services.order_export import export_orders, parse_export_request
+
+        request = parse_export_request(["2025-01", "delivered"])
+        result = export_orders(request, batch_size=1)
+        path = result.path
+        try:
+            with zipfile.ZipFile(path) as archive:
+                orders = _read_csv(archive, "orders.csv")
+                lines = _read_csv(archive, "order_lines.csv")
+        finally:
+            result.cleanup()
+
+        assert result.filename == "orders_2025-01_csv.zip"
+        assert (result.orders, result.lines) == (2, 3)
+        assert [o["order_number"] for o in orders] == ["SS1", "SS3"]
+        assert orders[0]["customer_name"] == "דנה" and float(orders[0]["total"]) == 50.0
+        assert [line["product_name"] for line in lines] == ["Kubaneh", "Hilbe", "Kubaneh"]
+        assert lines[0]["product_options"] == '{"size": "L"}'
+        assert not os.path.exists(path)
+
+    def test_parquet(self, db_session):
+        """Test that Parquet tables keep typed columns"""
+        pq = pytest.importorskip("pyarrow.parquet")
+        from src.services.order_export import export_orders, parse_export_request
+
+        result = export_orders(parse_export_request(["2025-01-31..2025-02-01", "parquet"]), batch_size=1)
+        try:
+            with zipfile.ZipFile(result.path) as archive:
+                orders = pq.read_table(io.BytesIO(archive.read("orders.parquet")))
+                lines = pq.read_table(io.BytesIO(archive.read("order_lines.parquet")))
+        finally:
+            result.cleanup()
+
+        assert orders.column("order_number").to_pylist() == ["SS3", "SS4"]
+        assert str(orders.schema.field("created_at").type) == "timestamp[us]"
+        assert lines.column("quantity").to_pylist() == [3, 1, 1]
+
+    def test_parse_export_request(self):
+        """Test defaults and period forms"""
+        from src.services.order_export import parse_export_request
+
+        default = parse_export_request([], today=date(2025, 3, 14))
+        assert (default.start_date, default.end_date, default.fmt, default.label) == (
+            date(2025, 2, 1), date(2025, 2, 28), "csv", "2025-02",
+        )
+        day = parse_export_request(["2025-03-02", "pending,confirmed"])
+        assert (day.label, day.statuses) == ("2025-03-02", ["pending", "confirmed"])
+        with pytest.raises(ValueError):
+            parse_export_request(["2025-13"])
+        with pytest.raises(ValueError):
+            parse_export_request(["2025-03-05..2025-03-01"])
+        with pytest.raises(ValueError):
+            parse_export_request(["2025-03", "deliverd"])
@@ -0,0 +1,173 @@
+"""
+Tests for the memory-mapped order history
+"""
+
+from datetime import date, datetime, timedelta
+from unittest.mock import patch
+
+import pytest
+
+START = date(2025, 1, 1)
+END = date(2025, 3, 31)
+
+
+def _rows(pending_in_february=False):
+    """Fact rows over January to March in the shape of get_order_fact_rows"""
+    products = ["Kubaneh", "Jachnun", "Hilbe"]
+    statuses = ["delivered", "cancelled", "delivered", "pending"]
+    orders, lines = [], []
+    for i in range(60):
+        created = datetime(2025, 1, 2, 10) + timedelta(days=1.5 * i, minutes=i)
+        status = statuses[i % 4] if created.month == 3 else statuses[i % 3]
+        if pending_in_february and i == 25:
+            status = "pending"
+        customer = None if i % 7 == 0 else 1 + i % 5
+        orders.append((i + 1, created, status, 10.0 + i, "delivery" if i % 2 else "pickup", customer,
+                       created + timedelta(hours=2)))
+        for j in range(1 + i % 3):
+            lines.append((i + 1, products[(i + j) % 3], 1 + j, 5.0 * (1 + j)))
+    names = {c: f"Customer {c}" for c in range(1, 6)}
+    return orders, lines, names
+
+
+@pytest.fixture(autouse=True)
+def numpy_required():
+    """The order history is only written and read with NumPy"""
+    from src.services import analytics_engine
+
+    if not analytics_engine.HAS_NUMPY:
+        pytest.skip("NumPy not installed")
+
+
+def _loader(orders, lines, names):
+    def load(start, end):
+        selected = [o for o in orders if start <= o[1] < end]
+        ids = {o[0] for o in selected}
+        return selected, [line for line in lines if line[0] in ids], names
+    return load
+
+
+def _by_name(products):
+    # Equal revenues may rank in either order
+    return sorted((p.product_name, p.total_orders, p.total_quantity, p.total_revenue) for p in products)
+
+
+class TestOrderHistory:
+    """Test exporting closed months and reading them back in analytics"""
+
+    def test_export_and_combine_with_live_rows(self, tmp_path):
+        """Test that reports over history plus live rows match reports over the database alone"""
+        from src.services.admin_service import AnalyticsService
+        from src.services.analytics_engine import OrderFacts
+        from src.services.order_history import OrderHistoryStore, np
+
+        orders, lines, names = _rows()
+        load = _loader(orders, lines, names)
+        store = OrderHistoryStore(str(tmp_path / "history"))
+        exported = store.export_closed_months(
+            today=date(2025, 3, 20), load_rows=load, first_order_time=lambda: orders[0][1]
+        )
+        assert exported == [date(2025, 1, 1), date(2025, 2, 1)]
+        assert store.covered_until() == date(2025, 3, 1)
+        assert isinstance(store.blocks(START, END)[0].orders["total"], np.memmap)
+
+        service = AnalyticsService()
+        queried = []
+
+        def live(start, end):
+            queried.append((start, end))
+            return load(start, end)
+
+        for start_date in (START, date(2025, 1, 20), date(2025, 2, 10)):
+            expected = OrderFacts.from_rows(start_date, END, orders, lines, names)
+            with patch("src.services.admin_service.get_order_history_store", return_value=store), \
+                    patch("src.services.admin_service.get_order_fact_rows", side_effect=live):
+                combined = service._load_order_facts(start_date, END)
+            assert queried[-1][0] == datetime(2025, 3, 1)
+            assert combined.order_count == expected.order_count
+            assert service._revenue_from_facts(combined).__dict__ == service._revenue_from_facts(expected).__dict__
+            assert service._trends_from_facts(combined) == service._trends_from_facts(expected)
+            assert _by_name(service._products_from_facts(combined)) == _by_name(service._products_from_facts(expected))
+            assert [c.__dict__ for c in service._customers_from_facts(combined)] == [
+                c.__dict__ for c in service._customers_from_facts(expected)
+            ]
+
+    def test_export_stops_at_month_with_active_orders(self, tmp_path):
+        """Test that a month with an active order and every later month stay in the database"""
+        from src.services.order_history import OrderHistoryStore
+
+        orders, lines, names = _rows(pending_in_february=True)
+        store = OrderHistoryStore(str(tmp_path / "history"))
+        exported = store.export_closed_months(
+            today=date(2025, 6, 1), load_rows=_loader(orders, lines, names), first_order_time=lambda: orders[0][1]
+        )
+        assert exported == [date(2025, 1, 1)]
+        assert store.covered_until() == date(2025, 2, 1)
+        assert store.export_closed_months(today=date(2025, 6, 1), load_rows=_loader(orders, lines, names),
+                                          first_order_time=lambda: orders[0][1]) == []
+
+    def test_export_does_not_restore_months_reopened_meanwhile(self, tmp_path):
+        """Test that a month loaded before an earlier month was reopened is not written"""
+        from src.services.order_history import OrderHistoryStore
+
+        orders, lines, names = _rows()
+        load = _loader(orders, lines, names)
+        store = OrderHistoryStore(str(tmp_path / "history"))
+
+        def load_and_reopen(start, end):
+            rows = load(start, end)
+            if start == datetime(2025, 2, 1):
+                store.reopen_month(datetime(2025, 1, 20))  # an order changed while February was loading
+            return rows
+
+        exported = store.export_closed_months(
+            today=date(2025, 6, 1), load_rows=load_and_reopen, first_order_time=lambda: orders[0][1]
+        )
+        assert exported == [date(2025, 1, 1)]
+        assert store.covered_until() is None
+        assert store.export_closed_months(today=date(2025, 6, 1), load_rows=load,
+                                          first_order_time=lambda: orders[0][1]) == [date(2025, 1, 1), date(2025, 2, 1)]
+
+    def test_changing_an_exported_order_reopens_its_month(self, tmp_path):
+        """Test that a status change or deletion drops the order's exported month and later ones"""
+        from types import SimpleNamespace
+
+        from src.db import operations
+        from src.services.order_history import OrderHistoryStore
+
+        orders, lines, names = _rows()
+        load = _loader(orders, lines, names)
+        store = OrderHistoryStore(str(tmp_path / "history"))
+        store.export_closed_months(today=date(2025, 6, 1), load_rows=load, first_order_time=lambda: orders[0][1])
+        assert store.covered_until() == date(2025, 3, 1)
+
+        manager = operations.DatabaseManager(SimpleNamespace(
+            supabase_connection_string="", database_url=f"sqlite:///{tmp_path / 'app.db'}",
+            database_replica_url="", environment="test", db_pool_mode="auto", db_pool_size=0,
+            db_max_overflow=-1, db_pool_adaptive=False,
+        ))
+        manager.create_tables()
+        with manager.get_session_context() as session:
+            customer = operations.Customer(telegram_id=1, name="Dana", phone="+972501111111")
+            session.add(customer)
+            session.flush()
+            for number, created_at in (("A1", datetime(2025, 2, 5)), ("A2", datetime(2025, 1, 10)),
+                                       ("A3", datetime(2025, 3, 1))):
+                session.add(operations.Order(customer_id=customer.id, order_number=number, status="delivered",
+                                             subtotal=10, total=10, created_at=created_at))
+            session.commit()
+            ids = {o.order_number: o.id for o in session.query(operations.Order)}
+
+        with patch.object(operations, "get_db_manager", return_value=manager), \
+                patch("src.services.order_history.get_order_history_store", return_value=store), \
+                patch.object(operations, "publish_invalidation"):
+            assert operations.update_order_status(ids["A3"], "cancelled")
+            assert store.covered_until() == date(2025, 3, 1)
+            assert operations.update_order_status(ids["A1"], "cancelled")
+            assert store.covered_until() == date(2025, 2, 1)
+            assert operations.delete_order(ids["A2"])
+            assert store.covered_until() is None
+        manager.get_engine().dispose()
+
+        assert store.export_closed_months(today=date(2025, 6, 1), load_rows=load,
+                                          first_order_time=lambda: orders[0][1]) == [date(2025, 1, 1), date(2025, 2, 1)]
@@ -0,0 +1,162 @@
+"""
+Tests for order archiving and the hot/cold order partitions
+"""
+
+import os
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+
+from src.db.models import Base, Customer, Order, OrderItem, Product
+from src.db.partitions import (
+    add_months,
+    archive_orders,
+    is_partitioned,
+    maintain_partitions,
+    month_start,
+    partition_order_tables,
+)
+from src.db.schema import ensure_schema, schema_version_table
+
+# Scratch database for the PostgreSQL-only tests; its tables are dropped
+POSTGRES_URL = os.getenv("TEST_POSTGRES_URL")
+
+
+def _seed(engine, now):
+    """Old and recent orders in finished and open states, one item each"""
+    old = add_months(month_start(now), -8) + timedelta(days=3)
+    rows = [("O1", old, "delivered"), ("O2", old, "cancelled"), ("O3", old, "pending"), ("O4", now, "delivered")]
+    with sessionmaker(bind=engine)() as session:
+        customer = Customer(telegram_id=1, name="Dana", phone="+972500000001")
+        product = Product(name="Kubaneh", price=10.0)
+        session.add_all([customer, product])
+        session.flush()
+        for number, created_at, status in rows:
+            order = Order(customer_id=customer.id, order_number=number, status=status, created_at=created_at)
+            session.add(order)
+            session.flush()
+            session.add(
+                OrderItem(
+                    order_id=order.id, product_id=product.id, product_name="Kubaneh", quantity=1,
+                    unit_price=10.0, total_price=10.0, created_at=created_at,
+                )
+            )
+        session.commit()
+
+
+def _archived(engine):
+    with engine.connect() as conn:
+        orders = conn.execute(text("SELECT order_number FROM orders WHERE archived ORDER BY order_number")).scalars()
+        items = conn.execute(text("SELECT COUNT(*) FROM order_items WHERE archived")).scalar()
+        return list(orders), items
+
+
+class TestOrderArchiving:
+    """Test the archive flag on a plain (SQLite) database"""
+
+    def test_archive_old_finished_orders(self, tmp_path):
+        """Test that only old delivered/cancelled orders and their items are archived"""
+        from src.db import operations
+
+        engine = create_engine(f"sqlite:///{tmp_path / 'app.db'}")
+        ensure_schema(engine)
+        now = datetime(2026, 10, 18, 12, 0)
+        _seed(engine, now)
+
+        assert archive_orders(engine, older_than_months=6, batch_size=1, now=now) == 2
+        assert _archived(engine) == (["O1", "O2"], 2)
+        assert archive_orders(engine, older_than_months=6, now=now) == 0
+
+        with patch.object(operations, "get_db_session", sessionmaker(bind=engine)):
+            active = operations.get_orders_by_status(("pending", "delivered", "cancelled"))
+        assert sorted(o.order_number for o in active) == ["O3", "O4"]
+        engine.dispose()
+
+
+class TestOrderNumbers:
+    """Test the order number registry that keeps numbers unique"""
+
+    def test_duplicate_order_number_is_rejected(self, tmp_path):
+        """Test that order numbers are registered with the order and never issued twice"""
+        from types import SimpleNamespace
+
+        from src.db import operations
+
+        config = SimpleNamespace(
+            supabase_connection_string="",
+            database_url=f"sqlite:///{tmp_path / 'app.db'}",
+            database_replica_url="",
+            environment="test",
+            db_pool_mode="auto",
+            db_pool_size=0,
+            db_max_overflow=-1,
+            db_pool_adaptive=False,
+        )
+        manager = operations.DatabaseManager(config)
+        manager.create_tables()
+        engine = manager.get_engine()
+        _seed(engine, datetime(2026, 10, 18, 12, 0))
+        item = {"product_id": 1, "product_name": "Kubaneh", "quantity": 1, "unit_price": 10.0, "total_price": 10.0}
+
+        with patch.object(operations, "get_db_manager", return_value=manager), patch.object(
+            operations, "publish_invalidation"
+        ):
+            assert operations.create_order_with_items(1, "SS1", 10.0, [item]) is not None
+            assert operations.create_order_with_items(1, "SS1", 10.0, [item]) is None
+
+        with engine.connect() as conn:
+            numbers = conn.execute(text("SELECT order_number FROM order_numbers ORDER BY order_number")).scalars()
+            assert list(numbers) == ["SS1"]
+            assert conn.execute(text("SELECT COUNT(*) FROM orders WHERE order_number = 'SS1'")).scalar() == 1
+        engine.dispose()
+
+    def test_migration_registers_existing_numbers(self, tmp_path):
+        """Test that the schema step backfills numbers of orders created before it"""
+        from src.db.schema import MIGRATIONS
+
+        engine = create_engine(f"sqlite:///{tmp_path / 'app.db'}")
+        ensure_schema(engine)
+        _seed(engine, datetime(2026, 10, 18, 12, 0))
+        register = next(m for m in MIGRATIONS if m.version == 6)
+        with engine.begin() as conn:
+            conn.execute(text("DELETE FROM order_numbers"))
+            register.apply(conn)
+            register.apply(conn)
+            numbers = conn.execute(text("SELECT order_number FROM order_numbers ORDER BY order_number")).scalars()
+            assert list(numbers) == ["O1", "O2", "O3", "O4"]
+        engine.dispose()
+
+
+@pytest.mark.skipif(not POSTGRES_URL, reason="TEST_POSTGRES_URL not set")
+class TestPostgresPartitions:
+    """Test partition conversion, archiving and pruning on a scratch PostgreSQL database"""
+
+    def test_archive_moves_rows_to_cold_partitions(self):
+        """Test that archived rows live in cold partitions and active queries skip them"""
+        engine = create_engine(POSTGRES_URL)
+        Base.metadata.drop_all(engine)
+        schema_version_table.drop(engine, checkfirst=True)
+        ensure_schema(engine)
+        with engine.begin() as conn:
+            # Opt-in: the schema bootstrap leaves the tables plain
+            assert not is_partitioned(conn, "orders")
+            assert partition_order_tables(conn) == ["orders", "order_items"]
+        now = datetime.utcnow()
+        _seed(engine, now)
+
+        result = maintain_partitions(engine, older_than_months=6)
+        assert result["archived"] == 2
+        with engine.connect() as conn:
+            placement = dict(conn.execute(text("SELECT order_number, tableoid::regclass::text FROM orders")).all())
+            plan = "\n".join(
+                conn.execute(text("EXPLAIN SELECT * FROM orders WHERE archived = false AND status = 'pending'")).scalars()
+            )
+        assert placement["O1"].startswith("orders_cold_") and placement["O3"].startswith("orders_hot_")
+        assert placement["O4"] == f"orders_hot_{now:%Y_%m}"
+        assert "orders_cold" not in plan
+        Base.metadata.drop_all(engine)
+        schema_version_table.drop(engine, checkfirst=True)
+        engine.dispose()
@@ -0,0 +1,92 @@
+"""
+Tests for the content-addressed invoice PDF cache
+"""
+
+import asyncio
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+ORDER = {
+    "order_id": 7,
+    "order_number": "SS-7",
+    "customer_name": "Dana",
+    "customer_phone": "+972500000000",
+    "delivery_method": "pickup",
+    "items": [{"product_name": "Kubaneh", "quantity": 2, "unit_price": 25.0, "total_price": 50.0}],
+    "delivery_charge": 0,
+    "created_at": "2025-01-01 10:00",
+}
+
+
+@pytest.fixture
+def cache(tmp_path):
+    """PDF cache in a temporary directory"""
+    from src.services.pdf_cache import PdfCache
+
+    return PdfCache(str(tmp_path / "pdfs"), max_bytes=250)
+
+
+class TestPdfCache:
+    """Test storage, LRU eviction and file_ids"""
+
+    def test_lru_eviction_by_size(self, cache):
+        """Test that the least recently used PDFs are evicted over budget"""
+        cache.put("a" * 64, b"x" * 100)
+        cache.put("b" * 64, b"y" * 100)
+        assert cache.get("a" * 64) == b"x" * 100  # "b" is now least recent
+        cache.set_file_id("b" * 64, "file-b")
+        cache.put("c" * 64, b"z" * 100)
+
+        assert cache.get("b" * 64) is None
+        assert cache.get_file_id("b" * 64) is None
+        assert cache.get("a" * 64) is not None
+        assert cache.stats()["bytes"] == 200
+
+    def test_index_survives_restart(self, cache):
+        """Test that a new instance picks up PDFs already on disk"""
+        from src.services.pdf_cache import PdfCache
+
+        cache.put("d" * 64, b"pdf")
+        cache.set_file_id("d" * 64, "file-d")
+        reopened = PdfCache(str(cache.directory), max_bytes=250)
+
+        assert reopened.get("d" * 64) == b"pdf"
+        assert reopened.get_file_id("d" * 64) == "file-d"
+        assert reopened.stats()["entries"] == 1
+
+
+class TestBuildInvoicePdf:
+    """Test cache use when building invoices"""
+
+    def test_unchanged_order_renders_once(self, cache):
+        """Test that the second build is served from the cache"""
+        from src.services import invoice_service
+
+        render = AsyncMock(return_value=b"%PDF-1.4")
+        with patch.object(invoice_service, "get_pdf_cache", return_value=cache), patch.object(
+            invoice_service, "generate_pdf_from_html", render
+        ):
+            first = asyncio.run(invoice_service.build_invoice_pdf(ORDER, {"business_name": "Samna"}))
+            second = asyncio.run(invoice_service.build_invoice_pdf(ORDER, {"business_name": "Samna"}))
+            changed = asyncio.run(invoice_service.build_invoice_pdf(dict(ORDER, delivery_charge=5), {"business_name": "Samna"}))
+
+        assert render.await_count == 2
+        assert second["pdf"] == first["pdf"]
+        assert second["cache_key"] == first["cache_key"] != changed["cache_key"]
+
+    def test_known_file_id_skips_render(self, cache):
+        """Test that a remembered Telegram file_id is returned instead of bytes"""
+        from src.services import invoice_service
+
+        render = AsyncMock(return_value=b"%PDF-1.4")
+        with patch.object(invoice_service, "get_pdf_cache", return_value=cache), patch.object(
+            invoice_service, "generate_pdf_from_html", render
+        ), patch.object(invoice_service, "_native_receipts_available", return_value=False):
+            key = asyncio.run(invoice_service.build_invoice_pdf(ORDER, receipt=True))["cache_key"]
+            cache.set_file_id(key, "telegram-file-id")
+            result = asyncio.run(invoice_service.build_invoice_pdf(ORDER, receipt=True, use_file_id=True))
+
+        assert result["file_id"] == "telegram-file-id"
+        assert result["pdf"] is None
+        assert render.await_count == 1
@@ -0,0 +1,120 @@
+"""
+Tests for read-replica routing
+"""
+
+import contextvars
+import threading
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+
+def _database(path, *names):
+    from src.db.models import Base, Customer
+
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    with sessionmaker(bind=engine)() as session:
+        for i, name in enumerate(names, start=1):
+            session.add(Customer(telegram_id=i, name=name, phone=f"+97250000000{i}"))
+        session.commit()
+    engine.dispose()
+    return f"sqlite:///{path}"
+
+
+@pytest.fixture
+def manager(tmp_path):
+    """Primary with two customers and a replica that has only replicated one"""
+    from src.db import replica
+    from src.db.operations import DatabaseManager
+    from src.utils import db_retry
+
+    config = SimpleNamespace(
+        supabase_connection_string="",
+        database_url=_database(tmp_path / "primary.db", "Dana", "Yossi"),
+        database_replica_url="",
+        db_replica_max_lag_seconds=5.0,
+        environment="test",
+        db_pool_mode="auto",
+        db_pool_size=0,
+        db_max_overflow=-1,
+        db_pool_adaptive=False,
+    )
+    db_retry._breakers.pop("replica", None)
+    # Writes published by earlier tests would pin reads to the primary
+    replica.begin_write_scope()
+    db_manager = DatabaseManager(config, replica_url=_database(tmp_path / "replica.db", "Dana"))
+    yield db_manager
+    replica.begin_write_scope()
+    db_retry._breakers.pop("replica", None)
+    db_manager.get_engine().dispose()
+    if db_manager._replica is not None:
+        db_manager._replica.engine.dispose()
+
+
+def _customers(session):
+    from src.db.models import Customer
+
+    try:
+        return session.query(Customer).count()
+    finally:
+        session.close()
+
+
+class TestReadReplicaRouting:
+    """Test where reads are sent"""
+
+    def test_reads_use_replica_and_writes_pin_primary(self, manager):
+        """Test that read-only queries hit the replica until a write is published"""
+        from src.db.operations import count_customers
+        from src.utils.invalidation_bus import InvalidationBus, LoopbackBackend, register_default_handlers
+
+        assert _customers(manager.get_read_session()) == 1
+        assert _customers(manager.get_session()) == 2
+        with patch("src.db.operations.get_db_manager", return_value=manager):
+            assert count_customers() == 1
+
+            register_default_handlers(InvalidationBus(LoopbackBackend())).publish("orders")
+            assert count_customers() == 2
+        assert manager.get_replica_status()["pinned_to_primary"] is True
+
+    def test_write_pins_only_its_own_scope(self, manager):
+        """Test that another update's write does not move this update's reads to the primary"""
+        from src.db.replica import begin_write_scope
+        from src.utils.invalidation_bus import InvalidationBus, LoopbackBackend, register_default_handlers
+
+        bus = register_default_handlers(InvalidationBus(LoopbackBackend()))
+
+        def update(write):
+            begin_write_scope()
+            if write:
+                bus.publish("orders")
+            # Reads in worker threads started from the update share its pin
+            reads = []
+            worker = threading.Thread(target=contextvars.copy_context().run,
+                                      args=(lambda: reads.append(_customers(manager.get_read_session())),))
+            worker.start()
+            worker.join()
+            return _customers(manager.get_read_session()), reads[0]
+
+        assert contextvars.Context().run(update, True) == (2, 2)
+        assert contextvars.Context().run(update, False) == (1, 1)
+
+    def test_fallback_when_lagging_or_down(self, manager):
+        """Test that a lagging or unreachable replica sends reads to the primary"""
+        replica = manager._get_replica()
+        replica.check_interval = 0
+
+        with patch.object(replica, "measure_lag", return_value=30.0):
+            assert _customers(manager.get_read_session()) == 2
+        assert replica.lag == 30.0
+
+        with patch.object(replica, "measure_lag", side_effect=OSError("connection refused")):
+            assert _customers(manager.get_read_session()) == 2
+        assert replica.lag is None and replica.breaker.failures == 1
+
+        assert _customers(manager.get_read_session()) == 1
+        assert replica.breaker.failures == 0
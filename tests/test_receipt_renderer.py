@@ -0,0 +1,122 @@
+"""
+Tests for the native 58 mm receipt renderer
+"""
+
+import asyncio
+import re
+import struct
+import zlib
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+ORDER = {
+    "order_id": 7,
+    "customer_name": "דנה",
+    "customer_phone": "+972500000000",
+    "delivery_method": "pickup",
+    "items": [{"product_name": "כובנה (Kubaneh) 🍞", "quantity": 2, "unit_price": 25.0, "total_price": 50.0}],
+    "delivery_charge": 5,
+    "created_at": "2025-01-01 10:00",
+}
+
+
+@pytest.fixture
+def font():
+    """The bundled Hebrew-capable font"""
+    from src.services.receipt_renderer import BUNDLED_FONT, load_receipt_font
+
+    return load_receipt_font(BUNDLED_FONT)
+
+
+class TestReceiptFont:
+    """Test font lookup"""
+
+    def test_bundled_font_is_used_by_default(self):
+        """Test that the bundled font is found before any system font"""
+        from src.services.receipt_renderer import BUNDLED_FONT, find_receipt_font
+
+        assert find_receipt_font() == BUNDLED_FONT
+        assert find_receipt_font("/nonexistent.ttf") == BUNDLED_FONT
+
+
+class TestVisualOrder:
+    """Test bidirectional reordering"""
+
+    def test_hebrew_with_numbers_and_brackets(self):
+        """Test that numbers keep their order and brackets are mirrored"""
+        from src.services.receipt_renderer import visual_order
+
+        assert visual_order("שלום") == "םולש"
+        assert visual_order('סה"כ ₪50.00', rtl=True) == '₪50.00 כ"הס'
+        assert visual_order("כובנה (Kubaneh)", rtl=True) == "(Kubaneh) הנבוכ"
+        assert visual_order("Total 12.50") == "Total 12.50"
+
+
+class TestReceiptPdf:
+    """Test the PDF writer and font subsetting"""
+
+    def test_pdf_embeds_font_subset(self, font):
+        """Test that the receipt is a 58 mm page with a subset font far smaller than the original"""
+        from src.services.receipt_renderer import render_receipt_pdf
+
+        pdf = render_receipt_pdf(ORDER, {"business_name": "סמנה סלטה"}, font=font)
+
+        assert pdf.startswith(b"%PDF-1.4") and pdf.rstrip().endswith(b"%%EOF")
+        assert b"/MediaBox [0 0 164.41 " in pdf
+        assert b"/FontFile2" in pdf and b"/ToUnicode" in pdf
+        assert len(pdf) < len(font.data) / 4
+
+        streams = [zlib.decompress(m) for m in re.findall(rb"stream\n(.*?)\nendstream", pdf, re.S)]
+        subset = next(s for s in streams if s[:4] == b"\x00\x01\x00\x00")
+        assert len(subset) < len(font.data)
+
+        tables = {}
+        for i in range(struct.unpack_from(">H", subset, 4)[0]):
+            tag, _, offset, length = struct.unpack_from(">4sIII", subset, 12 + 16 * i)
+            tables[tag] = (offset, length)
+        assert {b"glyf", b"loca", b"head", b"hmtx", b"maxp"} <= set(tables)
+        assert struct.unpack_from(">H", subset, tables[b"maxp"][0] + 4)[0] == font.num_glyphs
+        assert tables[b"glyf"][1] < font.tables[b"glyf"][1] / 10
+
+
+class TestReceiptEscPos:
+    """Test the thermal printer byte stream"""
+
+    def test_escpos_stream(self):
+        """Test initialisation, Hebrew code page, line width and cut"""
+        from src.services.receipt_renderer import render_receipt_escpos
+
+        data = render_receipt_escpos(ORDER, {"business_name": "Samna Salta"})
+
+        assert data.startswith(b"\x1b@\x1bt\x0f")
+        assert data.endswith(b"\x1dVB\x00")
+        assert "הנבוכ".encode("cp862") in data
+        assert b"NIS55.00" in data
+        for line in data.split(b"\n"):
+            text = line
+            for prefix in (b"\x1bE\x00", b"\x1bE\x01", b"\x1d!\x00", b"\x1d!\x11", b"\x1ba\x00", b"\x1ba\x01", b"\x1ba\x02"):
+                text = text.replace(prefix, b"")
+            if not text.startswith(b"\x1b"):
+                assert len(text) <= 32
+
+
+class TestBuildInvoicePdf:
+    """Test that receipts use the native renderer"""
+
+    def test_receipt_skips_chromium(self, font, tmp_path):
+        """Test that a receipt is rendered natively and cached"""
+        from src.services import invoice_service
+        from src.services.pdf_cache import PdfCache
+
+        render = AsyncMock(return_value=b"%PDF-chromium")
+        cache = PdfCache(str(tmp_path))
+        with patch.object(invoice_service, "get_pdf_cache", return_value=cache), patch.object(
+            invoice_service, "generate_pdf_from_html", render
+        ):
+            first = asyncio.run(invoice_service.build_invoice_pdf(ORDER, receipt=True))
+            second = asyncio.run(invoice_service.build_invoice_pdf(ORDER, receipt=True))
+
+        assert render.await_count == 0
+        assert first["pdf"].startswith(b"%PDF-1.4")
+        assert second["pdf"] == first["pdf"]
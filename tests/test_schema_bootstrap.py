@@ -0,0 +1,59 @@
+"""
+Tests for the schema version stamp and versioned migrations
+"""
+
+from sqlalchemy import create_engine, event, inspect, text
+
+from src.db.schema import MIGRATIONS, Migration, ensure_schema, read_schema_version, schema_fingerprint
+
+
+def _count_statements(engine):
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+    return statements
+
+
+class TestSchemaBootstrap:
+    """Test the cold and warm startup paths"""
+
+    def test_warm_start_is_one_select(self, tmp_path):
+        """Test that the second boot only reads the stamp"""
+        engine = create_engine(f"sqlite:///{tmp_path / 'app.db'}")
+
+        assert ensure_schema(engine) is True
+        assert {"schema_version", "orders", "product_option_rules"} <= set(inspect(engine).get_table_names())
+        assert read_schema_version(engine) == (schema_fingerprint(), MIGRATIONS[-1].version)
+
+        statements = _count_statements(engine)
+        assert ensure_schema(engine) is False
+        assert len(statements) == 1 and statements[0].lstrip().upper().startswith("SELECT")
+        engine.dispose()
+
+    def test_migrations_run_once_in_order(self, tmp_path):
+        """Test that only new steps run when a release adds one"""
+        engine = create_engine(f"sqlite:///{tmp_path / 'app.db'}")
+        calls = []
+
+        def step(name):
+            return lambda conn: calls.append((name, conn.execute(text("SELECT 1")).scalar()))
+
+        first = (Migration(1, "one", step("one")), Migration(2, "two", step("two")))
+        ensure_schema(engine, first)
+        ensure_schema(engine, first)
+        assert calls == [("one", 1), ("two", 1)]
+
+        second = first + (Migration(3, "three", step("three")),)
+        assert ensure_schema(engine, second) is True
+        assert calls[-1] == ("three", 1) and len(calls) == 3
+        assert read_schema_version(engine) == (schema_fingerprint(second), 3)
+        engine.dispose()
+
+    def test_legacy_database_is_upgraded(self, tmp_path):
+        """Test that the app_images step adds the column to an old table"""
+        engine = create_engine(f"sqlite:///{tmp_path / 'app.db'}")
+        with engine.begin() as conn:
+            conn.execute(text("CREATE TABLE business_settings (id INTEGER PRIMARY KEY, business_name TEXT)"))
+
+        ensure_schema(engine)
+        assert "app_images" in {c["name"] for c in inspect(engine).get_columns("business_settings")}
+        engine.dispose()
@@ -0,0 +1,82 @@
+"""
+Tests for the versioned business settings snapshot
+"""
+
+import json
+from unittest.mock import patch
+
+import pytest
+
+from src.utils import settings_snapshot
+from src.utils.image_handler import STEP_IMAGES, get_step_image
+from src.utils.settings_snapshot import (
+    build_settings_snapshot,
+    bump_settings_version,
+    get_settings_snapshot,
+)
+
+WELCOME_URL = "https://cdn.example.com/welcome.jpg"
+
+
+@pytest.fixture
+def fresh_snapshot():
+    """Force the next read to reload settings"""
+    settings_snapshot._holder.reset()
+    yield
+    settings_snapshot._holder.reset()
+
+
+class TestBuildSnapshot:
+    """Test parsing of settings into a snapshot"""
+
+    def test_step_images_resolve_overrides_and_aliases(self):
+        """Test exact overrides, alias fallbacks and defaults"""
+        snapshot = build_settings_snapshot(
+            {"app_images": json.dumps({"welcome": WELCOME_URL, "menu": "not a url"})}, version=1
+        )
+
+        assert snapshot.step_images["welcome"] == WELCOME_URL
+        assert snapshot.step_images["main_page"] == WELCOME_URL
+        assert snapshot.step_images["registration_complete"] == WELCOME_URL
+        assert snapshot.step_images["menu"] == STEP_IMAGES["menu"]
+
+    def test_delivery_charge_parsed(self):
+        """Test delivery charge parsing"""
+        assert build_settings_snapshot({"delivery_charge": "7.5"}, 1).delivery_charge == 7.5
+        assert build_settings_snapshot({"delivery_charge": "abc"}, 1).delivery_charge is None
+
+    def test_snapshot_is_immutable(self):
+        """Test that snapshot values cannot be mutated"""
+        snapshot = build_settings_snapshot({"business_name": "Samna"}, 1)
+        with pytest.raises(TypeError):
+            snapshot.values["business_name"] = "Other"
+        copy = snapshot.as_dict()
+        copy["business_name"] = "Other"
+        assert snapshot.get("business_name") == "Samna"
+
+
+class TestSnapshotVersioning:
+    """Test reload behaviour"""
+
+    def test_reloads_only_after_version_bump(self, fresh_snapshot):
+        """Test that the database is read once per version"""
+        with patch("src.db.operations.load_business_settings_dict", return_value={"business_name": "A"}) as load:
+            get_settings_snapshot()
+            get_settings_snapshot()
+            get_step_image("menu")
+            assert load.call_count == 1
+
+            bump_settings_version()
+            get_settings_snapshot()
+            assert load.call_count == 2
+
+    def test_failed_reload_serves_previous_snapshot(self, fresh_snapshot):
+        """Test that a reload failure keeps the last good snapshot"""
+        with patch("src.db.operations.load_business_settings_dict", return_value={"business_name": "A"}):
+            first = get_settings_snapshot()
+
+        bump_settings_version()
+        with patch("src.db.operations.load_business_settings_dict", side_effect=Exception("db down")) as load:
+            assert get_settings_snapshot() is first
+            assert get_settings_snapshot() is first
+            assert load.call_count == 1
@@ -0,0 +1,100 @@
+"""
+Tests for the embedded SQLite storage mode and portable cart option grouping
+"""
+
+import threading
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy import text
+
+
+@pytest.fixture
+def manager(tmp_path):
+    """Database manager on a fresh SQLite file with the schema and one product"""
+    from src.db.models import Product
+    from src.db.operations import DatabaseManager
+
+    config = SimpleNamespace(
+        supabase_connection_string="",
+        database_url=f"sqlite:///{tmp_path / 'app.db'}",
+        database_replica_url="",
+        environment="test",
+        db_pool_mode="auto",
+        db_pool_size=0,
+        db_max_overflow=-1,
+        db_pool_adaptive=False,
+    )
+    db_manager = DatabaseManager(config)
+    db_manager.create_tables()
+    with db_manager.get_session_context() as session:
+        session.add(Product(name="Kubaneh", price=25.0))
+    yield db_manager
+    db_manager.get_engine().dispose()
+
+
+class TestSQLiteMode:
+    """Test connection tuning and transactions on a SQLite file"""
+
+    def test_connections_use_wal_and_pragmas(self, manager):
+        """Test that pooled connections run in WAL mode with the configured pragmas"""
+        from src.utils.constants import SQLiteSettings
+
+        with manager.get_engine().connect() as conn:
+            assert conn.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+            assert conn.execute(text("PRAGMA synchronous")).scalar() == 1  # NORMAL
+            assert conn.execute(text("PRAGMA foreign_keys")).scalar() == 1
+            assert conn.execute(text("PRAGMA busy_timeout")).scalar() == SQLiteSettings.BUSY_TIMEOUT_MS
+
+    def test_concurrent_writers_wait_for_the_lock(self, manager):
+        """Test that overlapping add_to_cart calls from threads all succeed"""
+        from src.db import operations
+        from src.db.models import CartItem
+
+        with patch.object(operations, "get_db_manager", return_value=manager):
+            results = []
+            threads = [
+                threading.Thread(target=lambda: results.append(operations.add_to_cart(1, 1, 1, {"size": "large"})))
+                for _ in range(8)
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        assert results == [True] * 8
+        with manager.get_session_context() as session:
+            assert [item.quantity for item in session.query(CartItem)] == [8]
+
+
+class TestCartOptionGrouping:
+    """Test that cart lines are grouped by their canonical options key"""
+
+    def test_options_key_ignores_key_order(self):
+        """Test that equal selections share a key and no options is the empty key"""
+        from src.db.models import CartItem, canonical_options_key
+
+        assert canonical_options_key({"size": "large", "extra": "egg"}) == canonical_options_key(
+            {"extra": "egg", "size": "large"}
+        )
+        assert canonical_options_key({"size": "large"}) != canonical_options_key({"size": "small"})
+        assert canonical_options_key(None) == canonical_options_key({}) == ""
+        assert CartItem(product_options={"size": "large"}).options_key == canonical_options_key({"size": "large"})
+
+    def test_add_to_cart_groups_equal_options(self, manager):
+        """Test that the same options in any order add to one line and other options get their own"""
+        from src.db import operations
+        from src.db.models import CartItem
+
+        with patch.object(operations, "get_db_manager", return_value=manager):
+            assert operations.add_to_cart(1, 1, 1, {"size": "large", "extra": "egg"})
+            assert operations.add_to_cart(1, 1, 2, {"extra": "egg", "size": "large"})
+            assert operations.add_to_cart(1, 1, 1, {"size": "small"})
+            assert operations.add_to_cart(1, 1, 1)
+
+        with manager.get_session_context() as session:
+            lines = sorted((item.quantity, item.options_key, item.product_options) for item in session.query(CartItem))
+        assert [(quantity, options) for quantity, _key, options in lines] == [
+            (1, {}), (1, {"size": "small"}), (3, {"size": "large", "extra": "egg"})
+        ]
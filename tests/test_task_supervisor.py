@@ -0,0 +1,99 @@
+"""
+Tests for the bounded background task supervisor
+"""
+
+import asyncio
+
+import pytest
+
+from src.utils.metrics import get_metrics
+from src.utils.task_supervisor import DuplicateTask, SupervisorClosed, TaskPoolFull, TaskSupervisor
+
+
+class TestTaskSupervisor:
+    """Test limits, dedup, cancellation and shutdown"""
+
+    def test_concurrency_and_queue_bounds(self):
+        """Test that a pool runs at most N tasks and rejects beyond its queue"""
+
+        async def run():
+            supervisor = TaskSupervisor({"pdf": (2, 1)})
+            release = asyncio.Event()
+            running = 0
+            peak = 0
+
+            async def job():
+                nonlocal running, peak
+                running += 1
+                peak = max(peak, running)
+                await release.wait()
+                running -= 1
+
+            tasks = [supervisor.submit("pdf", job(), key=i) for i in range(3)]
+            with pytest.raises(TaskPoolFull):
+                supervisor.submit("pdf", job(), key=3)
+            await asyncio.sleep(0)
+            stats = supervisor.stats()["pdf"]
+            release.set()
+            await asyncio.gather(*tasks)
+            return peak, stats
+
+        peak, stats = asyncio.run(run())
+        assert peak == 2
+        assert (stats["running"], stats["waiting"]) == (2, 1)
+        assert get_metrics().gauges['task_queue_depth{pool="pdf"}'] == 0
+
+    def test_dedup_and_cancel(self):
+        """Test that a key is unique while scheduled and can be cancelled"""
+
+        async def run():
+            supervisor = TaskSupervisor({"export": (1, 1)})
+            task = supervisor.submit("export", asyncio.sleep(10), key="day")
+            with pytest.raises(DuplicateTask):
+                supervisor.submit("export", asyncio.sleep(0), key="day")
+            await asyncio.sleep(0)
+            assert supervisor.cancel("export", "day")
+            await asyncio.gather(task, return_exceptions=True)
+            # The key is free again once the task is gone
+            await supervisor.submit("export", asyncio.sleep(0), key="day")
+            return supervisor.stats()["export"]
+
+        stats = asyncio.run(run())
+        assert (stats["running"], stats["waiting"]) == (0, 0)
+
+    def test_exports_and_imports_have_separate_pools(self):
+        """Test that a full order export pool does not reject invoice exports or imports"""
+        from src.utils.constants import TaskPoolSettings
+
+        async def run():
+            supervisor = TaskSupervisor()
+            tasks = [supervisor.submit(TaskPoolSettings.EXPORT, asyncio.sleep(0.01), key=i) for i in range(3)]
+            with pytest.raises(TaskPoolFull):
+                supervisor.submit(TaskPoolSettings.EXPORT, asyncio.sleep(0), key=3)
+            tasks.append(supervisor.submit(TaskPoolSettings.INVOICE_EXPORT, asyncio.sleep(0), key="day"))
+            tasks.append(supervisor.submit(TaskPoolSettings.IMPORT, asyncio.sleep(0), key="import"))
+            await asyncio.gather(*tasks)
+
+        asyncio.run(run())
+
+    def test_shutdown_drains_then_cancels(self):
+        """Test that shutdown waits for quick tasks and cancels slow ones"""
+
+        async def run():
+            supervisor = TaskSupervisor({"analytics": (1, 2)})
+            finished = []
+
+            async def quick():
+                await asyncio.sleep(0.01)
+                finished.append("quick")
+
+            supervisor.submit("analytics", quick())
+            slow = supervisor.submit("analytics", asyncio.sleep(10))
+            await supervisor.shutdown(timeout=0.2)
+            with pytest.raises(SupervisorClosed):
+                supervisor.submit("analytics", quick())
+            return finished, slow
+
+        finished, slow = asyncio.run(run())
+        assert finished == ["quick"]
+        assert slow.cancelled()
@@ -0,0 +1,68 @@
+"""
+Tests for transaction options and connection liveness
+"""
+
+import time
+from unittest.mock import MagicMock, patch
+
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.pool import QueuePool
+
+
+class TestAtomicTransaction:
+    """Test that transaction characteristics cost no extra statements"""
+
+    def test_postgres_options_without_set_statements(self):
+        """Test isolation and read-only are passed as execution options"""
+        from src.db.operations import ACIDTransactionManager
+
+        session = MagicMock()
+        session.bind.dialect.name = "postgresql"
+        with patch("src.db.operations.get_db_session", return_value=session):
+            with ACIDTransactionManager.atomic_transaction("SERIALIZABLE", read_only=True):
+                pass
+
+        session.connection.assert_called_once_with(
+            execution_options={"isolation_level": "SERIALIZABLE", "postgresql_readonly": True}
+        )
+        session.execute.assert_not_called()
+        session.commit.assert_called_once()
+
+    def test_non_default_lock_timeout_is_set_locally(self):
+        """Test that only a non-default timeout adds a SET LOCAL"""
+        from src.db.operations import ACIDTransactionManager
+
+        session = MagicMock()
+        session.bind.dialect.name = "postgresql"
+        with patch("src.db.operations.get_db_session", return_value=session):
+            with ACIDTransactionManager.atomic_transaction(timeout=5):
+                pass
+
+        session.connection.assert_called_once_with(execution_options={"isolation_level": "READ COMMITTED"})
+        assert "lock_timeout = '5s'" in str(session.execute.call_args.args[0])
+
+
+class TestLivenessCheck:
+    """Test that pooled connections are pinged only after idling"""
+
+    def test_idle_connection_is_checked_and_replaced(self, tmp_path):
+        """Test that a busy connection is reused silently and a dead idle one is swapped"""
+        from src.db.operations import DatabaseManager
+
+        engine = create_engine(f"sqlite:///{tmp_path / 'pool.db'}", poolclass=QueuePool, pool_size=1)
+        DatabaseManager._setup_liveness_check(engine, idle_seconds=60)
+        connects = []
+        event.listen(engine, "connect", lambda dbapi_connection, record: connects.append(dbapi_connection))
+
+        for _ in range(3):
+            with engine.connect() as conn:
+                conn.execute(text("SELECT 1"))
+        assert len(connects) == 1
+
+        connects[0].close()  # the server dropped it while idle
+        record = engine.pool._pool.queue[0]
+        record.info["checked_in_at"] = time.monotonic() - 120
+        with engine.connect() as conn:
+            assert conn.execute(text("SELECT 2")).scalar() == 2
+        assert len(connects) == 2
+        engine.dispose()